@@ -0,0 +1,38 @@
+"""unique ven telemetry sample per ven and timestamp
+
+Revision ID: 202510220001
+Revises: 202510210001
+Create Date: 2025-10-22 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '202510220001'
+down_revision = '202510210001'
+branch_labels = None
+depends_on = None
+
+
+_DUPLICATE_IDS = (
+    "SELECT id FROM ven_telemetry WHERE id NOT IN "
+    "(SELECT MIN(id) FROM ven_telemetry GROUP BY ven_id, timestamp)"
+)
+
+
+def upgrade():
+    # Keep the first copy of every duplicated sample, together with its loads.
+    op.execute(f"DELETE FROM ven_load_samples WHERE telemetry_id IN ({_DUPLICATE_IDS})")
+    op.execute(f"DELETE FROM ven_telemetry WHERE id IN ({_DUPLICATE_IDS})")
+
+    op.create_index(
+        'uq_ven_telemetry_ven_timestamp',
+        'ven_telemetry',
+        ['ven_id', 'timestamp'],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index('uq_ven_telemetry_ven_timestamp', table_name='ven_telemetry')
@@ -0,0 +1,150 @@
+"""range-partition telemetry tables by timestamp
+
+Revision ID: 202510230001
+Revises: 202510220001
+Create Date: 2025-10-23 09:00:00.000000
+
+``ven_load_samples`` gains the ``timestamp`` of its telemetry sample on every
+database. On Postgres, ``ven_telemetry``, ``ven_load_samples`` and
+``load_snapshots`` are then rebuilt as tables range-partitioned by
+``timestamp``: weekly partitions cover the existing rows plus two weeks
+ahead, a default partition catches anything else, and
+``app.services.partition_maintenance`` keeps creating (and, with a retention
+set, dropping) partitions from there. Existing rows are copied in the same
+transaction, so plan for downtime proportional to the table sizes.
+
+Primary keys become ``(id, timestamp)`` since they must include the
+partition key; ids keep coming from the existing sequences.
+"""
+from datetime import UTC, datetime, timedelta
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '202510230001'
+down_revision = '202510220001'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ('ven_telemetry', 'ven_load_samples', 'load_snapshots')
+WEEKS_AHEAD = 2
+
+_BACKFILL_SAMPLE_TIMESTAMP = (
+    "UPDATE ven_load_samples SET timestamp = "
+    "(SELECT ven_telemetry.timestamp FROM ven_telemetry WHERE ven_telemetry.id = ven_load_samples.telemetry_id)"
+)
+
+# Constraints and indexes of the partitioned tables; created on the parents
+# after the copy so each partition gets its own.
+_PARTITIONED_CONSTRAINTS = (
+    "ALTER TABLE ven_telemetry ADD PRIMARY KEY (id, timestamp)",
+    "ALTER TABLE ven_telemetry ADD FOREIGN KEY (ven_id) REFERENCES vens (ven_id) ON DELETE CASCADE",
+    "ALTER TABLE ven_telemetry ADD FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE SET NULL",
+    "CREATE UNIQUE INDEX uq_ven_telemetry_ven_timestamp ON ven_telemetry (ven_id, timestamp)",
+    "CREATE INDEX ix_ven_telemetry_id ON ven_telemetry (id)",
+    "CREATE INDEX ix_ven_telemetry_event_id ON ven_telemetry (event_id)",
+    "CREATE INDEX ix_ven_telemetry_timestamp ON ven_telemetry USING brin (timestamp)",
+    "ALTER TABLE ven_load_samples ADD PRIMARY KEY (id, timestamp)",
+    "ALTER TABLE ven_load_samples ADD FOREIGN KEY (telemetry_id, timestamp) "
+    "REFERENCES ven_telemetry (id, timestamp) ON DELETE CASCADE",
+    "CREATE INDEX ix_ven_load_samples_telemetry_id ON ven_load_samples (telemetry_id)",
+    "CREATE INDEX ix_ven_load_samples_timestamp ON ven_load_samples USING brin (timestamp)",
+    "ALTER TABLE load_snapshots ADD PRIMARY KEY (id, timestamp)",
+    "CREATE INDEX ix_load_snapshots_ven_id_timestamp ON load_snapshots (ven_id, timestamp)",
+    "CREATE INDEX ix_load_snapshots_timestamp ON load_snapshots USING brin (timestamp)",
+)
+
+# The same for the original, unpartitioned tables.
+_PLAIN_CONSTRAINTS = (
+    "ALTER TABLE ven_telemetry ADD PRIMARY KEY (id)",
+    "ALTER TABLE ven_telemetry ADD FOREIGN KEY (ven_id) REFERENCES vens (ven_id) ON DELETE CASCADE",
+    "ALTER TABLE ven_telemetry ADD FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE SET NULL",
+    "CREATE UNIQUE INDEX uq_ven_telemetry_ven_timestamp ON ven_telemetry (ven_id, timestamp)",
+    "CREATE INDEX ix_ven_telemetry_ven_id ON ven_telemetry (ven_id)",
+    "CREATE INDEX ix_ven_telemetry_event_id ON ven_telemetry (event_id)",
+    "CREATE INDEX ix_ven_telemetry_timestamp ON ven_telemetry (timestamp)",
+    "ALTER TABLE ven_load_samples ADD PRIMARY KEY (id)",
+    "ALTER TABLE ven_load_samples ADD FOREIGN KEY (telemetry_id) REFERENCES ven_telemetry (id) ON DELETE CASCADE",
+    "CREATE INDEX ix_ven_load_samples_telemetry_id ON ven_load_samples (telemetry_id)",
+    "ALTER TABLE load_snapshots ADD PRIMARY KEY (id)",
+    "CREATE INDEX ix_load_snapshots_ven_id ON load_snapshots (ven_id)",
+    "CREATE INDEX ix_load_snapshots_timestamp ON load_snapshots (timestamp)",
+)
+
+
+def _week_start(moment):
+    day = moment.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+
+def _rebuild(partitioned):
+    """Copy the three tables into new ones, partitioned or not, keeping ids."""
+
+    bind = op.get_bind()
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+        partition_by = " PARTITION BY RANGE (timestamp)" if partitioned else ""
+        op.execute(f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS){partition_by}")
+
+    if partitioned:
+        oldest = [
+            bind.execute(sa.text(f"SELECT MIN(timestamp) FROM {table}_old")).scalar()
+            for table in ('ven_telemetry', 'load_snapshots')
+        ]
+        now = datetime.now(UTC)
+        lower = _week_start(min([moment for moment in oldest if moment is not None] + [now]))
+        horizon = _week_start(now) + timedelta(weeks=WEEKS_AHEAD + 1)
+        while lower < horizon:
+            upper = lower + timedelta(weeks=1)
+            for table in TABLES:
+                op.execute(
+                    f"CREATE TABLE {table}_p{lower:%Y%m%d} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+                )
+            lower = upper
+        for table in TABLES:
+            op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    for table in TABLES:
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    for table in reversed(TABLES):
+        op.execute(f"DROP TABLE {table}_old")
+    for table in TABLES:
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    for statement in _PARTITIONED_CONSTRAINTS if partitioned else _PLAIN_CONSTRAINTS:
+        op.execute(statement)
+
+
+def upgrade():
+    op.add_column('ven_load_samples', sa.Column('timestamp', sa.DateTime(timezone=True), nullable=True))
+    op.execute(_BACKFILL_SAMPLE_TIMESTAMP)
+
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('ven_load_samples') as batch_op:
+            batch_op.alter_column('timestamp', existing_type=sa.DateTime(timezone=True), nullable=False)
+            batch_op.create_index('ix_ven_load_samples_timestamp', ['timestamp'])
+        op.drop_index('ix_ven_telemetry_ven_id', table_name='ven_telemetry')
+        op.drop_index('ix_load_snapshots_ven_id', table_name='load_snapshots')
+        op.create_index('ix_load_snapshots_ven_id_timestamp', 'load_snapshots', ['ven_id', 'timestamp'])
+        return
+
+    op.execute("ALTER TABLE ven_load_samples ALTER COLUMN timestamp SET NOT NULL")
+    _rebuild(partitioned=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        op.drop_index('ix_load_snapshots_ven_id_timestamp', table_name='load_snapshots')
+        op.create_index('ix_load_snapshots_ven_id', 'load_snapshots', ['ven_id'])
+        op.create_index('ix_ven_telemetry_ven_id', 'ven_telemetry', ['ven_id'])
+        with op.batch_alter_table('ven_load_samples') as batch_op:
+            batch_op.drop_index('ix_ven_load_samples_timestamp')
+            batch_op.drop_column('timestamp')
+        return
+
+    _rebuild(partitioned=False)
+    op.drop_column('ven_load_samples', 'timestamp')
@@ -0,0 +1,86 @@
+"""add per-VEN and fleet telemetry rollups
+
+Revision ID: 202510240001
+Revises: 202510230001
+Create Date: 2025-10-24 09:00:00.000000
+
+Rollups of 1 minute, 5 minutes and 1 hour are maintained on ingest by
+``app.services.telemetry_rollups``. On Postgres they are backfilled from the
+existing telemetry; elsewhere they start empty.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202510240001'
+down_revision = '202510230001'
+branch_labels = None
+depends_on = None
+
+
+RESOLUTIONS = (60, 300, 3600)
+MEASURES = (
+    ('used_power', 'used_power_kw'),
+    ('shed_power', 'shed_power_kw'),
+    ('requested_reduction', 'requested_reduction_kw'),
+)
+
+
+def _rollup_columns():
+    columns = [
+        sa.Column('bucket_seconds', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False),
+    ]
+    for measure, _ in MEASURES:
+        columns += [
+            sa.Column(f'{measure}_sum', sa.Float(), nullable=False),
+            sa.Column(f'{measure}_count', sa.Integer(), nullable=False),
+            sa.Column(f'{measure}_min', sa.Float(), nullable=True),
+            sa.Column(f'{measure}_max', sa.Float(), nullable=True),
+        ]
+    columns.append(sa.Column('event_id', sa.String(), nullable=True))
+    return columns
+
+
+def _backfill(table, group_columns):
+    measures = ', '.join(
+        f'COALESCE(SUM({column}), 0), COUNT({column}), MIN({column}), MAX({column})'
+        for _, column in MEASURES
+    )
+    targets = ', '.join(
+        f'{measure}_sum, {measure}_count, {measure}_min, {measure}_max' for measure, _ in MEASURES
+    )
+    keys = ''.join(f'{column}, ' for column in group_columns)
+    for resolution in RESOLUTIONS:
+        bucket = f'to_timestamp(floor(extract(epoch FROM timestamp) / {resolution}) * {resolution})'
+        op.execute(
+            f"INSERT INTO {table} ({keys}bucket_seconds, bucket_start, sample_count, {targets}, event_id) "
+            f"SELECT {keys}{resolution}, {bucket} AS bucket, COUNT(*), {measures}, "
+            "(array_agg(event_id ORDER BY timestamp DESC) FILTER (WHERE event_id IS NOT NULL))[1] "
+            f"FROM ven_telemetry GROUP BY {keys}bucket"
+        )
+
+
+def upgrade():
+    op.create_table(
+        'ven_telemetry_rollups',
+        sa.Column('ven_id', sa.String(), sa.ForeignKey('vens.ven_id', ondelete='CASCADE'), nullable=False),
+        *_rollup_columns(),
+        sa.PrimaryKeyConstraint('ven_id', 'bucket_seconds', 'bucket_start'),
+    )
+    op.create_table(
+        'fleet_telemetry_rollups',
+        *_rollup_columns(),
+        sa.PrimaryKeyConstraint('bucket_seconds', 'bucket_start'),
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        _backfill('ven_telemetry_rollups', ['ven_id'])
+        _backfill('fleet_telemetry_rollups', [])
+
+
+def downgrade():
+    op.drop_table('fleet_telemetry_rollups')
+    op.drop_table('ven_telemetry_rollups')
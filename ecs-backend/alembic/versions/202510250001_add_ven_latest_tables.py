@@ -0,0 +1,87 @@
+"""add latest VEN state tables
+
+Revision ID: 202510250001
+Revises: 202510240001
+Create Date: 2025-10-25 09:00:00.000000
+
+``ven_latest`` and ``ven_latest_loads`` are upserted by ingest
+(``app.services.latest_state``) and backfilled here from each VEN's newest
+telemetry sample.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202510250001'
+down_revision = '202510240001'
+branch_labels = None
+depends_on = None
+
+
+_BACKFILL_LATEST = """
+INSERT INTO ven_latest (
+    ven_id, telemetry_id, timestamp, used_power_kw, shed_power_kw,
+    requested_reduction_kw, event_id, battery_soc
+)
+SELECT t.ven_id, t.id, t.timestamp, t.used_power_kw, t.shed_power_kw,
+       t.requested_reduction_kw, t.event_id, t.battery_soc
+FROM ven_telemetry t
+JOIN (
+    SELECT ven_id, MAX(timestamp) AS max_timestamp FROM ven_telemetry GROUP BY ven_id
+) newest ON newest.ven_id = t.ven_id AND newest.max_timestamp = t.timestamp
+"""
+
+# One row per load id of the newest sample; ``position`` only has to order
+# the loads, so the sample row id will do.
+_BACKFILL_LOADS = """
+INSERT INTO ven_latest_loads (
+    ven_id, load_id, timestamp, position, name, type, capacity_kw,
+    current_power_kw, shed_capability_kw, enabled, priority
+)
+SELECT l.ven_id, s.load_id, l.timestamp, s.id, s.name, s.type, s.capacity_kw,
+       s.current_power_kw, s.shed_capability_kw, s.enabled, s.priority
+FROM ven_latest l
+JOIN ven_load_samples s ON s.telemetry_id = l.telemetry_id
+WHERE s.id IN (
+    SELECT MIN(s2.id) FROM ven_load_samples s2
+    JOIN ven_latest l2 ON s2.telemetry_id = l2.telemetry_id
+    GROUP BY s2.telemetry_id, s2.load_id
+)
+"""
+
+
+def upgrade():
+    op.create_table(
+        'ven_latest',
+        sa.Column('ven_id', sa.String(), sa.ForeignKey('vens.ven_id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('telemetry_id', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('used_power_kw', sa.Float(), nullable=True),
+        sa.Column('shed_power_kw', sa.Float(), nullable=True),
+        sa.Column('requested_reduction_kw', sa.Float(), nullable=True),
+        sa.Column('event_id', sa.String(), nullable=True),
+        sa.Column('battery_soc', sa.Float(), nullable=True),
+    )
+    op.create_table(
+        'ven_latest_loads',
+        sa.Column('ven_id', sa.String(), sa.ForeignKey('vens.ven_id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('load_id', sa.String(), primary_key=True),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.Column('capacity_kw', sa.Float(), nullable=True),
+        sa.Column('current_power_kw', sa.Float(), nullable=True),
+        sa.Column('shed_capability_kw', sa.Float(), nullable=True),
+        sa.Column('enabled', sa.Boolean(), nullable=True),
+        sa.Column('priority', sa.Integer(), nullable=True),
+    )
+
+    op.execute(_BACKFILL_LATEST)
+    op.execute(_BACKFILL_LOADS)
+
+
+def downgrade():
+    op.drop_table('ven_latest_loads')
+    op.drop_table('ven_latest')
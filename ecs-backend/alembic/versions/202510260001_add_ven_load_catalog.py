@@ -0,0 +1,115 @@
+"""move static load attributes into a ven_loads catalog
+
+Revision ID: 202510260001
+Revises: 202510250001
+Create Date: 2025-10-26 09:00:00.000000
+
+``ven_loads`` holds one row per VEN and load id with the name, type,
+capacity and priority of the load's newest sample; ``ven_load_samples``
+keeps only ``load_ref`` and the per-sample values. The per-load
+``raw_payload`` copies are dropped, the telemetry sample's own
+``raw_payload`` still holds the loads as received.
+
+On Postgres every sample row is rewritten once; the space of the old row
+versions is reused by new inserts after the next vacuum, or reclaimed at
+once with ``VACUUM FULL`` on each partition.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202510260001'
+down_revision = '202510250001'
+branch_labels = None
+depends_on = None
+
+
+_BACKFILL_CATALOG = """
+INSERT INTO ven_loads (ven_id, load_id, timestamp, name, type, capacity_kw, priority)
+SELECT t.ven_id, s.load_id, s.timestamp, s.name, s.type, s.capacity_kw, s.priority
+FROM ven_load_samples s
+JOIN ven_telemetry t ON t.id = s.telemetry_id
+WHERE s.id IN (
+    SELECT MAX(s2.id) FROM ven_load_samples s2
+    JOIN ven_telemetry t2 ON t2.id = s2.telemetry_id
+    GROUP BY t2.ven_id, s2.load_id
+)
+"""
+
+_BACKFILL_LOAD_REF = """
+UPDATE ven_load_samples SET load_ref = (
+    SELECT l.id FROM ven_loads l
+    JOIN ven_telemetry t ON t.ven_id = l.ven_id
+    WHERE t.id = ven_load_samples.telemetry_id AND l.load_id = ven_load_samples.load_id
+)
+"""
+
+_BACKFILL_LOAD_REF_POSTGRES = """
+UPDATE ven_load_samples s SET load_ref = l.id
+FROM ven_telemetry t, ven_loads l
+WHERE t.id = s.telemetry_id AND l.ven_id = t.ven_id AND l.load_id = s.load_id
+"""
+
+_RESTORE_ATTRIBUTES = """
+UPDATE ven_load_samples SET
+    load_id = (SELECT l.load_id FROM ven_loads l WHERE l.id = ven_load_samples.load_ref),
+    name = (SELECT l.name FROM ven_loads l WHERE l.id = ven_load_samples.load_ref),
+    type = (SELECT l.type FROM ven_loads l WHERE l.id = ven_load_samples.load_ref),
+    capacity_kw = (SELECT l.capacity_kw FROM ven_loads l WHERE l.id = ven_load_samples.load_ref),
+    priority = (SELECT l.priority FROM ven_loads l WHERE l.id = ven_load_samples.load_ref)
+"""
+
+_CATALOG_COLUMNS = (
+    ('name', sa.String()),
+    ('type', sa.String()),
+    ('capacity_kw', sa.Float()),
+    ('priority', sa.Integer()),
+)
+
+
+def upgrade():
+    op.create_table(
+        'ven_loads',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('ven_id', sa.String(), sa.ForeignKey('vens.ven_id', ondelete='CASCADE'), nullable=False),
+        sa.Column('load_id', sa.String(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        *(sa.Column(name, type_, nullable=True) for name, type_ in _CATALOG_COLUMNS),
+        sa.UniqueConstraint('ven_id', 'load_id', name='uq_ven_loads_ven_load'),
+    )
+    op.execute(_BACKFILL_CATALOG)
+
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    op.add_column('ven_load_samples', sa.Column('load_ref', sa.Integer(), nullable=True))
+    # Dropping the wide columns first keeps them out of the rewritten rows.
+    with op.batch_alter_table('ven_load_samples') as batch_op:
+        for name, _ in _CATALOG_COLUMNS:
+            batch_op.drop_column(name)
+        batch_op.drop_column('raw_payload')
+    op.execute(_BACKFILL_LOAD_REF_POSTGRES if postgres else _BACKFILL_LOAD_REF)
+
+    with op.batch_alter_table('ven_load_samples') as batch_op:
+        batch_op.drop_column('load_id')
+        batch_op.alter_column('load_ref', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_ven_load_samples_load_ref', 'ven_loads', ['load_ref'], ['id'], ondelete='CASCADE'
+        )
+        batch_op.create_index('ix_ven_load_samples_load_ref_timestamp', ['load_ref', 'timestamp'])
+
+
+def downgrade():
+    with op.batch_alter_table('ven_load_samples') as batch_op:
+        batch_op.add_column(sa.Column('load_id', sa.String(), nullable=True))
+        for name, type_ in _CATALOG_COLUMNS:
+            batch_op.add_column(sa.Column(name, type_, nullable=True))
+        # The per-load raw payloads cannot be recovered.
+        batch_op.add_column(sa.Column('raw_payload', sa.JSON(), nullable=True))
+    op.execute(_RESTORE_ATTRIBUTES)
+
+    with op.batch_alter_table('ven_load_samples') as batch_op:
+        batch_op.drop_index('ix_ven_load_samples_load_ref_timestamp')
+        batch_op.drop_constraint('fk_ven_load_samples_load_ref', type_='foreignkey')
+        batch_op.drop_column('load_ref')
+        batch_op.alter_column('load_id', existing_type=sa.String(), nullable=False)
+    op.drop_table('ven_loads')
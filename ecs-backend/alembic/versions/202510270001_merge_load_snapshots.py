@@ -0,0 +1,107 @@
+"""merge load_snapshots into ven_load_samples
+
+Revision ID: 202510270001
+Revises: 202510260001
+Create Date: 2025-10-27 09:00:00.000000
+
+Load snapshots become ``ven_load_samples`` rows without a ``telemetry_id``.
+Snapshot rows of VENs that no longer exist are dropped, as are rows with a
+sample of the same load within 30 seconds (on SQLite: at the same
+timestamp), which ingest would not store either. Loads only known from
+snapshots are added to the ``ven_loads`` catalog. ``load_snapshots``, and
+on Postgres its partitions, are then dropped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202510270001'
+down_revision = '202510260001'
+branch_labels = None
+depends_on = None
+
+
+_ADD_SNAPSHOT_LOADS = """
+INSERT INTO ven_loads (ven_id, load_id, timestamp, name, type, capacity_kw, priority)
+SELECT s.ven_id, s.load_id, s.timestamp, s.name, s.type, s.capacity_kw, s.priority
+FROM load_snapshots s
+WHERE s.id IN (SELECT MAX(id) FROM load_snapshots GROUP BY ven_id, load_id)
+  AND s.ven_id IN (SELECT ven_id FROM vens)
+  AND NOT EXISTS (
+      SELECT 1 FROM ven_loads l WHERE l.ven_id = s.ven_id AND l.load_id = s.load_id
+  )
+"""
+
+_MERGE_SNAPSHOTS = """
+INSERT INTO ven_load_samples (timestamp, load_ref, current_power_kw, shed_capability_kw, enabled)
+SELECT s.timestamp, l.id, s.current_power_kw, s.shed_capability_kw, s.enabled
+FROM load_snapshots s
+JOIN ven_loads l ON l.ven_id = s.ven_id AND l.load_id = s.load_id
+WHERE NOT EXISTS (
+    SELECT 1 FROM ven_load_samples x
+    WHERE x.load_ref = l.id AND x.timestamp BETWEEN {lower} AND {upper}
+)
+"""
+
+_RESTORE_SNAPSHOTS = """
+INSERT INTO load_snapshots (
+    ven_id, timestamp, load_id, name, type, capacity_kw,
+    current_power_kw, shed_capability_kw, enabled, priority
+)
+SELECT l.ven_id, s.timestamp, l.load_id, l.name, l.type, l.capacity_kw,
+       s.current_power_kw, s.shed_capability_kw, s.enabled, l.priority
+FROM ven_load_samples s
+JOIN ven_loads l ON l.id = s.load_ref
+WHERE s.telemetry_id IS NULL
+"""
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    with op.batch_alter_table('ven_load_samples') as batch_op:
+        batch_op.alter_column('telemetry_id', existing_type=sa.Integer(), nullable=True)
+
+    op.execute(_ADD_SNAPSHOT_LOADS)
+    if postgres:
+        window = "interval '30 seconds'"
+        op.execute(_MERGE_SNAPSHOTS.format(lower=f's.timestamp - {window}', upper=f's.timestamp + {window}'))
+    else:
+        op.execute(_MERGE_SNAPSHOTS.format(lower='s.timestamp', upper='s.timestamp'))
+    op.drop_table('load_snapshots')
+
+
+def downgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    op.create_table(
+        'load_snapshots',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('ven_id', sa.String(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('load_id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.Column('capacity_kw', sa.Float(), nullable=True),
+        sa.Column('current_power_kw', sa.Float(), nullable=True),
+        sa.Column('shed_capability_kw', sa.Float(), nullable=True),
+        sa.Column('enabled', sa.Boolean(), nullable=True),
+        sa.Column('priority', sa.Integer(), nullable=True),
+        sa.Column('raw_payload', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        # Partitioned tables need the partition key in their primary key.
+        sa.PrimaryKeyConstraint('id', 'timestamp') if postgres else sa.PrimaryKeyConstraint('id'),
+        postgresql_partition_by='RANGE (timestamp)',
+    )
+    if postgres:
+        # Restored rows land in the default partition; move them by hand
+        # before partition maintenance creates ranges over them.
+        op.execute("CREATE TABLE load_snapshots_default PARTITION OF load_snapshots DEFAULT")
+        op.execute("CREATE INDEX ix_load_snapshots_timestamp ON load_snapshots USING brin (timestamp)")
+    else:
+        op.create_index('ix_load_snapshots_timestamp', 'load_snapshots', ['timestamp'])
+    op.create_index('ix_load_snapshots_ven_id_timestamp', 'load_snapshots', ['ven_id', 'timestamp'])
+
+    op.execute(_RESTORE_SNAPSHOTS)
+    op.execute("DELETE FROM ven_load_samples WHERE telemetry_id IS NULL")
+    with op.batch_alter_table('ven_load_samples') as batch_op:
+        batch_op.alter_column('telemetry_id', existing_type=sa.Integer(), nullable=False)
@@ -0,0 +1,75 @@
+"""add compressed raw telemetry side table
+
+Revision ID: 202510280001
+Revises: 202510270001
+Create Date: 2025-10-28 09:00:00.000000
+
+``ven_telemetry_raw`` receives the raw telemetry messages kept by the raw
+payload policy (``app.services.raw_payloads``). On Postgres it is
+range-partitioned like ``ven_telemetry``, with the same partition bounds,
+so partition maintenance creates and drops both together.
+
+Existing ``ven_telemetry.raw_payload`` values are left in place (the debug
+endpoint still reads them); set the column to NULL to discard them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202510280001'
+down_revision = '202510270001'
+branch_labels = None
+depends_on = None
+
+
+_TELEMETRY_PARTITIONS = sa.text(
+    """
+    SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = 'ven_telemetry'
+    """
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.create_table(
+            'ven_telemetry_raw',
+            sa.Column(
+                'telemetry_id',
+                sa.Integer(),
+                sa.ForeignKey('ven_telemetry.id', ondelete='CASCADE'),
+                primary_key=True,
+            ),
+            sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('codec', sa.String(), nullable=False),
+            sa.Column('payload', sa.LargeBinary(), nullable=False),
+        )
+        op.create_index('ix_ven_telemetry_raw_timestamp', 'ven_telemetry_raw', ['timestamp'])
+        return
+
+    op.execute(
+        "CREATE TABLE ven_telemetry_raw ("
+        "telemetry_id INTEGER NOT NULL, "
+        "timestamp TIMESTAMP WITH TIME ZONE NOT NULL, "
+        "codec VARCHAR NOT NULL, "
+        "payload BYTEA NOT NULL, "
+        "PRIMARY KEY (telemetry_id, timestamp)"
+        ") PARTITION BY RANGE (timestamp)"
+    )
+    for name, bound in bind.execute(_TELEMETRY_PARTITIONS).all():
+        suffix = name[len('ven_telemetry'):]
+        op.execute(f"CREATE TABLE ven_telemetry_raw{suffix} PARTITION OF ven_telemetry_raw {bound}")
+    op.execute(
+        "ALTER TABLE ven_telemetry_raw ADD FOREIGN KEY (telemetry_id, timestamp) "
+        "REFERENCES ven_telemetry (id, timestamp) ON DELETE CASCADE"
+    )
+    op.execute("CREATE INDEX ix_ven_telemetry_raw_timestamp ON ven_telemetry_raw USING brin (timestamp)")
+
+
+def downgrade():
+    op.drop_table('ven_telemetry_raw')
@@ -0,0 +1,29 @@
+"""add keyset pagination indexes
+
+Revision ID: 202510290001
+Revises: 202510280001
+Create Date: 2025-10-29 09:00:00.000000
+
+Event listings are paged by ``(start_time, event_id)`` and a VEN's ACKs by
+``(timestamp, id)``; these indexes let each page start at its cursor. VEN
+listings are paged by the primary key and circuit history by the existing
+``(load_ref, timestamp)`` index.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '202510290001'
+down_revision = '202510280001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_events_start_time_event_id', 'events', ['start_time', 'event_id'])
+    op.create_index('ix_ven_acks_ven_id_timestamp_id', 'ven_acks', ['ven_id', 'timestamp', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_ven_acks_ven_id_timestamp_id', table_name='ven_acks')
+    op.drop_index('ix_events_start_time_event_id', table_name='events')
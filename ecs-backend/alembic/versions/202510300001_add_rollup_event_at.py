@@ -0,0 +1,55 @@
+"""record the time of each rollup bucket's event
+
+Revision ID: 202510300001
+Revises: 202510290001
+Create Date: 2025-10-30 09:00:00.000000
+
+Rollup buckets keep the event id of their latest sample that has one; the
+new ``event_at`` column holds that sample's timestamp so a late sample
+with an older event no longer replaces it. On Postgres both columns are
+recomputed from the telemetry still stored; buckets whose telemetry is
+gone keep their event id, dated at the bucket start.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202510300001'
+down_revision = '202510290001'
+branch_labels = None
+depends_on = None
+
+
+RESOLUTIONS = (60, 300, 3600)
+TABLES = (
+    ('ven_telemetry_rollups', ['ven_id']),
+    ('fleet_telemetry_rollups', []),
+)
+
+
+def _backfill(table, group_columns):
+    keys = ''.join(f'{column}, ' for column in group_columns)
+    matches = ''.join(f'r.{column} = l.{column} AND ' for column in group_columns)
+    for resolution in RESOLUTIONS:
+        bucket = f'to_timestamp(floor(extract(epoch FROM timestamp) / {resolution}) * {resolution})'
+        op.execute(
+            f"UPDATE {table} r SET event_id = l.event_id, event_at = l.event_at FROM ("
+            f"SELECT DISTINCT ON ({keys}bucket) {keys}{bucket} AS bucket, timestamp AS event_at, event_id "
+            "FROM ven_telemetry WHERE event_id IS NOT NULL "
+            f"ORDER BY {keys}bucket, timestamp DESC, event_id DESC) l "
+            f"WHERE {matches}r.bucket_seconds = {resolution} AND r.bucket_start = l.bucket"
+        )
+
+
+def upgrade():
+    for table, group_columns in TABLES:
+        op.add_column(table, sa.Column('event_at', sa.DateTime(timezone=True), nullable=True))
+        if op.get_bind().dialect.name == 'postgresql':
+            _backfill(table, group_columns)
+        op.execute(f"UPDATE {table} SET event_at = bucket_start WHERE event_id IS NOT NULL AND event_at IS NULL")
+
+
+def downgrade():
+    for table, _ in TABLES:
+        op.drop_column(table, 'event_at')
@@ -0,0 +1,31 @@
+"""index the per-VEN rollups by bucket
+
+Revision ID: 202510300002
+Revises: 202510300001
+Create Date: 2025-10-30 10:00:00.000000
+
+Ingest no longer updates ``fleet_telemetry_rollups``: every ingest
+transaction upserted the same current-bucket rows, serializing the shard
+writers on their row locks. A periodic job folds the closed buckets of
+``ven_telemetry_rollups`` into it instead, and fleet history sums the
+per-VEN rollups of the buckets not folded yet; both group the per-VEN
+rows by bucket through the new ``(bucket_seconds, bucket_start)`` index.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '202510300002'
+down_revision = '202510300001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_ven_telemetry_rollups_bucket', 'ven_telemetry_rollups', ['bucket_seconds', 'bucket_start']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_ven_telemetry_rollups_bucket', table_name='ven_telemetry_rollups')
@@ -0,0 +1,39 @@
+"""
+Compression helpers for stored raw payloads.
+
+Uses zstandard when it is installed and falls back to zlib from the standard
+library. Each blob is stored together with the name of its codec, so blobs
+written with either stay readable (zstd ones need zstandard).
+"""
+from __future__ import annotations
+
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised only without zstandard
+    zstandard = None
+
+HAS_ZSTD = zstandard is not None
+CODEC = "zstd" if HAS_ZSTD else "zlib"
+
+_ZSTD_LEVEL = 3
+_ZLIB_LEVEL = 6
+
+
+def compress(data: bytes) -> tuple[str, bytes]:
+    """Compress ``data`` with the preferred codec; returns ``(codec, blob)``."""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, _ZLIB_LEVEL)
+
+
+def decompress(codec: str, blob: bytes) -> bytes:
+    """Inverse of :func:`compress`."""
+    if codec == "zlib":
+        return zlib.decompress(blob)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed payloads")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    raise ValueError(f"Unknown payload codec: {codec}")
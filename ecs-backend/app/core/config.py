@@ -1,6 +1,7 @@
 from __future__ import annotations
 # BaseSettings moved to the pydantic-settings package in Pydantic v2
 from collections.abc import Iterable
+from typing import Literal
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
 
@@ -48,7 +49,121 @@ class Settings(BaseSettings):
     mqtt_topic_responses: str | None = Field("openadr/response", alias="MQTT_TOPIC_RESPONSES")
     backend_loads_topic: str | None = Field(None, alias="BACKEND_LOADS_TOPIC")
     mqtt_additional_topics: list[str] = Field(default_factory=list, alias="MQTT_TOPICS")
-    
+    # When set, topics are subscribed as ``$share/<group>/<topic>`` so the
+    # broker load-balances messages across every replica in the group.
+    mqtt_shared_group: str | None = Field(None, alias="MQTT_SHARED_GROUP")
+
+    # Ingest batching: the consumer drains its queue into batches of at most
+    # ``ingest_batch_size`` messages, waiting up to ``ingest_flush_interval_ms``
+    # for the next message. A batch stops waiting for more messages once its
+    # oldest message was received ``ingest_max_latency_ms`` ago; a backlog that
+    # is already older than that is written without further waiting.
+    ingest_batch_size: int = Field(500, alias="INGEST_BATCH_SIZE", ge=1)
+    ingest_flush_interval_ms: int = Field(50, alias="INGEST_FLUSH_INTERVAL_MS", ge=0)
+    ingest_max_latency_ms: int = Field(250, alias="INGEST_MAX_LATENCY_MS", ge=0)
+    # Bound on queued-but-unpersisted messages and what to do when it is hit:
+    # "block" (wait for space, delaying the PUBACK of QoS >= 1 messages),
+    # "drop_oldest" or "drop_newest". VEN ACKs are never shed by the policy.
+    # At most ``ingest_max_waiting_messages`` messages may wait for space;
+    # size it to the broker's receive maximum / in-flight window.
+    ingest_queue_maxsize: int = Field(10000, alias="INGEST_QUEUE_MAXSIZE", ge=1)
+    ingest_overflow_policy: Literal["block", "drop_oldest", "drop_newest"] = Field(
+        "block", alias="INGEST_OVERFLOW_POLICY"
+    )
+    ingest_max_waiting_messages: int = Field(100, alias="INGEST_MAX_WAITING_MESSAGES", ge=0)
+    # Number of ingest workers. Messages are sharded by VEN id, so each VEN's
+    # messages are persisted in order while different VENs are written
+    # concurrently. The queue size and waiting limit are split across shards;
+    # keep this below the database pool size.
+    ingest_workers: int = Field(4, alias="INGEST_WORKERS", ge=1)
+    # Telemetry keys (VEN id + timestamp) persisted within this window are
+    # remembered per VEN, at most ``ingest_dedup_max_keys_per_ven`` each, so
+    # duplicate deliveries are dropped before they reach the database. 0
+    # disables the cache; the unique index still rejects duplicates.
+    ingest_dedup_window_s: float = Field(300.0, alias="INGEST_DEDUP_WINDOW_S", ge=0)
+    ingest_dedup_max_keys_per_ven: int = Field(1024, alias="INGEST_DEDUP_MAX_KEYS_PER_VEN", ge=1)
+    # Load snapshot messages repeat the per-load values of metering messages.
+    # A snapshot's load is only stored when no sample of that load lies
+    # within this many seconds of it.
+    load_snapshot_window_s: float = Field(30.0, alias="LOAD_SNAPSHOT_WINDOW_S", ge=0)
+    # What is kept of each message as received: "compressed" stores every
+    # telemetry message compressed in ``ven_telemetry_raw``, "sampled" only
+    # one in ``raw_payload_sample_every``, "off" none. ACK text is sampled
+    # the same way and dropped under "off".
+    raw_payload_policy: Literal["compressed", "sampled", "off"] = Field("compressed", alias="RAW_PAYLOAD_POLICY")
+    raw_payload_sample_every: int = Field(100, alias="RAW_PAYLOAD_SAMPLE_EVERY", ge=1)
+    # Messages that fail to persist because the database is unreachable are
+    # appended to segment files under ``ingest_spool_dir`` (unset disables the
+    # spool) and replayed oldest first, at most ``ingest_spool_replay_rate``
+    # messages per second, once writes succeed again.
+    ingest_spool_dir: str | None = Field(None, alias="INGEST_SPOOL_DIR")
+    ingest_spool_segment_bytes: int = Field(16 * 1024 * 1024, alias="INGEST_SPOOL_SEGMENT_BYTES", ge=1)
+    ingest_spool_max_bytes: int = Field(1024 * 1024 * 1024, alias="INGEST_SPOOL_MAX_BYTES", ge=1)
+    ingest_spool_replay_rate: float = Field(2000.0, alias="INGEST_SPOOL_REPLAY_RATE", gt=0)
+    ingest_spool_retry_interval_s: float = Field(5.0, alias="INGEST_SPOOL_RETRY_INTERVAL_S", gt=0)
+    # Heartbeats are coalesced in the in-process VEN registry and written to
+    # the ``vens`` table once per interval.
+    ven_heartbeat_flush_interval_s: float = Field(5.0, alias="VEN_HEARTBEAT_FLUSH_INTERVAL_S", gt=0)
+
+    # Run the MQTT consumer, event command service and heartbeat monitor in
+    # the API process. Disable when they run in ``python -m app.worker``.
+    background_services_enabled: bool = Field(True, alias="BACKGROUND_SERVICES_ENABLED")
+    # How long stopping the MQTT consumer waits for queued messages to be
+    # persisted before giving up on them (they are spooled if possible).
+    ingest_drain_timeout_s: float = Field(10.0, alias="INGEST_DRAIN_TIMEOUT_S", ge=0)
+
+    # On Postgres, ``ven_telemetry``, ``ven_load_samples`` and
+    # ``ven_telemetry_raw`` are range-partitioned by ``timestamp``. Partitions
+    # of one interval are created ``telemetry_partitions_ahead`` intervals in
+    # advance and, when ``telemetry_retention_days`` is set, dropped once they
+    # are entirely older than that (and archived, when the archive is
+    # enabled). Maintenance runs every ``partition_maintenance_interval_s``.
+    telemetry_partition_interval: Literal["day", "week"] = Field("day", alias="TELEMETRY_PARTITION_INTERVAL")
+    telemetry_partitions_ahead: int = Field(7, alias="TELEMETRY_PARTITIONS_AHEAD", ge=1)
+    telemetry_retention_days: int | None = Field(None, alias="TELEMETRY_RETENTION_DAYS", ge=1)
+    partition_maintenance_interval_s: float = Field(3600.0, alias="PARTITION_MAINTENANCE_INTERVAL_S", gt=0)
+    # Fleet-wide rollups are folded from the closed per-VEN rollup buckets
+    # every ``fleet_rollup_interval_s``; each fold recomputes the buckets of
+    # the last ``fleet_rollup_lookback_s``, so later samples only reach the
+    # per-VEN rollups.
+    fleet_rollup_interval_s: float = Field(30.0, alias="FLEET_ROLLUP_INTERVAL_S", gt=0)
+    fleet_rollup_lookback_s: float = Field(3600.0, alias="FLEET_ROLLUP_LOOKBACK_S", ge=0)
+    # Cold tier: when ``telemetry_archive_dir`` is set, whole UTC days of
+    # telemetry and load samples older than ``telemetry_archive_after_days``
+    # are exported to Parquet files under it, split into
+    # ``telemetry_archive_ven_buckets`` files per day by VEN id. History reads
+    # before the archived days' end come from the files.
+    telemetry_archive_dir: str | None = Field(None, alias="TELEMETRY_ARCHIVE_DIR")
+    telemetry_archive_after_days: int = Field(7, alias="TELEMETRY_ARCHIVE_AFTER_DAYS", ge=1)
+    telemetry_archive_ven_buckets: int = Field(16, alias="TELEMETRY_ARCHIVE_VEN_BUCKETS", ge=1)
+    telemetry_archive_interval_s: float = Field(3600.0, alias="TELEMETRY_ARCHIVE_INTERVAL_S", gt=0)
+    # Hot window: when ``hot_window_hours`` is set, the API process keeps that
+    # many hours of per-VEN power series in memory (at most
+    # ``hot_window_max_samples_per_ven`` samples for each of
+    # ``hot_window_max_vens`` VENs) and answers history queries within them
+    # from memory. It is fed by the in-process MQTT consumer, or otherwise by
+    # polling the database every ``hot_window_tail_interval_s`` for samples
+    # stamped up to ``hot_window_tail_lag_s`` before the previous poll.
+    hot_window_hours: float | None = Field(None, alias="HOT_WINDOW_HOURS", ge=0)
+    hot_window_max_samples_per_ven: int = Field(17280, alias="HOT_WINDOW_MAX_SAMPLES_PER_VEN", ge=1)
+    hot_window_max_vens: int = Field(1000, alias="HOT_WINDOW_MAX_VENS", ge=1)
+    hot_window_tail_interval_s: float = Field(5.0, alias="HOT_WINDOW_TAIL_INTERVAL_S", gt=0)
+    hot_window_tail_lag_s: float = Field(60.0, alias="HOT_WINDOW_TAIL_LAG_S", ge=0)
+    # Fleet views (VEN list and summary, network and load stats) are cached
+    # in process for ``fleet_cache_ttl_s`` (0 disables the cache), or per
+    # view for ``fleet_cache_ttls``, e.g. ``{"stats_loads": 30}``. For
+    # ``fleet_cache_stale_s`` after that the stale view is served while it
+    # is refreshed in the background.
+    fleet_cache_ttl_s: float = Field(2.0, alias="FLEET_CACHE_TTL_S", ge=0)
+    fleet_cache_ttls: dict[str, float] = Field(default_factory=dict, alias="FLEET_CACHE_TTLS")
+    fleet_cache_stale_s: float = Field(10.0, alias="FLEET_CACHE_STALE_S", ge=0)
+    # Keep each VEN's serialized entry of the VEN list and summary and only
+    # re-render VENs whose telemetry or status changed.
+    ven_fragments_enabled: bool = Field(True, alias="VEN_FRAGMENTS_ENABLED")
+    # Encode the large list and history responses from plain dicts with
+    # orjson instead of validating them against their response models.
+    fast_json_responses: bool = Field(False, alias="FAST_JSON_RESPONSES")
+
     # Event Command Service settings
     event_command_enabled: bool = Field(True, alias="EVENT_COMMAND_ENABLED")
     iot_endpoint: str | None = Field(None, alias="IOT_ENDPOINT")
@@ -70,6 +185,13 @@ class Settings(BaseSettings):
             return [part for part in value if isinstance(part, str) and part]
         return []
 
+    @field_validator("mqtt_shared_group")
+    @classmethod
+    def _check_shared_group(cls, value: str | None) -> str | None:
+        if value and any(char in value for char in "/+#"):
+            raise ValueError("MQTT_SHARED_GROUP must not contain '/', '+' or '#'")
+        return value or None
+
     @property
     def sqlalchemy_database_uri(self) -> str:
         return (
@@ -0,0 +1,57 @@
+"""
+JSON encoding and decoding helpers.
+
+Uses orjson when it is installed and falls back to the standard library.
+Both parse straight from ``bytes`` without an intermediate ``str`` copy.
+:func:`dumps` writes what FastAPI's ``JSONResponse`` writes for the same
+content after pydantic serialization: compact separators, UTF-8, and
+datetimes in ISO 8601 with ``Z`` for UTC. With orjson, floats below 1e-4
+or from 1e16 in magnitude are spelled without the stdlib's exponent padding
+(``1e-5`` rather than ``1e-05``, ``1e16`` rather than ``1e+16``).
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError; the stdlib raises
+# UnicodeDecodeError for bytes that are not valid UTF-8.
+JSONDecodeError = (json.JSONDecodeError, UnicodeDecodeError)
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    """Parse a JSON document directly from ``data``."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if value.utcoffset() == timedelta(0) else text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain dicts, lists, scalars and datetimes as a JSON document."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
@@ -2,18 +2,31 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
-from datetime import datetime
-from typing import Any
-
-from sqlalchemy import Select, delete, func, select
-from sqlalchemy.orm import selectinload
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Select, delete, func, or_, select, tuple_
+from sqlalchemy.orm import aliased, contains_eager, selectinload, undefer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.event import Event
-from app.models.telemetry import LoadSnapshot, VenLoadSample, VenStatus, VenTelemetry
+from app.models.telemetry import VenLatest, VenLoad, VenLoadSample, VenStatus, VenTelemetry, VenTelemetryRaw
+from app.models.telemetry_rollup import FleetTelemetryRollup, VenTelemetryRollup
 from app.models.ven import VEN
 from app.models.ven_ack import VenAck
+from app.services.telemetry_rollups import (
+    bucket_rows,
+    bucket_start,
+    fleet_horizon,
+    history_buckets,
+    rollup_resolution,
+)
+
+if TYPE_CHECKING:
+    from app.services.telemetry_archive import TelemetryArchive
 
 
 # ---------------------------------------------------------------------------
@@ -28,6 +41,16 @@ async def list_vens(session: AsyncSession) -> list[VEN]:
     return list(result.scalars().all())
 
 
+async def list_vens_page(session: AsyncSession, *, after: str | None = None, limit: int) -> list[VEN]:
+    """Return up to ``limit`` VENs ordered by id, starting after the id ``after``."""
+
+    stmt: Select[tuple[VEN]] = select(VEN).order_by(VEN.ven_id.asc()).limit(limit)
+    if after is not None:
+        stmt = stmt.where(VEN.ven_id > after)
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
 async def get_ven(session: AsyncSession, ven_id: str) -> VEN | None:
     stmt: Select[tuple[VEN]] = select(VEN).where(VEN.ven_id == ven_id)
     result = await session.execute(stmt)
@@ -84,6 +107,37 @@ async def list_events(session: AsyncSession) -> list[Event]:
     return list(result.scalars().all())
 
 
+async def list_events_page(
+    session: AsyncSession,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    after: tuple[datetime | None, str] | None = None,
+    limit: int,
+) -> list[Event]:
+    """
+    Return up to ``limit`` events starting in ``start``/``end``, ordered by
+    ``(start_time, event_id)`` with unscheduled events last, starting after
+    the key ``after``.
+    """
+
+    stmt: Select[tuple[Event]] = select(Event).where(*_time_range(Event.start_time, start, end))
+    if after is not None:
+        after_start, after_id = after
+        if after_start is None:
+            stmt = stmt.where(Event.start_time.is_(None), Event.event_id > after_id)
+        else:
+            stmt = stmt.where(
+                or_(
+                    tuple_(Event.start_time, Event.event_id) > tuple_(after_start, after_id),
+                    Event.start_time.is_(None),
+                )
+            )
+    stmt = stmt.order_by(Event.start_time.asc().nulls_last(), Event.event_id.asc()).limit(limit)
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
 async def get_event(session: AsyncSession, event_id: str) -> Event | None:
     stmt: Select[tuple[Event]] = select(Event).where(Event.event_id == event_id)
     result = await session.execute(stmt)
@@ -173,32 +227,90 @@ async def latest_status_map(
 async def latest_telemetry_map(
     session: AsyncSession,
     ven_ids: Iterable[str] | None = None,
-) -> dict[str, VenTelemetry]:
-    """Return latest telemetry sample for each VEN."""
+) -> dict[str, VenLatest]:
+    """Return latest telemetry sample for each VEN, as maintained by ingest."""
 
-    subquery = (
-        select(
-            VenTelemetry.ven_id.label("ven_id"),
-            func.max(VenTelemetry.timestamp).label("max_timestamp"),
-        )
-        .group_by(VenTelemetry.ven_id)
-    )
+    stmt = select(VenLatest).options(selectinload(VenLatest.loads))
     if ven_ids:
-        subquery = subquery.where(VenTelemetry.ven_id.in_(list(ven_ids)))
-    subquery = subquery.subquery()
+        stmt = stmt.where(VenLatest.ven_id.in_(list(ven_ids)))
+    result = await session.execute(stmt)
+    return {row.ven_id: row for row in result.scalars().all()}
 
-    stmt = (
-        select(VenTelemetry)
-        .options(selectinload(VenTelemetry.loads))
-        .join(
-            subquery,
-            (VenTelemetry.ven_id == subquery.c.ven_id)
-            & (VenTelemetry.timestamp == subquery.c.max_timestamp),
-        )
-    )
+
+async def latest_telemetry_ids(
+    session: AsyncSession,
+    ven_ids: Iterable[str] | None = None,
+) -> dict[str, int]:
+    """Return the id of each VEN's latest telemetry sample."""
+
+    stmt = select(VenLatest.ven_id, VenLatest.telemetry_id)
+    if ven_ids:
+        stmt = stmt.where(VenLatest.ven_id.in_(list(ven_ids)))
     result = await session.execute(stmt)
-    rows = result.scalars().unique().all()
-    return {row.ven_id: row for row in rows}
+    return dict(result.tuples().all())
+
+
+def _time_range(column: Any, start: datetime | None, end: datetime | None, include_end: bool = True) -> list[Any]:
+    """``start``/``end`` bounds on ``column``, skipping unset ones."""
+
+    criteria = []
+    if start is not None:
+        criteria.append(column >= start)
+    if end is not None:
+        criteria.append(column <= end if include_end else column < end)
+    return criteria
+
+
+def _as_utc(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=UTC) if ts.tzinfo is None else ts
+
+
+async def _read_through(
+    archive: TelemetryArchive | None,
+    start: datetime | None,
+    end: datetime | None,
+    read_cold: Callable[[datetime | None, datetime, bool], list[Any]],
+    read_hot: Callable[[datetime | None], Awaitable[list[Any]]],
+) -> list[Any]:
+    """
+    Rows between ``start`` and ``end``, oldest first, across both tiers.
+
+    The part before the archive horizon (see
+    :mod:`app.services.telemetry_archive`) comes from ``read_cold(start,
+    end, include_end)``, run in a thread; the rest from ``read_hot(start)``,
+    which keeps the caller's ``end``.
+    """
+
+    horizon = await asyncio.to_thread(archive.horizon) if archive is not None else None
+    if horizon is None or (start is not None and _as_utc(start) >= horizon):
+        return await read_hot(start)
+    if end is not None and _as_utc(end) < horizon:
+        return await asyncio.to_thread(read_cold, start, end, True)
+    cold = await asyncio.to_thread(read_cold, start, horizon, False)
+    return cold + await read_hot(horizon)
+
+
+def _archived_load_sample(row: dict[str, Any]) -> VenLoadSample:
+    """Detached sample (with its catalog entry) built from an archived row."""
+
+    load = VenLoad(
+        ven_id=row["ven_id"],
+        load_id=row["load_id"],
+        timestamp=row["timestamp"],
+        name=row["name"],
+        type=row["type"],
+        capacity_kw=row["capacity_kw"],
+        priority=row["priority"],
+    )
+    return VenLoadSample(
+        id=row["id"],
+        telemetry_id=row["telemetry_id"],
+        timestamp=row["timestamp"],
+        load=load,
+        current_power_kw=row["current_power_kw"],
+        shed_capability_kw=row["shed_capability_kw"],
+        enabled=row["enabled"],
+    )
 
 
 async def telemetry_for_ven(
@@ -206,19 +318,268 @@ async def telemetry_for_ven(
     ven_id: str,
     start: datetime | None = None,
     end: datetime | None = None,
+    archive: TelemetryArchive | None = None,
 ) -> list[VenTelemetry]:
-    stmt = (
-        select(VenTelemetry)
-        .options(selectinload(VenTelemetry.loads))
-        .where(VenTelemetry.ven_id == ven_id)
-    )
-    if start is not None:
-        stmt = stmt.where(VenTelemetry.timestamp >= start)
+    """Telemetry of ``ven_id`` with its load samples, oldest first.
+
+    Archived rows are returned as detached instances.
+    """
+
+    def read_cold(start: datetime | None, end: datetime, include_end: bool) -> list[VenTelemetry]:
+        loads: dict[int, list[VenLoadSample]] = {}
+        for row in archive.read_load_samples(ven_id, start, end, include_end):
+            if row["telemetry_id"] is not None:
+                loads.setdefault(row["telemetry_id"], []).append(_archived_load_sample(row))
+        return [
+            VenTelemetry(**row, loads=loads.get(row["id"], []))
+            for row in archive.read_telemetry(ven_id, start, end, include_end)
+        ]
+
+    async def read_hot(start: datetime | None) -> list[VenTelemetry]:
+        # Bounding the load samples by the same range lets Postgres prune
+        # their partitions too.
+        load_range = _time_range(VenLoadSample.timestamp, start, end)
+        loads = VenTelemetry.loads.and_(*load_range) if load_range else VenTelemetry.loads
+        stmt = (
+            select(VenTelemetry)
+            .options(selectinload(loads))
+            .where(VenTelemetry.ven_id == ven_id, *_time_range(VenTelemetry.timestamp, start, end))
+            .order_by(VenTelemetry.timestamp.asc())
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    return await _read_through(archive, start, end, read_cold, read_hot)
+
+
+def _history_bucket(row: Any) -> SimpleNamespace:
+    """A :func:`history_buckets` row, with its bucket start as a datetime."""
+
+    values = dict(row._mapping)
+    return SimpleNamespace(bucket_start=datetime.fromtimestamp(values.pop("bucket"), tz=UTC), **values)
+
+
+def _telemetry_event(ven_id: str | None) -> Callable[[Any], Any]:
+    """Event lookup for :func:`history_buckets` over raw telemetry."""
+
+    def lookup(event_at: Any) -> Any:
+        latest = aliased(VenTelemetry)
+        stmt = select(func.max(latest.event_id)).where(latest.timestamp == event_at, latest.event_id.is_not(None))
+        if ven_id is not None:
+            stmt = stmt.where(latest.ven_id == ven_id)
+        return stmt.scalar_subquery()
+
+    return lookup
+
+
+async def _raw_history(
+    session: AsyncSession,
+    ven_id: str | None,
+    bucket_seconds: int,
+    start: datetime | None,
+    end: datetime | None,
+    archive: TelemetryArchive | None,
+    include_end: bool = True,
+) -> list[Any]:
+    """History buckets aggregated from raw telemetry, for one VEN or the fleet."""
+
+    def read_cold(start: datetime | None, end: datetime, include_end: bool) -> list[Any]:
+        rows = archive.read_telemetry(ven_id, start, end, include_end)
+        return [SimpleNamespace(**bucket) for bucket in bucket_rows(rows, bucket_seconds)]
+
+    async def read_hot(start: datetime | None) -> list[Any]:
+        criteria = _time_range(VenTelemetry.timestamp, start, end, include_end)
+        if ven_id is not None:
+            criteria.append(VenTelemetry.ven_id == ven_id)
+        stmt = history_buckets(
+            (await session.connection()).dialect.name,
+            bucket_seconds,
+            VenTelemetry.timestamp,
+            func.count(),
+            {
+                measure: (func.sum(column), func.count(column))
+                for measure, column in (
+                    ("used_power", VenTelemetry.used_power_kw),
+                    ("shed_power", VenTelemetry.shed_power_kw),
+                    ("requested_reduction", VenTelemetry.requested_reduction_kw),
+                )
+            },
+            VenTelemetry.event_id,
+            criteria,
+            _telemetry_event(ven_id),
+        )
+        return [_history_bucket(row) for row in (await session.execute(stmt)).all()]
+
+    return await _read_through(archive, start, end, read_cold, read_hot)
+
+
+async def telemetry_history(
+    session: AsyncSession,
+    ven_id: str | None,
+    bucket_seconds: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    archive: TelemetryArchive | None = None,
+) -> list[Any]:
+    """
+    ``bucket_seconds`` history buckets for one VEN or (``ven_id=None``) the
+    whole fleet, aggregated in SQL.
+
+    Buckets lying entirely within ``start``/``end`` are summed from the
+    coarsest rollup dividing ``bucket_seconds`` (for the fleet, the fleet
+    rollups up to their horizon and the sums of every VEN's rollups after
+    it), the partial buckets at either edge from raw telemetry; without a
+    suitable rollup everything comes from raw telemetry. Raw telemetry
+    before the horizon of ``archive`` is read from the archive. Rows have
+    the sums and counts of a rollup row (see
+    :func:`app.services.telemetry_rollups.history_buckets`); a bucket split
+    across sources appears once per source.
+    """
+
+    # Query parameters may be naive; they are UTC like the stored timestamps.
+    start = _as_utc(start) if start is not None else None
+    end = _as_utc(end) if end is not None else None
+    resolution = rollup_resolution(bucket_seconds)
+    lower = upper = None
+    if resolution is not None:
+        step = timedelta(seconds=resolution)
+        if start is not None:
+            lower = bucket_start(start, resolution)
+            if lower < start:
+                lower += step
+        if end is not None:
+            upper = bucket_start(end, resolution)
+    if resolution is None or (lower is not None and upper is not None and lower >= upper):
+        return await _raw_history(session, ven_id, bucket_seconds, start, end, archive)
+
+    def rollup_buckets(model: Any, low: datetime | None, high: datetime | None) -> Select:
+        criteria = [model.bucket_seconds == resolution]
+        if ven_id is not None:
+            criteria.append(model.ven_id == ven_id)
+        if low is not None:
+            criteria.append(model.bucket_start >= low)
+        if high is not None:
+            criteria.append(model.bucket_start < high)
+
+        def rollup_event(event_at: Any) -> Any:
+            latest = aliased(model)
+            stmt = select(func.max(latest.event_id)).where(
+                latest.bucket_seconds == resolution, latest.event_at == event_at, latest.event_id.is_not(None)
+            )
+            if ven_id is not None:
+                stmt = stmt.where(latest.ven_id == ven_id)
+            return stmt.scalar_subquery()
+
+        table = model.__table__.c
+        return history_buckets(
+            dialect,
+            bucket_seconds,
+            model.bucket_start,
+            func.sum(table.sample_count),
+            {
+                measure: (func.sum(table[f"{measure}_sum"]), func.sum(table[f"{measure}_count"]))
+                for measure in ("used_power", "shed_power", "requested_reduction")
+            },
+            model.event_id,
+            criteria,
+            rollup_event,
+            event_time=model.event_at,
+        )
+
+    dialect = (await session.connection()).dialect.name
+    sources = [(VenTelemetryRollup, lower, upper)]
+    if ven_id is None:
+        # Folded fleet buckets come from the fleet rollups; those after their
+        # horizon (open, or not folded yet) are the sums of every VEN's.
+        horizon = await fleet_horizon(session, resolution)
+        if horizon is not None:
+            sources = [
+                (FleetTelemetryRollup, lower, horizon if upper is None else min(upper, horizon)),
+                (VenTelemetryRollup, horizon if lower is None else max(lower, horizon), upper),
+            ]
+    buckets = []
+    for model, low, high in sources:
+        if low is not None and high is not None and low >= high:
+            continue
+        stmt = rollup_buckets(model, low, high)
+        buckets += [_history_bucket(row) for row in (await session.execute(stmt)).all()]
+
+    if start is not None and start < lower:
+        buckets += await _raw_history(session, ven_id, bucket_seconds, start, lower, archive, include_end=False)
     if end is not None:
-        stmt = stmt.where(VenTelemetry.timestamp <= end)
-    stmt = stmt.order_by(VenTelemetry.timestamp.asc())
-    result = await session.execute(stmt)
-    return list(result.scalars().all())
+        buckets += await _raw_history(session, ven_id, bucket_seconds, upper, end, archive)
+    return buckets
+
+
+async def load_history(
+    session: AsyncSession,
+    ven_id: str,
+    load_id: str,
+    bucket_seconds: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    archive: TelemetryArchive | None = None,
+) -> list[Any]:
+    """
+    ``bucket_seconds`` history buckets of one load, aggregated in SQL.
+
+    Used and shed power are the load's current power and shed capability
+    (missing values count as 0); requested reduction and events are those
+    of the telemetry sample each load sample belongs to. Load snapshot
+    samples have neither. Rows are shaped like those of
+    :func:`telemetry_history`.
+    """
+
+    start = _as_utc(start) if start is not None else None
+    end = _as_utc(end) if end is not None else None
+
+    def read_cold(start: datetime | None, end: datetime, include_end: bool) -> list[Any]:
+        telemetry = {row["id"]: row for row in archive.read_telemetry(ven_id, start, end, include_end)}
+        samples = []
+        for row in archive.read_load_samples(ven_id, start, end, include_end, load_id=load_id):
+            sample = telemetry.get(row["telemetry_id"], {})
+            samples.append(
+                {
+                    "timestamp": row["timestamp"],
+                    "used_power_kw": row["current_power_kw"] or 0.0,
+                    "shed_power_kw": row["shed_capability_kw"] or 0.0,
+                    "requested_reduction_kw": sample.get("requested_reduction_kw"),
+                    "event_id": sample.get("event_id"),
+                }
+            )
+        return [SimpleNamespace(**bucket) for bucket in bucket_rows(samples, bucket_seconds)]
+
+    async def read_hot(start: datetime | None) -> list[Any]:
+        load_ref = await session.scalar(select(VenLoad.id).where(VenLoad.ven_id == ven_id, VenLoad.load_id == load_id))
+        if load_ref is None:
+            return []
+        used = func.coalesce(VenLoadSample.current_power_kw, 0.0)
+        shed = func.coalesce(VenLoadSample.shed_capability_kw, 0.0)
+        stmt = history_buckets(
+            (await session.connection()).dialect.name,
+            bucket_seconds,
+            VenLoadSample.timestamp,
+            func.count(),
+            {
+                "used_power": (func.sum(used), func.count()),
+                "shed_power": (func.sum(shed), func.count()),
+                "requested_reduction": (
+                    func.sum(VenTelemetry.requested_reduction_kw),
+                    func.count(VenTelemetry.requested_reduction_kw),
+                ),
+            },
+            VenTelemetry.event_id,
+            [VenLoadSample.load_ref == load_ref, *_time_range(VenLoadSample.timestamp, start, end)],
+            _telemetry_event(ven_id),
+            # Matching the timestamps too lets Postgres join partition-wise.
+            source=VenLoadSample.__table__.outerjoin(
+                VenTelemetry.__table__,
+                (VenTelemetry.id == VenLoadSample.telemetry_id) & (VenTelemetry.timestamp == VenLoadSample.timestamp),
+            ),
+        )
+        return [_history_bucket(row) for row in (await session.execute(stmt)).all()]
+
+    return await _read_through(archive, start, end, read_cold, read_hot)
 
 
 async def delete_telemetry_for_event(session: AsyncSession, event_id: str) -> None:
@@ -226,6 +587,26 @@ async def delete_telemetry_for_event(session: AsyncSession, event_id: str) -> No
     await session.commit()
 
 
+async def get_raw_telemetry(
+    session: AsyncSession,
+    ven_id: str,
+    telemetry_id: int,
+) -> tuple[VenTelemetry, VenTelemetryRaw | None] | None:
+    """A telemetry sample of ``ven_id`` with its compressed raw message, if kept.
+
+    Also loads the deferred inline ``raw_payload`` of rows ingested before
+    raw messages moved to ``ven_telemetry_raw``.
+    """
+    stmt = (
+        select(VenTelemetry, VenTelemetryRaw)
+        .outerjoin(VenTelemetryRaw, VenTelemetryRaw.telemetry_id == VenTelemetry.id)
+        .options(undefer(VenTelemetry.raw_payload))
+        .where(VenTelemetry.id == telemetry_id, VenTelemetry.ven_id == ven_id)
+    )
+    row = (await session.execute(stmt)).first()
+    return None if row is None else (row[0], row[1])
+
+
 # ---------------------------------------------------------------------------
 # VEN Ack helpers
 
@@ -236,9 +617,13 @@ async def get_ven_acks(
     start: datetime | None = None,
     end: datetime | None = None,
     limit: int = 100,
+    before: tuple[datetime, int] | None = None,
 ) -> list[VenAck]:
-    """Return acknowledgments for a VEN, optionally filtered by time range."""
-    
+    """
+    Return acknowledgments for a VEN, newest first, optionally filtered by
+    time range and starting before the ``(timestamp, id)`` key ``before``.
+    """
+
     stmt = (
         select(VenAck)
         .where(VenAck.ven_id == ven_id)
@@ -247,7 +632,9 @@ async def get_ven_acks(
         stmt = stmt.where(VenAck.timestamp >= start)
     if end is not None:
         stmt = stmt.where(VenAck.timestamp <= end)
-    stmt = stmt.order_by(VenAck.timestamp.desc()).limit(limit)
+    if before is not None:
+        stmt = stmt.where(tuple_(VenAck.timestamp, VenAck.id) < tuple_(*before))
+    stmt = stmt.order_by(VenAck.timestamp.desc(), VenAck.id.desc()).limit(limit)
     result = await session.execute(stmt)
     return list(result.scalars().all())
 
@@ -263,27 +650,44 @@ async def get_load_snapshots(
     start: datetime | None = None,
     end: datetime | None = None,
     limit: int = 1000,
+    archive: TelemetryArchive | None = None,
+    after: tuple[datetime, int] | None = None,
 ) -> list[tuple[VenLoadSample, datetime]]:
     """
     Get historical load/circuit snapshots for a VEN from VenLoadSample table.
     
-    Returns time-series data for circuit power usage by joining VenLoadSample
-    with VenTelemetry to get timestamps. Optionally filter by specific load_id
-    (circuit) and time range.
+    Returns time-series data for circuit power usage, reading the samples
+    together with their load catalog entries. Optionally filter by specific
+    load_id (circuit) and time range, and start after the ``(timestamp,
+    id)`` key ``after``. Samples before the horizon of ``archive`` are read
+    from the archive as detached instances.
     
     Returns list of (VenLoadSample, timestamp) tuples.
     """
-    stmt = (
-        select(VenLoadSample, VenTelemetry.timestamp)
-        .join(VenTelemetry, VenLoadSample.telemetry_id == VenTelemetry.id)
-        .where(VenTelemetry.ven_id == ven_id)
-    )
-    if load_id is not None:
-        stmt = stmt.where(VenLoadSample.load_id == load_id)
-    if start is not None:
-        stmt = stmt.where(VenTelemetry.timestamp >= start)
-    if end is not None:
-        stmt = stmt.where(VenTelemetry.timestamp <= end)
-    stmt = stmt.order_by(VenTelemetry.timestamp.asc()).limit(limit)
-    result = await session.execute(stmt)
-    return list(result.all())
+
+    if after is not None and (start is None or _as_utc(start) < _as_utc(after[0])):
+        start = after[0]
+
+    def read_cold(start: datetime | None, end: datetime, include_end: bool) -> list[Any]:
+        rows = archive.read_load_samples(
+            ven_id, start, end, include_end, load_id=load_id, limit=limit, after=after
+        )
+        return [(_archived_load_sample(row), row["timestamp"]) for row in rows]
+
+    async def read_hot(start: datetime | None) -> list[Any]:
+        stmt = (
+            select(VenLoadSample, VenLoadSample.timestamp)
+            .join(VenLoadSample.load)
+            .options(contains_eager(VenLoadSample.load))
+            .where(VenLoad.ven_id == ven_id)
+        )
+        if load_id is not None:
+            stmt = stmt.where(VenLoad.load_id == load_id)
+        stmt = stmt.where(*_time_range(VenLoadSample.timestamp, start, end))
+        if after is not None:
+            stmt = stmt.where(tuple_(VenLoadSample.timestamp, VenLoadSample.id) > tuple_(*after))
+        stmt = stmt.order_by(VenLoadSample.timestamp.asc(), VenLoadSample.id.asc()).limit(limit)
+        result = await session.execute(stmt)
+        return list(result.all())
+
+    return (await _read_through(archive, start, end, read_cold, read_hot))[:limit]
@@ -1,3 +1,55 @@
+from .core.config import settings
 from .db.database import get_session
+from .services.fleet_cache import FleetCache, fleet_cache
+from .services.hot_window import HotWindow, hot_window
+from .services.single_flight import SingleFlight, single_flight
+from .services.telemetry_archive import TelemetryArchive, telemetry_archive
+from .services.ven_fragments import VenFragments, ven_fragments
+from .services.ven_registry import VenRegistry, ven_registry
 
-__all__ = ["get_session"]
+
+def get_ven_registry() -> VenRegistry:
+    """Process-wide VEN registry populated by the ingest path."""
+    return ven_registry
+
+
+def get_telemetry_archive() -> TelemetryArchive | None:
+    """Cold-tier telemetry archive; None unless ``TELEMETRY_ARCHIVE_DIR`` is set."""
+    return telemetry_archive
+
+
+def get_hot_window() -> HotWindow | None:
+    """In-memory hot telemetry window; None unless ``HOT_WINDOW_HOURS`` is set."""
+    return hot_window
+
+
+def get_fleet_cache() -> FleetCache | None:
+    """Process-wide fleet view cache; None when ``FLEET_CACHE_TTL_S`` is 0."""
+    return fleet_cache
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide request coalescing used by ``@coalesce``."""
+    return single_flight
+
+
+def get_fast_json() -> bool:
+    """Whether heavy endpoints bypass their response models (``FAST_JSON_RESPONSES``)."""
+    return settings.fast_json_responses
+
+
+def get_ven_fragments() -> VenFragments | None:
+    """Serialized VEN list entries; None when ``VEN_FRAGMENTS_ENABLED`` is off."""
+    return ven_fragments
+
+
+__all__ = [
+    "get_fast_json",
+    "get_fleet_cache",
+    "get_hot_window",
+    "get_session",
+    "get_single_flight",
+    "get_telemetry_archive",
+    "get_ven_fragments",
+    "get_ven_registry",
+]
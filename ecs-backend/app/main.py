@@ -9,10 +9,11 @@ from app.routers import event
 from app.routers import health
 from app.routers import stats as api_stats
 from app.routers import ven
-from app.services import MQTTConsumer, EventCommandService
-from app.services.ven_heartbeat_monitor import VenHeartbeatMonitor
+from app.routers.pagination import NEXT_CURSOR_HEADER
+from app.services.background import BackgroundServices
+from app.services.hot_window import HotWindowFeed, fed_by_ingest
 from app.core.config import settings
-from app.dependencies import get_session
+from app.dependencies import get_fleet_cache, get_hot_window, get_session, get_ven_registry
 
 
 # Configure logging first
@@ -24,40 +25,38 @@ logging.basicConfig(
 logger = logging.getLogger("uvicorn")
 
 # Global service instances
-mqtt_consumer = MQTTConsumer(config=settings, session_factory=get_session)
-event_command_service = EventCommandService(config=settings, session_factory=get_session)
-ven_heartbeat_monitor = VenHeartbeatMonitor(session_factory=get_session, config=settings)
+hot_window = get_hot_window()
+hot_window_feed = HotWindowFeed(hot_window, session_factory=get_session, config=settings) if hot_window else None
+background_services = BackgroundServices(
+    settings,
+    session_factory=get_session,
+    registry=get_ven_registry(),
+    hot_window=hot_window if fed_by_ingest(settings) else None,
+    fleet_cache=get_fleet_cache(),
+)
+mqtt_consumer = background_services.mqtt_consumer
+event_command_service = background_services.event_command_service
+ven_heartbeat_monitor = background_services.ven_heartbeat_monitor
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    logger.info("Starting MQTT consumer...")
-    await mqtt_consumer.start()
-    logger.info("MQTT consumer started")
-    
-    logger.info("Starting event command service...")
-    await event_command_service.start()
-    logger.info("Event command service started")
-    
-    logger.info("Starting VEN heartbeat monitor...")
-    await ven_heartbeat_monitor.start()
-    logger.info("VEN heartbeat monitor started")
-    
-    yield
-    
-    # Shutdown
-    logger.info("Stopping VEN heartbeat monitor...")
-    await ven_heartbeat_monitor.stop()
-    logger.info("VEN heartbeat monitor stopped")
-    
-    logger.info("Stopping event command service...")
-    await event_command_service.stop()
-    logger.info("Event command service stopped")
-    
-    logger.info("Stopping MQTT consumer...")
-    await mqtt_consumer.stop()
-    logger.info("MQTT consumer stopped")
+    # Backfilled before ingest starts feeding it.
+    if hot_window_feed is not None:
+        await hot_window_feed.start()
+
+    if not settings.background_services_enabled:
+        logger.info("Background services disabled; run them with `python -m app.worker`")
+        yield
+    else:
+        # Startup
+        await background_services.start()
+        yield
+        # Shutdown
+        await background_services.stop()
+
+    if hot_window_feed is not None:
+        await hot_window_feed.stop()
 
 
 app = FastAPI(
@@ -67,6 +66,7 @@ app = FastAPI(
     openapi_url="/openapi.json",
     lifespan=lifespan,
 )
+app.state.mqtt_consumer = mqtt_consumer if settings.background_services_enabled else None
 
 # CORS (configured for demo environment)
 app.add_middleware(
@@ -81,6 +81,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(health.router, prefix="/health", tags=["Health"])
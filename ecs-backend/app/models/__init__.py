@@ -4,16 +4,30 @@ Base = declarative_base()
 
 from .ven import VEN  # noqa: E402
 from .event import Event  # noqa: E402
-from .telemetry import VenTelemetry, VenLoadSample, VenStatus, LoadSnapshot  # noqa: E402
+from .telemetry import (  # noqa: E402
+    VenTelemetry,
+    VenTelemetryRaw,
+    VenLoad,
+    VenLoadSample,
+    VenStatus,
+    VenLatest,
+    VenLatestLoad,
+)
 from .ven_ack import VenAck  # noqa: E402
+from .telemetry_rollup import FleetTelemetryRollup, VenTelemetryRollup  # noqa: E402
 
 __all__ = [
     "Base",
     "VEN",
     "Event",
     "VenTelemetry",
+    "VenTelemetryRaw",
+    "VenLoad",
     "VenLoadSample",
     "VenStatus",
-    "LoadSnapshot",
+    "VenLatest",
+    "VenLatestLoad",
     "VenAck",
+    "VenTelemetryRollup",
+    "FleetTelemetryRollup",
 ]
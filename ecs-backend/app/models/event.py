@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Float, JSON, String
+from sqlalchemy import Column, DateTime, Float, Index, JSON, String
 from sqlalchemy.sql import func
 
 from . import Base
@@ -6,6 +6,8 @@ from . import Base
 
 class Event(Base):
     __tablename__ = "events"
+    # Keyset pagination of event listings.
+    __table_args__ = (Index("ix_events_start_time_event_id", "start_time", "event_id"),)
 
     event_id = Column(String, primary_key=True, index=True)
     ven_id = Column(String, index=True, nullable=True)
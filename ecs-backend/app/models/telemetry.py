@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 
 from sqlalchemy import (
     Boolean,
@@ -8,29 +9,45 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     JSON,
+    LargeBinary,
     String,
+    UniqueConstraint,
+    event,
+    select,
 )
-from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Mapped, deferred, relationship
 from sqlalchemy.sql import func
 
 from . import Base
 
 
 class VenTelemetry(Base):
-    """A single telemetry datapoint emitted by a VEN."""
+    """A single telemetry datapoint emitted by a VEN.
+
+    On Postgres the table is range-partitioned by ``timestamp`` (see
+    :mod:`app.services.partition_maintenance`), so its primary key there is
+    ``(id, timestamp)``; ``id`` alone is still unique.
+    """
 
     __tablename__ = "ven_telemetry"
+    __table_args__ = (
+        # One sample per VEN and timestamp; ingest inserts ON CONFLICT DO NOTHING.
+        # Also serves per-VEN range queries.
+        Index("uq_ven_telemetry_ven_timestamp", "ven_id", "timestamp", unique=True),
+        Index("ix_ven_telemetry_timestamp", "timestamp", postgresql_using="brin"),
+    )
 
     id: Mapped[int] = Column(Integer, primary_key=True, index=True)
     ven_id: Mapped[str] = Column(
         String,
         ForeignKey("vens.ven_id", ondelete="CASCADE"),
-        index=True,
         nullable=False,
     )
-    timestamp: Mapped[datetime] = Column(DateTime(timezone=True), index=True, nullable=False)
+    timestamp: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
     used_power_kw: Mapped[float | None] = Column(Float)
     shed_power_kw: Mapped[float | None] = Column(Float)
     requested_reduction_kw: Mapped[float | None] = Column(Float)
@@ -40,7 +57,9 @@ class VenTelemetry(Base):
         index=True,
     )
     battery_soc: Mapped[float | None] = Column(Float)
-    raw_payload: Mapped[dict | None] = Column(JSON)
+    # Decoded message of rows ingested before raw payloads moved to
+    # ``ven_telemetry_raw``; deferred since only debugging reads it.
+    raw_payload: Mapped[dict | None] = deferred(Column(JSON))
     created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     loads: Mapped[list[VenLoadSample]] = relationship(
@@ -50,29 +69,128 @@ class VenTelemetry(Base):
     )
 
 
-class VenLoadSample(Base):
-    """Per-load telemetry captured as part of a VEN telemetry sample."""
+class VenLoad(Base):
+    """Catalog entry holding the static attributes of one of a VEN's loads.
 
-    __tablename__ = "ven_load_samples"
+    Ingest rewrites a row only when the attributes reported for the load
+    change (see :mod:`app.services.load_catalog`); ``timestamp`` is that of
+    the sample they were taken from.
+    """
+
+    __tablename__ = "ven_loads"
+    __table_args__ = (UniqueConstraint("ven_id", "load_id", name="uq_ven_loads_ven_load"),)
 
     id: Mapped[int] = Column(Integer, primary_key=True)
-    telemetry_id: Mapped[int] = Column(
-        Integer,
-        ForeignKey("ven_telemetry.id", ondelete="CASCADE"),
+    ven_id: Mapped[str] = Column(
+        String,
+        ForeignKey("vens.ven_id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     load_id: Mapped[str] = Column(String, nullable=False)
+    timestamp: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
     name: Mapped[str | None] = Column(String)
     type: Mapped[str | None] = Column(String)
     capacity_kw: Mapped[float | None] = Column(Float)
+    priority: Mapped[int | None] = Column(Integer)
+
+
+def _catalog_attribute(name: str) -> hybrid_property:
+    """A :class:`VenLoad` attribute exposed on its samples.
+
+    Samples built through the ORM hold the values until the insert resolves
+    their catalog entry; in queries the attribute reads the catalog row.
+    """
+
+    def fget(self: VenLoadSample) -> Any:
+        load = self.__dict__.get("load")
+        if load is not None:
+            return getattr(load, name)
+        return self.__dict__.get("_load_attributes", {}).get(name)
+
+    def fset(self: VenLoadSample, value: Any) -> None:
+        load = self.__dict__.get("load")
+        if load is not None:
+            setattr(load, name, value)
+        else:
+            self.__dict__.setdefault("_load_attributes", {})[name] = value
+
+    def expr(cls: type[VenLoadSample]) -> Any:
+        return select(getattr(VenLoad, name)).where(VenLoad.id == cls.load_ref).scalar_subquery()
+
+    return hybrid_property(fget, fset, expr=expr)
+
+
+class VenLoadSample(Base):
+    """Per-load telemetry of a VEN: the single time series of its circuits.
+
+    Samples captured as part of a VEN telemetry sample reference it through
+    ``telemetry_id`` and repeat its ``timestamp`` so the table can be
+    partitioned and pruned alongside ``ven_telemetry``. Load snapshot
+    messages add samples without ``telemetry_id``, and only for loads no
+    sample covers yet (see :func:`app.services.ingest_writer.write_batch`).
+
+    Only the values that change from sample to sample are stored here; the
+    load's id, name, type, capacity and priority live in its :class:`VenLoad`
+    catalog entry and are readable (and, before insert, settable) on the
+    sample as well.
+    """
+
+    __tablename__ = "ven_load_samples"
+    __table_args__ = (
+        Index("ix_ven_load_samples_timestamp", "timestamp", postgresql_using="brin"),
+        Index("ix_ven_load_samples_load_ref_timestamp", "load_ref", "timestamp"),
+    )
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    telemetry_id: Mapped[int | None] = Column(
+        Integer,
+        ForeignKey("ven_telemetry.id", ondelete="CASCADE"),
+        index=True,
+    )
+    timestamp: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+    load_ref: Mapped[int] = Column(
+        Integer,
+        ForeignKey("ven_loads.id", ondelete="CASCADE"),
+        nullable=False,
+    )
     current_power_kw: Mapped[float | None] = Column(Float)
     shed_capability_kw: Mapped[float | None] = Column(Float)
     enabled: Mapped[bool | None] = Column(Boolean)
-    priority: Mapped[int | None] = Column(Integer)
-    raw_payload: Mapped[dict | None] = Column(JSON)
+
+    load_id = _catalog_attribute("load_id")
+    name = _catalog_attribute("name")
+    type = _catalog_attribute("type")
+    capacity_kw = _catalog_attribute("capacity_kw")
+    priority = _catalog_attribute("priority")
 
     telemetry: Mapped[VenTelemetry] = relationship("VenTelemetry", back_populates="loads")
+    # Catalog rows are few and small; loading them with every sample keeps
+    # the attributes above usable without lazy loads.
+    load: Mapped[VenLoad] = relationship("VenLoad", lazy="joined", innerjoin=True)
+
+
+@event.listens_for(VenLoadSample, "before_insert")
+def _resolve_telemetry_and_load(mapper, connection, target: VenLoadSample) -> None:
+    if target.timestamp is not None and target.load_ref is not None:
+        return
+    telemetry = target.__dict__.get("telemetry")
+    if telemetry is not None:
+        ven_id, timestamp = telemetry.ven_id, telemetry.timestamp
+    else:
+        ven_id, timestamp = connection.execute(
+            select(VenTelemetry.ven_id, VenTelemetry.timestamp).where(VenTelemetry.id == target.telemetry_id)
+        ).one()
+    if target.timestamp is None:
+        target.timestamp = timestamp
+    if target.load_ref is None:
+        from app.services.load_catalog import resolve_load_ref
+
+        target.load_ref = resolve_load_ref(
+            connection,
+            ven_id,
+            target.timestamp,
+            {column: getattr(target, column) for column in ("load_id", "name", "type", "capacity_kw", "priority")},
+        )
 
 
 class VenStatus(Base):
@@ -96,19 +214,80 @@ class VenStatus(Base):
         ForeignKey("events.event_id", ondelete="SET NULL"),
         index=True,
     )
-    raw_payload: Mapped[dict | None] = Column(JSON)
+    raw_payload: Mapped[dict | None] = deferred(Column(JSON))
     created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
-class LoadSnapshot(Base):
-    """Snapshot of a VEN's controllable loads."""
+class VenTelemetryRaw(Base):
+    """A telemetry message as received, compressed.
 
-    __tablename__ = "load_snapshots"
+    Written according to the raw payload policy (see
+    :mod:`app.services.raw_payloads`) and partitioned like ``ven_telemetry``.
+    """
 
-    id: Mapped[int] = Column(Integer, primary_key=True)
-    ven_id: Mapped[str] = Column(String, index=True, nullable=False)
-    timestamp: Mapped[datetime] = Column(DateTime(timezone=True), index=True, nullable=False)
-    load_id: Mapped[str] = Column(String, nullable=False)
+    __tablename__ = "ven_telemetry_raw"
+    __table_args__ = (Index("ix_ven_telemetry_raw_timestamp", "timestamp", postgresql_using="brin"),)
+
+    telemetry_id: Mapped[int] = Column(
+        Integer,
+        ForeignKey("ven_telemetry.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    timestamp: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+    codec: Mapped[str] = Column(String, nullable=False)
+    payload: Mapped[bytes] = Column(LargeBinary, nullable=False)
+
+
+class VenLatest(Base):
+    """Latest telemetry sample of each VEN, upserted by ingest.
+
+    Fleet views read this table instead of searching ``ven_telemetry`` for
+    each VEN's newest row. ``loads`` are the per-load values of that sample.
+    """
+
+    __tablename__ = "ven_latest"
+
+    ven_id: Mapped[str] = Column(
+        String,
+        ForeignKey("vens.ven_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    telemetry_id: Mapped[int] = Column(Integer, nullable=False)
+    timestamp: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+    used_power_kw: Mapped[float | None] = Column(Float)
+    shed_power_kw: Mapped[float | None] = Column(Float)
+    requested_reduction_kw: Mapped[float | None] = Column(Float)
+    event_id: Mapped[str | None] = Column(String)
+    battery_soc: Mapped[float | None] = Column(Float)
+
+    loads: Mapped[list[VenLatestLoad]] = relationship(
+        "VenLatestLoad",
+        primaryjoin="and_(VenLatest.ven_id == foreign(VenLatestLoad.ven_id), "
+        "VenLatest.timestamp == foreign(VenLatestLoad.timestamp))",
+        order_by="VenLatestLoad.position",
+        viewonly=True,
+    )
+
+
+class VenLatestLoad(Base):
+    """Latest values of each of a VEN's loads.
+
+    Rows are only overwritten, never deleted, so a load missing from the
+    VEN's latest sample keeps an older ``timestamp`` and drops out of
+    :attr:`VenLatest.loads`.
+    """
+
+    __tablename__ = "ven_latest_loads"
+
+    ven_id: Mapped[str] = Column(
+        String,
+        ForeignKey("vens.ven_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    load_id: Mapped[str] = Column(String, primary_key=True)
+    timestamp: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+    # Order of the load within its sample.
+    position: Mapped[int] = Column(Integer, nullable=False)
     name: Mapped[str | None] = Column(String)
     type: Mapped[str | None] = Column(String)
     capacity_kw: Mapped[float | None] = Column(Float)
@@ -116,5 +295,52 @@ class LoadSnapshot(Base):
     shed_capability_kw: Mapped[float | None] = Column(Float)
     enabled: Mapped[bool | None] = Column(Boolean)
     priority: Mapped[int | None] = Column(Integer)
-    raw_payload: Mapped[dict | None] = Column(JSON)
-    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+@event.listens_for(VenTelemetry, "after_insert")
+def _record_latest_telemetry(mapper, connection, target: VenTelemetry) -> None:
+    from app.services.latest_state import latest_upsert
+
+    connection.execute(
+        latest_upsert(connection.dialect.name),
+        {
+            "ven_id": target.ven_id,
+            "telemetry_id": target.id,
+            "timestamp": target.timestamp,
+            "used_power_kw": target.used_power_kw,
+            "shed_power_kw": target.shed_power_kw,
+            "requested_reduction_kw": target.requested_reduction_kw,
+            "event_id": target.event_id,
+            "battery_soc": target.battery_soc,
+        },
+    )
+
+
+@event.listens_for(VenLoadSample, "after_insert")
+def _record_latest_load(mapper, connection, target: VenLoadSample) -> None:
+    from app.services.latest_state import latest_load_upsert
+
+    if target.telemetry_id is None:
+        # Snapshot samples are not part of the latest telemetry.
+        return
+    telemetry = target.__dict__.get("telemetry")
+    ven_id = telemetry.ven_id if telemetry is not None else connection.scalar(
+        select(VenTelemetry.ven_id).where(VenTelemetry.id == target.telemetry_id)
+    )
+    connection.execute(
+        latest_load_upsert(connection.dialect.name),
+        {
+            "ven_id": ven_id,
+            "load_id": target.load_id,
+            "timestamp": target.timestamp,
+            # Sample rows are inserted in order, so their id orders the loads.
+            "position": target.id,
+            "name": target.name,
+            "type": target.type,
+            "capacity_kw": target.capacity_kw,
+            "current_power_kw": target.current_power_kw,
+            "shed_capability_kw": target.shed_capability_kw,
+            "enabled": target.enabled,
+            "priority": target.priority,
+        },
+    )
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, PrimaryKeyConstraint, String
+from sqlalchemy.orm import Mapped
+
+from . import Base
+
+
+class _RollupColumns:
+    """Aggregates of the telemetry samples that fall into one bucket.
+
+    Averages are stored as sum and count so buckets can be merged exactly,
+    both when late samples are added and when history is re-bucketed to a
+    coarser granularity.
+    """
+
+    bucket_seconds: Mapped[int] = Column(Integer, nullable=False)
+    bucket_start: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+    sample_count: Mapped[int] = Column(Integer, nullable=False, default=0)
+    used_power_sum: Mapped[float] = Column(Float, nullable=False, default=0.0)
+    used_power_count: Mapped[int] = Column(Integer, nullable=False, default=0)
+    used_power_min: Mapped[float | None] = Column(Float)
+    used_power_max: Mapped[float | None] = Column(Float)
+    shed_power_sum: Mapped[float] = Column(Float, nullable=False, default=0.0)
+    shed_power_count: Mapped[int] = Column(Integer, nullable=False, default=0)
+    shed_power_min: Mapped[float | None] = Column(Float)
+    shed_power_max: Mapped[float | None] = Column(Float)
+    requested_reduction_sum: Mapped[float] = Column(Float, nullable=False, default=0.0)
+    requested_reduction_count: Mapped[int] = Column(Integer, nullable=False, default=0)
+    requested_reduction_min: Mapped[float | None] = Column(Float)
+    requested_reduction_max: Mapped[float | None] = Column(Float)
+    # Event id of the bucket's latest sample that has one, and that sample's
+    # timestamp, so late samples do not replace a newer event.
+    event_id: Mapped[str | None] = Column(String)
+    event_at: Mapped[datetime | None] = Column(DateTime(timezone=True))
+
+
+class VenTelemetryRollup(_RollupColumns, Base):
+    """Per-VEN telemetry aggregated into fixed buckets, maintained on ingest."""
+
+    __tablename__ = "ven_telemetry_rollups"
+    __table_args__ = (
+        PrimaryKeyConstraint("ven_id", "bucket_seconds", "bucket_start"),
+        # Fleet buckets are folded from, and read past their horizon as, the
+        # sums of every VEN's rollups of a bucket.
+        Index("ix_ven_telemetry_rollups_bucket", "bucket_seconds", "bucket_start"),
+    )
+
+    ven_id: Mapped[str] = Column(
+        String,
+        ForeignKey("vens.ven_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+
+class FleetTelemetryRollup(_RollupColumns, Base):
+    """Telemetry of every VEN aggregated into fixed buckets, folded from the per-VEN rollups."""
+
+    __tablename__ = "fleet_telemetry_rollups"
+    __table_args__ = (PrimaryKeyConstraint("bucket_seconds", "bucket_start"),)
@@ -7,7 +7,8 @@ Includes detailed circuit curtailment information.
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from sqlalchemy import JSON, Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import JSON, Column, DateTime, Float, Index, Integer, String, Text
+from sqlalchemy.orm import deferred
 
 from . import Base
 
@@ -20,6 +21,8 @@ class VenAck(Base):
     were curtailed and by how much.
     """
     __tablename__ = "ven_acks"
+    # Keyset pagination of a VEN's ACKs, newest first.
+    __table_args__ = (Index("ix_ven_acks_ven_id_timestamp_id", "ven_id", "timestamp", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     ven_id = Column(String(255), nullable=False, index=True)
@@ -39,8 +42,9 @@ class VenAck(Base):
     # Each entry: {id, name, breaker_amps, original_kw, curtailed_kw, final_kw, critical}
     circuits_curtailed = Column(JSON, nullable=True)
     
-    # Full ACK payload for debugging
-    raw_payload = Column(Text, nullable=True)
+    # Full ACK payload for debugging (see app.services.raw_payloads);
+    # deferred so listings never fetch it
+    raw_payload = deferred(Column(Text, nullable=True))
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
@@ -3,15 +3,18 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.dependencies import get_session
+from app.dependencies import get_fast_json, get_session
 from app.models.event import Event as EventModel
 from app.models.telemetry import VenTelemetry
+from app.routers.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, page, with_next_cursor
+from app.routers.utils import json_response
 from app.schemas.api_models import Event, EventCreate, EventMetrics, EventWithMetrics, EventDetail, VenParticipation
+from app.services.single_flight import coalesce
 
 router = APIRouter()
 
@@ -23,15 +26,19 @@ async def _ensure_event(session: AsyncSession, event_id: str) -> EventModel:
     return event
 
 
+def _event_row(event: EventModel, reduction: float = 0.0) -> dict:
+    return {
+        "id": event.event_id,
+        "status": event.status,
+        "startTime": event.start_time,
+        "endTime": event.end_time,
+        "requestedReductionKw": event.requested_reduction_kw,
+        "actualReductionKw": float(reduction),
+    }
+
+
 def _event_to_api(event: EventModel, reduction: float = 0.0) -> Event:
-    return Event(
-        id=event.event_id,
-        status=event.status,
-        startTime=event.start_time,
-        endTime=event.end_time,
-        requestedReductionKw=event.requested_reduction_kw,
-        actualReductionKw=reduction,
-    )
+    return Event.model_validate(_event_row(event, reduction))
 
 
 async def _reduction_map(session: AsyncSession, event_ids: list[str]) -> dict[str, float]:
@@ -99,14 +106,48 @@ async def _ven_participation(session: AsyncSession, event_id: str) -> list[VenPa
     return participation
 
 
-@router.get("/", response_model=list[Event])
-async def list_events_v2(session: AsyncSession = Depends(get_session)):
-    events = await crud.list_events(session)
+@coalesce
+async def _event_listing(
+    session: AsyncSession,
+    start: datetime | None,
+    end: datetime | None,
+    limit: int | None,
+    cursor: str | None,
+) -> tuple[list[dict], str | None]:
+    """Event rows starting in ``start``/``end``; one page of them when paged."""
+    next_cursor = None
+    if limit is None and cursor is None:
+        stmt = select(EventModel)
+        if start is not None:
+            stmt = stmt.where(EventModel.start_time >= start)
+        if end is not None:
+            stmt = stmt.where(EventModel.start_time <= end)
+        stmt = stmt.order_by(EventModel.start_time.asc())
+        result = await session.execute(stmt)
+        events = result.scalars().all()
+    else:
+        size = limit or DEFAULT_PAGE_SIZE
+        after = decode_cursor(cursor, datetime, str) if cursor is not None else None
+        events = await crud.list_events_page(session, start=start, end=end, after=after, limit=size + 1)
+        events, next_cursor = page(events, size, lambda event: (event.start_time, event.event_id))
     reductions = await _reduction_map(session, [event.event_id for event in events])
-    return [_event_to_api(event, reductions.get(event.event_id, 0.0)) for event in events]
+    return [_event_row(event, reductions.get(event.event_id, 0.0)) for event in events], next_cursor
+
+
+@router.get("/", response_model=list[Event])
+async def list_events_v2(
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    fast: bool = Depends(get_fast_json),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE, description="Page size; pages by start time"),
+    cursor: str | None = Query(default=None, description="nextCursor of the previous page"),
+):
+    result, next_cursor = await _event_listing(session, None, None, limit, cursor)
+    return with_next_cursor(json_response(result) if fast else result, response, next_cursor)
 
 
 @router.get("/current", response_model=EventWithMetrics | None)
+@coalesce
 async def current_event_v2(session: AsyncSession = Depends(get_session)):
     now = datetime.now(UTC)
     stmt = (
@@ -135,20 +176,16 @@ async def current_event_v2(session: AsyncSession = Depends(get_session)):
 
 @router.get("/history", response_model=list[Event])
 async def history_events_v2(
+    response: Response,
     session: AsyncSession = Depends(get_session),
+    fast: bool = Depends(get_fast_json),
     start: datetime | None = Query(default=None),
     end: datetime | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE, description="Page size; pages by start time"),
+    cursor: str | None = Query(default=None, description="nextCursor of the previous page"),
 ):
-    stmt = select(EventModel)
-    if start is not None:
-        stmt = stmt.where(EventModel.start_time >= start)
-    if end is not None:
-        stmt = stmt.where(EventModel.start_time <= end)
-    stmt = stmt.order_by(EventModel.start_time.asc())
-    result = await session.execute(stmt)
-    events = result.scalars().all()
-    reductions = await _reduction_map(session, [event.event_id for event in events])
-    return [_event_to_api(event, reductions.get(event.event_id, 0.0)) for event in events]
+    result, next_cursor = await _event_listing(session, start, end, limit, cursor)
+    return with_next_cursor(json_response(result) if fast else result, response, next_cursor)
 
 
 @router.post("/", response_model=Event, status_code=status.HTTP_201_CREATED)
@@ -206,6 +243,7 @@ async def stop_event_v2(event_id: str, session: AsyncSession = Depends(get_sessi
 
 
 @router.get("/{event_id}/metrics", response_model=EventMetrics)
+@coalesce
 async def event_metrics_v2(event_id: str, session: AsyncSession = Depends(get_session)):
     await _ensure_event(session, event_id)
     return await _event_metrics(session, event_id)
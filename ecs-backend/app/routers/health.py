@@ -1,9 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 
-from app.dependencies import get_session
+from app.dependencies import get_fleet_cache, get_hot_window, get_session, get_single_flight, get_ven_fragments
+from app.services.fleet_cache import FleetCache
+from app.services.hot_window import HotWindow
+from app.services.single_flight import SingleFlight
+from app.services.ven_fragments import VenFragments
 from app import crud
 
 router = APIRouter()
@@ -19,6 +23,71 @@ async def health_check():
     return {"status": "ok"}
 
 
+@router.get("/ingest")
+async def ingest_metrics(request: Request):
+    """Report MQTT ingest queue depth and message counters.
+
+    Returns:
+        Enqueued, dropped and processed message counts plus current queue
+        depth, or ``{"status": "disabled"}`` when no consumer is attached.
+    """
+    consumer = getattr(request.app.state, "mqtt_consumer", None)
+    if consumer is None:
+        return {"status": "disabled"}
+    return {"status": "ok", **consumer.metrics()}
+
+
+@router.get("/hot-window")
+async def hot_window_metrics(window: HotWindow | None = Depends(get_hot_window)):
+    """Report the in-memory hot telemetry window's size and hit rate.
+
+    Returns:
+        VEN and sample counts, allocated and maximum bytes, and query hits
+        and misses, or ``{"status": "disabled"}`` when the window is off.
+    """
+    if window is None:
+        return {"status": "disabled"}
+    return {"status": "ok", **window.stats()}
+
+
+@router.get("/fleet-cache")
+async def fleet_cache_metrics(cache: FleetCache | None = Depends(get_fleet_cache)):
+    """Report the fleet view cache's counters.
+
+    Returns:
+        Per view hits, stale hits, misses, refreshes, refresh errors,
+        refresh latency and invalidations, or ``{"status": "disabled"}``
+        when the cache is off.
+    """
+    if cache is None:
+        return {"status": "disabled"}
+    return {"status": "ok", **cache.stats()}
+
+
+@router.get("/single-flight")
+async def single_flight_metrics(flights: SingleFlight = Depends(get_single_flight)):
+    """Report how many requests were coalesced into identical in-flight calls.
+
+    Returns:
+        Calls in flight, and calls made and coalesced in total and per
+        decorated function.
+    """
+    return {"status": "ok", **flights.stats()}
+
+
+@router.get("/ven-fragments")
+async def ven_fragment_metrics(fragments: VenFragments | None = Depends(get_ven_fragments)):
+    """Report the serialized VEN list entries kept per view.
+
+    Returns:
+        Per view fragment count and size, and fragments served and
+        rendered, or ``{"status": "disabled"}`` when fragments are off.
+    """
+    if fragments is None:
+        return {"status": "disabled"}
+    return {"status": "ok", **fragments.stats()}
+
+
 @router.get("/db-check")
 async def db_check(session: AsyncSession = Depends(get_session)):
     """Verify database connectivity and required tables.
@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination
+
+Paged listings are ordered by an indexed sort key that ends in a unique
+column, and each page continues strictly after the key of the previous
+page's last row. A page therefore costs the same however deep it is, and
+rows inserted or deleted meanwhile never shift, skip or repeat the rows
+that were already there.
+
+Cursors are opaque to clients: the URL-safe base64 of the JSON-encoded
+sort key of the last row of a page. List endpoints return the cursor of the
+next page in the ``X-Next-Cursor`` header, object responses in their
+``nextCursor`` field; it is absent on the last page.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from typing import Any, TypeVar
+
+from fastapi import HTTPException, Response, status
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*key: Any) -> str:
+    """An opaque cursor for the sort key ``key`` (strings, ints, datetimes, None)."""
+
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    data = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple[Any, ...]:
+    """The sort key in ``cursor``, checked against ``types``; 400 if it is not one."""
+
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of values")
+        return tuple(_decode_value(value, kind) for value, kind in zip(values, types))
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def _decode_value(value: Any, kind: type) -> Any:
+    if value is None:
+        return None
+    if kind is datetime:
+        return datetime.fromisoformat(value)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise TypeError(f"expected {kind.__name__}")
+    return value
+
+
+def page(rows: Sequence[T], limit: int, key: Callable[[T], tuple[Any, ...]]) -> tuple[list[T], str | None]:
+    """Split the up to ``limit + 1`` rows read into a page and the next page's cursor."""
+
+    if len(rows) <= limit:
+        return list(rows), None
+    return list(rows[:limit]), encode_cursor(*key(rows[limit - 1]))
+
+
+def with_next_cursor(result: T, response: Response, next_cursor: str | None) -> T:
+    """Set the ``X-Next-Cursor`` header, on ``result`` itself if it is a response."""
+
+    if next_cursor is not None:
+        target = result if isinstance(result, Response) else response
+        target.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return result
@@ -3,25 +3,27 @@ from __future__ import annotations
 from datetime import UTC, datetime, timedelta
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app import crud
-from app.dependencies import get_session
-from app.models.telemetry import VenTelemetry
+from app.dependencies import get_fast_json, get_fleet_cache, get_hot_window, get_session, get_telemetry_archive
 from app.routers.utils import (
     aggregate_load_stats,
     aggregate_network_stats,
-    build_history_response,
+    history_bucket_seconds,
+    history_points,
+    json_response,
 )
 from app.schemas.api_models import HistoryResponse, LoadTypeStats, NetworkStats
+from app.services.fleet_cache import FleetCache
+from app.services.hot_window import HotWindow
+from app.services.single_flight import coalesce
+from app.services.telemetry_archive import TelemetryArchive
 
 router = APIRouter()
 
 
-@router.get("/network", response_model=NetworkStats)
-async def stats_network(session: AsyncSession = Depends(get_session)):
+async def _network_stats(session: AsyncSession) -> NetworkStats:
     vens = await crud.list_vens(session)
     ven_ids = [ven.ven_id for ven in vens]
     statuses = await crud.latest_status_map(session, ven_ids)
@@ -29,8 +31,17 @@ async def stats_network(session: AsyncSession = Depends(get_session)):
     return aggregate_network_stats(vens, statuses, telemetry)
 
 
-@router.get("/loads", response_model=list[LoadTypeStats])
-async def stats_loads(session: AsyncSession = Depends(get_session)):
+@router.get("/network", response_model=NetworkStats)
+async def stats_network(
+    session: AsyncSession = Depends(get_session),
+    cache: FleetCache | None = Depends(get_fleet_cache),
+):
+    if cache is None:
+        return await _network_stats(session)
+    return await cache.get("stats_network", _network_stats)
+
+
+async def _load_stats(session: AsyncSession) -> list[LoadTypeStats]:
     ven_ids = [ven.ven_id for ven in await crud.list_vens(session)]
     telemetry = await crud.latest_telemetry_map(session, ven_ids)
     stats = aggregate_load_stats(telemetry.values())
@@ -45,22 +56,35 @@ async def stats_loads(session: AsyncSession = Depends(get_session)):
     ]
 
 
+@router.get("/loads", response_model=list[LoadTypeStats])
+async def stats_loads(
+    session: AsyncSession = Depends(get_session),
+    cache: FleetCache | None = Depends(get_fleet_cache),
+):
+    if cache is None:
+        return await _load_stats(session)
+    return await cache.get("stats_loads", _load_stats)
+
+
 @router.get("/network/history", response_model=HistoryResponse)
+@coalesce
 async def stats_network_history(
     session: AsyncSession = Depends(get_session),
+    archive: TelemetryArchive | None = Depends(get_telemetry_archive),
+    hot_window: HotWindow | None = Depends(get_hot_window),
+    fast: bool = Depends(get_fast_json),
     start: datetime | None = Query(default=None),
     end: datetime | None = Query(default=None),
     granularity: str | None = Query(default="5m"),
+    max_points: int | None = Query(default=None, alias="maxPoints", ge=2, le=10000),
 ):
-    stmt = select(VenTelemetry).options(selectinload(VenTelemetry.loads))
-    if start is not None:
-        stmt = stmt.where(VenTelemetry.timestamp >= start)
-    else:
-        cutoff = datetime.now(UTC) - timedelta(hours=24)
-        stmt = stmt.where(VenTelemetry.timestamp >= cutoff)
-    if end is not None:
-        stmt = stmt.where(VenTelemetry.timestamp <= end)
-    stmt = stmt.order_by(VenTelemetry.timestamp.asc())
-    result = await session.execute(stmt)
-    rows = result.scalars().all()
-    return build_history_response(rows, granularity)
+    if start is None:
+        start = datetime.now(UTC) - timedelta(hours=24)
+    bucket_seconds = history_bucket_seconds(granularity)
+    buckets = hot_window.history(None, bucket_seconds, start, end) if hot_window is not None else None
+    if buckets is None:
+        buckets = await crud.telemetry_history(
+            session, None, bucket_seconds, start=start, end=end, archive=archive
+        )
+    content = {"points": history_points([], granularity, rollups=buckets, max_points=max_points)}
+    return json_response(content) if fast else content
@@ -4,19 +4,16 @@ from __future__ import annotations
 
 from collections import defaultdict
 from datetime import UTC, datetime, timedelta
-from typing import Iterable, Sequence
+from typing import Any, Iterable, Sequence
 
-from app.models.telemetry import VenStatus, VenTelemetry
+from fastapi import Response
+
+from app.core import json_codec
+from app.models.telemetry import VenLatest, VenStatus, VenTelemetry
+from app.models.telemetry_rollup import FleetTelemetryRollup, VenTelemetryRollup
 from app.models.ven import VEN
-from app.schemas.api_models import (
-    HistoryResponse,
-    Load,
-    Location,
-    NetworkStats,
-    TimeseriesPoint,
-    Ven,
-    VenMetrics,
-)
+from app.schemas.api_models import HistoryResponse, NetworkStats, Ven
+from app.services.downsampling import downsample
 
 
 def _granularity_to_timedelta(value: str | None) -> timedelta:
@@ -45,16 +42,16 @@ def _granularity_to_timedelta(value: str | None) -> timedelta:
     return timedelta(minutes=5)
 
 
-def build_ven_payload(
+def ven_row(
     ven: VEN,
     status: VenStatus | None,
-    telemetry: VenTelemetry | None,
+    telemetry: VenLatest | VenTelemetry | None,
     *,
     include_loads: bool = False,
-) -> Ven:
-    """Convert ORM rows into an API response object."""
+) -> dict[str, Any]:
+    """Convert ORM rows into the plain fields of a :class:`Ven`, in schema order."""
 
-    location = Location(lat=ven.latitude or 0.0, lon=ven.longitude or 0.0)
+    location = {"lat": ven.latitude or 0.0, "lon": ven.longitude or 0.0}
 
     # Get current power from status or telemetry
     current_power = (
@@ -76,16 +73,16 @@ def build_ven_payload(
         else (telemetry.event_id if telemetry and telemetry.event_id else None)
     )
 
-    metrics = VenMetrics(
-        currentPowerKw=current_power,
-        shedAvailabilityKw=shed_availability,
-        activeEventId=active_event,
-        shedLoadIds=[
+    metrics = {
+        "currentPowerKw": current_power,
+        "shedAvailabilityKw": shed_availability,
+        "activeEventId": active_event,
+        "shedLoadIds": [
             load.load_id
             for load in (telemetry.loads if telemetry else [])
             if load.shed_capability_kw and load.shed_capability_kw > 0
         ],
-    )
+    }
 
     status_value = status.status if status else ven.status or "unknown"
 
@@ -109,47 +106,108 @@ def build_ven_payload(
     loads = None
     if include_loads and telemetry:
         loads = [
-            Load(
-                id=sample.load_id,
-                type=sample.type or "unknown",
-                capacityKw=sample.capacity_kw or 0.0,
-                shedCapabilityKw=sample.shed_capability_kw or 0.0,
-                currentPowerKw=sample.current_power_kw or 0.0,
-                name=sample.name,
-            )
+            {
+                "id": sample.load_id,
+                "type": sample.type or "unknown",
+                "capacityKw": sample.capacity_kw or 0.0,
+                "shedCapabilityKw": sample.shed_capability_kw or 0.0,
+                "currentPowerKw": sample.current_power_kw or 0.0,
+                "name": sample.name,
+            }
             for sample in telemetry.loads
         ]
 
-    return Ven(
-        id=ven.ven_id,
-        name=ven.name,
-        status=status_value,
-        location=location,
-        metrics=metrics,
-        createdAt=created_at,
-        lastSeen=last_seen,
-        loads=loads,
+    return {
+        "id": ven.ven_id,
+        "name": ven.name,
+        "status": status_value,
+        "location": location,
+        "metrics": metrics,
+        "createdAt": created_at,
+        "lastSeen": last_seen,
+        "loads": loads,
+    }
+
+
+def build_ven_payload(
+    ven: VEN,
+    status: VenStatus | None,
+    telemetry: VenLatest | VenTelemetry | None,
+    *,
+    include_loads: bool = False,
+) -> Ven:
+    """Convert ORM rows into an API response object."""
+
+    return Ven.model_validate(ven_row(ven, status, telemetry, include_loads=include_loads))
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """Plain ``content`` encoded with :func:`app.core.json_codec.dumps`.
+
+    Returned by endpoints in place of response models when
+    ``FAST_JSON_RESPONSES`` is set, so FastAPI neither validates nor
+    re-encodes it. ``content`` must already have the shape and types of the
+    response model (see the ``*_row`` builders).
+    """
+
+    return Response(json_codec.dumps(content), status_code=status_code, media_type="application/json")
+
+
+def history_bucket_seconds(granularity: str | None) -> int:
+    """Bucket size in whole seconds for a history ``granularity`` string."""
+
+    return max(int(_granularity_to_timedelta(granularity).total_seconds()), 1)
+
+
+def _as_utc(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=UTC) if ts.tzinfo is None else ts
+
+
+def _sample_sums(row: VenTelemetry) -> tuple[tuple[float, int], ...]:
+    return tuple(
+        (value, 1) if value is not None else (0.0, 0)
+        for value in (row.used_power_kw, row.shed_power_kw, row.requested_reduction_kw)
     )
 
 
-def build_history_response(
+def _rollup_sums(rollup: VenTelemetryRollup | FleetTelemetryRollup) -> tuple[tuple[float, int], ...]:
+    return (
+        (rollup.used_power_sum, rollup.used_power_count),
+        (rollup.shed_power_sum, rollup.shed_power_count),
+        (rollup.requested_reduction_sum, rollup.requested_reduction_count),
+    )
+
+
+def history_points(
     telemetries: Sequence[VenTelemetry],
     granularity: str | None,
-) -> HistoryResponse:
-    """Bucket telemetry points into the requested granularity."""
+    rollups: Sequence[VenTelemetryRollup | FleetTelemetryRollup] = (),
+    max_points: int | None = None,
+) -> list[dict[str, Any]]:
+    """Bucket telemetry points into the requested granularity.
+
+    Points are the plain fields of :class:`TimeseriesPoint`, in schema order.
+
+    ``rollups`` are pre-aggregated buckets (rollup rows, or the rows of
+    :func:`app.crud.telemetry_history`); each is merged into the bucket
+    containing its start, so their resolution must divide the granularity.
+    With ``max_points``, the buckets are downsampled to at most that many
+    points by used power, keeping the first and last bucket of every event.
+    """
 
-    if not telemetries:
-        return HistoryResponse(points=[])
+    if not telemetries and not rollups:
+        return []
 
-    bucket = _granularity_to_timedelta(granularity)
-    bucket_seconds = max(int(bucket.total_seconds()), 1)
+    bucket_seconds = history_bucket_seconds(granularity)
 
+    items = [(_as_utc(row.timestamp), _sample_sums(row), row.event_id) for row in telemetries]
+    items += [(_as_utc(rollup.bucket_start), _rollup_sums(rollup), rollup.event_id) for rollup in rollups]
+    items.sort(key=lambda item: item[0])
+
+    # Running [sum, count] per measure, so rollups merge exactly.
     aggregates: dict[datetime, dict[str, list[float] | str | None]] = {}
 
-    for row in telemetries:
-        ts = row.timestamp
-        if ts.tzinfo is None:
-            ts = ts.replace(tzinfo=UTC)
+    for ts, sums, event_id in items:
         epoch = int(ts.timestamp())
         bucket_epoch = (epoch // bucket_seconds) * bucket_seconds
         bucket_ts = datetime.fromtimestamp(bucket_epoch, tz=ts.tzinfo)
@@ -157,48 +215,84 @@ def build_history_response(
         entry = aggregates.setdefault(
             bucket_ts,
             {
-                "used": [],
-                "shed": [],
-                "requested": [],
+                "used": [0.0, 0],
+                "shed": [0.0, 0],
+                "requested": [0.0, 0],
                 "event": None,
             },
         )
-        if row.used_power_kw is not None:
-            entry["used"].append(row.used_power_kw)
-        if row.shed_power_kw is not None:
-            entry["shed"].append(row.shed_power_kw)
-        if row.requested_reduction_kw is not None:
-            entry["requested"].append(row.requested_reduction_kw)
-        if row.event_id:
-            entry["event"] = row.event_id
-
-    points: list[TimeseriesPoint] = []
+        for name, (value, count) in zip(("used", "shed", "requested"), sums):
+            entry[name][0] += value
+            entry[name][1] += count
+        if event_id:
+            entry["event"] = event_id
+
+    points: list[dict[str, Any]] = []
     for bucket_ts in sorted(aggregates.keys()):
         entry = aggregates[bucket_ts]
-        used = sum(entry["used"]) / len(entry["used"]) if entry["used"] else 0.0
-        shed = sum(entry["shed"]) / len(entry["shed"]) if entry["shed"] else 0.0
-        requested = (
-            sum(entry["requested"]) / len(entry["requested"])
-            if entry["requested"]
-            else None
-        )
+        used, shed, requested = entry["used"], entry["shed"], entry["requested"]
         points.append(
-            TimeseriesPoint(
-                timestamp=bucket_ts,
-                usedPowerKw=used,
-                shedPowerKw=shed,
-                requestedReductionKw=requested,
-                eventId=entry["event"],
-            )
+            {
+                "timestamp": bucket_ts,
+                "usedPowerKw": used[0] / used[1] if used[1] else 0.0,
+                "shedPowerKw": shed[0] / shed[1] if shed[1] else 0.0,
+                "eventId": entry["event"],
+                "requestedReductionKw": requested[0] / requested[1] if requested[1] else None,
+            }
         )
 
-    return HistoryResponse(points=points)
+    if max_points is not None:
+        keep = downsample(
+            [point["timestamp"].timestamp() for point in points],
+            [point["usedPowerKw"] for point in points],
+            max_points,
+            keys=[point["eventId"] for point in points],
+        )
+        points = [points[index] for index in keep]
+
+    return points
+
+
+def build_history_response(
+    telemetries: Sequence[VenTelemetry],
+    granularity: str | None,
+    rollups: Sequence[VenTelemetryRollup | FleetTelemetryRollup] = (),
+    max_points: int | None = None,
+) -> HistoryResponse:
+    """:func:`history_points` as a :class:`HistoryResponse`."""
+
+    return HistoryResponse.model_validate(
+        {"points": history_points(telemetries, granularity, rollups=rollups, max_points=max_points)}
+    )
+
+
+def downsample_circuits(snapshots: Sequence[dict[str, Any]], max_points: int) -> list[dict[str, Any]]:
+    """Downsample each circuit's snapshot rows to at most ``max_points`` by power.
+
+    The first and last snapshot of every enabled/disabled run are kept, so
+    sheds stay visible. Snapshots keep their order.
+    """
+
+    by_load: dict[str, list[int]] = defaultdict(list)
+    for index, snapshot in enumerate(snapshots):
+        by_load[snapshot["loadId"]].append(index)
+    keep: list[int] = []
+    for indices in by_load.values():
+        series = [snapshots[index] for index in indices]
+        selected = downsample(
+            [snapshot["timestamp"].timestamp() for snapshot in series],
+            [snapshot["currentPowerKw"] for snapshot in series],
+            max_points,
+            keys=[snapshot["enabled"] for snapshot in series],
+        )
+        keep.extend(indices[position] for position in selected)
+    return [snapshots[index] for index in sorted(keep)]
 
 
 def aggregate_network_stats(
     vens: Sequence[VEN],
     statuses: dict[str, VenStatus],
-    telemetries: dict[str, VenTelemetry],
+    telemetries: dict[str, VenLatest | VenTelemetry],
 ) -> NetworkStats:
     """Build network statistics from stored telemetry."""
 
@@ -243,7 +337,7 @@ def aggregate_network_stats(
     )
 
 
-def aggregate_load_stats(telemetries: Iterable[VenTelemetry]) -> dict[str, dict[str, float]]:
+def aggregate_load_stats(telemetries: Iterable[VenLatest | VenTelemetry]) -> dict[str, dict[str, float]]:
     """Aggregate load metrics by type from telemetry samples."""
 
     stats: dict[str, dict[str, float]] = defaultdict(lambda: {
@@ -1,21 +1,38 @@
 from __future__ import annotations
 
+import functools
+from collections.abc import Callable
 from datetime import UTC, datetime
-from types import SimpleNamespace
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.dependencies import get_session
-from app.routers.utils import build_history_response, build_ven_payload
+from app.dependencies import (
+    get_fast_json,
+    get_fleet_cache,
+    get_hot_window,
+    get_session,
+    get_telemetry_archive,
+    get_ven_fragments,
+    get_ven_registry,
+)
+from app.routers.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, page, with_next_cursor
+from app.routers.utils import (
+    build_ven_payload,
+    downsample_circuits,
+    history_bucket_seconds,
+    history_points,
+    json_response,
+    ven_row,
+)
 from app.schemas.api_models import (
-    CircuitCurtailment,
     CircuitHistoryResponse,
-    CircuitSnapshot,
     HistoryResponse,
     Load,
+    RawTelemetry,
     ShedCommand,
     Ven,
     VenCreate,
@@ -23,6 +40,13 @@ from app.schemas.api_models import (
     VenSummary,
     VenUpdate,
 )
+from app.services.fleet_cache import FleetCache
+from app.services.hot_window import HotWindow
+from app.services.raw_payloads import decode_raw
+from app.services.single_flight import coalesce
+from app.services.telemetry_archive import TelemetryArchive
+from app.services.ven_fragments import VenFragments
+from app.services.ven_registry import VenRegistry
 
 router = APIRouter()
 
@@ -34,6 +58,13 @@ async def _ensure_ven(session: AsyncSession, ven_id: str):
     return ven
 
 
+async def _ensure_ven_exists(session: AsyncSession, registry: VenRegistry, ven_id: str) -> None:
+    """404 unless the VEN exists; VENs known to the ingest registry skip the query."""
+    if registry.is_known(ven_id):
+        return
+    await _ensure_ven(session, ven_id)
+
+
 def _load_from_sample(sample) -> Load:
     return Load(
         id=sample.load_id,
@@ -45,20 +76,117 @@ def _load_from_sample(sample) -> Load:
     )
 
 
-@router.get("/", response_model=list[Ven])
-async def list_vens_v2(session: AsyncSession = Depends(get_session)):
-    vens = await crud.list_vens(session)
+async def _ven_rows(session: AsyncSession, vens: list, build_row: Callable[..., dict]) -> list[dict]:
     ven_ids = [ven.ven_id for ven in vens]
     statuses = await crud.latest_status_map(session, ven_ids)
     telemetry = await crud.latest_telemetry_map(session, ven_ids)
-    return [
-        build_ven_payload(ven, statuses.get(ven.ven_id), telemetry.get(ven.ven_id), include_loads=True)
+    return [build_row(ven, statuses.get(ven.ven_id), telemetry.get(ven.ven_id)) for ven in vens]
+
+
+def _fragment_version(ven, status, telemetry_id: int | None) -> tuple:
+    """What a VEN's list entries are rendered from: its latest telemetry and status version."""
+    status_id = status.id if status else None
+    return telemetry_id, (status_id, ven.name, ven.status, ven.latitude, ven.longitude, ven.created_at)
+
+
+async def _ven_fragments(
+    session: AsyncSession,
+    fragments: VenFragments,
+    view: str,
+    build: Callable[..., BaseModel],
+    vens: list,
+    prune: bool = True,
+) -> bytes:
+    """The JSON list of ``view`` for ``vens``, rendering only VENs whose inputs changed."""
+    ven_ids = [ven.ven_id for ven in vens]
+    statuses = await crud.latest_status_map(session, ven_ids)
+    telemetry_ids = await crud.latest_telemetry_ids(session, ven_ids)
+    versions = {
+        ven.ven_id: _fragment_version(ven, statuses.get(ven.ven_id), telemetry_ids.get(ven.ven_id))
         for ven in vens
-    ]
+    }
+    stale = fragments.missing(view, versions)
+    if stale:
+        telemetry = await crud.latest_telemetry_map(session, stale)
+        by_id = {ven.ven_id: ven for ven in vens}
+        for ven_id in stale:
+            ven, status, telem = by_id[ven_id], statuses.get(ven_id), telemetry.get(ven_id)
+            version = _fragment_version(ven, status, telem.telemetry_id if telem else None)
+            fragments.put(view, ven_id, version, build(ven, status, telem))
+    return fragments.assemble(view, ven_ids, prune=prune)
+
+
+async def _ven_listing(
+    session: AsyncSession,
+    view: str,
+    build_row: Callable[..., dict],
+    model: type[BaseModel],
+    *,
+    cache: FleetCache | None,
+    fragments: VenFragments | None,
+    fast: bool,
+    response: Response,
+    limit: int | None,
+    cursor: str | None,
+):
+    """The VEN list ``view`` of the whole fleet, or of one page by VEN id when paged."""
+    vens = next_cursor = None
+    if limit is not None or cursor is not None:
+        size = limit or DEFAULT_PAGE_SIZE
+        after = decode_cursor(cursor, str)[0] if cursor is not None else None
+        rows = await crud.list_vens_page(session, after=after, limit=size + 1)
+        vens, next_cursor = page(rows, size, lambda ven: (ven.ven_id,))
+
+    async def load(session: AsyncSession):
+        listed = vens if vens is not None else await crud.list_vens(session)
+        if fragments is None:
+            return await _ven_rows(session, listed, build_row)
+
+        def build(ven, status, telemetry) -> BaseModel:
+            return model.model_validate(build_row(ven, status, telemetry))
+
+        # A page must not drop the fragments of the VENs on other pages.
+        return await _ven_fragments(session, fragments, view, build, listed, prune=vens is None)
+
+    # Only whole-fleet views are cached.
+    result = await load(session) if cache is None or vens is not None else await cache.get(view, load)
+    if fragments is not None:
+        result = Response(result, media_type="application/json")
+    elif fast:
+        result = json_response(result)
+    return with_next_cursor(result, response, next_cursor)
+
+
+@router.get("/", response_model=list[Ven])
+async def list_vens_v2(
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    cache: FleetCache | None = Depends(get_fleet_cache),
+    fragments: VenFragments | None = Depends(get_ven_fragments),
+    fast: bool = Depends(get_fast_json),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE, description="Page size; pages by VEN id"),
+    cursor: str | None = Query(default=None, description="nextCursor of the previous page"),
+):
+    return await _ven_listing(
+        session,
+        "vens",
+        functools.partial(ven_row, include_loads=True),
+        Ven,
+        cache=cache,
+        fragments=fragments,
+        fast=fast,
+        response=response,
+        limit=limit,
+        cursor=cursor,
+    )
 
 
 @router.post("/", response_model=Ven, status_code=status.HTTP_201_CREATED)
-async def create_ven_v2(payload: VenCreate, session: AsyncSession = Depends(get_session)):
+async def create_ven_v2(
+    payload: VenCreate,
+    session: AsyncSession = Depends(get_session),
+    cache: FleetCache | None = Depends(get_fleet_cache),
+):
     ven_id = f"ven-{uuid4().hex[:8]}"
     ven = await crud.create_ven(
         session,
@@ -69,42 +197,57 @@ async def create_ven_v2(payload: VenCreate, session: AsyncSession = Depends(get_
         latitude=payload.location.lat,
         longitude=payload.location.lon,
     )
+    if cache is not None:
+        cache.invalidate()
     statuses = await crud.latest_status_map(session, [ven.ven_id])
     telemetry = await crud.latest_telemetry_map(session, [ven.ven_id])
     return build_ven_payload(ven, statuses.get(ven.ven_id), telemetry.get(ven.ven_id))
 
 
+def _ven_summary_row(ven, status, telemetry) -> dict:
+    payload = ven_row(ven, status, telemetry)
+    location, metrics = payload["location"], payload["metrics"]
+    last_seen = None
+    if telemetry:
+        ts = telemetry.timestamp
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=UTC)
+        last_seen = ts.isoformat()
+    return {
+        "id": payload["id"],
+        "name": payload["name"],
+        "location": f"{location['lat']:.3f}, {location['lon']:.3f}",
+        "status": payload["status"],
+        "controllablePower": round(metrics["shedAvailabilityKw"], 3),
+        "currentPower": round(metrics["currentPowerKw"], 3),
+        "address": f"Lat {location['lat']:.3f} / Lon {location['lon']:.3f}",
+        "lastSeen": last_seen or payload["createdAt"].isoformat(),
+        "responseTime": 0,
+    }
+
+
 @router.get("/summary", response_model=list[VenSummary])
-async def list_vens_summary(session: AsyncSession = Depends(get_session)):
-    vens = await crud.list_vens(session)
-    ven_ids = [ven.ven_id for ven in vens]
-    statuses = await crud.latest_status_map(session, ven_ids)
-    telemetry = await crud.latest_telemetry_map(session, ven_ids)
-    summaries: list[VenSummary] = []
-    for ven in vens:
-        status = statuses.get(ven.ven_id)
-        telem = telemetry.get(ven.ven_id)
-        payload = build_ven_payload(ven, status, telem)
-        last_seen = None
-        if telem:
-            ts = telem.timestamp
-            if ts.tzinfo is None:
-                ts = ts.replace(tzinfo=UTC)
-            last_seen = ts.isoformat()
-        summaries.append(
-            VenSummary(
-                id=payload.id,
-                name=payload.name,
-                location=f"{payload.location.lat:.3f}, {payload.location.lon:.3f}",
-                status=payload.status,
-                controllablePower=round(payload.metrics.shedAvailabilityKw, 3),
-                currentPower=round(payload.metrics.currentPowerKw, 3),
-                address=f"Lat {payload.location.lat:.3f} / Lon {payload.location.lon:.3f}",
-                lastSeen=last_seen or payload.createdAt.isoformat(),
-                responseTime=0,
-            )
-        )
-    return summaries
+async def list_vens_summary(
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    cache: FleetCache | None = Depends(get_fleet_cache),
+    fragments: VenFragments | None = Depends(get_ven_fragments),
+    fast: bool = Depends(get_fast_json),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE, description="Page size; pages by VEN id"),
+    cursor: str | None = Query(default=None, description="nextCursor of the previous page"),
+):
+    return await _ven_listing(
+        session,
+        "vens_summary",
+        _ven_summary_row,
+        VenSummary,
+        cache=cache,
+        fragments=fragments,
+        fast=fast,
+        response=response,
+        limit=limit,
+        cursor=cursor,
+    )
 
 
 @router.get("/{ven_id}", response_model=Ven)
@@ -120,6 +263,7 @@ async def patch_ven_v2(
     ven_id: str,
     update: VenUpdate,
     session: AsyncSession = Depends(get_session),
+    cache: FleetCache | None = Depends(get_fleet_cache),
 ):
     ven = await _ensure_ven(session, ven_id)
     data = update.model_dump(exclude_unset=True)
@@ -132,21 +276,41 @@ async def patch_ven_v2(
         data["registration_id"] = registration
     if data:
         ven = await crud.update_ven(session, ven, data)
+        if cache is not None:
+            cache.invalidate()
     statuses = await crud.latest_status_map(session, [ven_id])
     telemetry = await crud.latest_telemetry_map(session, [ven_id])
     return build_ven_payload(ven, statuses.get(ven_id), telemetry.get(ven_id), include_loads=True)
 
 
 @router.delete("/{ven_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_ven_v2(ven_id: str, session: AsyncSession = Depends(get_session)):
+async def delete_ven_v2(
+    ven_id: str,
+    session: AsyncSession = Depends(get_session),
+    registry: VenRegistry = Depends(get_ven_registry),
+    hot_window: HotWindow | None = Depends(get_hot_window),
+    cache: FleetCache | None = Depends(get_fleet_cache),
+    fragments: VenFragments | None = Depends(get_ven_fragments),
+):
     ven = await _ensure_ven(session, ven_id)
     await crud.delete_ven(session, ven)
+    registry.forget(ven_id)
+    if hot_window is not None:
+        hot_window.forget(ven_id)
+    if fragments is not None:
+        fragments.forget(ven_id)
+    if cache is not None:
+        cache.invalidate()
     return None
 
 
 @router.get("/{ven_id}/loads", response_model=list[Load])
-async def list_ven_loads(ven_id: str, session: AsyncSession = Depends(get_session)):
-    await _ensure_ven(session, ven_id)
+async def list_ven_loads(
+    ven_id: str,
+    session: AsyncSession = Depends(get_session),
+    registry: VenRegistry = Depends(get_ven_registry),
+):
+    await _ensure_ven_exists(session, registry, ven_id)
     telemetry = await crud.latest_telemetry_map(session, [ven_id])
     latest = telemetry.get(ven_id)
     if not latest:
@@ -155,8 +319,13 @@ async def list_ven_loads(ven_id: str, session: AsyncSession = Depends(get_sessio
 
 
 @router.get("/{ven_id}/loads/{load_id}", response_model=Load)
-async def get_ven_load(ven_id: str, load_id: str, session: AsyncSession = Depends(get_session)):
-    await _ensure_ven(session, ven_id)
+async def get_ven_load(
+    ven_id: str,
+    load_id: str,
+    session: AsyncSession = Depends(get_session),
+    registry: VenRegistry = Depends(get_ven_registry),
+):
+    await _ensure_ven_exists(session, registry, ven_id)
     telemetry = await crud.latest_telemetry_map(session, [ven_id])
     latest = telemetry.get(ven_id)
     if not latest:
@@ -178,106 +347,170 @@ async def shed_ven_load(ven_id: str, load_id: str, cmd: ShedCommand):
 
 
 @router.get("/{ven_id}/history", response_model=HistoryResponse)
+@coalesce
 async def ven_history(
     ven_id: str,
     session: AsyncSession = Depends(get_session),
+    registry: VenRegistry = Depends(get_ven_registry),
+    archive: TelemetryArchive | None = Depends(get_telemetry_archive),
+    hot_window: HotWindow | None = Depends(get_hot_window),
+    fast: bool = Depends(get_fast_json),
     start: datetime | None = Query(default=None),
     end: datetime | None = Query(default=None),
     granularity: str | None = Query(default="5m"),
+    max_points: int | None = Query(default=None, alias="maxPoints", ge=2, le=10000),
 ):
-    await _ensure_ven(session, ven_id)
-    telemetries = await crud.telemetry_for_ven(session, ven_id, start=start, end=end)
-    return build_history_response(telemetries, granularity)
+    await _ensure_ven_exists(session, registry, ven_id)
+    bucket_seconds = history_bucket_seconds(granularity)
+    buckets = hot_window.history(ven_id, bucket_seconds, start, end) if hot_window is not None else None
+    if buckets is None:
+        buckets = await crud.telemetry_history(
+            session, ven_id, bucket_seconds, start=start, end=end, archive=archive
+        )
+    content = {"points": history_points([], granularity, rollups=buckets, max_points=max_points)}
+    return json_response(content) if fast else content
 
 
 @router.get("/{ven_id}/loads/{load_id}/history", response_model=HistoryResponse)
+@coalesce
 async def ven_load_history(
     ven_id: str,
     load_id: str,
     session: AsyncSession = Depends(get_session),
+    registry: VenRegistry = Depends(get_ven_registry),
+    archive: TelemetryArchive | None = Depends(get_telemetry_archive),
+    fast: bool = Depends(get_fast_json),
     start: datetime | None = Query(default=None),
     end: datetime | None = Query(default=None),
     granularity: str | None = Query(default="5m"),
+    max_points: int | None = Query(default=None, alias="maxPoints", ge=2, le=10000),
 ):
-    await _ensure_ven(session, ven_id)
-    telemetries = await crud.telemetry_for_ven(session, ven_id, start=start, end=end)
-    filtered = []
-    for telem in telemetries:
-        loads = [load for load in telem.loads if load.load_id == load_id]
-        if loads:
-            filtered.append(
-                SimpleNamespace(
-                    timestamp=telem.timestamp,
-                    used_power_kw=sum(load.current_power_kw or 0.0 for load in loads),
-                    shed_power_kw=sum(load.shed_capability_kw or 0.0 for load in loads),
-                    requested_reduction_kw=telem.requested_reduction_kw,
-                    event_id=telem.event_id,
-                )
-            )
-    return build_history_response(filtered, granularity)
+    await _ensure_ven_exists(session, registry, ven_id)
+    buckets = await crud.load_history(
+        session, ven_id, load_id, history_bucket_seconds(granularity), start=start, end=end, archive=archive
+    )
+    content = {"points": history_points([], granularity, rollups=buckets, max_points=max_points)}
+    return json_response(content) if fast else content
+
+
+@router.get("/{ven_id}/telemetry/{telemetry_id}/raw", response_model=RawTelemetry)
+async def get_raw_telemetry(
+    ven_id: str,
+    telemetry_id: int,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Debug view of a telemetry message as it was received.
+
+    Only messages kept by the raw payload policy (``RAW_PAYLOAD_POLICY``)
+    are available; they are decompressed on request.
+    """
+    found = await crud.get_raw_telemetry(session, ven_id, telemetry_id)
+    if found is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Telemetry not found")
+    telemetry, raw = found
+    payload = decode_raw(raw.codec, raw.payload) if raw is not None else telemetry.raw_payload
+    if payload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Raw payload not stored")
+    return RawTelemetry(
+        telemetryId=telemetry.id,
+        venId=telemetry.ven_id,
+        timestamp=telemetry.timestamp,
+        payload=payload,
+    )
+
+
+def _ack_row(ack) -> dict:
+    """The plain fields of a :class:`VenEventAck`; numbers stored as JSON get the model's types."""
+    circuits = None
+    if ack.circuits_curtailed:
+        circuits = [
+            {
+                "id": c["id"],
+                "name": c["name"],
+                "breaker_amps": int(c["breaker_amps"]),
+                "original_kw": float(c["original_kw"]),
+                "curtailed_kw": float(c["curtailed_kw"]),
+                "final_kw": float(c["final_kw"]),
+                "critical": c["critical"],
+            }
+            for c in ack.circuits_curtailed
+        ]
+    return {
+        "id": ack.id,
+        "venId": ack.ven_id,
+        "eventId": ack.event_id,
+        "correlationId": ack.correlation_id,
+        "op": ack.op,
+        "status": ack.status,
+        "timestamp": ack.timestamp,
+        "requestedShedKw": ack.requested_shed_kw,
+        "actualShedKw": ack.actual_shed_kw,
+        "circuitsCurtailed": circuits,
+    }
+
+
+@coalesce
+async def _ack_listing(
+    session: AsyncSession,
+    registry: VenRegistry,
+    ven_id: str,
+    start: datetime | None,
+    end: datetime | None,
+    limit: int,
+    cursor: str | None,
+) -> tuple[list[dict], str | None]:
+    await _ensure_ven_exists(session, registry, ven_id)
+    before = decode_cursor(cursor, datetime, int) if cursor is not None else None
+    acks = await crud.get_ven_acks(session, ven_id, start=start, end=end, limit=limit + 1, before=before)
+    acks, next_cursor = page(acks, limit, lambda ack: (ack.timestamp, ack.id))
+    return [_ack_row(ack) for ack in acks], next_cursor
 
 
 @router.get("/{ven_id}/events", response_model=list[VenEventAck])
 async def get_ven_events(
     ven_id: str,
+    response: Response,
     session: AsyncSession = Depends(get_session),
+    registry: VenRegistry = Depends(get_ven_registry),
+    fast: bool = Depends(get_fast_json),
     start: datetime | None = Query(default=None, description="Start time filter (ISO format)"),
     end: datetime | None = Query(default=None, description="End time filter (ISO format)"),
-    limit: int = Query(default=100, description="Maximum number of events to return"),
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of events to return"),
+    cursor: str | None = Query(default=None, description="nextCursor of the previous page"),
 ):
     """
     Get DR event acknowledgments for a VEN.
     
     Returns the history of DR events that this VEN has responded to,
-    including detailed circuit curtailment information.
+    including detailed circuit curtailment information, newest first.
+    When more acknowledgments remain, the ``X-Next-Cursor`` header holds
+    the cursor of the next page.
     """
-    await _ensure_ven(session, ven_id)
-    acks = await crud.get_ven_acks(session, ven_id, start=start, end=end, limit=limit)
-    
-    # Convert to response models
-    result = []
-    for ack in acks:
-        circuits = None
-        if ack.circuits_curtailed:
-            circuits = [
-                CircuitCurtailment(
-                    id=c["id"],
-                    name=c["name"],
-                    breaker_amps=c["breaker_amps"],
-                    original_kw=c["original_kw"],
-                    curtailed_kw=c["curtailed_kw"],
-                    final_kw=c["final_kw"],
-                    critical=c["critical"],
-                )
-                for c in ack.circuits_curtailed
-            ]
-        
-        result.append(
-            VenEventAck(
-                id=ack.id,
-                venId=ack.ven_id,
-                eventId=ack.event_id,
-                correlationId=ack.correlation_id,
-                op=ack.op,
-                status=ack.status,
-                timestamp=ack.timestamp,
-                requestedShedKw=ack.requested_shed_kw,
-                actualShedKw=ack.actual_shed_kw,
-                circuitsCurtailed=circuits,
-            )
-        )
-    
-    return result
+    result, next_cursor = await _ack_listing(session, registry, ven_id, start, end, limit, cursor)
+    return with_next_cursor(json_response(result) if fast else result, response, next_cursor)
 
 
 @router.get("/{ven_id}/circuits/history", response_model=CircuitHistoryResponse)
+@coalesce
 async def get_circuit_history(
     ven_id: str,
     session: AsyncSession = Depends(get_session),
+    registry: VenRegistry = Depends(get_ven_registry),
+    archive: TelemetryArchive | None = Depends(get_telemetry_archive),
+    fast: bool = Depends(get_fast_json),
     load_id: str | None = Query(default=None, description="Filter by specific circuit/load ID"),
     start: datetime | None = Query(default=None, description="Start time filter (ISO format)"),
     end: datetime | None = Query(default=None, description="End time filter (ISO format)"),
-    limit: int = Query(default=1000, le=5000, description="Maximum number of snapshots to return"),
+    limit: int = Query(default=1000, ge=1, le=5000, description="Maximum number of snapshots to return"),
+    cursor: str | None = Query(default=None, description="nextCursor of the previous page"),
+    max_points: int | None = Query(
+        default=None,
+        alias="maxPoints",
+        ge=2,
+        le=10000,
+        description="Downsample each circuit to at most this many snapshots",
+    ),
 ):
     """
     Get historical circuit power usage data for a VEN.
@@ -288,30 +521,41 @@ async def get_circuit_history(
     Example:
     - Last 5 minutes of all circuits: `?start=2025-10-23T12:00:00Z`
     - Last hour of specific circuit: `?load_id=circuit_3&start=2025-10-23T11:00:00Z`
+    - A day of one circuit for a chart: `?load_id=circuit_3&start=2025-10-22T12:00:00Z&limit=5000&maxPoints=300`
+
+    ``limit`` caps the snapshots read, oldest first; when more remain,
+    ``nextCursor`` continues after them. ``maxPoints`` then downsamples
+    each circuit (LTTB on its power, keeping shed/restore edges).
     """
-    await _ensure_ven(session, ven_id)
+    await _ensure_ven_exists(session, registry, ven_id)
+    after = decode_cursor(cursor, datetime, int) if cursor is not None else None
     snapshots = await crud.get_load_snapshots(
-        session, ven_id, load_id=load_id, start=start, end=end, limit=limit
+        session, ven_id, load_id=load_id, start=start, end=end, limit=limit + 1, archive=archive, after=after
     )
+    snapshots, next_cursor = page(snapshots, limit, lambda row: (row[1], row[0].id))
     
     result = [
-        CircuitSnapshot(
-            timestamp=timestamp,
-            loadId=snap.load_id,
-            name=snap.name,
-            type=snap.type,
-            capacityKw=snap.capacity_kw,
-            currentPowerKw=snap.current_power_kw,
-            shedCapabilityKw=snap.shed_capability_kw,
-            enabled=snap.enabled,
-            priority=snap.priority,
-        )
+        {
+            "timestamp": timestamp,
+            "loadId": snap.load_id,
+            "name": snap.name,
+            "type": snap.type,
+            "capacityKw": snap.capacity_kw,
+            "currentPowerKw": snap.current_power_kw,
+            "shedCapabilityKw": snap.shed_capability_kw,
+            "enabled": snap.enabled,
+            "priority": snap.priority,
+        }
         for snap, timestamp in snapshots
     ]
-    
-    return CircuitHistoryResponse(
-        venId=ven_id,
-        loadId=load_id,
-        snapshots=result,
-        totalCount=len(result),
-    )
+    if max_points is not None:
+        result = downsample_circuits(result, max_points)
+
+    content = {
+        "venId": ven_id,
+        "loadId": load_id,
+        "snapshots": result,
+        "totalCount": len(result),
+        "nextCursor": next_cursor,
+    }
+    return json_response(content) if fast else content
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
@@ -187,3 +187,12 @@ class CircuitHistoryResponse(BaseModel):
     loadId: Optional[str] = None  # If querying single circuit
     snapshots: list[CircuitSnapshot]
     totalCount: int
+    nextCursor: Optional[str] = None  # Cursor of the next page, if there is one
+
+
+class RawTelemetry(BaseModel):
+    """A telemetry message as received from the VEN, for debugging."""
+    telemetryId: int
+    venId: str
+    timestamp: datetime
+    payload: dict[str, Any]
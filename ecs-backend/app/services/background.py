@@ -0,0 +1,84 @@
+"""
+Background services
+
+Groups the long-running services (MQTT ingest, event command dispatch, the
+VEN heartbeat monitor, telemetry archiving, partition maintenance and the
+fleet rollup fold) so they can run inside the API process or on their own
+via ``python -m app.worker``.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from app.core.config import Settings
+from app.services.event_command_service import EventCommandService
+from app.services.fleet_cache import FleetCache
+from app.services.fleet_rollups import FleetRollups
+from app.services.hot_window import HotWindow
+from app.services.mqtt_consumer import MQTTConsumer, SessionFactory
+from app.services.partition_maintenance import PartitionMaintenance
+from app.services.telemetry_archive import TelemetryArchiver
+from app.services.ven_heartbeat_monitor import VenHeartbeatMonitor
+from app.services.ven_registry import VenRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundServices:
+    """Starts and stops the background services in dependency order."""
+
+    def __init__(
+        self,
+        config: Settings,
+        session_factory: SessionFactory,
+        registry: VenRegistry | None = None,
+        hot_window: HotWindow | None = None,
+        fleet_cache: FleetCache | None = None,
+    ) -> None:
+        self.mqtt_consumer = MQTTConsumer(
+            config=config,
+            session_factory=session_factory,
+            registry=registry,
+            hot_window=hot_window,
+            fleet_cache=fleet_cache,
+        )
+        self.event_command_service = EventCommandService(config=config, session_factory=session_factory)
+        self.ven_heartbeat_monitor = VenHeartbeatMonitor(session_factory=session_factory, config=config)
+        self.telemetry_archiver = TelemetryArchiver(session_factory=session_factory, config=config)
+        self.partition_maintenance = PartitionMaintenance(session_factory=session_factory, config=config)
+        self.fleet_rollups = FleetRollups(session_factory=session_factory, config=config)
+        # (name, service) in start order, for those running.
+        self._started: list[tuple[str, Any]] = []
+
+    def _ordered(self) -> list[tuple[str, Any]]:
+        """The services in start order; they are stopped in reverse."""
+        return [
+            ("telemetry archiver", self.telemetry_archiver),
+            ("partition maintenance", self.partition_maintenance),
+            ("fleet rollups", self.fleet_rollups),
+            ("MQTT consumer", self.mqtt_consumer),
+            ("event command service", self.event_command_service),
+            ("VEN heartbeat monitor", self.ven_heartbeat_monitor),
+        ]
+
+    async def start(self) -> None:
+        """Start the services in order; if one fails, stop those already started."""
+        try:
+            for name, service in self._ordered():
+                logger.info("Starting %s...", name)
+                await service.start()
+                self._started.append((name, service))
+                logger.info("Started %s", name)
+        except BaseException:
+            logger.exception("Background services failed to start; stopping those already started")
+            await self.stop()
+            raise
+
+    async def stop(self) -> None:
+        """Stop the started services; the MQTT consumer drains in-flight batches after its dependents."""
+        while self._started:
+            name, service = self._started.pop()
+            logger.info("Stopping %s...", name)
+            await service.stop()
+            logger.info("Stopped %s", name)
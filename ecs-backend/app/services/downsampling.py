@@ -0,0 +1,96 @@
+"""
+Shape-preserving downsampling for chart series
+
+:func:`downsample` picks at most ``max_points`` samples of a series with
+Largest-Triangle-Three-Buckets (LTTB): the series is cut into equal buckets
+and from each the sample spanning the largest triangle with the previously
+picked sample and the next bucket's mean is kept. Unlike averaging, this
+keeps peaks and dips.
+
+Samples can carry a key (e.g. the DR event id); each run of equal keys is
+downsampled on its own with its first and last sample always kept, so
+event edges stay where they are. Requires ``numpy``.
+"""
+from __future__ import annotations
+
+from collections.abc import Hashable, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def _lttb(x, y, threshold: int):
+    """Indices of the ``threshold`` samples LTTB keeps of ``x``/``y``."""
+
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold <= 2:
+        return np.array([0, n - 1][:threshold])
+
+    # threshold - 2 buckets between the fixed first and last samples.
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x[: n - 1], edges[:-1]) / sizes
+    mean_y = np.add.reduceat(y[: n - 1], edges[:-1]) / sizes
+    # The last bucket looks ahead to the last sample.
+    mean_x = np.append(mean_x[1:], x[n - 1])
+    mean_y = np.append(mean_y[1:], y[n - 1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for bucket in range(threshold - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        area = np.abs(
+            (x[a] - mean_x[bucket]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[bucket] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return selected
+
+
+def downsample(
+    x: Sequence[float],
+    y: Sequence[float | None],
+    max_points: int,
+    keys: Sequence[Hashable] | None = None,
+) -> list[int]:
+    """
+    Indices, in order, of at most ``max_points`` samples of the series
+    ``x`` (ascending) / ``y`` to keep; missing ``y`` values count as 0.
+
+    With ``keys``, the first and last sample of every run of equal keys is
+    kept and the remaining points are shared between runs by length. When
+    there are too many runs for that, the keys are ignored.
+    """
+
+    if not HAS_NUMPY:
+        raise RuntimeError("Downsampling requires numpy")
+    n = len(x)
+    if n <= max_points:
+        return list(range(n))
+    xs = np.asarray(x, dtype=np.float64)
+    ys = np.nan_to_num(np.asarray(y, dtype=np.float64))
+
+    starts = np.array([0])
+    if keys is not None:
+        values = np.asarray(keys, dtype=object)
+        starts = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1))
+        if 2 * len(starts) > max_points:
+            starts = np.array([0])
+    lengths = np.diff(np.append(starts, n))
+
+    # Two points per run, the rest in proportion to the run's length.
+    budgets = np.minimum(lengths, 2)
+    budgets = np.minimum(lengths, budgets + (max_points - budgets.sum()) * lengths // n)
+
+    selected = [
+        start + _lttb(xs[start:start + length], ys[start:start + length], int(budget))
+        for start, length, budget in zip(starts.tolist(), lengths.tolist(), budgets.tolist())
+    ]
+    return np.concatenate(selected).tolist()
@@ -0,0 +1,181 @@
+"""
+Fleet view cache
+
+Dashboards poll the fleet-wide views (``/api/vens``, ``/api/vens/summary``,
+``/api/stats/network``, ``/api/stats/loads``) every few seconds, and each
+poll lists every VEN with its latest status and telemetry. The views are
+cached in process for a per-view TTL, so any number of dashboards cost one
+database refresh per TTL:
+
+* A fresh view is served from memory.
+* For ``FLEET_CACHE_STALE_S`` after its TTL the stale view is still served
+  while a single background refresh replaces it.
+* Older or invalidated views are reloaded, with concurrent requests
+  awaiting the same load.
+
+Loads run in a session of their own, since a refresh outlives the request
+that triggered it. VEN mutations and the ingest path (when it registers new
+VENs) invalidate the views; a load that was in flight during an
+invalidation is returned to its waiters but not cached. Telemetry updates
+are picked up within the TTL.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings, settings
+from app.services.mqtt_consumer import SessionFactory
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[AsyncSession], Awaitable[Any]]
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any = None
+    # time.monotonic() of the load the value came from; None if there is none.
+    loaded_at: float | None = None
+    generation: int = 0
+    task: asyncio.Task[Any] | None = None
+
+
+@dataclass(slots=True)
+class _KeyStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    errors: int = 0
+    refresh_seconds: float = 0.0
+    max_refresh_seconds: float = 0.0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "avg_refresh_ms": round(1000 * self.refresh_seconds / self.refreshes, 3) if self.refreshes else None,
+            "max_refresh_ms": round(1000 * self.max_refresh_seconds, 3),
+            "invalidations": self.invalidations,
+        }
+
+
+class FleetCache:
+    """Per-key TTL cache of fleet views with stale-while-revalidate refresh."""
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        ttl_s: float,
+        stale_s: float = 0.0,
+        ttls: Mapping[str, float] | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._ttl_s = ttl_s
+        self._stale_s = stale_s
+        self._ttls = dict(ttls or {})
+        self._entries: dict[str, _Entry] = {}
+        self._stats: dict[str, _KeyStats] = {}
+
+    def ttl(self, key: str) -> float:
+        return self._ttls.get(key, self._ttl_s)
+
+    async def get(self, key: str, loader: Loader) -> Any:
+        """The view ``key``, loaded with ``loader(session)`` when needed."""
+
+        stats = self._stats.setdefault(key, _KeyStats())
+        entry = self._entries.setdefault(key, _Entry())
+        ttl = self.ttl(key)
+        if entry.loaded_at is not None:
+            age = time.monotonic() - entry.loaded_at
+            if age < ttl:
+                stats.hits += 1
+                return entry.value
+            if age < ttl + self._stale_s:
+                stats.stale_hits += 1
+                if entry.task is None:
+                    self._refresh(key, entry, loader)
+                return entry.value
+        stats.misses += 1
+        task = entry.task or self._refresh(key, entry, loader)
+        # Waiters may be cancelled (client disconnects); the load goes on for the others.
+        return await asyncio.shield(task)
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop the given views, or all of them; later reads reload."""
+
+        for key in keys or list(self._entries):
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            entry.generation += 1
+            entry.value = entry.loaded_at = entry.task = None
+            self._stats.setdefault(key, _KeyStats()).invalidations += 1
+
+    def _refresh(self, key: str, entry: _Entry, loader: Loader) -> asyncio.Task[Any]:
+        task = asyncio.create_task(self._load(key, entry, loader))
+        task.add_done_callback(lambda done: self._loaded(key, done))
+        entry.task = task
+        return task
+
+    async def _load(self, key: str, entry: _Entry, loader: Loader) -> Any:
+        generation = entry.generation
+        started = time.monotonic()
+        gen = self._session_factory()
+        session = await anext(gen)
+        try:
+            value = await loader(session)
+        finally:
+            await gen.aclose()
+            if entry.task is asyncio.current_task():
+                entry.task = None
+        elapsed = time.monotonic() - started
+        stats = self._stats[key]
+        stats.refreshes += 1
+        stats.refresh_seconds += elapsed
+        stats.max_refresh_seconds = max(stats.max_refresh_seconds, elapsed)
+        if entry.generation == generation:
+            entry.value, entry.loaded_at = value, started
+        return value
+
+    def _loaded(self, key: str, task: asyncio.Task[Any]) -> None:
+        if task.cancelled() or task.exception() is None:
+            return
+        self._stats[key].errors += 1
+        logger.warning("Fleet view refresh failed", exc_info=task.exception(), extra={"key": key})
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ttl_s": self._ttl_s,
+            "stale_s": self._stale_s,
+            "views": {key: {"ttl_s": self.ttl(key), **stats.as_dict()} for key, stats in self._stats.items()},
+        }
+
+
+def open_fleet_cache(config: Settings) -> FleetCache | None:
+    """The fleet view cache configured by ``config``, or None if disabled."""
+
+    if not config.fleet_cache_ttl_s:
+        return None
+    from app.db.database import get_session
+
+    return FleetCache(
+        get_session,
+        ttl_s=config.fleet_cache_ttl_s,
+        stale_s=config.fleet_cache_stale_s,
+        ttls=config.fleet_cache_ttls,
+    )
+
+
+fleet_cache = open_fleet_cache(settings)
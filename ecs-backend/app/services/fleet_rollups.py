@@ -0,0 +1,90 @@
+"""
+Fleet telemetry rollups
+
+Ingest only maintains the per-VEN rollups (see
+:mod:`app.services.telemetry_rollups`). This service periodically folds
+their closed buckets into ``fleet_telemetry_rollups``, one transaction
+every ``fleet_rollup_interval_s``, so the fleet rows are written by a
+single job instead of by every shard writer's ingest transaction.
+
+Each run recomputes the closed buckets of the last
+``fleet_rollup_lookback_s``: samples arriving later than that after their
+bucket closed only reach the per-VEN rollups. Fleet history reads the
+fleet rows up to :func:`app.services.telemetry_rollups.fleet_horizon` and
+sums the per-VEN rollups after it, so open buckets, and closed ones while
+the job is behind, are as current as the per-VEN rollups.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from app.core.config import Settings, settings
+from app.services.mqtt_consumer import SessionFactory
+from app.services.telemetry_rollups import fold_fleet_rollups
+
+logger = logging.getLogger(__name__)
+
+
+class FleetRollups:
+    """Folds closed per-VEN rollup buckets into the fleet rollups."""
+
+    def __init__(self, session_factory: SessionFactory, config: Settings | None = None) -> None:
+        self._session_factory = session_factory
+        self._config = config or settings
+        self._task: asyncio.Task | None = None
+        self.folded_buckets = 0
+        self.last_run: datetime | None = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            logger.warning("Fleet rollups already started")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "folded_buckets": self.folded_buckets,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+    async def run_once(self, now: datetime | None = None) -> None:
+        """Fold the closed buckets of the lookback into the fleet rollups."""
+
+        now = now or datetime.now(UTC)
+        gen = self._session_factory()
+        session = await anext(gen)
+        try:
+            folded = await fold_fleet_rollups(
+                session, timedelta(seconds=self._config.fleet_rollup_lookback_s), now
+            )
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await gen.aclose()
+        self.folded_buckets += folded
+        self.last_run = now
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Fleet rollup fold failed")
+            await asyncio.sleep(self._config.fleet_rollup_interval_s)
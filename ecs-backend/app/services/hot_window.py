@@ -0,0 +1,441 @@
+"""
+Hot telemetry window
+
+When ``HOT_WINDOW_HOURS`` is set, the API process keeps the last hours of
+every VEN's used power, shed power and requested reduction in memory and
+answers history queries that fall inside that window without touching the
+database.
+
+Each VEN's samples live in preallocated :mod:`array` buffers (timestamps as
+float64 epoch seconds, measures as float32 with NaN for missing values,
+events as interned int32 codes), kept sorted by timestamp. A VEN holds at
+most ``HOT_WINDOW_MAX_SAMPLES_PER_VEN`` samples; when full, the oldest
+quarter is shifted out, so memory is bounded by
+``HOT_WINDOW_MAX_VENS * HOT_WINDOW_MAX_SAMPLES_PER_VEN`` samples and the
+buffers stay contiguous for the vectorized (NumPy) bucketing. Samples older
+than the window are evicted as new ones arrive.
+
+On start the window is backfilled with one query over the last hours. It
+is then fed by the MQTT consumer when ingest runs in this process and sees
+every message, otherwise by polling the database for recent telemetry
+(:class:`HotWindowFeed`). A query is only answered from the window if it
+holds every sample in the requested range: ranges reaching before the
+backfill, before a VEN's evicted samples, or over the fleet when VENs were
+turned away at the ``HOT_WINDOW_MAX_VENS`` limit fall back to the database.
+When fed by polling, the newest ``HOT_WINDOW_TAIL_INTERVAL_S`` may be
+missing, and samples arriving more than ``HOT_WINDOW_TAIL_LAG_S`` late are
+not picked up. Requires ``numpy``.
+"""
+from __future__ import annotations
+
+import array
+import asyncio
+import bisect
+import logging
+import math
+import time
+from collections.abc import Iterable, Mapping
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+from sqlalchemy import select
+
+from app.core.config import Settings, settings
+from app.models.telemetry import VenTelemetry
+from app.services.mqtt_consumer import SessionFactory
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+HAS_NUMPY = np is not None
+
+logger = logging.getLogger(__name__)
+
+MEASURES = ("used_power", "shed_power", "requested_reduction")
+_COLUMNS = ("used_power_kw", "shed_power_kw", "requested_reduction_kw")
+# float64 timestamp, three float32 measures and an int32 event code.
+SAMPLE_BYTES = 8 + 4 * len(MEASURES) + 4
+_NO_EVENT = -1
+
+
+def _epoch(ts: datetime) -> float:
+    """Epoch seconds of ``ts``; naive datetimes (SQLite) are UTC."""
+
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=UTC)
+    return ts.timestamp()
+
+
+class _Series:
+    """One VEN's samples in timestamp order, in preallocated buffers."""
+
+    __slots__ = ("timestamps", "values", "events", "size", "evicted_until")
+
+    def __init__(self, capacity: int) -> None:
+        self.timestamps = array.array("d", bytes(8 * capacity))
+        self.values = [array.array("f", bytes(4 * capacity)) for _ in MEASURES]
+        self.events = array.array("i", bytes(4 * capacity))
+        self.size = 0
+        # Epoch seconds of the newest evicted sample; the series is complete after it.
+        self.evicted_until = -math.inf
+
+    def _buffers(self) -> list[array.array]:
+        return [self.timestamps, *self.values, self.events]
+
+    def add(self, ts: float, values: tuple[float, ...], event: int) -> bool:
+        """Insert a sample, returning False if it is evicted or already held."""
+
+        if ts <= self.evicted_until:
+            return False
+        size = self.size
+        pos = size
+        if size and ts <= self.timestamps[size - 1]:
+            pos = bisect.bisect_left(self.timestamps, ts, 0, size)
+            if self.timestamps[pos] == ts:
+                return False
+        capacity = len(self.timestamps)
+        if size == capacity:
+            count = max(1, capacity // 4)
+            self.evict(count)
+            pos -= count
+            if pos < 0:
+                # Older than everything kept: it went out with the evicted block.
+                self.evicted_until = max(self.evicted_until, ts)
+                return False
+            size = self.size
+        if pos < size:
+            for buffer in self._buffers():
+                buffer[pos + 1:size + 1] = buffer[pos:size]
+        self.timestamps[pos] = ts
+        for buffer, value in zip(self.values, values):
+            buffer[pos] = value
+        self.events[pos] = event
+        self.size = size + 1
+        return True
+
+    def evict(self, count: int) -> None:
+        """Drop the oldest ``count`` samples."""
+
+        size = self.size
+        count = min(count, size)
+        if not count:
+            return
+        self.evicted_until = max(self.evicted_until, self.timestamps[count - 1])
+        for buffer in self._buffers():
+            buffer[0:size - count] = buffer[count:size]
+        self.size = size - count
+
+    def expire(self, cutoff: float) -> None:
+        """Drop samples older than ``cutoff``."""
+
+        if self.size and self.timestamps[0] < cutoff:
+            self.evict(bisect.bisect_left(self.timestamps, cutoff, 0, self.size))
+
+    def view(self, start: float, end: float) -> tuple[Any, list[Any], Any] | None:
+        """Copies of the samples in ``[start, end]``, or None if there are none."""
+
+        if not self.size:
+            return None
+        timestamps = np.frombuffer(self.timestamps, dtype=np.float64, count=self.size)
+        lo = int(np.searchsorted(timestamps, start, "left"))
+        hi = int(np.searchsorted(timestamps, end, "right"))
+        if lo >= hi:
+            return None
+        values = [
+            np.frombuffer(buffer, dtype=np.float32, count=self.size)[lo:hi].astype(np.float64)
+            for buffer in self.values
+        ]
+        events = np.frombuffer(self.events, dtype=np.int32, count=self.size)[lo:hi].copy()
+        return timestamps[lo:hi].copy(), values, events
+
+
+class HotWindow:
+    """The last ``hours`` of per-VEN telemetry series, in memory."""
+
+    def __init__(self, hours: float, samples_per_ven: int, max_vens: int) -> None:
+        if not HAS_NUMPY:
+            raise RuntimeError("The hot telemetry window requires numpy")
+        self.span = timedelta(hours=hours)
+        self.samples_per_ven = samples_per_ven
+        self.max_vens = max_vens
+        self._series: dict[str, _Series] = {}
+        self._event_codes: dict[str, int] = {}
+        self._event_ids: list[str] = []
+        # Epoch seconds from which the window holds every sample; None until backfilled.
+        self._covered_from: float | None = None
+        self.rejected_vens = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._covered_from is not None
+
+    def reset(self, since: datetime) -> None:
+        """Forget every sample; the window covers ``since`` onwards again."""
+
+        self._series.clear()
+        self._event_codes.clear()
+        self._event_ids.clear()
+        self.rejected_vens = 0
+        self._covered_from = _epoch(since)
+
+    def forget(self, ven_id: str) -> None:
+        """Drop a deleted VEN's samples."""
+
+        self._series.pop(ven_id, None)
+
+    def _event_code(self, event_id: str | None) -> int:
+        if not event_id:
+            return _NO_EVENT
+        code = self._event_codes.get(event_id)
+        if code is None:
+            code = self._event_codes[event_id] = len(self._event_ids)
+            self._event_ids.append(event_id)
+        return code
+
+    def add(self, rows: Iterable[Mapping[str, Any]], now: float | None = None) -> int:
+        """Add telemetry rows (``ven_telemetry`` columns), returning how many were new."""
+
+        cutoff = (time.time() if now is None else now) - self.span.total_seconds()
+        added = 0
+        touched: set[str] = set()
+        for row in rows:
+            ts = _epoch(row["timestamp"])
+            if ts < cutoff:
+                continue
+            ven_id = row["ven_id"]
+            series = self._series.get(ven_id)
+            if series is None:
+                if len(self._series) >= self.max_vens:
+                    self.rejected_vens += 1
+                    continue
+                series = self._series[ven_id] = _Series(self.samples_per_ven)
+            values = tuple(math.nan if row[column] is None else row[column] for column in _COLUMNS)
+            added += series.add(ts, values, self._event_code(row["event_id"]))
+            touched.add(ven_id)
+        for ven_id in touched:
+            self._series[ven_id].expire(cutoff)
+        return added
+
+    def _covers(self, series: Iterable[_Series], start: float, now: float) -> bool:
+        if self._covered_from is None:
+            return False
+        if start < max(self._covered_from, now - self.span.total_seconds()):
+            return False
+        return all(start > item.evicted_until for item in series)
+
+    def history(
+        self,
+        ven_id: str | None,
+        bucket_seconds: int,
+        start: datetime | None,
+        end: datetime | None = None,
+        now: float | None = None,
+    ) -> list[SimpleNamespace] | None:
+        """
+        History buckets for one VEN or (``ven_id=None``) the fleet, shaped
+        like the rows of :func:`app.crud.telemetry_history`.
+
+        Returns None when the window does not hold the whole range; the
+        caller then queries the database.
+        """
+
+        now = time.time() if now is None else now
+        if ven_id is None:
+            series = list(self._series.values())
+            complete = not self.rejected_vens
+        else:
+            series = [self._series[ven_id]] if ven_id in self._series else []
+            complete = bool(series) or len(self._series) < self.max_vens
+        if start is None or not complete or not self._covers(series, _epoch(start), now):
+            self.misses += 1
+            return None
+        self.hits += 1
+        upper = math.inf if end is None else _epoch(end)
+        parts = [part for part in (item.view(_epoch(start), upper) for item in series) if part is not None]
+        if not parts:
+            return []
+        return self._bucket(parts, bucket_seconds)
+
+    def _bucket(self, parts: list[tuple[Any, list[Any], Any]], bucket_seconds: int) -> list[SimpleNamespace]:
+        timestamps = np.concatenate([part[0] for part in parts])
+        keys = np.floor_divide(timestamps, bucket_seconds).astype(np.int64)
+        buckets, inverse = np.unique(keys, return_inverse=True)
+        size = len(buckets)
+        columns: dict[str, list[Any]] = {"sample_count": np.bincount(inverse, minlength=size).tolist()}
+        for index, measure in enumerate(MEASURES):
+            values = np.concatenate([part[1][index] for part in parts])
+            present = ~np.isnan(values)
+            sums = np.bincount(inverse, weights=np.where(present, values, 0.0), minlength=size)
+            counts = np.bincount(inverse[present], minlength=size)
+            columns[f"{measure}_sum"] = sums.tolist()
+            columns[f"{measure}_count"] = counts.tolist()
+
+        # Per bucket, the event of its latest flagged sample (the greatest
+        # event id among samples sharing that timestamp, as in SQL).
+        events = np.concatenate([part[2] for part in parts])
+        latest = np.full(size, _NO_EVENT, dtype=np.int64)
+        flagged = np.flatnonzero(events != _NO_EVENT)
+        if flagged.size:
+            ranks = np.empty(len(self._event_ids), dtype=np.int64)
+            ranks[np.argsort(np.array(self._event_ids, dtype=object))] = np.arange(len(self._event_ids))
+            keys = (ranks[events[flagged]], timestamps[flagged], inverse[flagged])
+            order = flagged[np.lexsort(keys)]
+            groups = inverse[order]
+            last = np.append(groups[1:] != groups[:-1], True)
+            latest[groups[last]] = events[order][last]
+
+        rows = []
+        for position, (bucket, event) in enumerate(zip(buckets.tolist(), latest.tolist())):
+            values = {name: column[position] for name, column in columns.items()}
+            rows.append(
+                SimpleNamespace(
+                    bucket_start=datetime.fromtimestamp(bucket * bucket_seconds, tz=UTC),
+                    event_id=None if event == _NO_EVENT else self._event_ids[event],
+                    **values,
+                )
+            )
+        return rows
+
+    def stats(self) -> dict[str, Any]:
+        samples = sum(series.size for series in self._series.values())
+        return {
+            "ready": self.ready,
+            "hours": self.span.total_seconds() / 3600,
+            "vens": len(self._series),
+            "samples": samples,
+            "bytes": len(self._series) * self.samples_per_ven * SAMPLE_BYTES,
+            "max_bytes": self.max_vens * self.samples_per_ven * SAMPLE_BYTES,
+            "rejected_vens": self.rejected_vens,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def open_hot_window(config: Settings) -> HotWindow | None:
+    """The hot window configured by ``config``, or None if disabled."""
+
+    if not config.hot_window_hours:
+        return None
+    return HotWindow(config.hot_window_hours, config.hot_window_max_samples_per_ven, config.hot_window_max_vens)
+
+
+hot_window = open_hot_window(settings)
+
+
+def fed_by_ingest(config: Settings) -> bool:
+    """Whether this process's MQTT consumer sees every telemetry message."""
+
+    return config.background_services_enabled and not config.mqtt_shared_group
+
+
+_LOAD_CHUNK_ROWS = 10_000
+
+_WINDOW_COLUMNS = (
+    VenTelemetry.ven_id,
+    VenTelemetry.timestamp,
+    VenTelemetry.used_power_kw,
+    VenTelemetry.shed_power_kw,
+    VenTelemetry.requested_reduction_kw,
+    VenTelemetry.event_id,
+)
+
+
+class HotWindowFeed:
+    """Backfills the hot window and, unless ingest feeds it, tails the database."""
+
+    def __init__(
+        self,
+        window: HotWindow,
+        session_factory: SessionFactory,
+        config: Settings | None = None,
+        tail: bool | None = None,
+    ) -> None:
+        self._window = window
+        self._session_factory = session_factory
+        self._config = config or settings
+        self._tail = not fed_by_ingest(self._config) if tail is None else tail
+        self._task: asyncio.Task | None = None
+        self._last_poll: datetime | None = None
+        self._backfilled = 0
+        self._polled = 0
+
+    async def start(self) -> None:
+        await self.backfill()
+        if self._tail and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "tail": self._tail,
+            "backfilled_samples": self._backfilled,
+            "polled_samples": self._polled,
+            "last_poll": self._last_poll.isoformat() if self._last_poll else None,
+        }
+
+    async def _load(self, since: datetime, now: datetime) -> int:
+        stmt = select(*_WINDOW_COLUMNS).where(VenTelemetry.timestamp >= since).order_by(
+            VenTelemetry.ven_id, VenTelemetry.timestamp
+        )
+        added = 0
+        gen = self._session_factory()
+        session = await anext(gen)
+        try:
+            result = await session.stream(stmt)
+            async for chunk in result.mappings().partitions(_LOAD_CHUNK_ROWS):
+                added += self._window.add(chunk, now=now.timestamp())
+        finally:
+            await gen.aclose()
+        return added
+
+    async def backfill(self, now: datetime | None = None) -> int:
+        """Reload the window with one query over its whole span, returning the samples loaded."""
+
+        now = now or datetime.now(UTC)
+        since = now - self._window.span
+        # Samples ingested while the query runs are already in the window.
+        self._window.reset(since)
+        self._last_poll = now
+        self._backfilled = await self._load(since, now)
+        logger.info(
+            "Backfilled hot telemetry window",
+            extra={"samples": self._backfilled, "vens": self._window.stats()["vens"]},
+        )
+        return self._backfilled
+
+    async def run_once(self, now: datetime | None = None) -> int:
+        """Add telemetry stamped after the previous poll, less the tail lag.
+
+        Returns the number of samples new to the window.
+        """
+
+        now = now or datetime.now(UTC)
+        since = (self._last_poll or now) - timedelta(seconds=self._config.hot_window_tail_lag_s)
+        added = await self._load(since, now)
+        self._last_poll = now
+        self._polled += added
+        return added
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._config.hot_window_tail_interval_s)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Hot telemetry window poll failed")
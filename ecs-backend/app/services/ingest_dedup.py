@@ -0,0 +1,72 @@
+"""
+Recent telemetry key cache
+
+The enhanced VEN publishes every telemetry document on two topics, and QoS 1
+redeliveries or IoT rule retries repeat it again. :class:`RecentKeyCache`
+remembers the ``(ven_id, timestamp)`` keys persisted recently so those
+copies are dropped before they reach the database. The unique index on
+``ven_telemetry`` remains the backstop for anything the cache has forgotten.
+VEN ACKs are tracked in the same cache under their own keys; they have no
+database backstop.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+
+class RecentKeyCache:
+    """Per-VEN keys seen within the last ``window_s`` seconds.
+
+    Each VEN keeps at most ``max_keys_per_ven`` keys, oldest evicted first,
+    so a VEN publishing at a high rate cannot grow the cache without bound.
+    A window of zero disables the cache.
+    """
+
+    def __init__(self, window_s: float, max_keys_per_ven: int) -> None:
+        self.window_s = window_s
+        self.max_keys_per_ven = max_keys_per_ven
+        self._keys: dict[str, OrderedDict[Hashable, float]] = {}
+        self.hits = 0
+
+    def seen(self, ven_id: str, key: Hashable) -> bool:
+        """Return True, and count a hit, if ``key`` was recorded for ``ven_id`` recently."""
+        keys = self._keys.get(ven_id)
+        if keys is None:
+            return False
+        self._expire(ven_id, keys, time.monotonic())
+        if key in keys:
+            self.hits += 1
+            return True
+        return False
+
+    def record(self, ven_id: str, key: Hashable) -> None:
+        """Remember ``key`` as persisted for ``ven_id``."""
+        if self.window_s <= 0:
+            return
+        recent = self._keys.setdefault(ven_id, OrderedDict())
+        recent[key] = time.monotonic()
+        recent.move_to_end(key)
+        if len(recent) > self.max_keys_per_ven:
+            recent.popitem(last=False)
+
+    def forget(self, ven_id: str) -> None:
+        self._keys.pop(ven_id, None)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "vens": len(self._keys),
+            "keys": sum(len(keys) for keys in self._keys.values()),
+            "duplicates_dropped": self.hits,
+        }
+
+    def _expire(self, ven_id: str, keys: OrderedDict[Hashable, float], now: float) -> None:
+        cutoff = now - self.window_s
+        while keys:
+            oldest = next(iter(keys.values()))
+            if oldest >= cutoff:
+                break
+            keys.popitem(last=False)
+        if not keys:
+            del self._keys[ven_id]
@@ -0,0 +1,155 @@
+"""
+Bounded ingest queue
+
+An :class:`asyncio.Queue` with a hard size limit, a configurable overflow
+policy and counters for enqueued, dropped and completed messages. Messages
+flagged as non-droppable (VEN ACKs) are never discarded by the overflow
+policy: they displace queued telemetry, and they only wait for space when
+nothing else can be evicted.
+
+Waiting is bounded too. gmqtt runs every ``on_message`` coroutine as its own
+task, so a message that waits for space is parked in memory rather than
+slowing the socket reader. At most ``max_waiting`` offers may wait at once;
+past that, telemetry is refused, and an ACK is refused only if the queue
+holds nothing but ACKs.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from enum import Enum
+from collections.abc import Sequence
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    """What to do with a message that arrives while the queue is full."""
+
+    BLOCK = "block"
+    """Wait for space (bounded by ``max_waiting``), holding back the PUBACK for QoS >= 1."""
+
+    DROP_OLDEST = "drop_oldest"
+    """Evict the oldest droppable message to make room."""
+
+    DROP_NEWEST = "drop_newest"
+    """Discard the incoming message if it is droppable."""
+
+
+class QueuedItem(Protocol):
+    @property
+    def droppable(self) -> bool: ...
+
+
+class IngestQueue(asyncio.Queue):
+    """Bounded FIFO of ingest messages with overflow accounting."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        policy: OverflowPolicy | str = OverflowPolicy.BLOCK,
+        max_waiting: int = 100,
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("IngestQueue requires a positive maxsize")
+        super().__init__(maxsize)
+        self.policy = OverflowPolicy(policy)
+        self.max_waiting = max_waiting
+        self.enqueued = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.spooled = 0
+        self._waiting = 0
+
+    async def offer(self, item: QueuedItem) -> bool:
+        """
+        Enqueue ``item`` according to the overflow policy.
+
+        Returns ``False`` if the item itself was dropped or refused.
+        """
+        saturated = self._waiting >= self.max_waiting
+        if self.full() and (self.policy is not OverflowPolicy.BLOCK or saturated):
+            if item.droppable and self.policy is not OverflowPolicy.DROP_OLDEST:
+                self.dropped_newest += 1
+                self._log_drop("Ingest queue full, dropping incoming telemetry")
+                return False
+            # Make room by shedding queued telemetry; an ACK arriving at a
+            # full queue displaces the oldest telemetry under every policy.
+            if self._evict_oldest_droppable():
+                self.dropped_oldest += 1
+                self._log_drop("Ingest queue full, dropping oldest telemetry")
+            elif saturated:
+                self.rejected += 1
+                logger.error(
+                    "Ingest queue full of unpersisted ACKs, refusing message",
+                    extra={"droppable": item.droppable, "rejected": self.rejected},
+                )
+                return False
+
+        self._waiting += 1
+        try:
+            await self.put(item)
+        finally:
+            self._waiting -= 1
+        self.enqueued += 1
+        return True
+
+    def task_done(self) -> None:
+        super().task_done()
+        self.completed += 1
+
+    def record_failed(self, count: int) -> None:
+        """Count completed messages that could not be persisted."""
+        self.failed += count
+
+    def record_spooled(self, count: int) -> None:
+        """Count completed messages that were spooled to disk for later replay."""
+        self.spooled += count
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "depth": self.qsize(),
+            "maxsize": self.maxsize,
+            "policy": self.policy.value,
+            "waiting": self._waiting,
+            "enqueued": self.enqueued,
+            "dropped_oldest": self.dropped_oldest,
+            "dropped_newest": self.dropped_newest,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "spooled": self.spooled,
+            "persisted": self.completed - self.failed - self.spooled,
+        }
+
+    def _evict_oldest_droppable(self) -> bool:
+        for index, queued in enumerate(self._queue):
+            if queued.droppable:
+                del self._queue[index]
+                # The evicted item will never reach a worker; balance the
+                # unfinished-task counter without counting it as completed.
+                super().task_done()
+                return True
+        return False
+
+    def _log_drop(self, message: str) -> None:
+        dropped = self.dropped_oldest + self.dropped_newest
+        if dropped == 1 or dropped % 1000 == 0:
+            logger.warning(
+                message,
+                extra={"policy": self.policy.value, "dropped": dropped, "maxsize": self.maxsize},
+            )
+
+
+def combined_stats(queues: Sequence[IngestQueue]) -> dict[str, Any]:
+    """Sum the counters of several shard queues into one :meth:`IngestQueue.stats` view."""
+    shards = [queue.stats() for queue in queues]
+    combined: dict[str, Any] = {
+        key: sum(shard[key] for shard in shards) for key in shards[0] if key != "policy"
+    }
+    combined["policy"] = shards[0]["policy"]
+    return combined
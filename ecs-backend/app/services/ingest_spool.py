@@ -0,0 +1,195 @@
+"""
+On-disk ingest spool
+
+Messages that cannot be persisted because the database is unreachable are
+appended to segment files under a spool directory instead of being lost.
+Segments are append-only; once a segment is full (or replay needs it) a new
+one is started, and replay consumes closed segments oldest first, deleting
+each one after all of its messages were written to the database.
+
+Each record is a fixed header (wall-clock receive time, topic length,
+payload length) followed by the topic and the raw MQTT payload, so replay
+runs the exact bytes through the normal ingest path. A record truncated by
+a crash mid-write ends its segment.
+
+All methods do blocking file I/O; call them via :func:`asyncio.to_thread`.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<dHI")
+_SUFFIX = ".seg"
+
+
+@dataclass(slots=True)
+class SpooledMessage:
+    topic: str
+    payload: bytes
+    received_at: float
+
+
+@dataclass(slots=True)
+class _Segment:
+    path: Path
+    size: int
+    first_received_at: float | None
+
+
+class SpoolFullError(RuntimeError):
+    """Raised when appending would exceed the spool's size limit."""
+
+
+class IngestSpool:
+    """Append-only segment files holding messages awaiting replay."""
+
+    def __init__(self, directory: str | os.PathLike[str], segment_bytes: int, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.spooled = 0
+        self.rejected = 0
+        self.replayed = 0
+        self.replay_failed = 0
+        self.replay_segment: Path | None = None
+        self.replay_position = 0
+        self.replay_total = 0
+        self._lock = threading.Lock()
+        self._active: _Segment | None = None
+        self._closed: list[_Segment] = []
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.directory.glob(f"*{_SUFFIX}")):
+            self._closed.append(_Segment(path, path.stat().st_size, _first_received_at(path)))
+        self._next_seq = int(self._closed[-1].path.stem) + 1 if self._closed else 0
+        if self._closed:
+            logger.warning(
+                "Found spooled ingest messages from a previous run",
+                extra={"segments": len(self._closed), "bytes": self.size_bytes},
+            )
+
+    @property
+    def size_bytes(self) -> int:
+        active = self._active.size if self._active else 0
+        return active + sum(segment.size for segment in self._closed)
+
+    def append(self, messages: list[SpooledMessage]) -> None:
+        """Durably append ``messages`` to the active segment.
+
+        Raises :class:`SpoolFullError` without writing anything if the spool
+        would grow past ``max_bytes``.
+        """
+        records = b"".join(_encode(message) for message in messages)
+        with self._lock:
+            if self.size_bytes + len(records) > self.max_bytes:
+                self.rejected += len(messages)
+                raise SpoolFullError(f"Ingest spool is full ({self.size_bytes} bytes)")
+            if self._active is None or self._active.size >= self.segment_bytes:
+                self._rotate()
+            assert self._active is not None
+            with open(self._active.path, "ab") as handle:
+                handle.write(records)
+                handle.flush()
+                os.fsync(handle.fileno())
+            if self._active.first_received_at is None:
+                self._active.first_received_at = messages[0].received_at
+            self._active.size += len(records)
+            self.spooled += len(messages)
+
+    def oldest_segment(self) -> tuple[Path, list[SpooledMessage]] | None:
+        """Read the oldest segment, closing the active one if nothing else is left."""
+        with self._lock:
+            if not self._closed and self._active and self._active.size:
+                self._rotate()
+            if not self._closed:
+                return None
+            path = self._closed[0].path
+        return path, _read_segment(path)
+
+    def record_replay(self, path: Path, position: int, total: int, replayed: int, failed: int) -> None:
+        """Note that replay of ``path`` reached ``position`` of ``total`` messages."""
+        self.replay_segment = path
+        self.replay_position = position
+        self.replay_total = total
+        self.replayed += replayed
+        self.replay_failed += failed
+
+    def remove(self, path: Path) -> None:
+        """Delete a fully replayed segment."""
+        with self._lock:
+            self._closed = [segment for segment in self._closed if segment.path != path]
+            path.unlink(missing_ok=True)
+            if self.replay_segment == path:
+                self.replay_segment = None
+                self.replay_position = self.replay_total = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            segments = self._closed + ([self._active] if self._active and self._active.size else [])
+            oldest = next(
+                (segment.first_received_at for segment in segments if segment.first_received_at is not None),
+                None,
+            )
+            return {
+                "segments": len(segments),
+                "bytes": sum(segment.size for segment in segments),
+                "max_bytes": self.max_bytes,
+                "oldest_age_s": round(time.time() - oldest, 3) if oldest is not None else None,
+                "spooled": self.spooled,
+                "rejected": self.rejected,
+                "replayed": self.replayed,
+                "replay_failed": self.replay_failed,
+                "replay_segment": self.replay_segment.name if self.replay_segment else None,
+                "replay_position": self.replay_position,
+                "replay_total": self.replay_total,
+            }
+
+    def _rotate(self) -> None:
+        if self._active is not None and self._active.size:
+            self._closed.append(self._active)
+        path = self.directory / f"{self._next_seq:020d}{_SUFFIX}"
+        self._next_seq += 1
+        self._active = _Segment(path, 0, None)
+
+
+def _encode(message: SpooledMessage) -> bytes:
+    topic = message.topic.encode("utf-8")
+    return _HEADER.pack(message.received_at, len(topic), len(message.payload)) + topic + message.payload
+
+
+def _read_segment(path: Path) -> list[SpooledMessage]:
+    data = path.read_bytes()
+    messages: list[SpooledMessage] = []
+    offset = 0
+    while offset + _HEADER.size <= len(data):
+        received_at, topic_len, payload_len = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size
+        end = start + topic_len + payload_len
+        if end > len(data):
+            break
+        topic = data[start:start + topic_len].decode("utf-8")
+        messages.append(SpooledMessage(topic, data[start + topic_len:end], received_at))
+        offset = end
+    if offset != len(data):
+        logger.warning(
+            "Ignoring truncated record at end of spool segment",
+            extra={"segment": str(path), "offset": offset, "size": len(data)},
+        )
+    return messages
+
+
+def _first_received_at(path: Path) -> float | None:
+    with open(path, "rb") as handle:
+        header = handle.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    return _HEADER.unpack(header)[0]
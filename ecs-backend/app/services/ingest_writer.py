@@ -0,0 +1,213 @@
+"""
+Bulk persistence for batches of ingested MQTT messages.
+
+The MQTT consumer parses messages into an :class:`IngestBatch` and hands the
+whole batch to :func:`write_batch`, which persists it with a handful of
+multi-row statements inside a single transaction instead of one ORM flush
+per row. Telemetry is inserted with ``ON CONFLICT DO NOTHING`` against the
+``(ven_id, timestamp)`` unique index, so re-delivered samples are no-ops;
+per-load samples of newly inserted telemetry reference the load catalog, its compressed raw
+message (if kept) goes to ``ven_telemetry_raw``, and the telemetry is also
+merged into the rollups and the latest VEN state.
+
+Load snapshot messages repeat the per-load values of the telemetry, so they
+share its store: a snapshot's loads become samples without a telemetry
+sample only where no sample of the same load lies within the snapshot
+window.
+"""
+from __future__ import annotations
+
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import VenAck, VenLoadSample, VenTelemetry, VenTelemetryRaw
+from app.services.latest_state import upsert_latest
+from app.services.load_catalog import SAMPLE_COLUMNS, sync_catalog
+from app.services.telemetry_rollups import upsert_rollups
+
+TelemetryKey = tuple[str, datetime]
+LoadSnapshotRows = tuple[str, datetime, list[dict[str, Any]]]
+
+
+def naive_utc(timestamp: datetime) -> datetime:
+    """``timestamp`` as naive UTC.
+
+    Drivers disagree on whether ``timestamptz`` values come back aware, so
+    timestamps are compared in this form.
+    """
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(UTC).replace(tzinfo=None)
+    return timestamp
+
+
+def telemetry_key(ven_id: str, timestamp: datetime) -> TelemetryKey:
+    """Identity of a telemetry sample, normalised to naive UTC."""
+    return ven_id, naive_utc(timestamp)
+
+
+@dataclass(slots=True)
+class IngestBatch:
+    """Rows collected from a batch of MQTT messages, ready to be inserted."""
+
+    telemetry: list[dict[str, Any]] = field(default_factory=list)
+    load_samples: list[list[dict[str, Any]]] = field(default_factory=list)
+    raw_payloads: dict[TelemetryKey, tuple[str, bytes]] = field(default_factory=dict)
+    load_snapshots: list[LoadSnapshotRows] = field(default_factory=list)
+    acks: list[dict[str, Any]] = field(default_factory=list)
+    heartbeats: set[str] = field(default_factory=set)
+    telemetry_keys: set[TelemetryKey] = field(default_factory=set)
+    ack_keys: set[tuple[str, Hashable]] = field(default_factory=set)
+
+    def add_telemetry(
+        self,
+        row: dict[str, Any],
+        loads: list[dict[str, Any]],
+        raw_payload: tuple[str, bytes] | None = None,
+    ) -> bool:
+        """Queue a telemetry row together with its per-load samples.
+
+        ``raw_payload`` is the compressed message as ``(codec, blob)``, see
+        :mod:`app.services.raw_payloads`.
+
+        Returns ``False`` if the batch already holds a sample with the same
+        VEN and timestamp.
+        """
+
+        key = telemetry_key(row["ven_id"], row["timestamp"])
+        self.heartbeats.add(row["ven_id"])
+        if key in self.telemetry_keys:
+            return False
+        self.telemetry_keys.add(key)
+        self.telemetry.append(row)
+        self.load_samples.append(loads)
+        if raw_payload is not None:
+            self.raw_payloads[key] = raw_payload
+        return True
+
+    def add_load_snapshot(self, ven_id: str, timestamp: datetime, loads: list[dict[str, Any]]) -> None:
+        """Queue the per-load rows of a load snapshot message."""
+
+        self.heartbeats.add(ven_id)
+        self.load_snapshots.append((ven_id, timestamp, loads))
+
+    def add_ack(self, row: dict[str, Any], key: Hashable) -> bool:
+        """Queue a VEN ACK row unless the batch already holds one with ``key``."""
+
+        ack_key = (row["ven_id"], key)
+        if ack_key in self.ack_keys:
+            return False
+        self.ack_keys.add(ack_key)
+        self.acks.append(row)
+        return True
+
+    def __len__(self) -> int:
+        return len(self.telemetry) + len(self.load_snapshots) + len(self.acks)
+
+
+async def write_batch(
+    session: AsyncSession,
+    batch: IngestBatch,
+    snapshot_window: timedelta = timedelta(seconds=30),
+) -> None:
+    """
+    Persist ``batch`` using bulk statements; the caller owns the commit.
+
+    Load snapshot rows are dropped where a sample of the same load lies
+    within ``snapshot_window`` of the snapshot.
+
+    The VENs referenced by the batch must already exist, see
+    :meth:`app.services.ven_registry.VenRegistry.ensure_registered`.
+    """
+
+    if batch.telemetry:
+        dialect = (await session.connection()).dialect.name
+        dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        result = await session.execute(
+            dialect_insert(VenTelemetry)
+            .on_conflict_do_nothing(index_elements=[VenTelemetry.ven_id, VenTelemetry.timestamp])
+            .returning(VenTelemetry.id, VenTelemetry.ven_id, VenTelemetry.timestamp),
+            batch.telemetry,
+        )
+        # Samples that already existed return no row; attach loads and roll
+        # up only the inserted ones, by key.
+        by_key = {
+            telemetry_key(row["ven_id"], row["timestamp"]): (row, loads)
+            for row, loads in zip(batch.telemetry, batch.load_samples)
+        }
+        inserted = [
+            (telemetry_id, timestamp, *by_key[telemetry_key(ven_id, timestamp)])
+            for telemetry_id, ven_id, timestamp in result.all()
+        ]
+        load_refs = await sync_catalog(
+            session, [(row["ven_id"], row["timestamp"], loads) for _, _, row, loads in inserted]
+        )
+        samples = [
+            {
+                "telemetry_id": telemetry_id,
+                "timestamp": timestamp,
+                "load_ref": load_refs[row["ven_id"], load["load_id"]],
+            }
+            | {column: load.get(column) for column in SAMPLE_COLUMNS}
+            for telemetry_id, timestamp, row, loads in inserted
+            for load in loads
+        ]
+        if samples:
+            await session.execute(insert(VenLoadSample), samples)
+        raw_rows = [
+            {"telemetry_id": telemetry_id, "timestamp": timestamp, "codec": raw[0], "payload": raw[1]}
+            for telemetry_id, timestamp, row, _ in inserted
+            if (raw := batch.raw_payloads.get(telemetry_key(row["ven_id"], row["timestamp"]))) is not None
+        ]
+        if raw_rows:
+            await session.execute(insert(VenTelemetryRaw), raw_rows)
+        await upsert_rollups(session, [row for _, _, row, _ in inserted])
+        await upsert_latest(session, [(telemetry_id, row, loads) for telemetry_id, _, row, loads in inserted])
+
+    if batch.load_snapshots:
+        await _write_load_snapshots(session, batch.load_snapshots, snapshot_window)
+
+    if batch.acks:
+        await session.execute(insert(VenAck), batch.acks)
+
+
+async def _write_load_snapshots(
+    session: AsyncSession,
+    snapshots: list[LoadSnapshotRows],
+    window: timedelta,
+) -> None:
+    load_refs = await sync_catalog(session, snapshots)
+    rows = [
+        {"telemetry_id": None, "timestamp": timestamp, "load_ref": load_refs[ven_id, load["load_id"]]}
+        | {column: load.get(column) for column in SAMPLE_COLUMNS}
+        for ven_id, timestamp, loads in snapshots
+        for load in loads
+    ]
+    if not rows:
+        return
+    timestamps = [naive_utc(row["timestamp"]) for row in rows]
+    result = await session.execute(
+        select(VenLoadSample.load_ref, VenLoadSample.timestamp).where(
+            VenLoadSample.load_ref.in_({row["load_ref"] for row in rows}),
+            VenLoadSample.timestamp >= min(timestamps) - window,
+            VenLoadSample.timestamp <= max(timestamps) + window,
+        )
+    )
+    covered: dict[int, list[datetime]] = {}
+    for load_ref, timestamp in result:
+        covered.setdefault(load_ref, []).append(naive_utc(timestamp))
+
+    samples = []
+    for row, timestamp in zip(rows, timestamps):
+        nearby = covered.setdefault(row["load_ref"], [])
+        if any(abs(timestamp - other) <= window for other in nearby):
+            continue
+        nearby.append(timestamp)
+        samples.append(row)
+    if samples:
+        await session.execute(insert(VenLoadSample), samples)
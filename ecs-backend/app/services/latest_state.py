@@ -0,0 +1,115 @@
+"""
+Latest VEN state
+
+Ingest upserts each VEN's newest telemetry sample, and the values of its
+loads, into ``ven_latest`` and ``ven_latest_loads`` once per batch (see
+:func:`upsert_latest`), so fleet views cost one indexed read per VEN no
+matter how much history has accumulated. Upserts only overwrite rows with
+an older timestamp, so late samples never replace newer state. Telemetry
+added through the ORM instead is recorded row by row by listeners in
+:mod:`app.models.telemetry`.
+"""
+from __future__ import annotations
+
+from functools import cache
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import VenLatest, VenLatestLoad
+
+_LATEST_COLUMNS = (
+    "used_power_kw",
+    "shed_power_kw",
+    "requested_reduction_kw",
+    "event_id",
+    "battery_soc",
+)
+_LOAD_COLUMNS = (
+    "name",
+    "type",
+    "capacity_kw",
+    "current_power_kw",
+    "shed_capability_kw",
+    "enabled",
+    "priority",
+)
+
+
+def latest_rows(
+    samples: list[tuple[int, dict[str, Any], list[dict[str, Any]]]],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """``ven_latest`` and ``ven_latest_loads`` rows for the newest sample of each VEN.
+
+    ``samples`` are ``(telemetry_id, telemetry row, load rows)`` of inserted
+    telemetry.
+    """
+
+    newest: dict[str, tuple[int, dict[str, Any], list[dict[str, Any]]]] = {}
+    for sample in samples:
+        ven_id = sample[1]["ven_id"]
+        current = newest.get(ven_id)
+        if current is None or sample[1]["timestamp"] > current[1]["timestamp"]:
+            newest[ven_id] = sample
+
+    latest: list[dict[str, Any]] = []
+    loads: dict[tuple[str, str], dict[str, Any]] = {}
+    for ven_id, (telemetry_id, row, load_rows) in sorted(newest.items()):
+        timestamp = row["timestamp"]
+        latest.append(
+            {"ven_id": ven_id, "telemetry_id": telemetry_id, "timestamp": timestamp}
+            | {column: row.get(column) for column in _LATEST_COLUMNS}
+        )
+        for position, load in enumerate(load_rows):
+            # Of a load id repeated within a sample, the first one counts.
+            loads.setdefault(
+                (ven_id, load["load_id"]),
+                {"ven_id": ven_id, "load_id": load["load_id"], "timestamp": timestamp, "position": position}
+                | {column: load.get(column) for column in _LOAD_COLUMNS},
+            )
+    return latest, list(loads.values())
+
+
+@cache
+def latest_upsert(dialect: str) -> Any:
+    """Upsert of ``ven_latest`` rows that never replaces a newer sample."""
+
+    return _upsert(dialect, VenLatest, ["ven_id"], ("telemetry_id", "timestamp", *_LATEST_COLUMNS))
+
+
+@cache
+def latest_load_upsert(dialect: str) -> Any:
+    """Upsert of ``ven_latest_loads`` rows that never replaces newer values."""
+
+    return _upsert(dialect, VenLatestLoad, ["ven_id", "load_id"], ("timestamp", "position", *_LOAD_COLUMNS))
+
+
+def _upsert(
+    dialect: str,
+    model: type[VenLatest] | type[VenLatestLoad],
+    keys: list[str],
+    columns: tuple[str, ...],
+) -> Any:
+    dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+    stmt = dialect_insert(model)
+    return stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={column: stmt.excluded[column] for column in columns},
+        where=model.__table__.c.timestamp < stmt.excluded.timestamp,
+    )
+
+
+async def upsert_latest(
+    session: AsyncSession,
+    samples: list[tuple[int, dict[str, Any], list[dict[str, Any]]]],
+) -> None:
+    """Record the newest of the inserted ``samples`` as each VEN's latest state."""
+
+    if not samples:
+        return
+    dialect = (await session.connection()).dialect.name
+    latest, loads = latest_rows(samples)
+    await session.execute(latest_upsert(dialect), latest)
+    if loads:
+        await session.execute(latest_load_upsert(dialect), loads)
@@ -0,0 +1,96 @@
+"""
+Load catalog
+
+The static attributes of a VEN's loads (name, type, capacity and priority)
+are kept once per ``(ven_id, load_id)`` in ``ven_loads``; per-load sample
+rows only reference their catalog entry through ``load_ref`` and carry the
+values that change from sample to sample. Ingest syncs the catalog once per
+batch (see :func:`sync_catalog`), rewriting an entry only when a newer
+sample reports different attributes. Samples added through the ORM instead
+are resolved row by row by a listener in :mod:`app.models.telemetry`.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from functools import cache
+from typing import Any
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import VenLoad
+
+CATALOG_COLUMNS = ("name", "type", "capacity_kw", "priority")
+SAMPLE_COLUMNS = ("current_power_kw", "shed_capability_kw", "enabled")
+
+LoadKey = tuple[str, str]
+
+
+def catalog_rows(samples: list[tuple[str, datetime, list[dict[str, Any]]]]) -> list[dict[str, Any]]:
+    """``ven_loads`` rows for the loads of ``samples``, one per VEN and load id.
+
+    ``samples`` are ``(ven_id, timestamp, load rows)``; each load's attributes
+    come from the newest sample reporting it.
+    """
+
+    rows: dict[LoadKey, dict[str, Any]] = {}
+    for ven_id, timestamp, loads in sorted(samples, key=lambda sample: sample[1]):
+        reported: dict[LoadKey, dict[str, Any]] = {}
+        for load in loads:
+            # Of a load id repeated within a sample, the first one counts.
+            reported.setdefault(
+                (ven_id, load["load_id"]),
+                {"ven_id": ven_id, "load_id": load["load_id"], "timestamp": timestamp}
+                | {column: load.get(column) for column in CATALOG_COLUMNS},
+            )
+        rows.update(reported)
+    # Sorted so concurrent batches lock catalog rows in the same order.
+    return [rows[key] for key in sorted(rows)]
+
+
+@cache
+def catalog_upsert(dialect: str) -> Any:
+    """Upsert of ``ven_loads`` rows that only writes changed attributes."""
+
+    dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+    stmt = dialect_insert(VenLoad)
+    table = VenLoad.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=["ven_id", "load_id"],
+        set_={column: stmt.excluded[column] for column in ("timestamp", *CATALOG_COLUMNS)},
+        where=and_(
+            table.c.timestamp < stmt.excluded.timestamp,
+            or_(*(table.c[column].is_distinct_from(stmt.excluded[column]) for column in CATALOG_COLUMNS)),
+        ),
+    )
+
+
+def _load_refs(ven_ids: set[str]) -> Any:
+    return select(VenLoad.id, VenLoad.ven_id, VenLoad.load_id).where(VenLoad.ven_id.in_(ven_ids))
+
+
+async def sync_catalog(
+    session: AsyncSession,
+    samples: list[tuple[str, datetime, list[dict[str, Any]]]],
+) -> dict[LoadKey, int]:
+    """Record the loads of ``samples`` in the catalog; returns their ids by key."""
+
+    rows = catalog_rows(samples)
+    if not rows:
+        return {}
+    dialect = (await session.connection()).dialect.name
+    await session.execute(catalog_upsert(dialect), rows)
+    result = await session.execute(_load_refs({row["ven_id"] for row in rows}))
+    return {(ven_id, load_id): load_ref for load_ref, ven_id, load_id in result}
+
+
+def resolve_load_ref(connection: Connection, ven_id: str, timestamp: datetime, load: dict[str, Any]) -> int:
+    """Catalog id of a single load, recording its attributes like :func:`sync_catalog`."""
+
+    rows = catalog_rows([(ven_id, timestamp, [load])])
+    connection.execute(catalog_upsert(connection.dialect.name), rows)
+    return connection.scalar(
+        select(VenLoad.id).where(VenLoad.ven_id == ven_id, VenLoad.load_id == load["load_id"])
+    )
@@ -1,23 +1,37 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import hashlib
 import logging
 import os
 import ssl
 import tempfile
 import time
+import uuid
+import zlib
 from contextlib import asynccontextmanager, suppress
-from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Any, AsyncIterator, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable
 
 import gmqtt
 from gmqtt.mqtt.constants import MQTTv311
-import gmqtt
+from sqlalchemy.exc import DBAPIError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.core import json_codec
 from app.core.config import Settings, settings
-from app.models import LoadSnapshot, VenLoadSample, VenTelemetry
 from app.schemas.telemetry import LoadSnapshotPayload, TelemetryPayload
+from app.services.ingest_dedup import RecentKeyCache
+from app.services.ingest_queue import IngestQueue, combined_stats
+from app.services.ingest_spool import IngestSpool, SpooledMessage
+from app.services.ingest_writer import IngestBatch, telemetry_key, write_batch
+from app.services.raw_payloads import RawPayloadPolicy
+from app.services.ven_registry import VenRegistry
+
+if TYPE_CHECKING:
+    from app.services.fleet_cache import FleetCache
+    from app.services.hot_window import HotWindow
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +47,14 @@ SessionFactory = Callable[[], AsyncIterator[Any]]
 class _QueuedMessage:
     topic: str
     payload: bytes
+    received_at: float = field(default_factory=time.monotonic)
+    # JSON object decoded at receipt for shard routing, reused by the worker.
+    data: dict[str, Any] | None = None
+
+    @property
+    def droppable(self) -> bool:
+        # ACKs record the outcome of a DR command and are never shed.
+        return not self.topic.startswith("ven/ack/")
 
 
 class MQTTConsumer:
@@ -42,6 +64,9 @@ class MQTTConsumer:
         self,
         config: Settings | None = None,
         session_factory: SessionFactory | None = None,
+        registry: VenRegistry | None = None,
+        hot_window: HotWindow | None = None,
+        fleet_cache: FleetCache | None = None,
     ) -> None:
         self._config = config or settings
         if session_factory is None:
@@ -50,9 +75,25 @@ class MQTTConsumer:
             self._session_factory = get_session
         else:
             self._session_factory = session_factory
+        self._registry = registry or VenRegistry()
+        # Fed with every persisted telemetry row (see app.services.hot_window).
+        self._hot_window = hot_window
+        # Invalidated when new VENs are auto-registered (see app.services.fleet_cache).
+        self._fleet_cache = fleet_cache
+        self._recent = RecentKeyCache(
+            self._config.ingest_dedup_window_s,
+            self._config.ingest_dedup_max_keys_per_ven,
+        )
+        self._raw_payloads = RawPayloadPolicy(
+            self._config.raw_payload_policy,
+            self._config.raw_payload_sample_every,
+        )
 
-        self._queue: asyncio.Queue[_QueuedMessage] | None = None
-        self._worker: asyncio.Task[None] | None = None
+        self._queues: list[IngestQueue] = []
+        self._workers: list[asyncio.Task[None]] = []
+        self._heartbeat_flusher: asyncio.Task[None] | None = None
+        self._spool: IngestSpool | None = None
+        self._replayer: asyncio.Task[None] | None = None
         self._client: gmqtt.Client | None = None
         self._started = False
 
@@ -104,10 +145,13 @@ class MQTTConsumer:
         if not topics:
             raise MQTTConsumerError("At least one MQTT topic must be configured")
 
-        self._queue = asyncio.Queue()
-        self._worker = asyncio.create_task(self._process_queue())
+        await self.start_ingest()
 
         client_id = self._config.mqtt_client_id or gmqtt.client.get_client_id()
+        if self._config.mqtt_shared_group and self._config.mqtt_client_id:
+            # Replicas share their configuration; identical client ids would
+            # make the broker disconnect one replica whenever another connects.
+            client_id = f"{client_id}-{uuid.uuid4().hex[:8]}"
         self._client = gmqtt.Client(client_id)
 
         # Assign callbacks
@@ -170,6 +214,62 @@ class MQTTConsumer:
             extra={"client_id": client_id, "host": self._config.mqtt_host}
         )
 
+    async def start_ingest(self) -> None:
+        """Start the ingest workers, heartbeat flusher and spool replay.
+
+        Called by :meth:`start` before connecting to the broker; benchmarks
+        and tests call it directly and feed :meth:`_on_message` themselves.
+        """
+        shards = self._config.ingest_workers
+        self._queues = [
+            IngestQueue(
+                max(1, self._config.ingest_queue_maxsize // shards),
+                self._config.ingest_overflow_policy,
+                max_waiting=self._config.ingest_max_waiting_messages // shards,
+            )
+            for _ in range(shards)
+        ]
+        self._workers = [asyncio.create_task(self._process_queue(queue)) for queue in self._queues]
+        self._heartbeat_flusher = asyncio.create_task(self._flush_heartbeats_periodically())
+        if self._config.ingest_spool_dir:
+            self._spool = await asyncio.to_thread(
+                IngestSpool,
+                self._config.ingest_spool_dir,
+                self._config.ingest_spool_segment_bytes,
+                self._config.ingest_spool_max_bytes,
+            )
+            self._replayer = asyncio.create_task(self._replay_spool())
+
+    async def stop_ingest(self) -> None:
+        """Drain the ingest queues and stop the tasks started by :meth:`start_ingest`."""
+        # Replay would compete with the drain; spooled segments stay on disk.
+        if self._replayer:
+            self._replayer.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._replayer
+
+        await self._drain()
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            with suppress(asyncio.CancelledError):
+                await worker
+        await self._spool_leftovers()
+
+        if self._heartbeat_flusher:
+            self._heartbeat_flusher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._heartbeat_flusher
+        try:
+            await self.flush_heartbeats()
+        except Exception:
+            logger.exception("Failed to flush VEN heartbeats on shutdown")
+
+        self._workers = []
+        self._heartbeat_flusher = None
+        self._replayer = None
+        self._queues = []
+
     async def stop(self) -> None:
         if not self._started or not self._client:
             return
@@ -178,29 +278,65 @@ class MQTTConsumer:
         except Exception:
             logger.exception("Error stopping MQTT client")
         
-        if self._worker:
-            self._worker.cancel()
-            with suppress(asyncio.CancelledError):
-                await self._worker
-        
-        self._worker = None
+        await self.stop_ingest()
         self._client = None
-        self._queue = None
         self._started = False
         logger.info("MQTT consumer stopped")
 
+    async def _drain(self) -> None:
+        """Wait for the workers to persist everything queued before shutdown."""
+        timeout = self._config.ingest_drain_timeout_s
+        depth = sum(queue.qsize() for queue in self._queues)
+        if depth:
+            logger.info("Draining MQTT ingest queues", extra={"depth": depth, "timeout_s": timeout})
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Timed out draining MQTT ingest queues",
+                extra={"depth": sum(queue.qsize() for queue in self._queues)},
+            )
+
+    async def _spool_leftovers(self) -> None:
+        """Spool, or report, messages still queued after the workers stopped."""
+        leftovers: list[_QueuedMessage] = []
+        for queue in self._queues:
+            while not queue.empty():
+                leftovers.append(queue.get_nowait())
+                queue.task_done()
+        if not leftovers:
+            return
+        spooled = await self._spool_messages(leftovers) if self._spool is not None else 0
+        if spooled < len(leftovers):
+            logger.error("Discarding unpersisted MQTT messages on shutdown", extra={"count": len(leftovers)})
+
     def _on_connect(self, client: gmqtt.Client, flags: dict[str, Any], rc: int, properties: Any) -> None:
         if rc != 0:
             logger.error("MQTT client failed to connect", extra={"rc": rc, "error": gmqtt.constants.CONNACK_RETURN_CODES.get(rc)})
             return
         
         assert self._config.mqtt_topics
-        for topic in self._config.mqtt_topics:
+        for topic in self.subscription_topics():
             client.subscribe(topic, qos=1)
-        
-        # Subscribe to all VEN ACK topics (wildcard)
-        client.subscribe("ven/ack/+", qos=1)
-        logger.info("Subscribed to VEN ACK topic: ven/ack/+")
+        logger.info(
+            "Subscribed to MQTT topics",
+            extra={"topics": self.subscription_topics(), "shared_group": self._config.mqtt_shared_group},
+        )
+
+    def subscription_topics(self) -> list[str]:
+        """Topic filters to subscribe to, including the VEN ACK wildcard.
+
+        The ACK wildcard is skipped when a configured filter already covers
+        it, because overlapping subscriptions make the broker deliver every
+        matching message once per filter.
+        """
+        topics = list(self._config.mqtt_topics)
+        if not any(_filter_covers(topic, _ACK_TOPIC_FILTER) for topic in topics):
+            topics.append(_ACK_TOPIC_FILTER)
+        group = self._config.mqtt_shared_group
+        if group:
+            topics = [f"$share/{group}/{topic}" for topic in topics]
+        return topics
 
     def _on_subscribe(self, client: gmqtt.Client, mid: int, qos: list[int], properties: Any) -> None:
         logger.info("MQTT client subscribed", extra={"mid": mid, "qos": qos})
@@ -211,71 +347,296 @@ class MQTTConsumer:
         else:
             logger.info("MQTT client disconnected cleanly")
 
-    def _on_message(self, client: gmqtt.Client, topic: str, payload: bytes, qos: int, properties: Any) -> int:
-        if not self._queue:
+    async def _on_message(self, client: gmqtt.Client, topic: str, payload: bytes, qos: int, properties: Any) -> int:
+        if not self._queues:
             logger.warning("Received MQTT message before consumer initialisation")
             return 0
-        
-        self._queue.put_nowait(_QueuedMessage(topic=topic, payload=payload))
+
+        message = _QueuedMessage(topic=topic, payload=payload)
+        if not topic.startswith("ven/ack/"):
+            message.data = self._decode(topic, payload)
+            if message.data is None:
+                return 0
+
+        # gmqtt schedules this coroutine as a task rather than awaiting it, so
+        # waiting here does not slow the socket reader. Under the "block"
+        # policy it only delays the PUBACK of QoS >= 1 messages, and the queue
+        # caps how many offers may wait at once.
+        await self._queues[self._shard_for(message)].offer(message)
         return 0
 
+    def _shard_for(self, message: _QueuedMessage) -> int:
+        """Pick the shard for ``message`` from a stable hash of its VEN id.
+
+        All messages of one VEN land on the same worker, which keeps them in
+        arrival order; messages without a VEN id go to the first shard.
+        """
+        if len(self._queues) == 1:
+            return 0
+        if message.topic.startswith("ven/ack/"):
+            ven_id = message.topic.split("/")[-1]
+        else:
+            ven_id = (message.data or {}).get("venId")
+        if not isinstance(ven_id, str) or not ven_id:
+            return 0
+        return zlib.crc32(ven_id.encode("utf-8")) % len(self._queues)
+
+    def metrics(self) -> dict[str, Any]:
+        """Ingest queue counters and VEN registry state for monitoring."""
+        return {
+            "running": self._started,
+            "queue": combined_stats(self._queues) if self._queues else None,
+            "shards": [queue.stats() for queue in self._queues],
+            "registry": self._registry.stats(),
+            "dedup": self._recent.stats(),
+            "spool": self._spool.stats() if self._spool else None,
+        }
+
     async def handle_message(self, topic: str, payload: bytes) -> None:
+        await self.handle_batch([_QueuedMessage(topic=topic, payload=payload)])
+
+    async def handle_batch(self, messages: list[_QueuedMessage]) -> int:
+        """Parse ``messages`` and persist them in a single transaction.
+
+        If the bulk write fails the messages are retried one at a time so a
+        single bad row cannot take the rest of the batch down with it.
+        Returns the number of messages that could not be persisted.
+        """
+        batch = IngestBatch()
+        for message in messages:
+            self._collect(batch, message)
+        if not batch:
+            return 0
+
         try:
-            decoded = payload.decode("utf-8")
-        except UnicodeDecodeError:
+            registered = await self._persist(batch)
+        except Exception as e:
+            # Retrying message by message only helps against bad rows, not
+            # against a database that is down.
+            if len(messages) == 1 or _database_unavailable(e):
+                raise
             logger.warning(
-                "Received non-UTF8 payload",
-                extra={"topic": topic, "payload_preview": payload[:100]}
+                "Bulk write failed, retrying messages individually",
+                exc_info=True,
+                extra={"batch_size": len(messages)},
             )
+            failed = 0
+            for message in messages:
+                try:
+                    await self.handle_batch([message])
+                except Exception as e:
+                    if _database_unavailable(e):
+                        raise
+                    failed += 1
+                    logger.exception(
+                        "Failed to process MQTT message",
+                        extra={
+                            "topic": message.topic,
+                            "payload_size": len(message.payload),
+                            "error": str(e)
+                        }
+                    )
+            return failed
+
+        self._registry.mark_known(registered)
+        if registered and self._fleet_cache is not None:
+            self._fleet_cache.invalidate()
+        for ven_id, key in (*batch.telemetry_keys, *batch.ack_keys):
+            self._recent.record(ven_id, key)
+        seen_at = datetime.now(timezone.utc)
+        for ven_id in batch.heartbeats:
+            self._registry.record_heartbeat(ven_id, seen_at)
+        if self._hot_window is not None:
+            self._hot_window.add(batch.telemetry)
+
+        logger.debug(
+            "Persisted ingest batch",
+            extra={
+                "telemetry": len(batch.telemetry),
+                "load_snapshots": len(batch.load_snapshots),
+                "acks": len(batch.acks),
+            }
+        )
+        return 0
+
+    def _collect(self, batch: IngestBatch, message: _QueuedMessage) -> None:
+        topic = message.topic
+        data = message.data if message.data is not None else self._decode(topic, message.payload)
+        if data is None:
             return
 
+        if topic == self._config.mqtt_topic_metering or topic.startswith("ven/telemetry/"):
+            # The enhanced VEN publishes the same document on both topics.
+            self._collect_metering(batch, data, message.payload)
+        elif topic == self._config.backend_loads_topic:
+            self._collect_load_snapshot(batch, data)
+        elif topic.startswith("ven/ack/"):
+            # Handle VEN ACK messages (ven/ack/{venId})
+            self._collect_ven_ack(batch, topic, data, message.payload)
+        else:
+            logger.debug("Unhandled MQTT topic", extra={"topic": topic})
+
+    def _decode(self, topic: str, payload: bytes) -> dict[str, Any] | None:
+        """Decode ``payload`` into a JSON object, logging and returning None if it is not one."""
         try:
-            data = json.loads(decoded)
-        except json.JSONDecodeError as e:
+            # Parse straight from the received bytes; no intermediate str.
+            data = json_codec.loads(payload)
+        except json_codec.JSONDecodeError as e:
             logger.warning(
                 "Discarding invalid JSON payload",
                 extra={
                     "topic": topic,
                     "error": str(e),
-                    "payload_preview": decoded[:200]
+                    "payload_preview": payload[:200]
                 }
             )
-            return
+            return None
 
         if not isinstance(data, dict):
             logger.warning(
                 "Payload is not a JSON object",
                 extra={"topic": topic, "type": type(data).__name__}
             )
-            return
+            return None
+        return data
 
-        if topic == self._config.mqtt_topic_metering:
-            await self._persist_metering(data)
-        elif topic == self._config.backend_loads_topic:
-            await self._persist_load_snapshot(data)
-        elif topic.startswith("ven/ack/"):
-            # Handle VEN ACK messages (ven/ack/{venId})
-            await self._persist_ven_ack(topic, data)
-        else:
-            logger.debug("Unhandled MQTT topic", extra={"topic": topic})
+    async def _process_queue(self, queue: IngestQueue) -> None:
+        batch_size = self._config.ingest_batch_size
+        flush_interval = self._config.ingest_flush_interval_ms / 1000
+        max_latency = self._config.ingest_max_latency_ms / 1000
 
-    async def _process_queue(self) -> None:
-        assert self._queue is not None
         while True:
-            message = await self._queue.get()
+            messages = [await queue.get()]
+            # Latency is measured from receipt, so time spent queued counts.
+            deadline = messages[0].received_at + max_latency
+            while len(messages) < batch_size:
+                if not queue.empty():
+                    messages.append(queue.get_nowait())
+                    continue
+                timeout = min(flush_interval, deadline - time.monotonic())
+                if timeout <= 0:
+                    break
+                try:
+                    messages.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            failed = len(messages)
+            spooled = 0
             try:
-                await self.handle_message(message.topic, message.payload)
+                failed = await self.handle_batch(messages)
             except Exception as e:
-                logger.exception(
-                    "Failed to process MQTT message",
-                    extra={
-                        "topic": message.topic,
-                        "payload_size": len(message.payload),
-                        "error": str(e)
-                    }
-                )
+                if self._spool is not None and _database_unavailable(e):
+                    spooled = await self._spool_messages(messages)
+                    failed -= spooled
+                if failed:
+                    logger.exception(
+                        "Failed to process MQTT message",
+                        extra={
+                            "topic": messages[0].topic,
+                            "payload_size": len(messages[0].payload),
+                            "error": str(e)
+                        }
+                    )
             finally:
-                self._queue.task_done()
+                queue.record_failed(failed)
+                queue.record_spooled(spooled)
+                for _ in messages:
+                    queue.task_done()
+
+    async def _spool_messages(self, messages: list[_QueuedMessage]) -> int:
+        """Append ``messages`` to the spool; returns how many were spooled."""
+        assert self._spool is not None
+        received_at = time.time() - time.monotonic()
+        try:
+            await asyncio.to_thread(
+                self._spool.append,
+                [SpooledMessage(m.topic, m.payload, received_at + m.received_at) for m in messages],
+            )
+        except Exception as e:
+            logger.error("Failed to spool MQTT messages", extra={"count": len(messages), "error": str(e)})
+            return 0
+        logger.warning("Database unavailable, spooled MQTT messages", extra={"count": len(messages)})
+        return len(messages)
+
+    async def _replay_spool(self) -> None:
+        """Feed spooled segments back through :meth:`handle_batch`, oldest first."""
+        assert self._spool is not None
+        retry_interval = self._config.ingest_spool_retry_interval_s
+        while True:
+            segment = await asyncio.to_thread(self._spool.oldest_segment)
+            if segment is None:
+                await asyncio.sleep(retry_interval)
+                continue
+            try:
+                await self._replay_segment(*segment)
+            except Exception as e:
+                logger.warning(
+                    "Spool replay paused",
+                    extra={"segment": segment[0].name, "error": str(e)}
+                )
+                await asyncio.sleep(retry_interval)
+
+    async def _replay_segment(self, path: Path, messages: list[SpooledMessage]) -> None:
+        assert self._spool is not None
+        batch_size = self._config.ingest_batch_size
+        rate = self._config.ingest_spool_replay_rate
+        # Resume where a paused replay of this segment stopped.
+        start = self._spool.replay_position if self._spool.replay_segment == path else 0
+        for offset in range(start, len(messages), batch_size):
+            chunk = messages[offset:offset + batch_size]
+            started = time.monotonic()
+            failed = await self.handle_batch([_QueuedMessage(m.topic, m.payload) for m in chunk])
+            self._spool.record_replay(path, offset + len(chunk), len(messages), len(chunk) - failed, failed)
+            # Throttle so replay leaves database capacity for live ingest.
+            await asyncio.sleep(max(0.0, len(chunk) / rate - (time.monotonic() - started)))
+        await asyncio.to_thread(self._spool.remove, path)
+        logger.info("Replayed spooled MQTT messages", extra={"segment": path.name, "count": len(messages)})
+
+    async def _persist(self, batch: IngestBatch) -> set[str]:
+        """Write ``batch``, re-validating cached VENs once on an integrity error.
+
+        The registry can be stale when a VEN is deleted by another process;
+        the telemetry insert then violates its foreign key. Evicting the
+        batch's cached VENs makes the retry re-register them.
+        """
+        try:
+            return await self._write(batch)
+        except IntegrityError:
+            stale = {ven_id for ven_id in batch.heartbeats if self._registry.is_known(ven_id)}
+            if not stale:
+                raise
+            logger.warning("VEN registry out of date, re-validating", extra={"ven_ids": sorted(stale)})
+            for ven_id in stale:
+                self._registry.forget(ven_id)
+            return await self._write(batch)
+
+    async def _write(self, batch: IngestBatch) -> set[str]:
+        async with self._session_scope() as session:
+            registered = await self._registry.ensure_registered(session, batch.heartbeats)
+            await write_batch(
+                session, batch, snapshot_window=timedelta(seconds=self._config.load_snapshot_window_s)
+            )
+        return registered
+
+    async def flush_heartbeats(self) -> int:
+        """Write heartbeats accumulated in the VEN registry to the database."""
+        generator = self._session_factory()
+        session = await generator.__anext__()
+        try:
+            return await self._registry.flush(session)
+        finally:
+            with suppress(StopAsyncIteration):
+                await generator.aclose()
+
+    async def _flush_heartbeats_periodically(self) -> None:
+        interval = self._config.ven_heartbeat_flush_interval_s
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush_heartbeats()
+            except Exception as e:
+                logger.warning("Failed to flush VEN heartbeats", extra={"error": str(e)})
 
     @asynccontextmanager
     async def _session_scope(self):
@@ -291,7 +652,7 @@ class MQTTConsumer:
             with suppress(StopAsyncIteration):
                 await generator.aclose()
 
-    async def _persist_metering(self, payload: dict[str, Any]) -> None:
+    def _collect_metering(self, batch: IngestBatch, payload: dict[str, Any], raw: bytes) -> None:
         try:
             model = TelemetryPayload.model_validate(payload)
         except Exception as e:
@@ -303,108 +664,80 @@ class MQTTConsumer:
             logger.warning("Telemetry payload missing timestamp", extra={"ven": model.ven_id})
             return
 
-        async with self._session_scope() as session:
-            from app import crud
-            from datetime import datetime, timezone
-            
-            ven = await crud.get_ven(session, model.ven_id)
-            if ven is None:
-                logger.info("Auto-registering new VEN", extra={"ven_id": model.ven_id})
-                try:
-                    await crud.create_ven(
-                        session,
-                        ven_id=model.ven_id,
-                        name=f"Auto-registered VEN {model.ven_id}",
-                        status="online",
-                        registration_id=model.ven_id,
-                    )
-                except Exception as e:
-                    logger.error("Failed to auto-register VEN", extra={"ven_id": model.ven_id, "error": str(e)})
-                    return
-            else:
-                # Update heartbeat and status for existing VEN
-                ven.last_heartbeat = datetime.now(timezone.utc)
-                if ven.status != "online":
-                    ven.status = "online"
-                    logger.info(f"VEN {model.ven_id} came back online")
-                await session.commit()
+        ven_id, key = telemetry_key(model.ven_id, timestamp)
+        if self._recent.seen(ven_id, key):
+            logger.debug(
+                "Dropping duplicate telemetry",
+                extra={"ven": model.ven_id, "timestamp": timestamp.isoformat()}
+            )
+            return
 
         # Use modern field names with fallback to legacy names
         used_power = model.used_power_kw if model.used_power_kw is not None else model.legacy_power_kw
         shed_power = model.shed_power_kw if model.shed_power_kw is not None else model.legacy_shed_kw
 
-        reading = VenTelemetry(
-            ven_id=model.ven_id,
-            timestamp=timestamp,
-            used_power_kw=used_power,
-            shed_power_kw=shed_power,
-            requested_reduction_kw=model.requested_reduction_kw,
-            event_id=model.event_id,
-            battery_soc=model.battery_soc,
-            raw_payload=payload,
+        batch.add_telemetry(
+            {
+                "ven_id": model.ven_id,
+                "timestamp": timestamp,
+                "used_power_kw": used_power,
+                "shed_power_kw": shed_power,
+                "requested_reduction_kw": model.requested_reduction_kw,
+                "event_id": model.event_id,
+                "battery_soc": model.battery_soc,
+            },
+            [
+                {
+                    "load_id": load.load_id,
+                    "name": load.name,
+                    "type": load.type,
+                    "capacity_kw": load.capacity_kw,
+                    "current_power_kw": load.current_power_kw,
+                    "shed_capability_kw": load.shed_capability_kw,
+                    "enabled": load.enabled,
+                    "priority": load.priority,
+                }
+                for load in model.loads
+            ],
+            self._raw_payloads.encode(raw),
         )
 
-        for load in model.loads:
-            reading.loads.append(
-                VenLoadSample(
-                    load_id=load.load_id,
-                    name=load.name,
-                    type=load.type,
-                    capacity_kw=load.capacity_kw,
-                    current_power_kw=load.current_power_kw,
-                    shed_capability_kw=load.shed_capability_kw,
-                    enabled=load.enabled,
-                    priority=load.priority,
-                    raw_payload=load.model_dump(mode="json", by_alias=True),
-                )
-            )
-
-        async with self._session_scope() as session:
-            session.add(reading)
-
-        logger.debug("Persisted telemetry", extra={"ven": model.ven_id, "timestamp": timestamp.isoformat()})
-
-    async def _persist_load_snapshot(self, payload: dict[str, Any]) -> None:
+    def _collect_load_snapshot(self, batch: IngestBatch, payload: dict[str, Any]) -> None:
         try:
             model = LoadSnapshotPayload.model_validate(payload)
         except Exception as e:
             logger.warning("Failed to validate load snapshot payload", extra={"error": str(e), "payload": payload})
             return
-            
+
         timestamp = _coerce_timestamp(model.timestamp)
         if not timestamp:
             logger.warning("Load snapshot missing timestamp", extra={"ven": model.ven_id})
             return
 
-        records = [
-            LoadSnapshot(
-                ven_id=model.ven_id,
-                timestamp=timestamp,
-                load_id=load.load_id,
-                name=load.name,
-                type=load.type,
-                capacity_kw=load.capacity_kw,
-                current_power_kw=load.current_power_kw,
-                shed_capability_kw=load.shed_capability_kw,
-                enabled=load.enabled,
-                priority=load.priority,
-                raw_payload=load.model_dump(mode="json", by_alias=True),
-            )
-            for load in model.loads
-        ]
-
-        if not records:
-            return
-
-        async with self._session_scope() as session:
-            session.add_all(records)
-
-        logger.debug("Persisted load snapshot", extra={"ven": model.ven_id, "count": len(records)})
+        batch.add_load_snapshot(
+            model.ven_id,
+            timestamp,
+            [
+                {
+                    "load_id": load.load_id,
+                    "name": load.name,
+                    "type": load.type,
+                    "capacity_kw": load.capacity_kw,
+                    "current_power_kw": load.current_power_kw,
+                    "shed_capability_kw": load.shed_capability_kw,
+                    "enabled": load.enabled,
+                    "priority": load.priority,
+                }
+                for load in model.loads
+            ],
+        )
 
-    async def _persist_ven_ack(self, topic: str, payload: dict[str, Any]) -> None:
+    def _collect_ven_ack(
+        self, batch: IngestBatch, topic: str, payload: dict[str, Any], raw: bytes
+    ) -> None:
         """
-        Persist VEN acknowledgment messages.
-        
+        Collect VEN acknowledgment messages.
+
         Topic format: ven/ack/{venId}
         Payload: {op, status, event_id, requested_shed_kw, actual_shed_kw, circuits_curtailed, ...}
         """
@@ -413,48 +746,56 @@ class MQTTConsumer:
         if not ven_id:
             logger.warning("Cannot extract VEN ID from ACK topic", extra={"topic": topic})
             return
-        
+
         # Extract fields from payload
         op = payload.get("op")
         status = payload.get("status")
         event_id = payload.get("event_id")
         correlation_id = payload.get("correlationId")
         timestamp_value = payload.get("ts") or payload.get("timestamp")
-        
+
         if not op or not status:
             logger.warning("ACK missing required fields", extra={"ven_id": ven_id, "payload": payload})
             return
-        
+
+        # QoS 1 redeliveries and overlapping subscriptions repeat ACKs. Without a
+        # timestamp, only byte-identical copies are the same ACK.
+        if timestamp_value is None:
+            ack_key = ("ack", op, status, event_id, correlation_id, hashlib.blake2b(raw, digest_size=16).digest())
+        else:
+            ack_key = ("ack", op, status, event_id, correlation_id, str(timestamp_value))
+        if self._recent.seen(ven_id, ack_key):
+            logger.debug("Dropping duplicate VEN ACK", extra={"ven_id": ven_id, "event_id": event_id})
+            return
+
         timestamp = _coerce_timestamp(timestamp_value)
         if not timestamp:
             timestamp = datetime.now(timezone.utc)
-        
+
         # Extract shed information
         requested_shed_kw = payload.get("requested_shed_kw")
         actual_shed_kw = payload.get("actual_shed_kw")
         circuits_curtailed = payload.get("circuits_curtailed")
-        
-        # Import the VenAck model
-        from app.models.ven_ack import VenAck
-        
-        ack_record = VenAck(
-            ven_id=ven_id,
-            event_id=event_id,
-            correlation_id=correlation_id,
-            op=op,
-            status=status,
-            timestamp=timestamp,
-            requested_shed_kw=requested_shed_kw,
-            actual_shed_kw=actual_shed_kw,
-            circuits_curtailed=circuits_curtailed,
-            raw_payload=json.dumps(payload),
+
+        batch.add_ack(
+            {
+                "ven_id": ven_id,
+                "event_id": event_id,
+                "correlation_id": correlation_id,
+                "op": op,
+                "status": status,
+                "timestamp": timestamp,
+                "requested_shed_kw": requested_shed_kw,
+                "actual_shed_kw": actual_shed_kw,
+                "circuits_curtailed": circuits_curtailed,
+                # Store the ACK exactly as received instead of re-encoding it.
+                "raw_payload": raw.decode("utf-8") if self._raw_payloads.keep() else None,
+            },
+            ack_key,
         )
-        
-        async with self._session_scope() as session:
-            session.add(ack_record)
-        
+
         logger.info(
-            "Persisted VEN ACK",
+            "Received VEN ACK",
             extra={
                 "ven_id": ven_id,
                 "event_id": event_id,
@@ -466,6 +807,30 @@ class MQTTConsumer:
         )
 
 
+_ACK_TOPIC_FILTER = "ven/ack/+"
+
+
+def _filter_covers(topic_filter: str, other: str) -> bool:
+    """Whether every topic matched by ``other`` is also matched by ``topic_filter``."""
+    parts = topic_filter.split("/")
+    other_parts = other.split("/")
+    for index, part in enumerate(parts):
+        if part == "#":
+            return True
+        if index >= len(other_parts):
+            return False
+        if part != "+" and (part != other_parts[index] or other_parts[index] in ("+", "#")):
+            return False
+    return len(parts) == len(other_parts)
+
+
+def _database_unavailable(exc: BaseException) -> bool:
+    """Whether ``exc`` means the database could not be reached, as opposed to a bad row."""
+    if isinstance(exc, DBAPIError) and exc.connection_invalidated:
+        return True
+    return isinstance(exc, (OperationalError, InterfaceError, PoolTimeoutError, OSError))
+
+
 def _coerce_timestamp(value: Any) -> datetime | None:
     if isinstance(value, datetime):
         return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
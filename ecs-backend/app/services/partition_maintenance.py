@@ -0,0 +1,260 @@
+"""
+Telemetry partition maintenance
+
+On Postgres, ``ven_telemetry``, ``ven_load_samples`` and ``ven_telemetry_raw``
+are range-partitioned by ``timestamp`` (migrations ``202510230001`` and
+``202510280001``). This
+service periodically:
+
+* creates partitions ``telemetry_partitions_ahead`` intervals (days or
+  weeks) in advance, continuing from the newest existing partition so a
+  change of interval never produces overlapping ranges;
+* drops partitions whose whole range is older than
+  ``telemetry_retention_days``, which removes expired rows without row
+  deletes or vacuum work. With the cold-tier archive enabled (see
+  :mod:`app.services.telemetry_archive`) a partition is only dropped once
+  its whole range was archived.
+
+Partitions are named ``<table>_p<YYYYMMDD>`` after their lower bound. Rows
+outside every partition land in ``<table>_default``, which is never dropped;
+a partition cannot be created over a range that already has rows there.
+On other databases (SQLite in tests) maintenance is a no-op.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings, settings
+from app.services.mqtt_consumer import SessionFactory
+from app.services.telemetry_archive import TelemetryArchive, open_archive
+
+logger = logging.getLogger(__name__)
+
+# Creation order; expired partitions are dropped in reverse because
+# ``ven_load_samples`` and ``ven_telemetry_raw`` reference ``ven_telemetry``.
+PARTITIONED_TABLES = ("ven_telemetry", "ven_load_samples", "ven_telemetry_raw")
+
+_BOUND = re.compile(r"FOR VALUES FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+_LIST_PARTITIONS = text(
+    """
+    SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+    """
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Partition:
+    name: str
+    lower: datetime
+    upper: datetime
+
+
+def interval_start(moment: datetime, interval: str) -> datetime:
+    """Start of the day or (ISO, Monday-based) week containing ``moment``, in UTC."""
+
+    day = moment.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def next_interval_start(moment: datetime, interval: str) -> datetime:
+    return interval_start(moment, interval) + (timedelta(weeks=1) if interval == "week" else timedelta(days=1))
+
+
+def partition_name(table: str, lower: datetime) -> str:
+    return f"{table}_p{lower:%Y%m%d}"
+
+
+def parse_bound(name: str, bound: str) -> Partition | None:
+    """Parse ``pg_get_expr(relpartbound)``; None for the default partition."""
+
+    match = _BOUND.search(bound)
+    if match is None:
+        return None
+    lower, upper = (datetime.fromisoformat(value).astimezone(UTC) for value in match.groups())
+    return Partition(name, lower, upper)
+
+
+def plan_partitions(
+    table: str,
+    existing: list[Partition],
+    now: datetime,
+    interval: str,
+    ahead: int,
+) -> list[Partition]:
+    """Partitions to create so that ``ahead`` intervals past ``now`` are covered.
+
+    Planning starts at the newest existing upper bound (or the current
+    interval when that is older), so the first new partition may be shorter
+    than a full interval after the interval setting changed.
+    """
+
+    lower = interval_start(now, interval)
+    if existing:
+        lower = max(lower, max(partition.upper for partition in existing))
+    horizon = interval_start(now, interval)
+    for _ in range(ahead + 1):
+        horizon = next_interval_start(horizon, interval)
+
+    planned: list[Partition] = []
+    while lower < horizon:
+        upper = next_interval_start(lower, interval)
+        planned.append(Partition(partition_name(table, lower), lower, upper))
+        lower = upper
+    return planned
+
+
+def expired_partitions(existing: list[Partition], now: datetime, retention_days: int | None) -> list[Partition]:
+    """Partitions holding only rows older than ``retention_days``."""
+
+    if retention_days is None:
+        return []
+    cutoff = now - timedelta(days=retention_days)
+    return [partition for partition in existing if partition.upper <= cutoff]
+
+
+class PartitionMaintenance:
+    """Creates upcoming telemetry partitions and drops expired ones."""
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        config: Settings | None = None,
+        archive: TelemetryArchive | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._config = config or settings
+        self._archive = archive if archive is not None else open_archive(self._config)
+        self._task: asyncio.Task | None = None
+        self.created = 0
+        self.dropped = 0
+        self.last_run: datetime | None = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            logger.warning("Partition maintenance already started")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "created": self.created,
+            "dropped": self.dropped,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+    async def run_once(self, now: datetime | None = None) -> None:
+        """Create and drop partitions for every partitioned table."""
+
+        now = now or datetime.now(UTC)
+        gen = self._session_factory()
+        session = await anext(gen)
+        try:
+            if (await session.connection()).dialect.name != "postgresql":
+                return
+            existing = {table: await self._partitions(session, table) for table in PARTITIONED_TABLES}
+            # The transaction opened by the catalog reads must not hold locks
+            # while partitions are created one by one.
+            await session.commit()
+
+            for table in PARTITIONED_TABLES:
+                for partition in plan_partitions(
+                    table,
+                    existing[table],
+                    now,
+                    self._config.telemetry_partition_interval,
+                    self._config.telemetry_partitions_ahead,
+                ):
+                    await self._execute(
+                        session,
+                        [
+                            f"CREATE TABLE IF NOT EXISTS {partition.name} PARTITION OF {table} "
+                            f"FOR VALUES FROM ('{partition.lower.isoformat()}') TO ('{partition.upper.isoformat()}')"
+                        ],
+                        "create",
+                        partition,
+                    )
+
+            horizon = await asyncio.to_thread(self._archive.horizon) if self._archive is not None else None
+            for table in reversed(PARTITIONED_TABLES):
+                expired = expired_partitions(existing[table], now, self._config.telemetry_retention_days)
+                if self._archive is not None:
+                    expired = [partition for partition in expired if horizon is not None and partition.upper <= horizon]
+                for partition in expired:
+                    # Detaching first releases the foreign key between the
+                    # sample and telemetry partitions.
+                    await self._execute(
+                        session,
+                        [f"ALTER TABLE {table} DETACH PARTITION {partition.name}", f"DROP TABLE {partition.name}"],
+                        "drop",
+                        partition,
+                    )
+        finally:
+            await gen.aclose()
+            self.last_run = now
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Telemetry partition maintenance failed")
+            await asyncio.sleep(self._config.partition_maintenance_interval_s)
+
+    async def _partitions(self, session: AsyncSession, table: str) -> list[Partition]:
+        result = await session.execute(_LIST_PARTITIONS, {"table": table})
+        partitions = (parse_bound(name, bound) for name, bound in result.all())
+        return sorted((partition for partition in partitions if partition), key=lambda partition: partition.lower)
+
+    async def _execute(
+        self, session: AsyncSession, statements: list[str], action: str, partition: Partition
+    ) -> None:
+        # One transaction per partition: a failure (e.g. rows for the range
+        # already sitting in the default partition) only skips that one.
+        try:
+            for statement in statements:
+                await session.execute(text(statement))
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            logger.exception(
+                "Could not %s telemetry partition",
+                action,
+                extra={"partition": partition.name, "lower": partition.lower.isoformat()},
+            )
+            return
+        if action == "create":
+            self.created += 1
+        else:
+            self.dropped += 1
+        logger.info(
+            "Telemetry partition %s",
+            "created" if action == "create" else "dropped",
+            extra={"partition": partition.name, "lower": partition.lower.isoformat()},
+        )
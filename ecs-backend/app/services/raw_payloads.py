@@ -0,0 +1,53 @@
+"""
+Raw payload retention
+
+``RAW_PAYLOAD_POLICY`` decides what is kept of each message as received:
+
+* ``compressed`` (default): every telemetry message is compressed into
+  ``ven_telemetry_raw``, keyed by its telemetry id;
+* ``sampled``: the same for one telemetry message in
+  ``RAW_PAYLOAD_SAMPLE_EVERY``;
+* ``off``: nothing is kept.
+
+ACKs are few, so their text stays in ``ven_acks.raw_payload`` (sampled the
+same way, and dropped under ``off``). Raw payloads are only decompressed by
+the debug endpoint; the raw columns are deferred in the ORM mappings so
+regular queries never fetch them.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from app.core import json_codec
+from app.core.compression import compress, decompress
+
+
+class RawPayloadPolicy:
+    """Decides which raw messages are kept and encodes them for storage."""
+
+    def __init__(self, mode: str, sample_every: int = 1) -> None:
+        self.mode = mode
+        self.sample_every = sample_every
+        self._seen = 0
+
+    def keep(self) -> bool:
+        """Whether to keep the raw payload of the next message."""
+
+        if self.mode == "off":
+            return False
+        if self.mode == "sampled":
+            keep = self._seen % self.sample_every == 0
+            self._seen += 1
+            return keep
+        return True
+
+    def encode(self, raw: bytes) -> tuple[str, bytes] | None:
+        """``(codec, blob)`` to store for a telemetry message, or None to drop it."""
+
+        return compress(raw) if self.keep() else None
+
+
+def decode_raw(codec: str, blob: bytes) -> Any:
+    """The JSON document stored by :meth:`RawPayloadPolicy.encode`."""
+
+    return json_codec.loads(decompress(codec, blob))
@@ -0,0 +1,157 @@
+"""
+Request coalescing (single-flight)
+
+When a dashboard fleet reloads, many identical requests arrive within
+milliseconds of each other. Functions decorated with :func:`coalesce`
+run once per distinct set of arguments at a time: a call made while an
+identical call is in flight awaits that call's result (or exception)
+instead of running the same queries on another pooled connection.
+
+The key is the function's qualified name plus its arguments, normalized
+so equivalent values compare equal (datetimes in UTC, lists as tuples,
+pydantic models by their JSON). Arguments that are not plain values --
+database sessions, injected services -- are left out of the key, so
+callers with different sessions share one computation. That computation
+outlives the request that started it (its client may disconnect and its
+session be closed), so it runs in sessions of its own: each session
+argument is replaced by a new session on the same engine, closed when
+the call finishes. The caller's session is not used at all, so a request
+must do all its database work inside the coalesced call -- and coalesced
+functions must not call each other -- or it holds two pooled
+connections at once. Results are shared between callers and must not be
+mutated; only decorate functions whose results are fully loaded (no lazy
+ORM attributes) and that do not write through their session. Calls are
+only coalesced while in flight, so a request that arrives just after a
+write may be answered by a read that started before it.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import inspect
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+_IGNORED = object()
+_SCALARS = (str, int, float, bool, Enum, date, time, timedelta, Decimal, UUID)
+
+
+def _normalize(value: Any) -> Any:
+    """A hashable stand-in for ``value``, or ``_IGNORED`` if it is not a plain value."""
+
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.astimezone(UTC) if value.tzinfo is not None else value
+    if isinstance(value, _SCALARS):
+        return value
+    if isinstance(value, BaseModel):
+        return (type(value).__qualname__, value.model_dump_json())
+    if isinstance(value, (list, tuple)):
+        items = tuple(_normalize(item) for item in value)
+    elif isinstance(value, (set, frozenset)):
+        items = frozenset(_normalize(item) for item in value)
+    elif isinstance(value, dict):
+        items = tuple(sorted((str(key), _normalize(item)) for key, item in value.items()))
+        if any(item is _IGNORED for _, item in items):
+            return _IGNORED
+        return items
+    else:
+        return _IGNORED
+    return _IGNORED if _IGNORED in items else items
+
+
+@dataclass(slots=True)
+class _Counters:
+    calls: int = 0
+    coalesced: int = 0
+
+
+class SingleFlight:
+    """Shares the result of in-flight calls between identical callers."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+        self._counters: dict[str, _Counters] = {}
+
+    async def do(self, name: str, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``call()``, or await the identical call in flight under ``key``."""
+
+        counters = self._counters.setdefault(name, _Counters())
+        counters.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(call())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        else:
+            counters.coalesced += 1
+        # A caller going away (client disconnect) must not cancel the others.
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieved here so a failure nobody waits for any more is not reported as unhandled.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": sum(counters.calls for counters in self._counters.values()),
+            "coalesced": sum(counters.coalesced for counters in self._counters.values()),
+            "functions": {
+                name: {"calls": counters.calls, "coalesced": counters.coalesced}
+                for name, counters in sorted(self._counters.items())
+            },
+        }
+
+
+single_flight = SingleFlight()
+
+
+async def _call_in_own_sessions(func: Callable[..., Awaitable[T]], bound: inspect.BoundArguments) -> T:
+    """``func(*bound)`` with every session argument replaced by a new session on its engine."""
+
+    async with contextlib.AsyncExitStack() as stack:
+        shared = inspect.BoundArguments(bound.signature, dict(bound.arguments))
+        for param, value in shared.arguments.items():
+            if isinstance(value, AsyncSession):
+                own = AsyncSession(value.bind, expire_on_commit=False)
+                shared.arguments[param] = await stack.enter_async_context(own)
+        return await func(*shared.args, **shared.kwargs)
+
+
+def coalesce(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Decorate an async router function or crud helper for :data:`single_flight`."""
+
+    signature = inspect.signature(func)
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = ((param, _normalize(value)) for param, value in bound.arguments.items())
+        key = (name, *((param, value) for param, value in arguments if value is not _IGNORED))
+        return await single_flight.do(name, key, lambda: _call_in_own_sessions(func, bound))
+
+    # FastAPI resolves the endpoint's annotations in the wrapper's module;
+    # hand it the evaluated signature of the wrapped function instead.
+    try:
+        wrapper.__signature__ = inspect.signature(func, eval_str=True)
+    except NameError:
+        pass
+    return wrapper
@@ -0,0 +1,435 @@
+"""
+Cold-tier telemetry archive
+
+When ``TELEMETRY_ARCHIVE_DIR`` is set, whole UTC days of ``ven_telemetry``
+and ``ven_load_samples`` older than ``TELEMETRY_ARCHIVE_AFTER_DAYS`` are
+exported to Parquet files laid out as::
+
+    <dir>/<table>/date=YYYY-MM-DD/ven_bucket=NN/part-0.parquet
+
+``ven_bucket`` is a stable hash of the VEN id, so a single VEN's history is
+read from one file per day. Rows are sorted by VEN (and load) and
+timestamp, which keeps the row-group statistics selective for the ven_id
+and time filters pushed down by the readers. Load samples are stored
+together with their catalog attributes, so the files do not depend on
+``ven_loads``.
+
+A day is written under a hidden staging directory and renamed into place,
+then ``<dir>/_horizon`` is advanced past it. Everything before the horizon
+is read from the archive; history queries (see :mod:`app.crud`) read the
+rest from the database, so callers never see the boundary. Partition
+maintenance only drops partitions that lie entirely before the horizon.
+Rows ingested for a day after it was archived are not archived; keep
+``TELEMETRY_ARCHIVE_AFTER_DAYS`` above the longest ingest delay (e.g. spool
+replay).
+
+The :class:`TelemetryArchive` methods do blocking file I/O; call them via
+:func:`asyncio.to_thread`. Requires ``pyarrow``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+import zlib
+from collections.abc import Iterable, Sequence
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings, settings
+from app.models.telemetry import VenLoad, VenLoadSample, VenTelemetry
+from app.services.mqtt_consumer import SessionFactory
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = ds = pq = None
+
+HAS_PYARROW = pa is not None
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY = "ven_telemetry"
+LOAD_SAMPLES = "ven_load_samples"
+
+_HORIZON = "_horizon"
+_PART = "part-0.parquet"
+_ROW_GROUP_ROWS = 64 * 1024
+_EXPORT_CHUNK_ROWS = 10_000
+
+if HAS_PYARROW:
+    _TIMESTAMP = pa.timestamp("us", tz="UTC")
+    SCHEMAS = {
+        TELEMETRY: pa.schema(
+            [
+                ("id", pa.int64()),
+                ("ven_id", pa.string()),
+                ("timestamp", _TIMESTAMP),
+                ("used_power_kw", pa.float64()),
+                ("shed_power_kw", pa.float64()),
+                ("requested_reduction_kw", pa.float64()),
+                ("event_id", pa.string()),
+                ("battery_soc", pa.float64()),
+            ]
+        ),
+        LOAD_SAMPLES: pa.schema(
+            [
+                ("id", pa.int64()),
+                ("telemetry_id", pa.int64()),
+                ("ven_id", pa.string()),
+                ("load_id", pa.string()),
+                ("timestamp", _TIMESTAMP),
+                ("name", pa.string()),
+                ("type", pa.string()),
+                ("capacity_kw", pa.float64()),
+                ("priority", pa.int64()),
+                ("current_power_kw", pa.float64()),
+                ("shed_capability_kw", pa.float64()),
+                ("enabled", pa.bool_()),
+            ]
+        ),
+    }
+
+
+def ven_bucket(ven_id: str, buckets: int) -> int:
+    """Stable bucket of ``ven_id`` (unlike :func:`hash`, identical across processes)."""
+
+    return zlib.crc32(ven_id.encode("utf-8")) % buckets
+
+
+def _as_utc(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=UTC) if ts.tzinfo is None else ts.astimezone(UTC)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=UTC)
+
+
+class _DayWriter:
+    """Writes one table's rows of one day into per-bucket Parquet files."""
+
+    def __init__(self, directory: Path, table: str, buckets: int) -> None:
+        self.directory = directory
+        self.schema = SCHEMAS[table]
+        self.buckets = buckets
+        self.rows = 0
+        self._pending: dict[int, list[Sequence[Any]]] = {}
+        self._writers: dict[int, Any] = {}
+
+    def write(self, rows: Iterable[Sequence[Any]]) -> None:
+        ven_index = self.schema.get_field_index("ven_id")
+        for row in rows:
+            pending = self._pending.setdefault(ven_bucket(row[ven_index], self.buckets), [])
+            pending.append(row)
+            self.rows += 1
+        for bucket in [bucket for bucket, pending in self._pending.items() if len(pending) >= _ROW_GROUP_ROWS]:
+            self._flush(bucket)
+
+    def close(self) -> None:
+        for bucket in list(self._pending):
+            self._flush(bucket)
+        for writer in self._writers.values():
+            writer.close()
+
+    def _flush(self, bucket: int) -> None:
+        rows = self._pending.pop(bucket)
+        if not rows:
+            return
+        columns = list(zip(*rows))
+        table = pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, self.schema)],
+            schema=self.schema,
+        )
+        writer = self._writers.get(bucket)
+        if writer is None:
+            path = self.directory / f"ven_bucket={bucket:02d}" / _PART
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = self._writers[bucket] = pq.ParquetWriter(path, self.schema)
+        writer.write_table(table, row_group_size=_ROW_GROUP_ROWS)
+
+
+class TelemetryArchive:
+    """Parquet files of archived telemetry and load samples under ``root``."""
+
+    def __init__(self, root: str | os.PathLike[str], ven_buckets: int) -> None:
+        if not HAS_PYARROW:
+            raise RuntimeError("pyarrow is required for the telemetry archive")
+        self.root = Path(root)
+        self.ven_buckets = ven_buckets
+
+    def horizon(self) -> datetime | None:
+        """Start of the first day not archived yet; None before the first export."""
+
+        try:
+            value = (self.root / _HORIZON).read_text().strip()
+        except FileNotFoundError:
+            return None
+        return _day_start(date.fromisoformat(value))
+
+    def set_horizon(self, day: date) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".{_HORIZON}"
+        staging.write_text(day.isoformat())
+        os.replace(staging, self.root / _HORIZON)
+
+    # -- export -----------------------------------------------------------
+
+    def open_day(self, table: str, day: date) -> _DayWriter:
+        """Writer for ``table`` on ``day``; :meth:`publish_day` makes it visible."""
+
+        staging = self._table_dir(table) / f".date={day.isoformat()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        return _DayWriter(staging, table, self.ven_buckets)
+
+    def publish_day(self, table: str, day: date, writer: _DayWriter) -> None:
+        writer.close()
+        target = self._table_dir(table) / f"date={day.isoformat()}"
+        # A previous export of the day (interrupted before the horizon was
+        # advanced) is replaced as a whole.
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(writer.directory, target)
+
+    # -- read-through -----------------------------------------------------
+
+    def read_telemetry(
+        self,
+        ven_id: str | None,
+        start: datetime | None,
+        end: datetime,
+        include_end: bool = True,
+    ) -> list[dict[str, Any]]:
+        """Archived telemetry of one VEN (or the fleet) in ``start``/``end``, oldest first."""
+
+        return self._read(TELEMETRY, ven_id, start, end, include_end, ["timestamp"])
+
+    def read_load_samples(
+        self,
+        ven_id: str,
+        start: datetime | None,
+        end: datetime,
+        include_end: bool = True,
+        load_id: str | None = None,
+        limit: int | None = None,
+        after: tuple[datetime, int] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Archived load samples of ``ven_id`` in ``start``/``end``, oldest first.
+
+        With ``after``, only samples after that ``(timestamp, id)`` key.
+        """
+
+        criteria = [] if load_id is None else [ds.field("load_id") == load_id]
+        if after is not None:
+            after_ts = pa.scalar(_as_utc(after[0]), type=_TIMESTAMP)
+            criteria.append(
+                (ds.field("timestamp") > after_ts)
+                | ((ds.field("timestamp") == after_ts) & (ds.field("id") > after[1]))
+            )
+        return self._read(LOAD_SAMPLES, ven_id, start, end, include_end, ["timestamp", "id"], criteria, limit)
+
+    def _read(
+        self,
+        table: str,
+        ven_id: str | None,
+        start: datetime | None,
+        end: datetime,
+        include_end: bool,
+        order: list[str],
+        criteria: Sequence[Any] = (),
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        end = _as_utc(end)
+        start = _as_utc(start) if start is not None else None
+
+        paths = self._paths(table, ven_id, start, end)
+        if not paths:
+            return []
+        criteria = list(criteria)
+        if ven_id is not None:
+            criteria.append(ds.field("ven_id") == ven_id)
+        if start is not None:
+            criteria.append(ds.field("timestamp") >= pa.scalar(start, type=_TIMESTAMP))
+        upper = pa.scalar(end, type=_TIMESTAMP)
+        criteria.append(ds.field("timestamp") <= upper if include_end else ds.field("timestamp") < upper)
+        expression = criteria[0]
+        for criterion in criteria[1:]:
+            expression = expression & criterion
+
+        dataset = ds.dataset(paths, schema=SCHEMAS[table], format="parquet")
+        result = dataset.to_table(filter=expression).sort_by([(column, "ascending") for column in order])
+        if limit is not None:
+            result = result.slice(0, limit)
+        return result.to_pylist()
+
+    def _paths(self, table: str, ven_id: str | None, start: datetime | None, end: datetime) -> list[str]:
+        """Files that can hold rows of ``ven_id`` between ``start`` and ``end``."""
+
+        directory = self._table_dir(table)
+        if not directory.is_dir():
+            return []
+        first = f"date={start.date().isoformat()}" if start is not None else ""
+        last = f"date={end.date().isoformat()}"
+        days = sorted(
+            entry.path for entry in os.scandir(directory) if entry.is_dir() and first <= entry.name <= last
+        )
+        if ven_id is None:
+            return [str(path) for day in days for path in sorted(Path(day).glob(f"ven_bucket=*/{_PART}"))]
+        bucket = f"ven_bucket={ven_bucket(ven_id, self.ven_buckets):02d}"
+        paths = (Path(day) / bucket / _PART for day in days)
+        return [str(path) for path in paths if path.exists()]
+
+    def _table_dir(self, table: str) -> Path:
+        return self.root / table
+
+
+def open_archive(config: Settings) -> TelemetryArchive | None:
+    """The archive configured by ``config``; None when archiving is disabled."""
+
+    if config.telemetry_archive_dir is None:
+        return None
+    return TelemetryArchive(config.telemetry_archive_dir, config.telemetry_archive_ven_buckets)
+
+
+telemetry_archive = open_archive(settings)
+
+
+_TELEMETRY_EXPORT = select(
+    VenTelemetry.id,
+    VenTelemetry.ven_id,
+    VenTelemetry.timestamp,
+    VenTelemetry.used_power_kw,
+    VenTelemetry.shed_power_kw,
+    VenTelemetry.requested_reduction_kw,
+    VenTelemetry.event_id,
+    VenTelemetry.battery_soc,
+)
+
+_LOAD_SAMPLES_EXPORT = select(
+    VenLoadSample.id,
+    VenLoadSample.telemetry_id,
+    VenLoad.ven_id,
+    VenLoad.load_id,
+    VenLoadSample.timestamp,
+    VenLoad.name,
+    VenLoad.type,
+    VenLoad.capacity_kw,
+    VenLoad.priority,
+    VenLoadSample.current_power_kw,
+    VenLoadSample.shed_capability_kw,
+    VenLoadSample.enabled,
+).join(VenLoad, VenLoad.id == VenLoadSample.load_ref)
+
+
+class TelemetryArchiver:
+    """Exports closed days of telemetry to the archive and advances its horizon."""
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        config: Settings | None = None,
+        archive: TelemetryArchive | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._config = config or settings
+        self._archive = archive if archive is not None else open_archive(self._config)
+        self._task: asyncio.Task | None = None
+        self.archived_days = 0
+        self.archived_rows = 0
+        self.last_run: datetime | None = None
+
+    async def start(self) -> None:
+        if self._archive is None:
+            return
+        if self._task is not None:
+            logger.warning("Telemetry archiver already started")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "archived_days": self.archived_days,
+            "archived_rows": self.archived_rows,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+    async def run_once(self, now: datetime | None = None) -> None:
+        """Export every day before the archive cutoff that is not archived yet."""
+
+        if self._archive is None:
+            return
+        now = now or datetime.now(UTC)
+        cutoff = (now - timedelta(days=self._config.telemetry_archive_after_days)).date()
+        gen = self._session_factory()
+        session = await anext(gen)
+        try:
+            horizon = await asyncio.to_thread(self._archive.horizon)
+            day = horizon.date() if horizon is not None else await self._oldest_day(session)
+            while day is not None and day < cutoff:
+                rows = await self._export_day(session, day)
+                await asyncio.to_thread(self._archive.set_horizon, day + timedelta(days=1))
+                self.archived_days += 1
+                self.archived_rows += rows
+                logger.info("Telemetry day archived", extra={"day": day.isoformat(), "rows": rows})
+                day += timedelta(days=1)
+        finally:
+            await gen.aclose()
+            self.last_run = now
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Telemetry archiving failed")
+            await asyncio.sleep(self._config.telemetry_archive_interval_s)
+
+    async def _oldest_day(self, session: AsyncSession) -> date | None:
+        oldest = [
+            await session.scalar(select(func.min(VenTelemetry.timestamp))),
+            await session.scalar(select(func.min(VenLoadSample.timestamp))),
+        ]
+        oldest = [_as_utc(ts) for ts in oldest if ts is not None]
+        return min(oldest).date() if oldest else None
+
+    async def _export_day(self, session: AsyncSession, day: date) -> int:
+        lower = _day_start(day)
+        upper = lower + timedelta(days=1)
+        exports = (
+            (TELEMETRY, _TELEMETRY_EXPORT, VenTelemetry.timestamp, (VenTelemetry.ven_id, VenTelemetry.timestamp)),
+            (
+                LOAD_SAMPLES,
+                _LOAD_SAMPLES_EXPORT,
+                VenLoadSample.timestamp,
+                (VenLoad.ven_id, VenLoad.load_id, VenLoadSample.timestamp),
+            ),
+        )
+        rows = 0
+        for table, stmt, timestamp, order in exports:
+            writer = await asyncio.to_thread(self._archive.open_day, table, day)
+            result = await session.stream(stmt.where(timestamp >= lower, timestamp < upper).order_by(*order))
+            async for chunk in result.partitions(_EXPORT_CHUNK_ROWS):
+                await asyncio.to_thread(writer.write, chunk)
+            await asyncio.to_thread(self._archive.publish_day, table, day, writer)
+            rows += writer.rows
+        # Release the snapshot held by the export reads.
+        await session.commit()
+        return rows
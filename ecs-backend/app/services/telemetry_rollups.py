@@ -0,0 +1,305 @@
+"""
+Telemetry rollups
+
+Telemetry is aggregated into per-VEN buckets of 1 minute, 5 minutes and
+1 hour (:mod:`app.models.telemetry_rollup`) as it is ingested:
+:func:`upsert_rollups` runs in the ingest transaction and merges the new
+samples into their buckets with ``INSERT ... ON CONFLICT DO UPDATE``, so a
+sample arriving late simply updates an older bucket. Each bucket keeps the
+event id of its latest sample that has one, as raw telemetry bucketing
+does, together with that sample's timestamp. Only samples that were
+actually inserted are passed in, so re-delivered samples are not counted
+twice.
+
+History endpoints read the coarsest rollup whose resolution divides the
+requested granularity (:func:`rollup_resolution`) and fall back to raw
+telemetry otherwise. Either way the buckets of the requested granularity
+are aggregated in SQL (:func:`history_buckets`), so a history costs one row
+per bucket however many samples it covers.
+
+Fleet-wide buckets (``fleet_telemetry_rollups``) are not maintained on
+ingest: their current rows would be updated by every ingest transaction,
+serializing the parallel shard writers on their row locks. Instead a
+single periodic job (:class:`app.services.fleet_rollups.FleetRollups`)
+folds closed per-VEN buckets into them (:func:`fold_fleet_rollups`), and
+fleet history reads them up to :func:`fleet_horizon` and sums the per-VEN
+rollups of the buckets after it.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import BigInteger, Integer, Select, and_, case, cast, extract, func, literal_column, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models import FleetTelemetryRollup, VenTelemetryRollup
+
+# Bucket sizes in seconds, finest first.
+ROLLUP_RESOLUTIONS = (60, 300, 3600)
+
+# Rollup column prefix -> telemetry column.
+_MEASURES = {
+    "used_power": "used_power_kw",
+    "shed_power": "shed_power_kw",
+    "requested_reduction": "requested_reduction_kw",
+}
+
+
+def rollup_resolution(bucket_seconds: int) -> int | None:
+    """Coarsest rollup whose buckets tile ``bucket_seconds`` exactly, if any."""
+
+    for resolution in reversed(ROLLUP_RESOLUTIONS):
+        if bucket_seconds % resolution == 0:
+            return resolution
+    return None
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are UTC.
+    return timestamp.replace(tzinfo=UTC) if timestamp.tzinfo is None else timestamp.astimezone(UTC)
+
+
+def bucket_start(timestamp: datetime, bucket_seconds: int) -> datetime:
+    """Start of the epoch-aligned bucket containing ``timestamp``, in UTC."""
+
+    epoch = int(_as_utc(timestamp).timestamp())
+    return datetime.fromtimestamp(epoch - epoch % bucket_seconds, tz=UTC)
+
+
+def bucket_epoch(column: Any, bucket_seconds: int, dialect: str) -> Any:
+    """SQL counterpart of :func:`bucket_start`, as epoch seconds."""
+
+    if dialect == "sqlite":
+        epoch = cast(func.strftime("%s", column), Integer)
+    else:
+        epoch = cast(func.floor(extract("epoch", column)), BigInteger)
+    # Inlined rather than bound, so the expression renders identically in the
+    # select list and in GROUP BY.
+    return epoch - epoch % literal_column(str(int(bucket_seconds)))
+
+
+def _empty_bucket() -> dict[str, Any]:
+    bucket: dict[str, Any] = {"sample_count": 0, "event_id": None, "event_at": None}
+    for measure in _MEASURES:
+        bucket.update({f"{measure}_sum": 0.0, f"{measure}_count": 0, f"{measure}_min": None, f"{measure}_max": None})
+    return bucket
+
+
+def _add_sample(bucket: dict[str, Any], sample: dict[str, Any]) -> None:
+    bucket["sample_count"] += 1
+    for measure, column in _MEASURES.items():
+        value = sample.get(column)
+        if value is None:
+            continue
+        bucket[f"{measure}_sum"] += value
+        bucket[f"{measure}_count"] += 1
+        low, high = bucket[f"{measure}_min"], bucket[f"{measure}_max"]
+        bucket[f"{measure}_min"] = value if low is None else min(low, value)
+        bucket[f"{measure}_max"] = value if high is None else max(high, value)
+    event_id = sample.get("event_id")
+    if event_id:
+        # The latest sample with an event wins; ties go to the greater id, as in SQL.
+        event_at = _as_utc(sample["timestamp"])
+        if bucket["event_at"] is None or (event_at, event_id) > (bucket["event_at"], bucket["event_id"]):
+            bucket["event_id"], bucket["event_at"] = event_id, event_at
+
+
+def rollup_rows(samples: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Aggregate telemetry rows into per-VEN rollup rows.
+
+    Rows come back sorted by primary key so concurrent ingest transactions
+    lock shared buckets in the same order.
+    """
+
+    per_ven: dict[tuple[str, int, datetime], dict[str, Any]] = {}
+    for sample in samples:
+        for resolution in ROLLUP_RESOLUTIONS:
+            start = bucket_start(sample["timestamp"], resolution)
+            _add_sample(per_ven.setdefault((sample["ven_id"], resolution, start), _empty_bucket()), sample)
+
+    return [
+        {"ven_id": ven_id, "bucket_seconds": resolution, "bucket_start": start, **bucket}
+        for (ven_id, resolution, start), bucket in sorted(per_ven.items())
+    ]
+
+
+def bucket_rows(samples: Iterable[dict[str, Any]], bucket_seconds: int) -> list[dict[str, Any]]:
+    """Aggregate telemetry rows into ``bucket_seconds`` buckets in Python.
+
+    The rows have the shape of :func:`history_buckets` rows, for samples
+    that are not in the database (e.g. archived ones).
+    """
+
+    buckets: dict[datetime, dict[str, Any]] = {}
+    for sample in sorted(samples, key=lambda sample: _as_utc(sample["timestamp"])):
+        start = bucket_start(sample["timestamp"], bucket_seconds)
+        _add_sample(buckets.setdefault(start, _empty_bucket()), sample)
+    return [{"bucket_start": start, **bucket} for start, bucket in sorted(buckets.items())]
+
+
+def history_buckets(
+    dialect: str,
+    bucket_seconds: int,
+    timestamp: Any,
+    sample_count: Any,
+    measures: dict[str, tuple[Any, Any]],
+    event_id: Any,
+    criteria: list[Any],
+    event_lookup: Callable[[Any], Any],
+    source: Any = None,
+    event_time: Any = None,
+) -> Select:
+    """
+    Aggregate rows into ``bucket_seconds`` buckets of ``timestamp`` in SQL.
+
+    ``measures`` maps each of ``used_power``, ``shed_power`` and
+    ``requested_reduction`` to its ``(sum, count)`` aggregates. Rows hold
+    ``bucket`` (the bucket start in epoch seconds), ``sample_count``, the
+    ``<measure>_sum`` and ``<measure>_count`` columns and ``event_id``: the
+    event of the latest row in the bucket that has one, read by
+    ``event_lookup(latest_timestamp)``, a scalar subquery. Rows are ordered
+    for that by ``event_time`` (``timestamp`` unless given, e.g. a rollup's
+    ``event_at``). ``source`` overrides the FROM clause (e.g. for a join).
+    """
+
+    bucket = bucket_epoch(timestamp, bucket_seconds, dialect)
+    columns = [bucket.label("bucket"), sample_count.label("sample_count")]
+    for measure in _MEASURES:
+        total, count = measures[measure]
+        columns += [func.coalesce(total, 0.0).label(f"{measure}_sum"), count.label(f"{measure}_count")]
+    event_time = timestamp if event_time is None else event_time
+    columns.append(func.max(case((event_id.is_not(None), event_time))).label("event_at"))
+    stmt = select(*columns)
+    if source is not None:
+        stmt = stmt.select_from(source)
+    buckets = stmt.where(*criteria).group_by(bucket).subquery()
+    return select(
+        *(column for column in buckets.c if column.name != "event_at"),
+        event_lookup(buckets.c.event_at).label("event_id"),
+    ).order_by(buckets.c.bucket)
+
+
+def _upsert(dialect: str) -> Any:
+    dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+    # SQLite's two-argument min()/max() are its scalar LEAST/GREATEST.
+    least, greatest = (func.min, func.max) if dialect == "sqlite" else (func.least, func.greatest)
+    stmt = dialect_insert(VenTelemetryRollup)
+    current, new = VenTelemetryRollup.__table__.c, stmt.excluded
+
+    merged: dict[str, Any] = {"sample_count": current.sample_count + new.sample_count}
+    for measure in _MEASURES:
+        merged[f"{measure}_sum"] = current[f"{measure}_sum"] + new[f"{measure}_sum"]
+        merged[f"{measure}_count"] = current[f"{measure}_count"] + new[f"{measure}_count"]
+        for name, pick in (("min", least), ("max", greatest)):
+            old, added = current[f"{measure}_{name}"], new[f"{measure}_{name}"]
+            merged[f"{measure}_{name}"] = pick(func.coalesce(old, added), func.coalesce(added, old))
+    # Only an event seen at a later sample (or the same one, with a greater id) replaces the stored one.
+    take_new = and_(
+        new.event_at.is_not(None),
+        or_(
+            current.event_at.is_(None),
+            new.event_at > current.event_at,
+            and_(new.event_at == current.event_at, new.event_id > current.event_id),
+        ),
+    )
+    merged["event_id"] = case((take_new, new.event_id), else_=current.event_id)
+    merged["event_at"] = case((take_new, new.event_at), else_=current.event_at)
+    return stmt.on_conflict_do_update(index_elements=["ven_id", "bucket_seconds", "bucket_start"], set_=merged)
+
+
+async def upsert_rollups(session: AsyncSession, samples: list[dict[str, Any]]) -> None:
+    """Merge newly inserted telemetry ``samples`` into the rollup table."""
+
+    if not samples:
+        return
+    dialect = (await session.connection()).dialect.name
+    await session.execute(_upsert(dialect), rollup_rows(samples))
+
+
+async def fleet_horizon(session: AsyncSession, resolution: int, now: datetime | None = None) -> datetime | None:
+    """End of the fleet rollups of ``resolution``: buckets before it are folded.
+
+    None while nothing is folded. Never past the open bucket containing
+    ``now``, which is only complete in the per-VEN rollups.
+    """
+
+    newest = await session.scalar(
+        select(func.max(FleetTelemetryRollup.bucket_start)).where(FleetTelemetryRollup.bucket_seconds == resolution)
+    )
+    if newest is None:
+        return None
+    return min(_as_utc(newest) + timedelta(seconds=resolution), bucket_start(now or datetime.now(UTC), resolution))
+
+
+def _fleet_buckets(resolution: int, lower: datetime | None, upper: datetime) -> Select:
+    """Fleet rollup rows of the per-VEN buckets of ``resolution`` in ``lower``/``upper``."""
+
+    rollup = VenTelemetryRollup
+    table = rollup.__table__.c
+    columns = [rollup.bucket_start, func.sum(rollup.sample_count).label("sample_count")]
+    for measure in _MEASURES:
+        columns += [
+            func.sum(table[f"{measure}_sum"]).label(f"{measure}_sum"),
+            func.sum(table[f"{measure}_count"]).label(f"{measure}_count"),
+            func.min(table[f"{measure}_min"]).label(f"{measure}_min"),
+            func.max(table[f"{measure}_max"]).label(f"{measure}_max"),
+        ]
+    columns.append(func.max(rollup.event_at).label("event_at"))
+    criteria = [rollup.bucket_seconds == resolution, rollup.bucket_start < upper]
+    if lower is not None:
+        criteria.append(rollup.bucket_start >= lower)
+    buckets = select(*columns).where(*criteria).group_by(rollup.bucket_start).subquery()
+
+    # The event of the latest VEN sample with one; ties go to the greater id.
+    latest = aliased(rollup)
+    event_id = select(func.max(latest.event_id)).where(
+        latest.bucket_seconds == resolution,
+        latest.bucket_start == buckets.c.bucket_start,
+        latest.event_at == buckets.c.event_at,
+    )
+    return select(buckets, event_id.scalar_subquery().label("event_id")).order_by(buckets.c.bucket_start)
+
+
+def _fleet_upsert(dialect: str) -> Any:
+    dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+    stmt = dialect_insert(FleetTelemetryRollup)
+    # A fold recomputes whole buckets, so it replaces what an earlier one wrote.
+    replaced = {
+        column.name: stmt.excluded[column.name]
+        for column in FleetTelemetryRollup.__table__.c
+        if not column.primary_key
+    }
+    return stmt.on_conflict_do_update(index_elements=["bucket_seconds", "bucket_start"], set_=replaced)
+
+
+async def fold_fleet_rollups(session: AsyncSession, lookback: timedelta, now: datetime | None = None) -> int:
+    """Recompute the closed fleet buckets from the per-VEN rollups; returns how many were written.
+
+    For each resolution, the closed buckets starting within ``lookback``
+    (at least one bucket) of ``now`` are recomputed, so samples late by up
+    to that much are included; when the newest fleet bucket is older, the
+    fold continues from it, and with no fleet bucket yet it covers every
+    per-VEN bucket. The caller commits.
+    """
+
+    now = now or datetime.now(UTC)
+    dialect = (await session.connection()).dialect.name
+    rows: list[dict[str, Any]] = []
+    for resolution in ROLLUP_RESOLUTIONS:
+        upper = bucket_start(now, resolution)
+        lower = bucket_start(now - max(lookback, timedelta(seconds=resolution)), resolution)
+        newest = await session.scalar(
+            select(func.max(FleetTelemetryRollup.bucket_start)).where(
+                FleetTelemetryRollup.bucket_seconds == resolution
+            )
+        )
+        lower = None if newest is None else min(lower, _as_utc(newest))
+        for row in (await session.execute(_fleet_buckets(resolution, lower, upper))).all():
+            rows.append({**row._mapping, "bucket_seconds": resolution, "bucket_start": _as_utc(row.bucket_start)})
+    if rows:
+        await session.execute(_fleet_upsert(dialect), rows)
+    return len(rows)
@@ -0,0 +1,121 @@
+"""
+Pre-serialized VEN fragments
+
+Listing a large fleet is dominated by building a ``Ven`` (with its
+``VenMetrics``, ``Location`` and one ``Load`` per circuit) or ``VenSummary``
+model per VEN and having FastAPI validate and serialize each of them again.
+Instead, the JSON of each VEN's entry is kept per view, together with the
+version of the inputs it was rendered from -- the VEN's latest telemetry id
+and its status version (latest ``ven_status`` row and the VEN's own
+columns). A listing compares the stored versions with the current ones,
+renders only the VENs that changed, and concatenates the fragments into the
+response body.
+
+Fragments are rendered like FastAPI's ``JSONResponse`` renders a
+``response_model``, so the assembled bytes are what the endpoint would
+otherwise return. Fragments of VENs missing from a listing of the whole
+fleet are dropped.
+"""
+from __future__ import annotations
+
+import json
+from collections.abc import Hashable, Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.core.config import Settings, settings
+
+
+def encode(model: BaseModel) -> bytes:
+    """``model`` as JSON, byte for byte as FastAPI returns a response model."""
+
+    return json.dumps(
+        model.model_dump(mode="json", by_alias=True),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+@dataclass(slots=True)
+class _View:
+    # ven_id -> (version, fragment)
+    fragments: dict[str, tuple[Hashable, bytes]] = field(default_factory=dict)
+    served: int = 0
+    rendered: int = 0
+
+
+class VenFragments:
+    """Serialized per-VEN entries of the fleet listings, by view."""
+
+    def __init__(self) -> None:
+        self._views: dict[str, _View] = {}
+
+    def missing(self, view: str, versions: Mapping[str, Hashable]) -> list[str]:
+        """VENs of ``versions`` without a fragment of that version."""
+
+        fragments = self._view(view).fragments
+        return [
+            ven_id
+            for ven_id, version in versions.items()
+            if (entry := fragments.get(ven_id)) is None or entry[0] != version
+        ]
+
+    def put(self, view: str, ven_id: str, version: Hashable, model: BaseModel) -> None:
+        state = self._view(view)
+        state.fragments[ven_id] = (version, encode(model))
+        state.rendered += 1
+
+    def assemble(self, view: str, ven_ids: Iterable[str], prune: bool = True) -> bytes:
+        """The JSON array of the fragments of ``ven_ids``, in that order.
+
+        With ``prune`` (a listing of the whole fleet), fragments of other
+        VENs are dropped. A VEN whose fragment was dropped by a concurrent
+        listing (it was deleted meanwhile) is left out.
+        """
+
+        state = self._view(view)
+        listed = {}
+        for ven_id in ven_ids:
+            entry = state.fragments.get(ven_id)
+            if entry is not None:
+                listed[ven_id] = entry
+        state.served += len(listed)
+        if prune:
+            state.fragments = listed
+        return b"[" + b",".join(fragment for _, fragment in listed.values()) + b"]"
+
+    def forget(self, ven_id: str) -> None:
+        for state in self._views.values():
+            state.fragments.pop(ven_id, None)
+
+    def _view(self, view: str) -> _View:
+        return self._views.setdefault(view, _View())
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "views": {
+                view: {
+                    "fragments": len(state.fragments),
+                    "bytes": sum(len(fragment) for _, fragment in state.fragments.values()),
+                    # Fragments served, including those rendered for the request.
+                    "served": state.served,
+                    "rendered": state.rendered,
+                }
+                for view, state in sorted(self._views.items())
+            }
+        }
+
+
+def open_ven_fragments(config: Settings) -> VenFragments | None:
+    """The fragment store configured by ``config``, or None if disabled."""
+
+    if not config.ven_fragments_enabled:
+        return None
+    return VenFragments()
+
+
+ven_fragments = open_ven_fragments(settings)
@@ -0,0 +1,145 @@
+"""
+In-process VEN registry
+
+Caches which VENs exist so the ingest path does not have to look every VEN
+up in the database, and coalesces heartbeats in memory so the hot ``vens``
+rows are updated once per flush interval instead of once per message.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from datetime import UTC, datetime
+
+from sqlalchemy import String, bindparam, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import ARRAY, TIMESTAMP
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ven import VEN as VENModel
+
+logger = logging.getLogger(__name__)
+
+_UNNEST_HEARTBEAT_UPDATE = text(
+    """
+    UPDATE vens
+    SET last_heartbeat = hb.seen_at, status = 'online'
+    FROM unnest(:ven_ids, :seen_at) AS hb(ven_id, seen_at)
+    WHERE vens.ven_id = hb.ven_id
+    """
+).bindparams(
+    bindparam("ven_ids", type_=ARRAY(String)),
+    bindparam("seen_at", type_=ARRAY(TIMESTAMP(timezone=True))),
+)
+
+
+class VenRegistry:
+    """
+    Set of VEN ids known to exist plus heartbeats waiting to be written.
+
+    ``known`` only ever contains VENs that were confirmed in the database by
+    a committed transaction, so a positive lookup can skip the ``vens``
+    query entirely. Misses always fall back to the database. Entries go
+    stale if a VEN is deleted by another process; the ingest path evicts
+    them when a write hits a foreign-key violation.
+    """
+
+    def __init__(self) -> None:
+        self._known: set[str] = set()
+        self._pending: dict[str, datetime] = {}
+        self._flushes = 0
+        self._flushed_heartbeats = 0
+
+    def is_known(self, ven_id: str) -> bool:
+        return ven_id in self._known
+
+    def mark_known(self, ven_ids: Iterable[str]) -> None:
+        self._known.update(ven_ids)
+
+    def forget(self, ven_id: str) -> None:
+        """Drop a VEN from the cache, e.g. after it was deleted."""
+        self._known.discard(ven_id)
+        self._pending.pop(ven_id, None)
+
+    def record_heartbeat(self, ven_id: str, seen_at: datetime | None = None) -> None:
+        seen_at = seen_at or datetime.now(UTC)
+        previous = self._pending.get(ven_id)
+        if previous is None or seen_at > previous:
+            self._pending[ven_id] = seen_at
+
+    async def ensure_registered(self, session: AsyncSession, ven_ids: Iterable[str]) -> set[str]:
+        """
+        Make sure every VEN in ``ven_ids`` has a ``vens`` row.
+
+        Unknown VENs are looked up with one query and the missing ones are
+        auto-registered with one insert. Returns the ids that were not yet
+        known; the caller passes them to :meth:`mark_known` once the
+        surrounding transaction has committed.
+        """
+        unknown = {ven_id for ven_id in ven_ids if ven_id not in self._known}
+        if not unknown:
+            return unknown
+
+        result = await session.execute(select(VENModel.ven_id).where(VENModel.ven_id.in_(unknown)))
+        missing = sorted(unknown - set(result.scalars().all()))
+        if missing:
+            logger.info("Auto-registering new VENs", extra={"ven_ids": missing})
+            now = datetime.now(UTC)
+            # Another process may register the same VEN concurrently.
+            dialect = (await session.connection()).dialect.name
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            await session.execute(
+                insert(VENModel).on_conflict_do_nothing(index_elements=[VENModel.ven_id]),
+                [
+                    {
+                        "ven_id": ven_id,
+                        "name": f"Auto-registered VEN {ven_id}",
+                        "status": "online",
+                        "registration_id": ven_id,
+                        "last_heartbeat": now,
+                    }
+                    for ven_id in missing
+                ],
+            )
+        return unknown
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Write all pending heartbeats with one set-based UPDATE and commit."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            if (await session.connection()).dialect.name == "postgresql":
+                await session.execute(
+                    _UNNEST_HEARTBEAT_UPDATE,
+                    {"ven_ids": list(pending), "seen_at": list(pending.values())},
+                )
+            else:
+                table = VENModel.__table__
+                await session.execute(
+                    update(table)
+                    .where(table.c.ven_id == bindparam("b_ven_id"))
+                    .values(last_heartbeat=bindparam("b_seen_at"), status="online"),
+                    [{"b_ven_id": ven_id, "b_seen_at": seen_at} for ven_id, seen_at in pending.items()],
+                )
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            for ven_id, seen_at in pending.items():
+                self.record_heartbeat(ven_id, seen_at)
+            raise
+        self._flushes += 1
+        self._flushed_heartbeats += len(pending)
+        return len(pending)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "known_vens": len(self._known),
+            "pending_heartbeats": len(self._pending),
+            "flushes": self._flushes,
+            "flushed_heartbeats": self._flushed_heartbeats,
+        }
+
+
+# Process-wide registry shared by the ingest path and the API routers.
+ven_registry = VenRegistry()
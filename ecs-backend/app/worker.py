@@ -0,0 +1,57 @@
+"""
+Standalone background worker
+
+Runs the MQTT consumer, event command service, VEN heartbeat monitor,
+telemetry archiver and partition maintenance without the HTTP API, so ingest scales
+independently of API workers::
+
+    python -m app.worker
+
+Run the API with ``BACKGROUND_SERVICES_ENABLED=false`` alongside it so the
+services are not started twice. SIGINT/SIGTERM stop the worker after the
+ingest queues have drained.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+import sys
+
+from app.core.config import settings
+from app.dependencies import get_session, get_ven_registry
+from app.services.background import BackgroundServices
+
+logger = logging.getLogger("app.worker")
+
+
+async def run() -> None:
+    services = BackgroundServices(settings, session_factory=get_session, registry=get_ven_registry())
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopping.set)
+
+    try:
+        await services.start()
+        logger.info("Background worker running")
+        await stopping.wait()
+    finally:
+        # Stops whatever started, in reverse order, also when a later start failed.
+        logger.info("Background worker shutting down")
+        await services.stop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(signum)
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
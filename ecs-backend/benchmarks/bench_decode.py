@@ -0,0 +1,107 @@
+"""
+Per-message CPU cost of turning an MQTT metering payload into insert rows.
+
+Compares the previous path (bytes -> str -> json.loads -> model_validate ->
+model_dump per load) with the consumer's current one (parse from bytes,
+no per-load raw copies). No database is touched.
+
+Run from ``ecs-backend``::
+
+    python -m benchmarks.bench_decode [--messages 20000] [--loads 8]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+
+for _name, _value in (
+    ("DB_HOST", "bench"),
+    ("DB_USER", "bench"),
+    ("DB_PASSWORD", "bench"),
+    ("DB_NAME", "bench"),
+):
+    os.environ.setdefault(_name, _value)
+
+from app.core import json_codec  # noqa: E402
+from app.core.config import Settings  # noqa: E402
+from app.schemas.telemetry import TelemetryPayload  # noqa: E402
+from app.services.ingest_writer import IngestBatch  # noqa: E402
+from app.services.mqtt_consumer import MQTTConsumer, _QueuedMessage  # noqa: E402
+
+
+def build_payload(loads: int) -> bytes:
+    return json.dumps(
+        {
+            "venId": "bench-ven",
+            "timestamp": 1700000000,
+            "usedPowerKw": 4.2,
+            "shedPowerKw": 0.8,
+            "eventId": "evt-bench",
+            "batterySoc": 0.55,
+            "loads": [
+                {
+                    "id": f"load-{i}",
+                    "name": f"Load {i}",
+                    "type": "hvac",
+                    "capacityKw": 5.0,
+                    "currentPowerKw": 1.25,
+                    "shedCapabilityKw": 0.5,
+                    "enabled": True,
+                    "priority": i,
+                }
+                for i in range(loads)
+            ],
+        }
+    ).encode()
+
+
+def legacy_decode(payload: bytes) -> tuple[dict, list[dict]]:
+    """The decode path before the fast path was introduced."""
+    data = json.loads(payload.decode("utf-8"))
+    model = TelemetryPayload.model_validate(data)
+    loads = [
+        {
+            "load_id": load.load_id,
+            "current_power_kw": load.current_power_kw,
+            "raw_payload": load.model_dump(mode="json", by_alias=True),
+        }
+        for load in model.loads
+    ]
+    return data, loads
+
+
+def run(label: str, func, payload: bytes, messages: int) -> float:
+    for _ in range(min(messages, 1000)):
+        func(payload)
+    started = time.process_time()
+    for _ in range(messages):
+        func(payload)
+    per_message_us = (time.process_time() - started) / messages * 1e6
+    print(f"{label:<10} {per_message_us:8.1f} us/message")
+    return per_message_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--loads", type=int, default=8)
+    args = parser.parse_args()
+
+    config = Settings(DB_HOST="bench", DB_USER="bench", DB_PASSWORD="bench", DB_NAME="bench")
+    consumer = MQTTConsumer(config=config, session_factory=lambda: None)
+    topic = config.mqtt_topic_metering
+
+    def current(payload: bytes) -> None:
+        consumer._collect(IngestBatch(), _QueuedMessage(topic, payload))
+
+    payload = build_payload(args.loads)
+    print(f"{args.messages} messages, {args.loads} loads each, orjson={json_codec.HAS_ORJSON}")
+    before = run("before", legacy_decode, payload, args.messages)
+    after = run("after", current, payload, args.messages)
+    print(f"speedup    {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
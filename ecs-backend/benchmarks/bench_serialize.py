@@ -0,0 +1,161 @@
+"""
+Response serialization cost of the heavy list and history endpoints.
+
+Compares, for the same content, the response-model path (build pydantic
+models, then FastAPI's ``serialize_response`` validates and dumps them and
+``JSONResponse`` encodes the result) with ``FAST_JSON_RESPONSES`` (plain
+rows encoded by :func:`app.core.json_codec.dumps`). Covers a VEN list with
+8 loads per VEN and a history series, at 1k and 10k items by default. No
+database is touched; both paths must produce the same bytes.
+
+Run from ``ecs-backend``::
+
+    python -m benchmarks.bench_serialize [--items 1000 10000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable
+
+for _name, _value in (
+    ("DB_HOST", "bench"),
+    ("DB_USER", "bench"),
+    ("DB_PASSWORD", "bench"),
+    ("DB_NAME", "bench"),
+):
+    os.environ.setdefault(_name, _value)
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.core import json_codec  # noqa: E402
+from app.routers.utils import json_response, ven_row  # noqa: E402
+from app.schemas.api_models import HistoryResponse, Ven  # noqa: E402
+
+START = datetime(2025, 10, 10, tzinfo=UTC)
+
+
+def build_vens(count: int, loads: int = 8) -> list[dict[str, Any]]:
+    rows = []
+    for index in range(count):
+        samples = [
+            SimpleNamespace(
+                load_id=f"load-{i}",
+                name=f"Load {i}",
+                type="hvac",
+                capacity_kw=5.0,
+                current_power_kw=1.25 + i / 8,
+                shed_capability_kw=0.5 if i % 2 else 0.0,
+            )
+            for i in range(loads)
+        ]
+        ven = SimpleNamespace(
+            ven_id=f"ven-{index}",
+            name=f"VEN {index}",
+            status="online",
+            latitude=37.0 + index / 1e4,
+            longitude=-122.0,
+            created_at=START,
+        )
+        telemetry = SimpleNamespace(
+            timestamp=START + timedelta(seconds=index),
+            used_power_kw=4.2,
+            shed_power_kw=0.8,
+            event_id=None,
+            loads=samples,
+        )
+        rows.append(ven_row(ven, None, telemetry, include_loads=True))
+    return rows
+
+
+def build_history(count: int) -> dict[str, Any]:
+    return {
+        "points": [
+            {
+                "timestamp": START + timedelta(minutes=5 * index),
+                "usedPowerKw": 4.0 + (index % 17) / 3,
+                "shedPowerKw": 0.5 * (index % 3),
+                "eventId": "evt-bench" if index % 50 < 10 else None,
+                "requestedReductionKw": 3.0 if index % 50 < 10 else None,
+            }
+            for index in range(count)
+        ]
+    }
+
+
+def model_path(response_model: Any, build_models: Callable[[], Any]) -> Callable[[], bytes]:
+    """What a router returning models costs: build, validate, dump, encode."""
+    field = create_response_field(name="Response", type_=response_model, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def render() -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=build_models()))
+        return JSONResponse(content).body
+
+    return render
+
+
+def timed(render: Callable[[], bytes], repeat: int) -> tuple[float, bytes]:
+    body = render()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, body
+
+
+def run(items: list[int], repeat: int) -> list[dict[str, Any]]:
+    report = []
+    for count in items:
+        vens = build_vens(count)
+        history = build_history(count)
+        cases = {
+            "vens": (
+                model_path(list[Ven], lambda: [Ven.model_validate(row) for row in vens]),
+                lambda: json_response(vens).body,
+            ),
+            "history": (
+                model_path(HistoryResponse, lambda: HistoryResponse.model_validate(history)),
+                lambda: json_response(history).body,
+            ),
+        }
+        for name, (models, fast) in cases.items():
+            model_ms, expected = timed(models, repeat)
+            fast_ms, body = timed(fast, repeat)
+            report.append(
+                {
+                    "endpoint": name,
+                    "items": count,
+                    "model_ms": round(model_ms, 2),
+                    "fast_ms": round(fast_ms, 2),
+                    "speedup": round(model_ms / fast_ms, 2),
+                    "identical": body == expected,
+                }
+            )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"orjson={json_codec.HAS_ORJSON}, best of {args.repeat}")
+    print(f"{'endpoint':<10} {'items':>7} {'models':>10} {'fast':>10} {'speedup':>8}  identical")
+    for row in run(args.items, args.repeat):
+        print(
+            f"{row['endpoint']:<10} {row['items']:>7} {row['model_ms']:>8.2f}ms {row['fast_ms']:>8.2f}ms "
+            f"{row['speedup']:>7.2f}x  {row['identical']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
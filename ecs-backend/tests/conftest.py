@@ -13,6 +13,10 @@ os.environ.setdefault("DB_PASSWORD", "test_password")
 os.environ.setdefault("DB_NAME", "test_db")
 os.environ.setdefault("IOT_ENDPOINT", "test.iot.amazonaws.com")
 os.environ.setdefault("AWS_REGION", "us-west-2")
+# Tests read what they just wrote; the fleet view cache is tested on its own.
+os.environ.setdefault("FLEET_CACHE_TTL_S", "0")
+# Fragments outlive the per-test databases, whose ids repeat.
+os.environ.setdefault("VEN_FRAGMENTS_ENABLED", "false")
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -0,0 +1,38 @@
+"""Smoke tests keeping the benchmark harnesses runnable."""
+import argparse
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_ingest_harness_reports_metrics():
+    from benchmarks import bench_ingest
+
+    args = argparse.Namespace(
+        vens=5,
+        loads=2,
+        messages=60,
+        ack_ratio=0.1,
+        snapshot_ratio=0.1,
+        batch_size=20,
+        workers=2,
+        rate=None,
+        database_url=None,
+    )
+
+    report = await bench_ingest.run(args)
+
+    assert report["persisted"] == 60
+    assert report["failed"] == 0
+    assert report["msgs_per_s"] > 0
+    assert 0 < report["round_trips_per_msg"] < 1
+    assert set(report["latency_ms"]) == {"p50", "p95", "p99"}
+
+
+def test_serialize_harness_reports_identical_bodies():
+    from benchmarks import bench_serialize
+
+    report = bench_serialize.run([50], repeat=1)
+
+    assert {row["endpoint"] for row in report} == {"vens", "history"}
+    assert all(row["identical"] and row["fast_ms"] > 0 for row in report)
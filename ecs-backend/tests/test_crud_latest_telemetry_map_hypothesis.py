@@ -46,11 +46,48 @@ async def test_latest_telemetry_map_property(
                 created_at DATETIME NOT NULL
             )
         ''')))
+        await conn.run_sync(lambda c: c.execute(text('''
+            CREATE TABLE ven_loads (
+                id INTEGER PRIMARY KEY,
+                ven_id VARCHAR NOT NULL,
+                load_id VARCHAR NOT NULL,
+                timestamp DATETIME NOT NULL,
+                name VARCHAR,
+                type VARCHAR,
+                capacity_kw FLOAT,
+                priority INTEGER,
+                UNIQUE (ven_id, load_id)
+            )
+        ''')))
         await conn.run_sync(lambda c: c.execute(text('''
             CREATE TABLE ven_load_samples (
                 id INTEGER PRIMARY KEY,
                 telemetry_id INTEGER NOT NULL,
+                timestamp DATETIME NOT NULL,
+                load_ref INTEGER NOT NULL,
+                current_power_kw FLOAT,
+                shed_capability_kw FLOAT,
+                enabled BOOLEAN
+            )
+        ''')))
+        await conn.run_sync(lambda c: c.execute(text('''
+            CREATE TABLE ven_latest (
+                ven_id VARCHAR PRIMARY KEY,
+                telemetry_id INTEGER NOT NULL,
+                timestamp DATETIME NOT NULL,
+                used_power_kw FLOAT,
+                shed_power_kw FLOAT,
+                requested_reduction_kw FLOAT,
+                event_id VARCHAR,
+                battery_soc FLOAT
+            )
+        ''')))
+        await conn.run_sync(lambda c: c.execute(text('''
+            CREATE TABLE ven_latest_loads (
+                ven_id VARCHAR NOT NULL,
                 load_id VARCHAR NOT NULL,
+                timestamp DATETIME NOT NULL,
+                position INTEGER NOT NULL,
                 name VARCHAR,
                 type VARCHAR,
                 capacity_kw FLOAT,
@@ -58,7 +95,7 @@ async def test_latest_telemetry_map_property(
                 shed_capability_kw FLOAT,
                 enabled BOOLEAN,
                 priority INTEGER,
-                raw_payload JSON
+                PRIMARY KEY (ven_id, load_id)
             )
         ''')))
     async with AsyncSessionLocal() as db_session:
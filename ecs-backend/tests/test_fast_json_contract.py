@@ -0,0 +1,162 @@
+"""Contract tests: fast JSON responses are byte-identical to the response-model path."""
+import json
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+
+from app import crud
+from app.core import json_codec
+from app.dependencies import get_fast_json
+from app.models.telemetry import VenStatus
+from app.models.ven_ack import VenAck
+from app.services.ingest_writer import IngestBatch, write_batch
+
+NOW = datetime(2025, 10, 10, 12, tzinfo=UTC)
+
+PATHS = [
+    ("/api/vens/", {}),
+    ("/api/vens/summary", {}),
+    ("/api/vens/ven-a/history", {"start": NOW.isoformat(), "granularity": "1m"}),
+    ("/api/vens/ven-a/history", {"start": NOW.isoformat(), "granularity": "1m", "maxPoints": 10}),
+    ("/api/vens/ven-a/loads/hvac/history", {"start": NOW.isoformat(), "granularity": "5m"}),
+    ("/api/stats/network/history", {"start": NOW.isoformat(), "granularity": "15m"}),
+    ("/api/vens/ven-a/circuits/history", {"start": NOW.isoformat()}),
+    ("/api/vens/ven-a/circuits/history", {"load_id": "hvac", "maxPoints": 5}),
+    ("/api/vens/ven-a/events", {}),
+    ("/api/events/", {}),
+    ("/api/events/history", {"start": (NOW - timedelta(days=1)).isoformat()}),
+    ("/api/vens/", {"limit": 2}),
+    ("/api/vens/ven-a/events", {"limit": 1}),
+    ("/api/vens/ven-a/circuits/history", {"limit": 3}),
+    ("/api/events/", {"limit": 1}),
+]
+
+
+async def _fleet(session) -> None:
+    await crud.create_ven(
+        session, ven_id="ven-a", name="Nörrby – A", status="online", registration_id="ven-a", latitude=59.3, longitude=18.07
+    )
+    await crud.create_ven(session, ven_id="ven-b", name="B", status="offline", registration_id="ven-b")
+    await crud.create_ven(session, ven_id="ven-c", name="C", status="online", registration_id="ven-c")
+    await crud.create_event(
+        session,
+        event_id="evt-1",
+        status="active",
+        start_time=NOW + timedelta(minutes=20),
+        end_time=NOW + timedelta(minutes=50),
+        requested_reduction_kw=3.0,
+    )
+    await crud.create_event(
+        session,
+        event_id="evt-2",
+        status="scheduled",
+        start_time=NOW + timedelta(hours=5),
+        end_time=NOW + timedelta(hours=6),
+        requested_reduction_kw=None,
+    )
+    batch = IngestBatch()
+    for step in range(90):
+        event_id = "evt-1" if 20 <= step < 50 else None
+        for ven_id, scale in (("ven-a", 1.0), ("ven-b", 0.37)):
+            row = {
+                "ven_id": ven_id,
+                "timestamp": NOW + timedelta(minutes=step, seconds=7, microseconds=250000 * (step % 4)),
+                "used_power_kw": scale * (4.0 + (step % 9) / 3),
+                "shed_power_kw": scale * (2.5 if event_id else 0.0),
+                "requested_reduction_kw": 3.0 if event_id else None,
+                "event_id": event_id,
+            }
+            loads = [
+                {
+                    "load_id": "hvac",
+                    "name": "HVAC",
+                    "type": "hvac",
+                    "capacity_kw": 5.0,
+                    "current_power_kw": scale * (step % 7) / 2,
+                    "shed_capability_kw": 1.25,
+                    "enabled": event_id is None,
+                    "priority": 1,
+                },
+                {
+                    "load_id": "ev",
+                    "name": None,
+                    "type": None,
+                    "capacity_kw": 11.0,
+                    "current_power_kw": 0.0,
+                    "shed_capability_kw": 0.0,
+                    "enabled": True,
+                    "priority": None,
+                },
+            ]
+            batch.add_telemetry(row, loads)
+    await write_batch(session, batch)
+    session.add(
+        VenStatus(ven_id="ven-b", timestamp=NOW, status="curtailing", current_power_kw=1.5, shed_availability_kw=0.75)
+    )
+    session.add_all(
+        [
+            VenAck(
+                ven_id="ven-a",
+                event_id="evt-1",
+                correlation_id="corr-1",
+                op="event",
+                status="success",
+                timestamp=NOW + timedelta(minutes=20, milliseconds=125),
+                requested_shed_kw=3.0,
+                actual_shed_kw=2.5,
+                circuits_curtailed=[
+                    {
+                        "id": "hvac",
+                        "name": "HVAC",
+                        "breaker_amps": 20,
+                        "original_kw": 3,
+                        "curtailed_kw": 2.5,
+                        "final_kw": 0.5,
+                        "critical": False,
+                    }
+                ],
+            ),
+            VenAck(ven_id="ven-a", event_id="evt-1", op="restore", status="accepted", timestamp=NOW + timedelta(hours=1)),
+        ]
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_fast_responses_match_the_response_models(client, test_session):
+    from app.main import app
+
+    await _fleet(test_session)
+    for path, params in PATHS:
+        app.dependency_overrides[get_fast_json] = lambda: False
+        expected = await client.get(path, params=params)
+        app.dependency_overrides[get_fast_json] = lambda: True
+        fast = await client.get(path, params=params)
+
+        assert expected.status_code == fast.status_code == 200, path
+        assert json.loads(expected.content), path
+        assert fast.headers["content-type"] == expected.headers["content-type"]
+        assert fast.content == expected.content, path
+        assert fast.headers.get("x-next-cursor") == expected.headers.get("x-next-cursor"), path
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_matches_the_default_encoder(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(json_codec, "orjson", None)
+    elif not json_codec.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    content = {
+        "utc": NOW,
+        "micro": NOW.replace(microsecond=120),
+        "naive": datetime(2025, 1, 2, 3, 4, 5),
+        "offset": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-3))),
+        "text": "Nörrby – A",
+        "numbers": [0.0, -0.0, 1.25, 2 / 3, 1e-4, 1e15, 7, None, True],
+    }
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    expected = JSONResponse(jsonable_encoder(TypeAdapter(dict).dump_python(content, mode="json"))).body
+    assert json_codec.dumps(content) == expected
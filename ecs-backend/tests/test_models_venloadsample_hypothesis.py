@@ -13,7 +13,6 @@ from app.models.telemetry import VenLoadSample
     shed_capability_kw=st.one_of(st.none(), st.floats(allow_nan=False, allow_infinity=False, min_value=0, max_value=10000)),
     enabled=st.one_of(st.none(), st.booleans()),
     priority=st.one_of(st.none(), st.integers(min_value=0, max_value=100)),
-    raw_payload=st.one_of(st.none(), st.dictionaries(st.text(max_size=10), st.integers())),
 )
 def test_ven_load_sample_fields(
     telemetry_id,
@@ -25,7 +24,6 @@ def test_ven_load_sample_fields(
     shed_capability_kw,
     enabled,
     priority,
-    raw_payload,
 ):
     obj = VenLoadSample(
         telemetry_id=telemetry_id,
@@ -37,7 +35,6 @@ def test_ven_load_sample_fields(
         shed_capability_kw=shed_capability_kw,
         enabled=enabled,
         priority=priority,
-        raw_payload=raw_payload,
     )
     assert obj.telemetry_id == telemetry_id
     assert obj.load_id == load_id
@@ -48,4 +45,3 @@ def test_ven_load_sample_fields(
     assert obj.shed_capability_kw == shed_capability_kw
     assert obj.enabled == enabled
     assert obj.priority == priority
-    assert obj.raw_payload == raw_payload
@@ -21,7 +21,7 @@ os.environ.setdefault("DB_NAME", "test")
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from app.core.config import Settings  # noqa: E402  pylint: disable=wrong-import-position
-from app.models import LoadSnapshot, VenLoadSample, VenTelemetry  # noqa: E402
+from app.models import VenLoad, VenLoadSample, VenTelemetry  # noqa: E402
 from app.services import MQTTConsumer  # noqa: E402
 
 
@@ -56,18 +56,19 @@ async def db_fixture(tmp_path_factory):
 
 
 def build_settings(**overrides) -> Settings:
+    # Settings only populates fields by their environment aliases.
     base = dict(
-        db_host="unused",
-        db_port=5432,
-        db_user="unused",
-        db_password="unused",
-        db_name="unused",
-        db_timeout=30,
-        mqtt_enabled=True,
-        mqtt_host="localhost",
-        mqtt_port=1883,
-        mqtt_use_tls=False,
-        backend_loads_topic="ven/loads/test",
+        DB_HOST="unused",
+        DB_PORT=5432,
+        DB_USER="unused",
+        DB_PASSWORD="unused",
+        DB_NAME="unused",
+        DB_TIMEOUT=30,
+        MQTT_ENABLED=True,
+        MQTT_HOST="localhost",
+        MQTT_PORT=1883,
+        MQTT_USE_TLS=False,
+        BACKEND_LOADS_TOPIC="ven/loads/test",
     )
     base.update(overrides)
     return Settings(**base)
@@ -156,10 +157,597 @@ async def test_load_snapshot_persists_rows(db_fixture):
     await consumer.handle_message(config.backend_loads_topic, json.dumps(payload).encode())
 
     async with session_factory() as session:
-        rows = (await session.execute(select(LoadSnapshot))).scalars().all()
+        rows = (
+            await session.execute(select(VenLoadSample).where(VenLoadSample.telemetry_id.is_(None)))
+        ).scalars().all()
         assert len(rows) == 2
         ids = {row.load_id for row in rows}
         assert ids == {"load-10", "load-11"}
-        ven_ids = {row.ven_id for row in rows}
+        ven_ids = {row.load.ven_id for row in rows}
         assert ven_ids == {"ven-2"}
 
+
+@pytest.mark.asyncio
+async def test_load_snapshot_skips_loads_covered_by_telemetry(db_fixture):
+    session_factory, dependency = db_fixture
+    config = build_settings()
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+
+    def snapshot(timestamp: int) -> bytes:
+        loads = [{"id": f"load-{index}", "currentPowerKw": 0.5} for index in range(3)]
+        return json.dumps({"venId": "snap-ven", "timestamp": timestamp, "loads": loads}).encode()
+
+    # Metering carries load-0 and load-1; only load-2 is new in the first
+    # snapshot, and the second one is outside the window.
+    await consumer.handle_message(config.mqtt_topic_metering, _metering_payload("snap-ven", 1700005000))
+    await consumer.handle_message(config.backend_loads_topic, snapshot(1700005010))
+    await consumer.handle_message(config.backend_loads_topic, snapshot(1700005010))
+    await consumer.handle_message(config.backend_loads_topic, snapshot(1700005100))
+
+    async with session_factory() as session:
+        rows = (
+            await session.execute(
+                select(VenLoadSample)
+                .join(VenLoadSample.load)
+                .where(VenLoad.ven_id == "snap-ven")
+                .order_by(VenLoadSample.id)
+            )
+        ).scalars().all()
+        assert [(row.load_id, row.telemetry_id is None) for row in rows] == [
+            ("load-0", False),
+            ("load-1", False),
+            ("load-2", True),
+            ("load-0", True),
+            ("load-1", True),
+            ("load-2", True),
+        ]
+
+
+
+def _metering_payload(ven_id: str, timestamp: int, loads: int = 2) -> bytes:
+    return json.dumps(
+        {
+            "venId": ven_id,
+            "timestamp": timestamp,
+            "usedPowerKw": 4.0,
+            "shedPowerKw": 1.0,
+            "loads": [
+                {"id": f"load-{i}", "type": "hvac", "currentPowerKw": 1.0, "shedCapabilityKw": 0.5}
+                for i in range(loads)
+            ],
+        }
+    ).encode()
+
+
+@pytest.mark.asyncio
+async def test_handle_batch_bulk_inserts_all_rows(db_fixture):
+    from app.models import VEN, VenAck
+    from app.services.mqtt_consumer import _QueuedMessage
+
+    session_factory, dependency = db_fixture
+    config = build_settings()
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+
+    messages = [
+        _QueuedMessage(config.mqtt_topic_metering, _metering_payload(f"batch-ven-{i % 3}", 1700001000 + i))
+        for i in range(9)
+    ]
+    messages.append(
+        _QueuedMessage("ven/ack/batch-ven-0", json.dumps({"op": "event", "status": "accepted", "event_id": "evt-batch"}).encode())
+    )
+    messages.append(_QueuedMessage(config.mqtt_topic_metering, b"not json"))
+
+    await consumer.handle_batch(messages)
+
+    async with session_factory() as session:
+        telemetry = (
+            await session.execute(select(VenTelemetry).where(VenTelemetry.ven_id.like("batch-ven-%")))
+        ).scalars().all()
+        assert len(telemetry) == 9
+        telemetry_ids = {row.id for row in telemetry}
+        samples = (
+            await session.execute(select(VenLoadSample).where(VenLoadSample.telemetry_id.in_(telemetry_ids)))
+        ).scalars().all()
+        assert len(samples) == 18
+        assert {sample.telemetry_id for sample in samples} == telemetry_ids
+
+        vens = (await session.execute(select(VEN).where(VEN.ven_id.like("batch-ven-%")))).scalars().all()
+        assert {ven.ven_id for ven in vens} == {"batch-ven-0", "batch-ven-1", "batch-ven-2"}
+        assert all(ven.status == "online" and ven.last_heartbeat is not None for ven in vens)
+
+        acks = (await session.execute(select(VenAck).where(VenAck.ven_id == "batch-ven-0"))).scalars().all()
+        assert len(acks) == 1
+
+
+@pytest.mark.asyncio
+async def test_process_queue_drains_into_batches(db_fixture):
+    from app.services.ingest_queue import IngestQueue
+    from app.services.mqtt_consumer import _QueuedMessage
+
+    session_factory, dependency = db_fixture
+    config = build_settings(INGEST_BATCH_SIZE=4, INGEST_FLUSH_INTERVAL_MS=10, INGEST_MAX_LATENCY_MS=50)
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+
+    batch_sizes: list[int] = []
+    original = consumer.handle_batch
+
+    async def recording_handle_batch(messages):
+        batch_sizes.append(len(messages))
+        return await original(messages)
+
+    consumer.handle_batch = recording_handle_batch
+    queue = IngestQueue(config.ingest_queue_maxsize)
+    consumer._queues = [queue]
+    for i in range(10):
+        queue.put_nowait(
+            _QueuedMessage(config.mqtt_topic_metering, _metering_payload("queue-ven", 1700002000 + i, loads=1))
+        )
+
+    worker = asyncio.create_task(consumer._process_queue(queue))
+    try:
+        await asyncio.wait_for(queue.join(), timeout=5)
+    finally:
+        worker.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await worker
+
+    assert batch_sizes == [4, 4, 2]
+    async with session_factory() as session:
+        rows = (
+            await session.execute(select(VenTelemetry).where(VenTelemetry.ven_id == "queue-ven"))
+        ).scalars().all()
+        assert len(rows) == 10
+
+
+@pytest.mark.asyncio
+async def test_process_queue_max_latency_counts_time_queued(db_fixture):
+    """A message that already waited past the latency bound is flushed without lingering."""
+    import time
+
+    from app.services.ingest_queue import IngestQueue
+    from app.services.mqtt_consumer import _QueuedMessage
+
+    _, dependency = db_fixture
+    config = build_settings(INGEST_FLUSH_INTERVAL_MS=5000, INGEST_MAX_LATENCY_MS=100)
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+    queue = IngestQueue(config.ingest_queue_maxsize)
+    consumer._queues = [queue]
+    queue.put_nowait(
+        _QueuedMessage(
+            config.mqtt_topic_metering,
+            _metering_payload("stale-ven", 1700004000, loads=0),
+            received_at=time.monotonic() - 1,
+        )
+    )
+
+    worker = asyncio.create_task(consumer._process_queue(queue))
+    try:
+        await asyncio.wait_for(queue.join(), timeout=1)
+    finally:
+        worker.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await worker
+
+
+@pytest.mark.asyncio
+async def test_handle_batch_isolates_failing_message(db_fixture, monkeypatch):
+    from app.services import mqtt_consumer as consumer_module
+    from app.services.mqtt_consumer import _QueuedMessage
+
+    session_factory, dependency = db_fixture
+    config = build_settings()
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+
+    original = consumer_module.write_batch
+
+    async def flaky_write_batch(session, batch, **kwargs):
+        if any(row["ven_id"] == "poison-ven" for row in batch.telemetry):
+            raise RuntimeError("boom")
+        await original(session, batch, **kwargs)
+
+    monkeypatch.setattr(consumer_module, "write_batch", flaky_write_batch)
+    failed = await consumer.handle_batch(
+        [
+            _QueuedMessage(config.mqtt_topic_metering, _metering_payload("good-ven", 1700003000)),
+            _QueuedMessage(config.mqtt_topic_metering, _metering_payload("poison-ven", 1700003000)),
+        ]
+    )
+
+    assert failed == 1
+    async with session_factory() as session:
+        ven_ids = set(
+            (
+                await session.execute(
+                    select(VenTelemetry.ven_id).where(VenTelemetry.ven_id.in_(["good-ven", "poison-ven"]))
+                )
+            ).scalars().all()
+        )
+        assert ven_ids == {"good-ven"}
+
+
+@pytest.mark.asyncio
+async def test_on_message_sheds_telemetry_but_keeps_acks(db_fixture):
+    from app.services.ingest_queue import IngestQueue
+
+    _, dependency = db_fixture
+    config = build_settings(INGEST_QUEUE_MAXSIZE=2, INGEST_OVERFLOW_POLICY="drop_oldest")
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+    queue = IngestQueue(config.ingest_queue_maxsize, config.ingest_overflow_policy)
+    consumer._queues = [queue]
+
+    for i in range(3):
+        await consumer._on_message(None, config.mqtt_topic_metering, _metering_payload("shed-ven", i), 1, None)
+    await consumer._on_message(None, "ven/ack/shed-ven", b"{}", 1, None)
+
+    topics = [queue.get_nowait().topic for _ in range(queue.qsize())]
+    assert topics == [config.mqtt_topic_metering, "ven/ack/shed-ven"]
+    metrics = consumer.metrics()["queue"]
+    assert metrics["enqueued"] == 4
+    assert metrics["dropped_oldest"] == 2
+
+
+@pytest.mark.asyncio
+async def test_on_message_bounds_pending_tasks_through_gmqtt_dispatch(db_fixture):
+    """gmqtt runs on_message as detached tasks; blocked offers must not pile up."""
+    from gmqtt.mqtt.utils import run_coroutine_or_function
+    from app.services.ingest_queue import IngestQueue
+
+    _, dependency = db_fixture
+    config = build_settings(INGEST_QUEUE_MAXSIZE=5, INGEST_MAX_WAITING_MESSAGES=3)
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+    consumer._queues = [IngestQueue(
+        config.ingest_queue_maxsize,
+        config.ingest_overflow_policy,
+        max_waiting=config.ingest_max_waiting_messages,
+    )]
+
+    # Nothing drains the queue, as during a database brownout.
+    before = asyncio.all_tasks()
+    for i in range(100):
+        run_coroutine_or_function(
+            consumer._on_message, None, config.mqtt_topic_metering, _metering_payload("flood-ven", i), 1, None
+        )
+    await asyncio.sleep(0.05)
+
+    pending = asyncio.all_tasks() - before
+    stats = consumer.metrics()["queue"]
+    assert len(pending) == 3
+    assert stats["depth"] == 5
+    assert stats["waiting"] == 3
+    assert stats["dropped_newest"] == 92
+
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_stale_registry_entry_is_re_registered(tmp_path):
+    """A VEN deleted behind the registry's back is re-registered instead of failing forever."""
+    from sqlalchemy import event
+
+    from app.models import Base, VEN
+    from app.services.ven_registry import VenRegistry
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'fk.db'}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async_session = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def dependency():
+        async with async_session() as session:
+            yield session
+
+    registry = VenRegistry()
+    registry.mark_known(["deleted-ven"])
+    config = build_settings()
+    consumer = MQTTConsumer(config=config, session_factory=dependency, registry=registry)
+
+    try:
+        await consumer.handle_message(config.mqtt_topic_metering, _metering_payload("deleted-ven", 1700005000))
+
+        async with async_session() as session:
+            assert await session.get(VEN, "deleted-ven") is not None
+            rows = (await session.execute(select(VenTelemetry))).scalars().all()
+            assert [row.ven_id for row in rows] == ["deleted-ven"]
+        assert registry.is_known("deleted-ven")
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_on_message_routes_each_ven_to_one_shard(db_fixture):
+    from app.services.ingest_queue import IngestQueue
+
+    _, dependency = db_fixture
+    config = build_settings(INGEST_WORKERS=4)
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+    consumer._queues = [IngestQueue(100) for _ in range(config.ingest_workers)]
+
+    ven_ids = [f"shard-ven-{i}" for i in range(20)]
+    for ts in range(3):
+        for ven_id in ven_ids:
+            await consumer._on_message(None, config.mqtt_topic_metering, _metering_payload(ven_id, ts), 1, None)
+    for ven_id in ven_ids:
+        await consumer._on_message(None, f"ven/ack/{ven_id}", b"{}", 1, None)
+
+    shard_of: dict[str, int] = {}
+    for index, queue in enumerate(consumer._queues):
+        seen: dict[str, list[int]] = {}
+        while not queue.empty():
+            message = queue.get_nowait()
+            ven_id = message.topic.split("/")[-1] if message.data is None else message.data["venId"]
+            assert shard_of.setdefault(ven_id, index) == index
+            if message.data is not None:
+                seen.setdefault(ven_id, []).append(message.data["timestamp"])
+        assert all(timestamps == [0, 1, 2] for timestamps in seen.values())
+
+    assert set(shard_of) == set(ven_ids)
+    assert len(set(shard_of.values())) > 1
+    metrics = consumer.metrics()
+    assert len(metrics["shards"]) == 4
+    assert metrics["queue"]["enqueued"] == 80
+
+
+@pytest.mark.asyncio
+async def test_slow_shard_does_not_stall_other_vens(db_fixture, monkeypatch):
+    from app.services import mqtt_consumer as consumer_module
+    from app.services.ingest_queue import IngestQueue
+
+    session_factory, dependency = db_fixture
+    config = build_settings(INGEST_WORKERS=2, INGEST_FLUSH_INTERVAL_MS=1, INGEST_MAX_LATENCY_MS=1)
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+    consumer._queues = [IngestQueue(100) for _ in range(config.ingest_workers)]
+
+    # Find two VENs that hash to different shards.
+    slow_ven, fast_ven = "slow-ven", None
+    slow_shard = consumer._shard_for(consumer_module._QueuedMessage("t", b"", data={"venId": slow_ven}))
+    for i in range(100):
+        candidate = f"fast-ven-{i}"
+        if consumer._shard_for(consumer_module._QueuedMessage("t", b"", data={"venId": candidate})) != slow_shard:
+            fast_ven = candidate
+            break
+    assert fast_ven is not None
+
+    # Stall before the transaction opens; SQLite would serialise the writers.
+    release = asyncio.Event()
+    original = consumer._write
+
+    async def stalling_write(batch):
+        if slow_ven in batch.heartbeats:
+            await release.wait()
+        return await original(batch)
+
+    monkeypatch.setattr(consumer, "_write", stalling_write)
+    workers = [asyncio.create_task(consumer._process_queue(queue)) for queue in consumer._queues]
+    try:
+        await consumer._on_message(None, config.mqtt_topic_metering, _metering_payload(slow_ven, 1700006000), 1, None)
+        await consumer._on_message(None, config.mqtt_topic_metering, _metering_payload(fast_ven, 1700006000), 1, None)
+        await asyncio.wait_for(consumer._queues[1 - slow_shard].join(), timeout=5)
+        assert consumer._queues[slow_shard].stats()["completed"] == 0
+
+        release.set()
+        await asyncio.wait_for(consumer._queues[slow_shard].join(), timeout=5)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async with session_factory() as session:
+        ven_ids = set(
+            (
+                await session.execute(
+                    select(VenTelemetry.ven_id).where(VenTelemetry.ven_id.in_([slow_ven, fast_ven]))
+                )
+            ).scalars().all()
+        )
+        assert ven_ids == {slow_ven, fast_ven}
+
+
+@pytest.mark.asyncio
+async def test_raw_payloads_reuse_decoded_objects(db_fixture):
+    """Raw telemetry and ACKs hold what the VEN sent, not a re-serialised model."""
+    from app.models import VenAck, VenTelemetryRaw
+    from app.services.raw_payloads import decode_raw
+    from app.services.mqtt_consumer import _QueuedMessage
+
+    session_factory, dependency = db_fixture
+    config = build_settings()
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+
+    load = {"id": "raw-load", "currentPowerKw": 1.5, "vendorField": "x"}
+    metering = json.dumps({"venId": "raw-ven", "timestamp": 1700007000, "loads": [load]}).encode()
+    ack = b'{"op": "event", "status": "accepted", "event_id": "evt-raw"}'
+
+    failed = await consumer.handle_batch(
+        [
+            _QueuedMessage(config.mqtt_topic_metering, metering),
+            _QueuedMessage("ven/ack/raw-ven", ack),
+            _QueuedMessage(config.mqtt_topic_metering, b"\xff\xfe not utf-8"),
+        ]
+    )
+
+    assert failed == 0
+    async with session_factory() as session:
+        sample = (
+            await session.execute(select(VenLoadSample).where(VenLoadSample.load_id == "raw-load"))
+        ).scalar_one()
+        raw = await session.get(VenTelemetryRaw, sample.telemetry_id)
+        assert decode_raw(raw.codec, raw.payload)["loads"] == [load]
+        stored_ack = await session.scalar(select(VenAck.raw_payload).where(VenAck.event_id == "evt-raw"))
+        assert stored_ack == ack.decode()
+
+
+@pytest.mark.asyncio
+async def test_duplicate_telemetry_is_stored_once(db_fixture):
+    """The same sample on both VEN topics, in one batch or redelivered later, is stored once."""
+    from app.services.mqtt_consumer import _QueuedMessage
+
+    session_factory, dependency = db_fixture
+    config = build_settings()
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+    payload = _metering_payload("dup-ven", 1700008000)
+
+    await consumer.handle_batch(
+        [
+            _QueuedMessage(config.mqtt_topic_metering, payload),
+            _QueuedMessage("ven/telemetry/dup-ven", payload),
+        ]
+    )
+    await consumer.handle_message(config.mqtt_topic_metering, payload)
+
+    assert consumer.metrics()["dedup"]["duplicates_dropped"] == 1
+    async with session_factory() as session:
+        rows = (await session.execute(select(VenTelemetry).where(VenTelemetry.ven_id == "dup-ven"))).scalars().all()
+        assert len(rows) == 1
+        samples = (
+            await session.execute(select(VenLoadSample).where(VenLoadSample.telemetry_id == rows[0].id))
+        ).scalars().all()
+        assert len(samples) == 2
+
+
+@pytest.mark.asyncio
+async def test_unique_index_rejects_duplicates_the_cache_missed(db_fixture):
+    session_factory, dependency = db_fixture
+    config = build_settings(INGEST_DEDUP_WINDOW_S=0)
+
+    for _ in range(2):
+        # A fresh consumer has an empty cache, as after a restart.
+        consumer = MQTTConsumer(config=config, session_factory=dependency)
+        await consumer.handle_message(config.mqtt_topic_metering, _metering_payload("restart-ven", 1700009000))
+    await consumer.handle_message(config.mqtt_topic_metering, _metering_payload("restart-ven", 1700009001))
+
+    async with session_factory() as session:
+        rows = (
+            await session.execute(select(VenTelemetry).where(VenTelemetry.ven_id == "restart-ven"))
+        ).scalars().all()
+        assert sorted(row.timestamp.timestamp() for row in rows) == [1700009000, 1700009001]
+        samples = (
+            await session.execute(
+                select(VenLoadSample).where(VenLoadSample.telemetry_id.in_([row.id for row in rows]))
+            )
+        ).scalars().all()
+        assert len(samples) == 4
+
+
+@pytest.mark.asyncio
+async def test_database_outage_spools_and_replays(db_fixture, tmp_path, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    from app.services.ingest_queue import IngestQueue
+    from app.services.ingest_spool import IngestSpool
+    from app.services.mqtt_consumer import _QueuedMessage
+
+    session_factory, dependency = db_fixture
+    config = build_settings(INGEST_MAX_LATENCY_MS=0, INGEST_SPOOL_REPLAY_RATE=1000)
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+    consumer._spool = IngestSpool(tmp_path, segment_bytes=1024, max_bytes=1024 * 1024)
+    queue = IngestQueue(100)
+    consumer._queues = [queue]
+
+    original = consumer._write
+    database_down = True
+
+    async def flaky_write(batch):
+        if database_down:
+            raise OperationalError("INSERT", {}, ConnectionRefusedError("connection refused"))
+        return await original(batch)
+
+    monkeypatch.setattr(consumer, "_write", flaky_write)
+
+    worker = asyncio.create_task(consumer._process_queue(queue))
+    try:
+        for i in range(3):
+            queue.put_nowait(
+                _QueuedMessage(config.mqtt_topic_metering, _metering_payload("spool-ven", 1700010000 + i))
+            )
+            await asyncio.wait_for(queue.join(), timeout=5)
+    finally:
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+    assert queue.stats()["spooled"] == 3
+    assert queue.stats()["persisted"] == 0
+    assert consumer.metrics()["spool"]["spooled"] == 3
+
+    # Replay keeps failing while the database is down and loses nothing.
+    path, messages = consumer._spool.oldest_segment()
+    with pytest.raises(OperationalError):
+        await consumer._replay_segment(path, messages)
+    assert path.exists()
+
+    database_down = False
+    await consumer._replay_segment(path, messages)
+
+    spool_stats = consumer.metrics()["spool"]
+    assert spool_stats["segments"] == 0
+    assert spool_stats["replayed"] == 3
+    async with session_factory() as session:
+        rows = (
+            await session.execute(select(VenTelemetry).where(VenTelemetry.ven_id == "spool-ven"))
+        ).scalars().all()
+        assert len(rows) == 3
+
+
+class _FakeClient:
+    async def disconnect(self):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_queued_messages(db_fixture):
+    from app.services.ingest_queue import IngestQueue
+    from app.services.mqtt_consumer import _QueuedMessage
+
+    session_factory, dependency = db_fixture
+    config = build_settings(INGEST_BATCH_SIZE=5, INGEST_MAX_LATENCY_MS=0)
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+    queue = IngestQueue(100)
+    consumer._queues = [queue]
+    for i in range(12):
+        queue.put_nowait(_QueuedMessage(config.mqtt_topic_metering, _metering_payload("drain-ven", 1700015000 + i)))
+    consumer._workers = [asyncio.create_task(consumer._process_queue(queue))]
+    consumer._client = _FakeClient()
+    consumer._started = True
+
+    await consumer.stop()
+
+    async with session_factory() as session:
+        count = len(
+            (await session.execute(select(VenTelemetry).where(VenTelemetry.ven_id == "drain-ven"))).scalars().all()
+        )
+        assert count == 12
+
+
+@pytest.mark.asyncio
+async def test_stop_spools_what_cannot_be_drained(db_fixture, tmp_path, monkeypatch):
+    from app.services.ingest_queue import IngestQueue
+    from app.services.ingest_spool import IngestSpool
+    from app.services.mqtt_consumer import _QueuedMessage
+
+    _, dependency = db_fixture
+    config = build_settings(INGEST_BATCH_SIZE=1, INGEST_MAX_LATENCY_MS=0, INGEST_DRAIN_TIMEOUT_S=0.05)
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+    consumer._spool = IngestSpool(tmp_path, segment_bytes=1024, max_bytes=1024 * 1024)
+
+    async def hanging_write(batch):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(consumer, "_write", hanging_write)
+    queue = IngestQueue(100)
+    consumer._queues = [queue]
+    for i in range(3):
+        queue.put_nowait(_QueuedMessage(config.mqtt_topic_metering, _metering_payload("stuck-ven", i)))
+    consumer._workers = [asyncio.create_task(consumer._process_queue(queue))]
+    consumer._client = _FakeClient()
+    consumer._started = True
+
+    await consumer.stop()
+
+    # The batch being written when the worker was cancelled is lost; the rest is spooled.
+    assert consumer._spool.stats()["spooled"] == 2
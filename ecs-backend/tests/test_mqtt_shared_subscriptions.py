@@ -0,0 +1,189 @@
+"""Shared-subscription ingest across several consumer replicas.
+
+``FakeBroker`` stands in for the MQTT broker: it records subscriptions made
+through ``MQTTConsumer._on_connect`` and delivers published messages the way
+a broker does, once per matching plain subscription and once per shared
+group, round-robin across the group's members.
+"""
+import asyncio
+import itertools
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import VenAck, VenTelemetry
+from app.services import MQTTConsumer
+from app.services.ingest_queue import IngestQueue
+from app.services.mqtt_consumer import _filter_covers
+
+from test_mqtt_consumer import _metering_payload, build_settings, db_fixture  # noqa: F401
+
+
+class FakeClient:
+    def __init__(self, broker: "FakeBroker", consumer: MQTTConsumer) -> None:
+        self.broker = broker
+        self.consumer = consumer
+
+    def subscribe(self, topic: str, qos: int = 0) -> None:
+        self.broker.subscribe(self, topic)
+
+
+class FakeBroker:
+    def __init__(self) -> None:
+        self.plain: list[tuple[FakeClient, str]] = []
+        self.groups: dict[tuple[str, str], list[FakeClient]] = {}
+        self._cursors: dict[tuple[str, str], itertools.cycle] = {}
+
+    def connect(self, consumer: MQTTConsumer) -> FakeClient:
+        client = FakeClient(self, consumer)
+        consumer._on_connect(client, {}, 0, None)
+        return client
+
+    def subscribe(self, client: FakeClient, topic: str) -> None:
+        if topic.startswith("$share/"):
+            _, group, topic_filter = topic.split("/", 2)
+            members = self.groups.setdefault((group, topic_filter), [])
+            members.append(client)
+            self._cursors[(group, topic_filter)] = itertools.cycle(members)
+        else:
+            self.plain.append((client, topic))
+
+    async def publish(self, topic: str, payload: bytes) -> None:
+        receivers = [client for client, topic_filter in self.plain if _filter_covers(topic_filter, topic)]
+        for (group, topic_filter), cursor in self._cursors.items():
+            if _filter_covers(topic_filter, topic):
+                receivers.append(next(cursor))
+        for client in receivers:
+            await client.consumer._on_message(client, topic, payload, 1, None)
+
+
+def _replica(config, dependency) -> MQTTConsumer:
+    consumer = MQTTConsumer(config=config, session_factory=dependency)
+    consumer._queues = [IngestQueue(10_000)]
+    return consumer
+
+
+async def _drain(consumers: list[MQTTConsumer]) -> None:
+    workers = [asyncio.create_task(c._process_queue(c._queues[0])) for c in consumers]
+    try:
+        await asyncio.wait_for(asyncio.gather(*(c._queues[0].join() for c in consumers)), timeout=30)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+def test_subscription_topics_use_shared_group():
+    config = build_settings(MQTT_SHARED_GROUP="ingest", MQTT_TOPICS="ven/#")
+    consumer = MQTTConsumer(config=config)
+
+    topics = consumer.subscription_topics()
+
+    assert all(topic.startswith("$share/ingest/") for topic in topics)
+    assert "$share/ingest/ven/#" in topics
+    # ven/# already covers the ACK wildcard, so it is not subscribed twice.
+    assert "$share/ingest/ven/ack/+" not in topics
+
+
+def test_shared_group_rejects_wildcards():
+    with pytest.raises(ValueError):
+        build_settings(MQTT_SHARED_GROUP="a/b")
+
+
+@pytest.mark.asyncio
+async def test_replicas_persist_each_message_once(db_fixture):
+    session_factory, dependency = db_fixture
+    config = build_settings(MQTT_SHARED_GROUP="ingest", INGEST_MAX_LATENCY_MS=0)
+    broker = FakeBroker()
+    replicas = [_replica(config, dependency) for _ in range(3)]
+    for replica in replicas:
+        broker.connect(replica)
+
+    for i in range(30):
+        await broker.publish(config.mqtt_topic_metering, _metering_payload(f"shared-ven-{i % 5}", 1700011000 + i))
+    await broker.publish("ven/ack/shared-ven-0", b'{"op": "event", "status": "accepted", "event_id": "evt-shared"}')
+    await _drain(replicas)
+
+    assert [r.metrics()["queue"]["enqueued"] for r in replicas] == [11, 10, 10]
+    async with session_factory() as session:
+        count = await session.scalar(
+            select(func.count()).select_from(VenTelemetry).where(VenTelemetry.ven_id.like("shared-ven-%"))
+        )
+        assert count == 30
+        acks = await session.scalar(select(func.count()).select_from(VenAck).where(VenAck.event_id == "evt-shared"))
+        assert acks == 1
+
+
+@pytest.mark.asyncio
+async def test_duplicate_ack_is_suppressed(db_fixture):
+    """A redelivered ACK, or one matched by two overlapping filters, is stored once."""
+    session_factory, dependency = db_fixture
+    config = build_settings(MQTT_TOPICS="ven/ack/#", INGEST_MAX_LATENCY_MS=0)
+    broker = FakeBroker()
+    consumer = _replica(config, dependency)
+    broker.connect(consumer)
+    # The broker would deliver to both filters if ven/ack/+ were still subscribed.
+    broker.subscribe(FakeClient(broker, consumer), "ven/ack/+")
+
+    ack = json.dumps({"op": "event", "status": "completed", "event_id": "evt-dup-ack", "ts": 1700012000}).encode()
+    await broker.publish("ven/ack/dup-ack-ven", ack)
+    await _drain([consumer])
+    await broker.publish("ven/ack/dup-ack-ven", ack)
+    await _drain([consumer])
+
+    async with session_factory() as session:
+        acks = await session.scalar(select(func.count()).select_from(VenAck).where(VenAck.event_id == "evt-dup-ack"))
+        assert acks == 1
+
+
+@pytest.mark.asyncio
+async def test_acks_without_timestamp_are_told_apart_by_payload(db_fixture):
+    session_factory, dependency = db_fixture
+    config = build_settings(MQTT_TOPICS="ven/ack/#", INGEST_MAX_LATENCY_MS=0)
+    broker = FakeBroker()
+    consumer = _replica(config, dependency)
+    broker.connect(consumer)
+
+    first = json.dumps({"op": "event", "status": "completed", "event_id": "evt-no-ts", "actual_shed_kw": 1.5}).encode()
+    second = json.dumps({"op": "event", "status": "completed", "event_id": "evt-no-ts", "actual_shed_kw": 2.5}).encode()
+    for payload in (first, second, first):
+        await broker.publish("ven/ack/no-ts-ven", payload)
+        await _drain([consumer])
+
+    async with session_factory() as session:
+        shed = await session.scalars(select(VenAck.actual_shed_kw).where(VenAck.event_id == "evt-no-ts"))
+        assert sorted(shed) == [1.5, 2.5]
+
+
+@pytest.mark.asyncio
+async def test_throughput_scales_with_replicas(db_fixture, monkeypatch):
+    """Replicas split the group's messages evenly and write their batches concurrently."""
+    _, dependency = db_fixture
+    config = build_settings(MQTT_SHARED_GROUP="ingest", INGEST_BATCH_SIZE=10, INGEST_MAX_LATENCY_MS=0)
+    broker = FakeBroker()
+    replicas = [_replica(config, dependency) for _ in range(3)]
+    written = [0] * len(replicas)
+    writing, overlap = 0, 0
+
+    def slow_write(index: int):
+        async def write(batch):
+            nonlocal writing, overlap
+            writing += 1
+            overlap = max(overlap, writing)
+            # Write latency dominates; other replicas' batches proceed meanwhile.
+            await asyncio.sleep(0.02)
+            writing -= 1
+            written[index] += len(batch.telemetry)
+            return set()
+        return write
+
+    for index, replica in enumerate(replicas):
+        monkeypatch.setattr(replica, "_write", slow_write(index))
+        broker.connect(replica)
+    for i in range(240):
+        await broker.publish(config.mqtt_topic_metering, _metering_payload("scale-ven", 1700013000 + i, loads=0))
+    await _drain(replicas)
+
+    assert written == [80, 80, 80]
+    assert overlap == len(replicas)
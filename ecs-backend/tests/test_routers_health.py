@@ -91,3 +91,15 @@ async def test_demo_status_with_data(client: AsyncClient, test_session: AsyncSes
     assert data["metrics"]["total_events"] == 1
     assert data["services"]["database"] == "connected"
     assert data["services"]["api"] == "operational"
+
+
+@pytest.mark.asyncio
+async def test_ingest_metrics(client: AsyncClient):
+    """Ingest metrics report queue counters even when MQTT is disabled."""
+    response = await client.get("/health/ingest")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    assert data["running"] is False
+    assert data["queue"] is None
+    assert "known_vens" in data["registry"]
@@ -0,0 +1,170 @@
+"""Tests for keyset (cursor) pagination of the list endpoints."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app import crud
+from app.dependencies import get_ven_fragments
+from app.models.ven_ack import VenAck
+from app.routers.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.services.ingest_writer import IngestBatch, write_batch
+from app.services.ven_fragments import VenFragments
+
+NOW = datetime(2025, 10, 10, 12, tzinfo=UTC)
+
+
+async def _walk(client, path: str, **params) -> list[list]:
+    """Every page of ``path``, following ``X-Next-Cursor``."""
+    pages = []
+    while True:
+        response = await client.get(path, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+        params["cursor"] = cursor
+
+
+async def _vens(session, *ven_ids: str) -> None:
+    for ven_id in ven_ids:
+        await crud.create_ven(session, ven_id=ven_id, name=ven_id.upper(), status="online", registration_id=ven_id)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(NOW, 42)
+    assert decode_cursor(cursor, datetime, int) == (NOW, 42)
+    assert decode_cursor(encode_cursor(None, "evt-1"), datetime, str) == (None, "evt-1")
+    for bad in ("", "not base64!", encode_cursor("x"), encode_cursor(NOW, "42"), encode_cursor("yesterday", 1)):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(bad, datetime, int)
+        assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/api/vens/", "/api/vens/summary"])
+async def test_ven_pages_cover_the_fleet(client, test_session, path):
+    await _vens(test_session, "ven-c", "ven-a", "ven-e", "ven-b", "ven-d")
+
+    unpaged = (await client.get(path)).json()
+    assert NEXT_CURSOR_HEADER not in (await client.get(path)).headers
+    pages = await _walk(client, path, limit=2)
+    assert [len(rows) for rows in pages] == [2, 2, 1]
+    assert [row for rows in pages for row in rows] == sorted(unpaged, key=lambda row: row["id"])
+
+
+@pytest.mark.asyncio
+async def test_ven_pages_are_stable_under_inserts(client, test_session):
+    await _vens(test_session, "ven-b", "ven-d", "ven-f")
+
+    first = await client.get("/api/vens/", params={"limit": 2})
+    assert [ven["id"] for ven in first.json()] == ["ven-b", "ven-d"]
+    # One VEN joins before the cursor, one after it.
+    await _vens(test_session, "ven-a", "ven-e")
+    rest = await _walk(client, "/api/vens/", limit=2, cursor=first.headers[NEXT_CURSOR_HEADER])
+    assert [ven["id"] for rows in rest for ven in rows] == ["ven-e", "ven-f"]
+
+
+@pytest.mark.asyncio
+async def test_ven_pages_keep_the_fragments_of_other_pages(client, test_session):
+    from app.main import app
+
+    fragments = VenFragments()
+    app.dependency_overrides[get_ven_fragments] = lambda: fragments
+    await _vens(test_session, "ven-a", "ven-b", "ven-c")
+
+    pages = await _walk(client, "/api/vens/", limit=2)
+    assert [ven["id"] for rows in pages for ven in rows] == ["ven-a", "ven-b", "ven-c"]
+    await _walk(client, "/api/vens/", limit=2)
+    stats = fragments.stats()["views"]["vens"]
+    assert stats["fragments"] == 3
+    assert stats["rendered"] == 3
+
+
+@pytest.mark.asyncio
+async def test_event_pages_cover_every_event(client, test_session):
+    for index, offset in enumerate([3, 1, 1, None, 2]):
+        start = NOW + timedelta(hours=offset) if offset is not None else None
+        end = start + timedelta(hours=1) if start is not None else None
+        await crud.create_event(
+            test_session, event_id=f"evt-{index}", status="scheduled", start_time=start, end_time=end
+        )
+    await test_session.commit()
+
+    pages = await _walk(client, "/api/events/", limit=2)
+    assert [len(rows) for rows in pages] == [2, 2, 1]
+    # By start time, ties by id, unscheduled events last.
+    assert [event["id"] for rows in pages for event in rows] == ["evt-1", "evt-2", "evt-4", "evt-0", "evt-3"]
+
+    pages = await _walk(client, "/api/events/history", start=(NOW + timedelta(hours=2)).isoformat(), limit=1)
+    assert [event["id"] for rows in pages for event in rows] == ["evt-4", "evt-0"]
+
+
+@pytest.mark.asyncio
+async def test_ack_pages_are_newest_first(client, test_session):
+    await _vens(test_session, "ven-a")
+    # Two acknowledgments share a timestamp; the id breaks the tie.
+    timestamps = [NOW, NOW + timedelta(minutes=1), NOW + timedelta(minutes=1), NOW + timedelta(minutes=2)]
+    test_session.add_all(
+        [
+            VenAck(ven_id="ven-a", event_id="evt-1", correlation_id=f"corr-{index}", op="event", status="success", timestamp=ts)
+            for index, ts in enumerate(timestamps)
+        ]
+    )
+    await test_session.commit()
+
+    pages = await _walk(client, "/api/vens/ven-a/events", limit=3)
+    assert [len(rows) for rows in pages] == [3, 1]
+    assert [ack["correlationId"] for rows in pages for ack in rows] == ["corr-3", "corr-2", "corr-1", "corr-0"]
+
+
+@pytest.mark.asyncio
+async def test_circuit_history_pages_by_next_cursor(client, test_session):
+    await _vens(test_session, "ven-a")
+    batch = IngestBatch()
+    for step in range(5):
+        row = {
+            "ven_id": "ven-a",
+            "timestamp": NOW + timedelta(minutes=step),
+            "used_power_kw": 2.0,
+            "shed_power_kw": 0.0,
+            "requested_reduction_kw": None,
+            "event_id": None,
+        }
+        loads = [
+            {"load_id": load_id, "capacity_kw": 5.0, "current_power_kw": float(step), "shed_capability_kw": 0.0}
+            for load_id in ("ev", "hvac")
+        ]
+        batch.add_telemetry(row, loads)
+    await write_batch(test_session, batch)
+    await test_session.commit()
+
+    seen, params = [], {"limit": 4}
+    while True:
+        data = (await client.get("/api/vens/ven-a/circuits/history", params=params)).json()
+        seen.extend((snap["timestamp"], snap["loadId"]) for snap in data["snapshots"])
+        if data["nextCursor"] is None:
+            break
+        params["cursor"] = data["nextCursor"]
+    assert len(seen) == len(set(seen)) == 10
+    assert [ts for ts, _ in seen] == sorted(ts for ts, _ in seen)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/vens/",
+        "/api/vens/summary",
+        "/api/events/",
+        "/api/events/history",
+        "/api/vens/ven-a/events",
+        "/api/vens/ven-a/circuits/history",
+    ],
+)
+async def test_invalid_cursor_is_rejected(client, test_session, path):
+    await _vens(test_session, "ven-a")
+    response = await client.get(path, params={"cursor": "bm90IGEgY3Vyc29y"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -189,6 +189,33 @@ async def test_network_history_with_date_range(client: AsyncClient, test_session
     assert len(points) >= 0  # May be 0 or more depending on aggregation
 
 
+@pytest.mark.asyncio
+async def test_network_history_with_naive_range(client: AsyncClient, test_session: AsyncSession):
+    """Test network history with start/end given without a time zone (read as UTC)."""
+    from app import crud
+    from app.services.ingest_writer import IngestBatch, write_batch
+
+    await crud.create_ven(test_session, ven_id="ven-1", name="Test VEN", status="active", registration_id="reg-1")
+    batch = IngestBatch()
+    row = {
+        "ven_id": "ven-1",
+        "timestamp": datetime(2025, 10, 23, 12, 30, tzinfo=UTC),
+        "used_power_kw": 5.0,
+        "shed_power_kw": 1.0,
+        "requested_reduction_kw": None,
+        "event_id": None,
+    }
+    batch.add_telemetry(row, [])
+    await write_batch(test_session, batch)
+    await test_session.commit()
+
+    for params in ({"start": "2025-10-23T12:00:07"}, {"start": "2025-10-23T12:00:07", "end": "2025-10-23T13:00:07"}):
+        response = await client.get("/api/stats/network/history", params=params)
+        assert response.status_code == 200
+        points = response.json()["points"]
+        assert sum(point["usedPowerKw"] for point in points) == 5.0
+
+
 @pytest.mark.asyncio
 async def test_network_stats_fields(client: AsyncClient, test_session: AsyncSession):
     """Test that network stats contain all expected fields."""
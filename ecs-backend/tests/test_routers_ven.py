@@ -504,3 +504,27 @@ async def test_ven_history(client: AsyncClient, test_session: AsyncSession):
     
     assert "points" in data
     assert isinstance(data["points"], list)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["history", "loads/ev/history"])
+async def test_ven_history_with_naive_range(client: AsyncClient, test_session: AsyncSession, path: str):
+    """Test VEN history with start/end given without a time zone (read as UTC)."""
+    from app import crud
+    from app.models.telemetry import VenTelemetry
+
+    await crud.create_ven(test_session, ven_id="ven-naive", name="VEN", status="active", registration_id="naive-reg")
+    test_session.add(
+        VenTelemetry(
+            ven_id="ven-naive",
+            timestamp=datetime(2025, 10, 23, 12, 30, tzinfo=UTC),
+            used_power_kw=5.0,
+            shed_power_kw=1.0,
+        )
+    )
+    await test_session.commit()
+
+    for params in ({"start": "2025-10-23T12:00:07"}, {"start": "2025-10-23T12:00:07", "end": "2025-10-23T13:00:07"}):
+        response = await client.get(f"/api/vens/ven-naive/{path}", params=params)
+        assert response.status_code == 200
+        assert isinstance(response.json()["points"], list)
@@ -0,0 +1,93 @@
+"""Tests for LTTB downsampling of chart series."""
+import math
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app import crud
+from app.services.downsampling import downsample
+from app.services.ingest_writer import IngestBatch, write_batch
+
+NOW = datetime(2025, 10, 10, 12, tzinfo=UTC)
+
+
+def test_short_series_are_returned_whole():
+    assert downsample([0, 1, 2], [1.0, None, 3.0], 5) == [0, 1, 2]
+
+
+def test_lttb_keeps_extremes_and_ends():
+    x = list(range(1000))
+    y = [math.sin(i / 50) for i in x]
+    y[537] = -10.0
+
+    keep = downsample(x, y, 100)
+
+    assert len(keep) == 100
+    assert keep == sorted(set(keep))
+    assert keep[0] == 0 and keep[-1] == 999
+    assert 537 in keep
+
+
+def test_runs_keep_their_edges():
+    x = list(range(1000))
+    y = [1.0] * 1000
+    keys = [None] * 300 + ["evt-1"] * 17 + [None] * 683
+
+    keep = downsample(x, y, 50, keys=keys)
+
+    assert len(keep) <= 50
+    assert {299, 300, 316, 317} <= set(keep)
+    # Too many runs to keep every edge: the keys are ignored.
+    assert len(downsample(x, y, 50, keys=[i % 2 for i in x])) == 50
+
+
+@pytest.mark.asyncio
+async def test_history_endpoints_bound_the_points(client, test_session):
+    batch = IngestBatch()
+    await crud.create_ven(test_session, ven_id="ven-a", name="A", status="online", registration_id="ven-a")
+    for step in range(600):
+        event_id = "evt-1" if 200 <= step < 230 else None
+        row = {
+            "ven_id": "ven-a",
+            "timestamp": NOW + timedelta(minutes=step),
+            "used_power_kw": 5.0 - (3.0 if event_id else 0.0),
+            "shed_power_kw": 1.0,
+            "requested_reduction_kw": None,
+            "event_id": event_id,
+        }
+        load = {
+            "load_id": "hvac",
+            "name": "HVAC",
+            "type": "hvac",
+            "capacity_kw": 5.0,
+            "current_power_kw": float(step % 7),
+            "shed_capability_kw": 1.0,
+            "enabled": event_id is None,
+        }
+        batch.add_telemetry(row, [load])
+    await write_batch(test_session, batch)
+    await test_session.commit()
+
+    params = {"start": NOW.isoformat(), "granularity": "1m", "maxPoints": 40}
+    for path in ("/api/vens/ven-a/history", "/api/vens/ven-a/loads/hvac/history", "/api/stats/network/history"):
+        response = await client.get(path, params=params)
+        assert response.status_code == 200
+        points = response.json()["points"]
+        assert len(points) <= 40
+        assert [point["eventId"] for point in points].count("evt-1") >= 2
+
+    history = (await client.get("/api/vens/ven-a/history", params=params)).json()["points"]
+    dips = [point["timestamp"] for point in history if point["usedPowerKw"] == 2.0]
+    assert dips[0].startswith("2025-10-10T15:20") and dips[-1].startswith("2025-10-10T15:49")
+
+    circuits = await client.get(
+        "/api/vens/ven-a/circuits/history", params={"start": NOW.isoformat(), "maxPoints": 40}
+    )
+    data = circuits.json()
+    assert data["totalCount"] == len(data["snapshots"]) <= 40
+    assert sum(not snapshot["enabled"] for snapshot in data["snapshots"]) >= 2
+
+    response = await client.get("/api/vens/ven-a/history", params={"maxPoints": 1})
+    assert response.status_code == 422
@@ -0,0 +1,147 @@
+"""Tests for the fleet view cache."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import crud
+from app.dependencies import get_fleet_cache
+from app.services import fleet_cache as fleet_cache_module
+from app.services.fleet_cache import FleetCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    # Only the cache's clock: the event loop keeps the real one.
+    monkeypatch.setattr(fleet_cache_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def _factory(sessions: list):
+    async def factory():
+        sessions.append(object())
+        yield sessions[-1]
+    return factory
+
+
+def _counting_loader(calls: list, delay: float = 0.0):
+    async def loader(session):
+        calls.append(session)
+        count = len(calls)
+        await asyncio.sleep(delay)
+        return count
+    return loader
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load(clock):
+    sessions, calls = [], []
+    cache = FleetCache(_factory(sessions), ttl_s=2.0)
+    loader = _counting_loader(calls, delay=0.01)
+
+    results = await asyncio.gather(*(cache.get("vens", loader) for _ in range(20)))
+
+    assert results == [1] * 20
+    assert len(calls) == len(sessions) == 1
+    assert await cache.get("vens", loader) == 1
+    views = cache.stats()["views"]["vens"]
+    assert (views["misses"], views["hits"], views["refreshes"]) == (20, 1, 1)
+    assert views["avg_refresh_ms"] is not None
+
+
+@pytest.mark.asyncio
+async def test_stale_views_are_served_while_refreshing(clock):
+    calls = []
+    cache = FleetCache(_factory([]), ttl_s=2.0, stale_s=10.0, ttls={"stats_loads": 30.0})
+    loader = _counting_loader(calls)
+    await cache.get("vens", loader)
+    await cache.get("stats_loads", loader)
+
+    clock.now += 5
+    # Past its TTL: the stale value is returned and one refresh starts.
+    assert await cache.get("vens", loader) == 1
+    assert await cache.get("vens", loader) == 1
+    # Per-key TTL: still fresh.
+    assert await cache.get("stats_loads", loader) == 2
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert await cache.get("vens", loader) == 3
+    assert cache.stats()["views"]["vens"]["stale_hits"] == 2
+
+    clock.now += 60
+    # Too old to serve: reloaded before returning.
+    assert await cache.get("vens", loader) == 4
+
+
+@pytest.mark.asyncio
+async def test_invalidation_discards_in_flight_loads(clock):
+    calls = []
+    cache = FleetCache(_factory([]), ttl_s=2.0)
+    loader = _counting_loader(calls, delay=0.01)
+
+    first = asyncio.create_task(cache.get("vens", loader))
+    await asyncio.sleep(0)
+    cache.invalidate()
+    # The load started before the invalidation is not joined or cached.
+    assert await cache.get("vens", loader) == 2
+    assert await first == 1
+    assert await cache.get("vens", loader) == 2
+    assert cache.stats()["views"]["vens"]["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_background_refresh_keeps_the_stale_view(clock):
+    cache = FleetCache(_factory([]), ttl_s=2.0, stale_s=10.0)
+
+    async def ok(session):
+        return "cached"
+
+    async def failing(session):
+        raise RuntimeError("database unavailable")
+
+    await cache.get("vens", ok)
+    clock.now += 3
+    assert await cache.get("vens", failing) == "cached"
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert cache.stats()["views"]["vens"]["errors"] == 1
+    assert await cache.get("vens", ok) == "cached"
+
+
+@pytest.mark.asyncio
+async def test_ven_mutations_invalidate_the_fleet_views(client, test_session):
+    from app.main import app
+
+    async def factory():
+        yield test_session
+
+    cache = FleetCache(factory, ttl_s=60.0)
+    app.dependency_overrides[get_fleet_cache] = lambda: cache
+    await crud.create_ven(test_session, ven_id="ven-a", name="A", status="online", registration_id="ven-a")
+
+    assert [ven["id"] for ven in (await client.get("/api/vens/")).json()] == ["ven-a"]
+    await crud.create_ven(test_session, ven_id="ven-b", name="B", status="online", registration_id="ven-b")
+    # Cached: the VEN added behind the API's back is not listed yet.
+    assert len((await client.get("/api/vens/")).json()) == 1
+
+    created = await client.post(
+        "/api/vens/", json={"name": "C", "location": {"lat": 1.0, "lon": 2.0}, "registrationId": "ven-c"}
+    )
+    assert created.status_code == 201
+    assert len((await client.get("/api/vens/")).json()) == 3
+    assert len((await client.get("/api/vens/summary")).json()) == 3
+
+    await client.delete("/api/vens/ven-b")
+    assert len((await client.get("/api/vens/summary")).json()) == 2
+
+    metrics = (await client.get("/health/fleet-cache")).json()
+    assert metrics["views"]["vens"]["hits"] == 1
@@ -0,0 +1,128 @@
+"""Tests for the fleet rollups folded from the per-VEN rollups."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, update
+
+from app import crud
+from app.core.config import Settings
+from app.models import FleetTelemetryRollup
+from app.services.fleet_rollups import FleetRollups
+from app.services.ingest_writer import IngestBatch, write_batch
+from app.services.telemetry_rollups import fleet_horizon, fold_fleet_rollups
+
+BASE = datetime(2025, 10, 22, 12, 0, tzinfo=UTC)
+
+
+def _sample(ven_id: str, seconds: int, used: float, event_id: str | None = None) -> dict:
+    return {
+        "ven_id": ven_id,
+        "timestamp": BASE + timedelta(seconds=seconds),
+        "used_power_kw": used,
+        "shed_power_kw": 0.0,
+        "requested_reduction_kw": None,
+        "event_id": event_id,
+    }
+
+
+async def _ingest(session, samples: list[dict]) -> None:
+    batch = IngestBatch()
+    for sample in samples:
+        batch.add_telemetry(sample, [])
+    await write_batch(session, batch)
+    await session.commit()
+
+
+async def _fleet_rows(session) -> list[FleetTelemetryRollup]:
+    stmt = (
+        select(FleetTelemetryRollup)
+        .order_by(FleetTelemetryRollup.bucket_seconds, FleetTelemetryRollup.bucket_start)
+        # The fold writes through Core; reload rows already in the session.
+        .execution_options(populate_existing=True)
+    )
+    return list((await session.execute(stmt)).scalars().all())
+
+
+@pytest_asyncio.fixture
+async def vens(test_session):
+    for ven_id in ("ven-f", "ven-g"):
+        await crud.create_ven(test_session, ven_id=ven_id, name="VEN", status="online", registration_id=ven_id)
+
+
+@pytest_asyncio.fixture
+async def session_factory(test_session):
+    async def _factory():
+        yield test_session
+    return _factory
+
+
+@pytest.mark.asyncio
+async def test_fold_writes_closed_buckets_only(test_session, vens):
+    await _ingest(
+        test_session,
+        [_sample("ven-f", 10, 2.0, "evt-1"), _sample("ven-g", 50, 4.0, "evt-2"), _sample("ven-g", 70, 6.0)],
+    )
+    # Ingest leaves the fleet rollups to the fold.
+    assert await test_session.scalar(select(func.count()).select_from(FleetTelemetryRollup)) == 0
+
+    # 12:01:30: only the first minute is closed.
+    now = BASE + timedelta(seconds=90)
+    assert await fold_fleet_rollups(test_session, timedelta(minutes=5), now) == 1
+    await test_session.commit()
+    [minute] = await _fleet_rows(test_session)
+    assert (minute.bucket_seconds, minute.bucket_start.replace(tzinfo=UTC)) == (60, BASE)
+    assert (minute.sample_count, minute.used_power_sum, minute.used_power_count) == (2, 6.0, 2)
+    assert (minute.used_power_min, minute.used_power_max, minute.event_id) == (2.0, 4.0, "evt-2")
+    assert await fleet_horizon(test_session, 60, now) == BASE + timedelta(minutes=1)
+    assert await fleet_horizon(test_session, 300, now) is None
+
+    # A late sample within the lookback is folded again.
+    await _ingest(test_session, [_sample("ven-f", 55, 1.0, "evt-3")])
+    await fold_fleet_rollups(test_session, timedelta(minutes=5), now)
+    await test_session.commit()
+    [minute] = await _fleet_rows(test_session)
+    assert (minute.sample_count, minute.used_power_sum, minute.used_power_min) == (3, 7.0, 1.0)
+    assert minute.event_id == "evt-3"
+
+
+@pytest.mark.asyncio
+async def test_fold_catches_up_from_the_newest_fleet_bucket(test_session, vens):
+    await _ingest(test_session, [_sample("ven-f", seconds, 1.0) for seconds in (30, 90, 150, 210)])
+    await fold_fleet_rollups(test_session, timedelta(0), BASE + timedelta(minutes=1))
+    await test_session.commit()
+
+    # Four minutes later, with a lookback of one minute.
+    assert await fold_fleet_rollups(test_session, timedelta(minutes=1), BASE + timedelta(minutes=4)) == 4
+    await test_session.commit()
+    minutes = [row for row in await _fleet_rows(test_session) if row.bucket_seconds == 60]
+    assert [row.bucket_start.replace(tzinfo=UTC) for row in minutes] == [BASE + timedelta(minutes=n) for n in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_fleet_history_reads_folded_buckets_from_the_fleet_rollups(test_session, vens):
+    await _ingest(test_session, [_sample("ven-f", 30, 2.0), _sample("ven-g", 90, 4.0)])
+    await fold_fleet_rollups(test_session, timedelta(0), BASE + timedelta(seconds=90))
+    # Marks the folded minute; the open one is summed over the VENs.
+    await test_session.execute(update(FleetTelemetryRollup).values(used_power_sum=20.0))
+    await test_session.commit()
+
+    buckets = await crud.telemetry_history(test_session, None, 60, start=BASE, end=BASE + timedelta(minutes=2))
+    assert [(bucket.bucket_start, bucket.used_power_sum) for bucket in buckets] == [
+        (BASE, 20.0),
+        (BASE + timedelta(minutes=1), 4.0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_service_run_once_counts_folded_buckets(session_factory, test_session, vens):
+    await _ingest(test_session, [_sample("ven-f", 30, 2.0)])
+    config = Settings(DB_HOST="h", DB_USER="u", DB_PASSWORD="p", DB_NAME="n", FLEET_ROLLUP_LOOKBACK_S=0)
+    service = FleetRollups(session_factory=session_factory, config=config)
+
+    now = BASE + timedelta(hours=1)
+    await service.run_once(now)
+
+    # One bucket of each resolution.
+    assert service.stats() == {"folded_buckets": 3, "last_run": now.isoformat()}
+    assert len(await _fleet_rows(test_session)) == 3
@@ -0,0 +1,144 @@
+"""Tests for the in-memory hot telemetry window."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+pytest.importorskip("numpy")
+
+from app import crud
+from app.dependencies import get_hot_window
+from app.routers.utils import build_history_response, history_bucket_seconds
+from app.services.hot_window import SAMPLE_BYTES, HotWindow, HotWindowFeed
+from app.services.ingest_writer import IngestBatch, write_batch
+
+NOW = datetime(2025, 10, 10, 12, tzinfo=UTC)
+
+
+def _row(ven_id: str, timestamp: datetime, used: float, event_id: str | None = None) -> dict:
+    return {
+        "ven_id": ven_id,
+        "timestamp": timestamp,
+        "used_power_kw": used,
+        "shed_power_kw": 1.0,
+        "requested_reduction_kw": 2.0 if event_id else None,
+        "event_id": event_id,
+    }
+
+
+def _points(rows, granularity: str):
+    return [
+        (point.timestamp, pytest.approx(point.usedPowerKw), point.requestedReductionKw, point.eventId)
+        for point in build_history_response([], granularity, rollups=rows).points
+    ]
+
+
+@pytest_asyncio.fixture
+async def ingested(test_session):
+    """Two VENs with a sample every minute over the last 3 hours."""
+
+    batch = IngestBatch()
+    for ven_id in ("ven-a", "ven-b"):
+        await crud.create_ven(test_session, ven_id=ven_id, name=ven_id, status="online", registration_id=ven_id)
+        for step in range(180):
+            timestamp = NOW - timedelta(minutes=step)
+            event_id = f"evt-{step // 40}" if step % 3 == 0 else None
+            batch.add_telemetry(_row(ven_id, timestamp, step * 0.5, event_id), [])
+    await write_batch(test_session, batch)
+    await test_session.commit()
+    return test_session
+
+
+@pytest_asyncio.fixture
+async def session_factory(test_session):
+    async def _factory():
+        yield test_session
+    return _factory
+
+
+def test_series_evicts_oldest_block_when_full():
+    window = HotWindow(hours=24, samples_per_ven=8, max_vens=2)
+    window.reset(NOW - timedelta(hours=24))
+    rows = [_row("ven-a", NOW - timedelta(minutes=minute), 1.0) for minute in range(10)]
+    # Out of order and with a duplicate: inserts keep the buffers sorted.
+    assert window.add(rows[::-1] + rows[:1], now=NOW.timestamp()) == 10
+    assert window.stats()["samples"] == 8
+    assert window.stats()["bytes"] == 8 * SAMPLE_BYTES
+
+    recent = window.history("ven-a", 60, NOW - timedelta(minutes=5), NOW, now=NOW.timestamp())
+    assert [row.bucket_start for row in recent] == [NOW - timedelta(minutes=m) for m in range(5, -1, -1)]
+    # Evicted samples are not answered from memory.
+    assert window.history("ven-a", 60, NOW - timedelta(minutes=8), NOW, now=NOW.timestamp()) is None
+    assert window.add([_row("ven-a", NOW - timedelta(minutes=9), 1.0)], now=NOW.timestamp()) == 0
+
+
+def test_window_declines_uncovered_queries():
+    window = HotWindow(hours=2, samples_per_ven=100, max_vens=1)
+    now = NOW.timestamp()
+    assert window.history("ven-a", 60, NOW - timedelta(minutes=5), now=now) is None
+
+    window.reset(NOW - timedelta(hours=2))
+    window.add([_row("ven-a", NOW, 1.0), _row("ven-b", NOW, 1.0)], now=now)
+    assert window.stats()["rejected_vens"] == 1
+    assert window.history("ven-a", 60, NOW - timedelta(minutes=5), now=now) is not None
+    # ven-b and the fleet are incomplete once a VEN was turned away.
+    assert window.history("ven-b", 60, NOW - timedelta(minutes=5), now=now) is None
+    assert window.history(None, 60, NOW - timedelta(minutes=5), now=now) is None
+    # Before the window or without a start it is the database's job.
+    assert window.history("ven-a", 60, NOW - timedelta(hours=3), now=now) is None
+    assert window.history("ven-a", 60, None, now=now) is None
+    assert window.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ven_id", ["ven-a", None])
+@pytest.mark.parametrize("granularity", ["1m", "15m"])
+async def test_window_history_matches_the_database(ingested, session_factory, ven_id, granularity):
+    window = HotWindow(hours=4, samples_per_ven=1000, max_vens=10)
+    feed = HotWindowFeed(window, session_factory=session_factory, tail=True)
+    assert await feed.backfill(NOW) == 360
+
+    start, end = NOW - timedelta(hours=2, minutes=7), NOW - timedelta(minutes=3)
+    bucket_seconds = history_bucket_seconds(granularity)
+    expected = await crud.telemetry_history(ingested, ven_id, bucket_seconds, start=start, end=end)
+    history = window.history(ven_id, bucket_seconds, start, end, now=NOW.timestamp())
+    assert _points(history, granularity) == _points(expected, granularity)
+
+
+@pytest.mark.asyncio
+async def test_tail_picks_up_new_telemetry(ingested, session_factory):
+    window = HotWindow(hours=1, samples_per_ven=1000, max_vens=10)
+    feed = HotWindowFeed(window, session_factory=session_factory, tail=True)
+    await feed.backfill(NOW)
+    assert window.stats()["samples"] == 2 * 61
+
+    batch = IngestBatch()
+    batch.add_telemetry(_row("ven-a", NOW + timedelta(seconds=30), 9.0), [])
+    await write_batch(ingested, batch)
+    await ingested.commit()
+
+    assert await feed.run_once(NOW + timedelta(minutes=1)) == 1
+    rows = window.history("ven-a", 60, NOW, now=(NOW + timedelta(minutes=1)).timestamp())
+    assert [(row.sample_count, row.used_power_sum) for row in rows] == [(2, 9.0)]
+
+
+@pytest.mark.asyncio
+async def test_history_endpoint_reads_the_window(client, test_session):
+    from app.main import app
+
+    now = datetime.now(UTC).replace(microsecond=0)
+    await crud.create_ven(test_session, ven_id="ven-a", name="A", status="online", registration_id="ven-a")
+    window = HotWindow(hours=1, samples_per_ven=100, max_vens=10)
+    window.reset(now - timedelta(hours=1))
+    window.add([_row("ven-a", now - timedelta(minutes=2), 4.0)])
+    app.dependency_overrides[get_hot_window] = lambda: window
+
+    params = {"start": (now - timedelta(minutes=10)).isoformat(), "granularity": "5m"}
+    response = await client.get("/api/vens/ven-a/history", params=params)
+    assert response.status_code == 200
+    # Only the window holds the sample.
+    assert [point["usedPowerKw"] for point in response.json()["points"]] == [4.0]
+    assert window.stats()["hits"] == 1
+
+    response = await client.get("/health/hot-window")
+    assert response.json()["status"] == "ok"
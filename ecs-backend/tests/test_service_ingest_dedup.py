@@ -0,0 +1,46 @@
+"""Tests for the recent telemetry key cache."""
+from app.services.ingest_dedup import RecentKeyCache
+
+
+def test_recorded_keys_are_seen_per_ven():
+    cache = RecentKeyCache(window_s=60, max_keys_per_ven=10)
+    cache.record("ven-1", 1)
+
+    assert cache.seen("ven-1", 1)
+    assert not cache.seen("ven-1", 2)
+    assert not cache.seen("ven-2", 1)
+    assert cache.stats()["duplicates_dropped"] == 1
+
+
+def test_keys_expire_after_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.ingest_dedup.time.monotonic", lambda: now[0])
+    cache = RecentKeyCache(window_s=60, max_keys_per_ven=10)
+    cache.record("ven-1", 1)
+    now[0] += 30
+    cache.record("ven-1", 2)
+
+    now[0] += 40
+    assert not cache.seen("ven-1", 1)
+    assert cache.seen("ven-1", 2)
+
+    now[0] += 60
+    assert not cache.seen("ven-1", 2)
+    assert cache.stats()["vens"] == 0
+
+
+def test_keys_per_ven_are_bounded():
+    cache = RecentKeyCache(window_s=60, max_keys_per_ven=3)
+    for key in range(5):
+        cache.record("ven-1", key)
+
+    assert cache.stats()["keys"] == 3
+    assert not cache.seen("ven-1", 0)
+    assert cache.seen("ven-1", 4)
+
+
+def test_zero_window_disables_cache():
+    cache = RecentKeyCache(window_s=0, max_keys_per_ven=3)
+    cache.record("ven-1", 1)
+
+    assert not cache.seen("ven-1", 1)
@@ -0,0 +1,173 @@
+"""Tests for the bounded ingest queue and its overflow policies."""
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+from app.services.ingest_queue import IngestQueue, OverflowPolicy, combined_stats
+
+
+@dataclass
+class Item:
+    name: str
+    droppable: bool = True
+
+
+def _drain(queue: IngestQueue) -> list[str]:
+    names = []
+    while not queue.empty():
+        names.append(queue.get_nowait().name)
+        queue.task_done()
+    return names
+
+
+@pytest.mark.asyncio
+async def test_drop_newest_discards_incoming_telemetry():
+    queue = IngestQueue(2, OverflowPolicy.DROP_NEWEST)
+    for name in ("a", "b", "c"):
+        await queue.offer(Item(name))
+
+    assert _drain(queue) == ["a", "b"]
+    assert queue.stats() == {
+        "depth": 0,
+        "maxsize": 2,
+        "policy": "drop_newest",
+        "waiting": 0,
+        "enqueued": 2,
+        "dropped_oldest": 0,
+        "dropped_newest": 1,
+        "rejected": 0,
+        "completed": 2,
+        "failed": 0,
+        "spooled": 0,
+        "persisted": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_evicts_first_droppable_item():
+    queue = IngestQueue(3, "drop_oldest")
+    await queue.offer(Item("ack-1", droppable=False))
+    await queue.offer(Item("a"))
+    await queue.offer(Item("b"))
+    await queue.offer(Item("c"))
+
+    assert _drain(queue) == ["ack-1", "b", "c"]
+    assert queue.dropped_oldest == 1
+    assert queue.dropped_newest == 0
+    assert queue.completed == 3
+    await asyncio.wait_for(queue.join(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_acks_displace_telemetry_when_full():
+    """Under both drop policies an ACK evicts queued telemetry instead of being dropped."""
+    for policy in (OverflowPolicy.DROP_NEWEST, OverflowPolicy.DROP_OLDEST):
+        queue = IngestQueue(2, policy)
+        await queue.offer(Item("a"))
+        await queue.offer(Item("b"))
+
+        assert await queue.offer(Item("ack-1", droppable=False)) is True
+        assert _drain(queue) == ["b", "ack-1"]
+        assert queue.dropped_oldest == 1
+
+
+@pytest.mark.asyncio
+async def test_acks_wait_when_queue_holds_only_acks():
+    """A queue full of ACKs makes further ACKs wait for room regardless of policy."""
+    for policy in OverflowPolicy:
+        queue = IngestQueue(1, policy)
+        await queue.offer(Item("ack-1", droppable=False))
+
+        pending = asyncio.create_task(queue.offer(Item("ack-2", droppable=False)))
+        await asyncio.sleep(0)
+        assert not pending.done()
+
+        assert queue.get_nowait().name == "ack-1"
+        queue.task_done()
+        assert await asyncio.wait_for(pending, timeout=1) is True
+        assert _drain(queue) == ["ack-2"]
+        assert queue.dropped_oldest == queue.dropped_newest == 0
+
+
+@pytest.mark.asyncio
+async def test_block_policy_waits_for_space():
+    queue = IngestQueue(1, OverflowPolicy.BLOCK)
+    await queue.offer(Item("a"))
+
+    pending = asyncio.create_task(queue.offer(Item("b")))
+    await asyncio.sleep(0)
+    assert not pending.done()
+
+    queue.get_nowait()
+    queue.task_done()
+    await asyncio.wait_for(pending, timeout=1)
+    assert _drain(queue) == ["b"]
+    assert queue.dropped_newest == 0
+
+
+@pytest.mark.asyncio
+async def test_block_policy_bounds_waiting_offers():
+    """Past ``max_waiting`` blocked offers, telemetry is refused rather than parked."""
+    queue = IngestQueue(1, OverflowPolicy.BLOCK, max_waiting=2)
+    await queue.offer(Item("a"))
+
+    waiting = [asyncio.create_task(queue.offer(Item(name))) for name in ("b", "c")]
+    await asyncio.sleep(0)
+    assert queue.stats()["waiting"] == 2
+
+    assert await queue.offer(Item("d")) is False
+    assert queue.dropped_newest == 1
+
+    # An ACK still gets in by displacing queued telemetry.
+    assert await queue.offer(Item("ack-1", droppable=False)) is True
+    assert queue.dropped_oldest == 1
+
+    for task in waiting:
+        task.cancel()
+    await asyncio.gather(*waiting, return_exceptions=True)
+    assert queue.stats()["waiting"] == 0
+    assert _drain(queue) == ["ack-1"]
+
+
+@pytest.mark.asyncio
+async def test_saturated_queue_of_acks_refuses():
+    queue = IngestQueue(1, OverflowPolicy.DROP_OLDEST, max_waiting=0)
+    await queue.offer(Item("ack-1", droppable=False))
+
+    assert await queue.offer(Item("ack-2", droppable=False)) is False
+    assert queue.rejected == 1
+
+
+def test_record_failed_separates_persisted():
+    queue = IngestQueue(2)
+    queue.put_nowait(Item("a"))
+    queue.put_nowait(Item("b"))
+    for _ in range(2):
+        queue.get_nowait()
+        queue.task_done()
+    queue.record_failed(1)
+
+    stats = queue.stats()
+    assert (stats["completed"], stats["failed"], stats["persisted"]) == (2, 1, 1)
+
+
+def test_rejects_unbounded_queue():
+    with pytest.raises(ValueError):
+        IngestQueue(0)
+
+
+@pytest.mark.asyncio
+async def test_combined_stats_sums_shards():
+    shards = [IngestQueue(1, OverflowPolicy.DROP_NEWEST) for _ in range(2)]
+    for shard in shards:
+        await shard.offer(Item("kept"))
+    await shards[0].offer(Item("dropped"))
+
+    combined = combined_stats(shards)
+
+    assert combined["depth"] == 2
+    assert combined["maxsize"] == 2
+    assert combined["enqueued"] == 2
+    assert combined["dropped_newest"] == 1
+    assert combined["policy"] == "drop_newest"
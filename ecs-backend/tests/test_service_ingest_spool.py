@@ -0,0 +1,57 @@
+"""Tests for the on-disk ingest spool."""
+import pytest
+
+from app.services.ingest_spool import IngestSpool, SpooledMessage, SpoolFullError
+
+
+def _messages(*names: str) -> list[SpooledMessage]:
+    return [SpooledMessage("volttron/metering", name.encode(), 1700000000.0 + i) for i, name in enumerate(names)]
+
+
+def test_segments_are_replayed_oldest_first(tmp_path):
+    spool = IngestSpool(tmp_path, segment_bytes=64, max_bytes=10_000)
+    spool.append(_messages("a", "b"))
+    spool.append(_messages("c"))
+    spool.append(_messages("d"))
+
+    payloads = []
+    while (segment := spool.oldest_segment()) is not None:
+        path, messages = segment
+        payloads.extend(message.payload.decode() for message in messages)
+        spool.remove(path)
+
+    assert payloads == ["a", "b", "c", "d"]
+    assert spool.stats()["segments"] == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spool_survives_restart_and_ignores_torn_record(tmp_path):
+    spool = IngestSpool(tmp_path, segment_bytes=1_000, max_bytes=10_000)
+    spool.append(_messages("kept"))
+    segment_file = next(tmp_path.iterdir())
+    with open(segment_file, "ab") as handle:
+        handle.write(b"\x00\x01partial")
+
+    reopened = IngestSpool(tmp_path, segment_bytes=1_000, max_bytes=10_000)
+    reopened.append(_messages("new"))
+
+    stats = reopened.stats()
+    assert stats["segments"] == 2
+    assert stats["oldest_age_s"] > 0
+    path, messages = reopened.oldest_segment()
+    assert path == segment_file
+    assert [message.payload for message in messages] == [b"kept"]
+    assert messages[0].topic == "volttron/metering"
+
+
+def test_full_spool_rejects_without_writing(tmp_path):
+    spool = IngestSpool(tmp_path, segment_bytes=1_000, max_bytes=40)
+    spool.append(_messages("x"))
+
+    with pytest.raises(SpoolFullError):
+        spool.append(_messages("y" * 50))
+
+    stats = spool.stats()
+    assert stats["spooled"] == 1
+    assert stats["rejected"] == 1
+    assert stats["bytes"] < 40
@@ -0,0 +1,63 @@
+"""Tests for the latest VEN state maintained on ingest."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app import crud
+from app.services.ingest_writer import IngestBatch, write_batch
+
+BASE = datetime(2025, 10, 22, 12, 0, tzinfo=UTC)
+
+
+def _telemetry(seconds: int, used: float) -> dict:
+    return {"ven_id": "ven-l", "timestamp": BASE + timedelta(seconds=seconds), "used_power_kw": used}
+
+
+def _load(load_id: str, power: float) -> dict:
+    return {"load_id": load_id, "type": "hvac", "current_power_kw": power}
+
+
+async def _ingest(session, *samples: tuple[dict, list[dict]]) -> None:
+    batch = IngestBatch()
+    for row, loads in samples:
+        batch.add_telemetry(row, loads)
+    await write_batch(session, batch)
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_latest_state_follows_the_newest_sample(test_session):
+    await crud.create_ven(test_session, ven_id="ven-l", name="VEN", status="online", registration_id="reg-l")
+    await _ingest(
+        test_session,
+        (_telemetry(10, 2.0), [_load("hvac", 1.0), _load("ev", 1.0)]),
+        (_telemetry(5, 1.0), [_load("hvac", 0.5)]),
+    )
+    await _ingest(test_session, (_telemetry(20, 3.0), [_load("ev", 2.0), _load("hvac", 1.0)]))
+
+    latest = (await crud.latest_telemetry_map(test_session, ["ven-l"]))["ven-l"]
+    assert latest.used_power_kw == 3.0
+    assert [(load.load_id, load.current_power_kw) for load in latest.loads] == [("ev", 2.0), ("hvac", 1.0)]
+
+
+@pytest.mark.asyncio
+async def test_late_samples_do_not_replace_newer_state(test_session):
+    await crud.create_ven(test_session, ven_id="ven-l", name="VEN", status="online", registration_id="reg-l")
+    await _ingest(test_session, (_telemetry(20, 3.0), [_load("hvac", 1.0)]))
+    await _ingest(test_session, (_telemetry(10, 9.0), [_load("hvac", 9.0), _load("ev", 9.0)]))
+
+    latest = (await crud.latest_telemetry_map(test_session))["ven-l"]
+    assert latest.timestamp.replace(tzinfo=UTC) == BASE + timedelta(seconds=20)
+    assert [(load.load_id, load.current_power_kw) for load in latest.loads] == [("hvac", 1.0)]
+
+
+@pytest.mark.asyncio
+async def test_loads_missing_from_the_latest_sample_are_dropped(client, test_session):
+    await crud.create_ven(test_session, ven_id="ven-l", name="VEN", status="online", registration_id="reg-l")
+    await _ingest(test_session, (_telemetry(10, 2.0), [_load("hvac", 1.0), _load("ev", 1.0)]))
+    await _ingest(test_session, (_telemetry(20, 2.0), [_load("hvac", 1.5)]))
+
+    response = await client.get("/api/vens/ven-l/loads")
+
+    assert response.status_code == 200
+    assert [(load["id"], load["currentPowerKw"]) for load in response.json()] == [("hvac", 1.5)]
@@ -0,0 +1,85 @@
+"""Tests for the load catalog referenced by per-load samples."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app import crud
+from app.models import VenLoad, VenLoadSample
+from app.services.ingest_writer import IngestBatch, write_batch
+from app.services.load_catalog import catalog_rows
+
+BASE = datetime(2025, 10, 22, 12, 0, tzinfo=UTC)
+
+
+def _load(load_id: str, power: float, name: str = "Heat pump", capacity: float = 5.0) -> dict:
+    return {
+        "load_id": load_id,
+        "name": name,
+        "type": "hvac",
+        "capacity_kw": capacity,
+        "current_power_kw": power,
+        "shed_capability_kw": power / 2,
+        "enabled": True,
+        "priority": 1,
+    }
+
+
+async def _ingest(session, *samples: tuple[int, list[dict]]) -> None:
+    batch = IngestBatch()
+    for seconds, loads in samples:
+        batch.add_telemetry({"ven_id": "ven-c", "timestamp": BASE + timedelta(seconds=seconds)}, loads)
+    await write_batch(session, batch)
+    await session.commit()
+
+
+def test_catalog_rows_take_attributes_from_the_newest_sample():
+    rows = catalog_rows(
+        [
+            ("ven-c", BASE + timedelta(seconds=10), [_load("hvac", 1.0, "new"), _load("hvac", 1.0, "dup")]),
+            ("ven-c", BASE, [_load("hvac", 1.0, "old"), _load("ev", 2.0)]),
+        ]
+    )
+
+    assert [(row["load_id"], row["name"]) for row in rows] == [("ev", "Heat pump"), ("hvac", "new")]
+    assert "current_power_kw" not in rows[0]
+
+
+@pytest.mark.asyncio
+async def test_catalog_changes_only_with_newer_attributes(test_session):
+    await crud.create_ven(test_session, ven_id="ven-c", name="VEN", status="online", registration_id="reg-c")
+    await _ingest(test_session, (0, [_load("hvac", 1.0)]), (10, [_load("hvac", 2.0)]))
+    catalog = (await test_session.execute(select(VenLoad.id, VenLoad.timestamp))).all()
+    assert len(catalog) == 1
+
+    # Unchanged attributes leave the entry alone; changed ones from a late
+    # sample do not replace newer ones.
+    await _ingest(test_session, (20, [_load("hvac", 3.0)]), (5, [_load("hvac", 3.0, name="stale")]))
+    assert (await test_session.execute(select(VenLoad.id, VenLoad.timestamp))).all() == catalog
+
+    await _ingest(test_session, (30, [_load("hvac", 4.0, capacity=7.5)]))
+    entry = await test_session.scalar(select(VenLoad))
+    await test_session.refresh(entry)
+    assert (entry.id, entry.name, entry.capacity_kw) == (catalog[0][0], "Heat pump", 7.5)
+
+    samples = (await test_session.execute(select(VenLoadSample.load_ref, VenLoadSample.current_power_kw))).all()
+    assert sorted(samples) == [(entry.id, power) for power in (1.0, 2.0, 3.0, 3.0, 4.0)]
+
+
+@pytest.mark.asyncio
+async def test_circuit_history_reads_attributes_from_the_catalog(client, test_session):
+    await crud.create_ven(test_session, ven_id="ven-c", name="VEN", status="online", registration_id="reg-c")
+    await _ingest(
+        test_session,
+        (0, [_load("hvac", 1.0), _load("ev", 2.0, name="Charger")]),
+        (10, [_load("ev", 3.0, name="Charger")]),
+    )
+
+    response = await client.get("/api/vens/ven-c/circuits/history?load_id=ev")
+
+    assert response.status_code == 200
+    snapshots = response.json()["snapshots"]
+    assert [(item["loadId"], item["name"], item["capacityKw"], item["currentPowerKw"]) for item in snapshots] == [
+        ("ev", "Charger", 5.0, 2.0),
+        ("ev", "Charger", 5.0, 3.0),
+    ]
@@ -0,0 +1,124 @@
+"""Tests for telemetry partition planning and maintenance."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+from app import crud
+from app.core.config import Settings
+from app.models import VenLoadSample, VenTelemetry
+from app.services.partition_maintenance import (
+    Partition,
+    PartitionMaintenance,
+    expired_partitions,
+    interval_start,
+    parse_bound,
+    plan_partitions,
+)
+
+# A Wednesday.
+NOW = datetime(2025, 10, 22, 13, 30, tzinfo=UTC)
+
+
+def _day(day: int) -> datetime:
+    return datetime(2025, 10, day, tzinfo=UTC)
+
+
+@pytest_asyncio.fixture
+async def session_factory(test_session):
+    async def _factory():
+        yield test_session
+    return _factory
+
+
+def test_interval_start_day_and_week():
+    assert interval_start(NOW, "day") == _day(22)
+    assert interval_start(NOW, "week") == _day(20)
+
+
+def test_parse_bound():
+    partition = parse_bound(
+        "ven_telemetry_p20251020",
+        "FOR VALUES FROM ('2025-10-20 02:00:00+02') TO ('2025-10-27 01:00:00+01')",
+    )
+
+    assert partition == Partition("ven_telemetry_p20251020", _day(20), _day(27))
+    assert parse_bound("ven_telemetry_default", "DEFAULT") is None
+
+
+def test_plan_daily_partitions_from_scratch():
+    planned = plan_partitions("ven_telemetry", [], NOW, "day", ahead=2)
+
+    assert [(p.name, p.lower, p.upper) for p in planned] == [
+        ("ven_telemetry_p20251022", _day(22), _day(23)),
+        ("ven_telemetry_p20251023", _day(23), _day(24)),
+        ("ven_telemetry_p20251024", _day(24), _day(25)),
+    ]
+
+
+def test_plan_continues_after_existing_partitions():
+    existing = [Partition("ven_telemetry_p20251020", _day(20), _day(27))]
+
+    planned = plan_partitions("ven_telemetry", existing, NOW, "day", ahead=7)
+
+    assert planned[0].lower == _day(27)
+    assert planned[-1].upper == _day(30)
+    assert plan_partitions("ven_telemetry", existing, NOW, "day", ahead=4) == []
+
+
+def test_plan_switching_to_weekly_aligns_to_week_boundaries():
+    existing = [Partition("ven_load_samples_p20251023", _day(23), _day(24))]
+
+    planned = plan_partitions("ven_load_samples", existing, NOW, "week", ahead=1)
+
+    # The first partition only fills the rest of the current week.
+    assert [(p.lower, p.upper) for p in planned] == [
+        (_day(24), _day(27)),
+        (_day(27), datetime(2025, 11, 3, tzinfo=UTC)),
+    ]
+
+
+def test_expired_partitions_respect_retention():
+    existing = [
+        Partition("ven_telemetry_p20251010", _day(10), _day(11)),
+        Partition("ven_telemetry_p20251011", _day(11), _day(12)),
+        Partition("ven_telemetry_p20251012", _day(12), _day(13)),
+    ]
+
+    assert expired_partitions(existing, NOW, None) == []
+    # Cutoff is Oct 12 13:30: only partitions ending before it go.
+    assert [p.name for p in expired_partitions(existing, NOW, 10)] == [
+        "ven_telemetry_p20251010",
+        "ven_telemetry_p20251011",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_maintenance_is_a_noop_on_sqlite(session_factory):
+    config = Settings(DB_HOST="h", DB_USER="u", DB_PASSWORD="p", DB_NAME="n", TELEMETRY_RETENTION_DAYS=1)
+    maintenance = PartitionMaintenance(session_factory=session_factory, config=config)
+
+    await maintenance.run_once(NOW)
+
+    assert maintenance.stats() == {"created": 0, "dropped": 0, "last_run": NOW.isoformat()}
+
+
+@pytest.mark.asyncio
+async def test_load_samples_take_their_telemetry_timestamp(test_session):
+    await crud.create_ven(test_session, ven_id="ven-ts", name="VEN", status="online", registration_id="reg-ts")
+    timestamp = datetime.now(UTC) - timedelta(hours=1)
+    telemetry = VenTelemetry(ven_id="ven-ts", timestamp=timestamp, used_power_kw=1.0)
+    test_session.add(telemetry)
+    await test_session.flush()
+    test_session.add(VenLoadSample(telemetry_id=telemetry.id, load_id="hvac1", current_power_kw=1.0))
+    test_session.add(VenLoadSample(telemetry=telemetry, load_id="ev1", current_power_kw=2.0))
+    await test_session.commit()
+
+    samples = await crud.get_load_snapshots(
+        test_session, "ven-ts", start=timestamp - timedelta(minutes=1), end=timestamp + timedelta(minutes=1)
+    )
+
+    assert sorted(sample.load_id for sample, _ in samples) == ["ev1", "hvac1"]
+    assert all(sample.timestamp is not None for sample, _ in samples)
+    history = await crud.telemetry_for_ven(test_session, "ven-ts", start=timestamp - timedelta(minutes=1))
+    assert sorted(load.load_id for load in history[0].loads) == ["ev1", "hvac1"]
@@ -0,0 +1,60 @@
+"""Tests for the raw payload policy and the raw telemetry debug endpoint."""
+import json
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import select
+
+from app import crud
+from app.core.compression import compress, decompress
+from app.models import VenAck, VenTelemetry, VenTelemetryRaw
+from app.services.ingest_writer import IngestBatch, write_batch
+from app.services.raw_payloads import RawPayloadPolicy
+
+
+def test_compression_round_trips():
+    data = json.dumps({"venId": "ven-x", "loads": [{"id": "load-1"}] * 50}).encode()
+
+    codec, blob = compress(data)
+
+    assert len(blob) < len(data)
+    assert decompress(codec, blob) == data
+
+
+@pytest.mark.parametrize(
+    "mode, sample_every, kept",
+    [("compressed", 1, 6), ("sampled", 3, 2), ("sampled", 1, 6), ("off", 1, 0)],
+)
+def test_policy_keeps_the_configured_share(mode, sample_every, kept):
+    policy = RawPayloadPolicy(mode, sample_every)
+
+    encoded = [policy.encode(b'{"venId": "ven-x"}') for _ in range(6)]
+
+    assert sum(blob is not None for blob in encoded) == kept
+
+
+@pytest.mark.asyncio
+async def test_raw_telemetry_is_deferred_and_served_by_the_debug_endpoint(client, test_session):
+    await crud.create_ven(test_session, ven_id="ven-raw", name="VEN", status="online", registration_id="reg-raw")
+    message = {"venId": "ven-raw", "timestamp": 1761134400, "usedPowerKw": 1.5}
+    batch = IngestBatch()
+    batch.add_telemetry(
+        {"ven_id": "ven-raw", "timestamp": datetime(2025, 10, 22, 12, 0, tzinfo=UTC), "used_power_kw": 1.5},
+        [],
+        compress(json.dumps(message).encode()),
+    )
+    await write_batch(test_session, batch)
+    await test_session.commit()
+    test_session.expunge_all()
+
+    telemetry = await test_session.scalar(select(VenTelemetry).where(VenTelemetry.ven_id == "ven-raw"))
+    assert "raw_payload" not in telemetry.__dict__
+    assert await test_session.get(VenTelemetryRaw, telemetry.id) is not None
+    assert VenAck.__mapper__.column_attrs["raw_payload"].deferred
+
+    response = await client.get(f"/api/vens/ven-raw/telemetry/{telemetry.id}/raw")
+    assert response.status_code == 200
+    assert response.json()["payload"] == message
+
+    missing = await client.get(f"/api/vens/other-ven/telemetry/{telemetry.id}/raw")
+    assert missing.status_code == 404
@@ -0,0 +1,175 @@
+"""Tests for request coalescing."""
+import asyncio
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.services.single_flight import SingleFlight, coalesce, single_flight
+
+
+def _counting(calls: list, delay: float = 0.01):
+    @coalesce
+    async def fetch(session, ven_id: str, start: datetime | None = None, ids: list[str] | None = None):
+        calls.append(session)
+        await asyncio.sleep(delay)
+        return {"ven_id": ven_id, "run": len(calls)}
+    return fetch
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_calls_share_one_run():
+    calls = []
+    fetch = _counting(calls)
+    name = f"{fetch.__module__}.{fetch.__qualname__}"
+    before = single_flight.stats()["functions"].get(name, {"calls": 0, "coalesced": 0})
+    start = datetime(2025, 10, 10, 12, tzinfo=UTC)
+
+    results = await asyncio.gather(
+        *(fetch(object(), "ven-a", start=start, ids=["x", "y"]) for _ in range(10)),
+        # Equal after normalization: positional, same instant in another zone.
+        fetch(object(), "ven-a", start.astimezone(timezone(timedelta(hours=2))), ["x", "y"]),
+    )
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    counters = single_flight.stats()["functions"][name]
+    assert counters["calls"] - before["calls"] == 11
+    assert counters["coalesced"] - before["coalesced"] == 10
+    # Finished calls are not cached.
+    assert (await fetch(object(), "ven-a", start=start, ids=["x", "y"]))["run"] == 2
+
+
+@pytest.mark.asyncio
+async def test_different_arguments_run_separately():
+    calls = []
+    fetch = _counting(calls)
+
+    results = await asyncio.gather(
+        fetch(object(), "ven-a"),
+        fetch(object(), "ven-b"),
+        fetch(object(), "ven-a", ids=["x"]),
+    )
+
+    assert len(calls) == 3
+    assert [result["ven_id"] for result in results] == ["ven-a", "ven-b", "ven-a"]
+
+
+@pytest.mark.asyncio
+async def test_exceptions_reach_every_waiter():
+    flights = SingleFlight()
+    runs = []
+
+    async def failing():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database unavailable")
+
+    results = await asyncio.gather(*(flights.do("f", "key", failing) for _ in range(3)), return_exceptions=True)
+
+    assert len(runs) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flights.stats() == {
+        "in_flight": 0,
+        "calls": 3,
+        "coalesced": 2,
+        "functions": {"f": {"calls": 3, "coalesced": 2}},
+    }
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_the_call():
+    flights = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.create_task(flights.do("f", "key", slow))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(flights.do("f", "key", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_call_outlives_the_first_callers_session(test_engine):
+    used = []
+
+    @coalesce
+    async def count(session, table: str):
+        used.append(session)
+        await asyncio.sleep(0.02)
+        return (await session.execute(text(f"SELECT count(*) FROM {table}"))).scalar_one()
+
+    first_session = AsyncSession(test_engine)
+    first = asyncio.create_task(count(first_session, "vens"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(count(AsyncSession(test_engine), "vens"))
+    await asyncio.sleep(0)
+    # The first request goes away and its session is closed mid-call.
+    first.cancel()
+    await first_session.close()
+
+    assert await second == 0
+    assert len(used) == 1 and used[0] is not first_session
+    assert used[0].bind is test_engine
+
+
+@pytest.mark.asyncio
+async def test_decorated_endpoints_keep_their_parameters(client):
+    response = await client.get("/api/vens/missing/history", params={"granularity": "5m", "maxPoints": 1})
+    assert response.status_code == 422
+
+    assert (await client.get("/api/events/current")).status_code == 200
+    metrics = (await client.get("/health/single-flight")).json()
+    assert metrics["status"] == "ok"
+    assert metrics["functions"]["app.routers.event.current_event_v2"]["calls"] >= 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/vens/ven-a/history",
+        "/api/vens/ven-a/loads/ev/history",
+        "/api/vens/ven-a/events",
+        "/api/vens/ven-a/circuits/history",
+        "/api/stats/network/history",
+        "/api/events/",
+        "/api/events/current",
+        "/api/events/history",
+    ],
+)
+async def test_coalesced_endpoints_hold_one_connection(tmp_path, path):
+    from app import crud
+    from app.dependencies import get_session
+    from app.main import app
+    from app.models import Base
+
+    # A request that needs a second pooled connection times out here.
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=0, pool_timeout=1
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as session:
+        await crud.create_ven(session, ven_id="ven-a", name="VEN A", status="online", registration_id="ven-a")
+
+    async def override_get_session():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get(path)).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
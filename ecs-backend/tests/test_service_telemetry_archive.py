@@ -0,0 +1,152 @@
+"""Tests for the Parquet telemetry archive and history read-through."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete
+
+pytest.importorskip("pyarrow")
+
+from app import crud
+from app.core.config import Settings
+from app.models import VenLoadSample, VenTelemetry
+from app.services.ingest_writer import IngestBatch, write_batch
+from app.services.telemetry_archive import TelemetryArchive, TelemetryArchiver, ven_bucket
+
+DAY = datetime(2025, 10, 1, tzinfo=UTC)
+NOW = DAY + timedelta(days=9, hours=6)
+
+
+def _config(tmp_path) -> Settings:
+    return Settings(
+        DB_HOST="h",
+        DB_USER="u",
+        DB_PASSWORD="p",
+        DB_NAME="n",
+        TELEMETRY_ARCHIVE_DIR=str(tmp_path),
+        TELEMETRY_ARCHIVE_AFTER_DAYS=7,
+        TELEMETRY_ARCHIVE_VEN_BUCKETS=4,
+    )
+
+
+def _load(load_id: str, power: float) -> dict:
+    return {
+        "load_id": load_id,
+        "name": load_id.upper(),
+        "type": "hvac",
+        "capacity_kw": 5.0,
+        "current_power_kw": power,
+        "shed_capability_kw": power / 2,
+        "enabled": True,
+        "priority": 1,
+    }
+
+
+@pytest_asyncio.fixture
+async def ingested(test_session):
+    """Two VENs with a sample every 6 hours from DAY until NOW."""
+
+    batch = IngestBatch()
+    for ven_id in ("ven-a", "ven-b"):
+        await crud.create_ven(test_session, ven_id=ven_id, name=ven_id, status="online", registration_id=ven_id)
+        for step in range(37):
+            timestamp = DAY + timedelta(hours=6 * step)
+            row = {
+                "ven_id": ven_id,
+                "timestamp": timestamp,
+                "used_power_kw": float(step),
+                "shed_power_kw": 1.0,
+                "requested_reduction_kw": None,
+                "event_id": None,
+            }
+            batch.add_telemetry(row, [_load("hvac", float(step)), _load("ev", 1.0)])
+    await write_batch(test_session, batch)
+    await test_session.commit()
+    return test_session
+
+
+@pytest_asyncio.fixture
+async def session_factory(test_session):
+    async def _factory():
+        yield test_session
+    return _factory
+
+
+def test_ven_bucket_is_stable():
+    assert ven_bucket("ven-a", 16) == ven_bucket("ven-a", 16)
+    assert {ven_bucket(f"ven-{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+@pytest.mark.asyncio
+async def test_archiver_exports_closed_days(ingested, session_factory, tmp_path):
+    config = _config(tmp_path)
+    archiver = TelemetryArchiver(session_factory=session_factory, config=config)
+
+    await archiver.run_once(NOW)
+
+    archive = TelemetryArchive(tmp_path, 4)
+    # NOW - 7 days falls on Oct 3: Oct 1 and 2 are closed and archived.
+    assert archive.horizon() == DAY + timedelta(days=2)
+    assert archiver.stats()["archived_days"] == 2
+    # 4 samples per VEN and day, each with 2 loads.
+    assert archiver.stats()["archived_rows"] == 2 * 2 * 4 * 3
+    days = sorted(path.name for path in (tmp_path / "ven_telemetry").iterdir())
+    assert days == ["date=2025-10-01", "date=2025-10-02"]
+    bucket = f"ven_bucket={ven_bucket('ven-a', 4):02d}"
+    assert (tmp_path / "ven_load_samples" / "date=2025-10-01" / bucket / "part-0.parquet").exists()
+
+    # The next run only continues after the horizon.
+    await archiver.run_once(NOW + timedelta(days=1))
+    assert archive.horizon() == DAY + timedelta(days=3)
+    assert archiver.stats()["archived_days"] == 3
+
+
+@pytest.mark.asyncio
+async def test_history_reads_through_the_archive(ingested, session_factory, tmp_path):
+    session = ingested
+    start, end = DAY + timedelta(hours=12), DAY + timedelta(days=4)
+    expected_history = await crud.telemetry_history(session, "ven-a", 7, start=start, end=end)
+    expected_fleet = await crud.telemetry_history(session, None, 7, start=start, end=end)
+    expected_load = await crud.load_history(session, "ven-a", "hvac", 7, start=start, end=end)
+    expected_loads = await crud.get_load_snapshots(session, "ven-a", load_id="hvac", start=start, end=end)
+    expected_telemetry = await crud.telemetry_for_ven(session, "ven-a", start=start, end=end)
+
+    await TelemetryArchiver(session_factory=session_factory, config=_config(tmp_path)).run_once(NOW)
+    archive = TelemetryArchive(tmp_path, 4)
+    # What partition maintenance drops once the days are archived.
+    horizon = archive.horizon()
+    session.expunge_all()
+    await session.execute(delete(VenLoadSample).where(VenLoadSample.timestamp < horizon))
+    await session.execute(delete(VenTelemetry).where(VenTelemetry.timestamp < horizon))
+    await session.commit()
+
+    def points(rows):
+        return [(row.timestamp.replace(tzinfo=None), row.used_power_kw) for row in rows]
+
+    def buckets(rows):
+        return [(row.bucket_start, row.sample_count, row.used_power_sum, row.event_id) for row in rows]
+
+    history = await crud.telemetry_history(session, "ven-a", 7, start=start, end=end, archive=archive)
+    assert buckets(history) == buckets(expected_history)
+    fleet = await crud.telemetry_history(session, None, 7, start=start, end=end, archive=archive)
+    assert buckets(fleet) == buckets(expected_fleet)
+    assert sum(row.sample_count for row in fleet) == 2 * 15
+    load = await crud.load_history(session, "ven-a", "hvac", 7, start=start, end=end, archive=archive)
+    assert buckets(load) == buckets(expected_load)
+
+    loads = await crud.get_load_snapshots(
+        session, "ven-a", load_id="hvac", start=start, end=end, archive=archive
+    )
+    assert [(sample.load_id, sample.name, sample.current_power_kw) for sample, _ in loads] == [
+        (sample.load_id, sample.name, sample.current_power_kw) for sample, _ in expected_loads
+    ]
+    limited = await crud.get_load_snapshots(session, "ven-a", start=start, end=end, limit=5, archive=archive)
+    assert len(limited) == 5
+
+    telemetry = await crud.telemetry_for_ven(session, "ven-a", start=start, end=end, archive=archive)
+    assert points(telemetry) == points(expected_telemetry)
+    assert [sorted(load.load_id for load in row.loads) for row in telemetry] == [["ev", "hvac"]] * len(telemetry)
+
+    # Ranges entirely before the horizon never reach the database.
+    cold = await crud.telemetry_for_ven(session, "ven-a", start=start, end=DAY + timedelta(days=1), archive=archive)
+    assert points(cold) == points(expected_telemetry[:3])
@@ -0,0 +1,168 @@
+"""Tests for telemetry rollups maintained on ingest and read by history endpoints."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app import crud
+from app.models import VenTelemetryRollup
+from app.routers.utils import build_history_response, history_bucket_seconds
+from app.services.ingest_writer import IngestBatch, write_batch
+from app.services.telemetry_rollups import fold_fleet_rollups, rollup_resolution, rollup_rows
+
+BASE = datetime(2025, 10, 22, 12, 0, tzinfo=UTC)
+
+
+def _sample(ven_id: str, seconds: int, used: float, event_id: str | None = None) -> dict:
+    return {
+        "ven_id": ven_id,
+        "timestamp": BASE + timedelta(seconds=seconds),
+        "used_power_kw": used,
+        "shed_power_kw": used / 10,
+        "requested_reduction_kw": None,
+        "event_id": event_id,
+    }
+
+
+async def _ingest(session, samples: list[dict]) -> None:
+    batch = IngestBatch()
+    for sample in samples:
+        batch.add_telemetry(sample, [])
+    await write_batch(session, batch)
+    await session.commit()
+
+
+def test_rollup_resolution_picks_the_coarsest_divisor():
+    assert rollup_resolution(60) == 60
+    assert rollup_resolution(900) == 300
+    assert rollup_resolution(86400) == 3600
+    assert rollup_resolution(90) is None
+    assert rollup_resolution(1) is None
+
+
+def test_rollup_rows_aggregate_per_ven():
+    ven_rows = rollup_rows(
+        [_sample("ven-a", 5, 2.0, "evt-1"), _sample("ven-a", 65, 4.0), _sample("ven-b", 10, 6.0)]
+    )
+
+    minute = [row for row in ven_rows if row["ven_id"] == "ven-a" and row["bucket_seconds"] == 60]
+    assert [(row["bucket_start"], row["used_power_sum"], row["event_id"]) for row in minute] == [
+        (BASE, 2.0, "evt-1"),
+        (BASE + timedelta(minutes=1), 4.0, None),
+    ]
+    hours = [row for row in ven_rows if row["bucket_seconds"] == 3600]
+    assert [(row["ven_id"], row["sample_count"]) for row in hours] == [("ven-a", 2), ("ven-b", 1)]
+    assert (hours[0]["used_power_sum"], hours[0]["used_power_min"], hours[0]["used_power_max"]) == (6.0, 2.0, 4.0)
+    assert hours[0]["requested_reduction_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_ingest_merges_late_samples_and_skips_duplicates(test_session):
+    await crud.create_ven(test_session, ven_id="ven-r", name="VEN", status="online", registration_id="reg-r")
+    await _ingest(test_session, [_sample("ven-r", 30, 3.0, "evt-1"), _sample("ven-r", 400, 5.0)])
+    # A late sample for the first minute, plus a re-delivered one.
+    await _ingest(test_session, [_sample("ven-r", 10, 1.0), _sample("ven-r", 30, 3.0, "evt-1")])
+
+    result = await test_session.execute(
+        select(VenTelemetryRollup).where(VenTelemetryRollup.bucket_seconds == 60).order_by("bucket_start")
+    )
+    first = result.scalars().first()
+    assert (first.sample_count, first.used_power_sum, first.used_power_count) == (2, 4.0, 2)
+    assert (first.used_power_min, first.used_power_max, first.event_id) == (1.0, 3.0, "evt-1")
+
+    await crud.create_ven(test_session, ven_id="ven-s", name="VEN", status="online", registration_id="reg-s")
+    await _ingest(test_session, [_sample("ven-s", 60, 2.0)])
+    # Until they are folded, fleet buckets are summed over the VENs' rollups.
+    [fleet] = await crud.telemetry_history(test_session, None, 3600, start=BASE, end=BASE + timedelta(hours=1))
+    assert (fleet.sample_count, fleet.used_power_sum, fleet.used_power_count) == (4, 11.0, 4)
+
+
+@pytest.mark.asyncio
+async def test_late_samples_keep_the_latest_event(test_session):
+    await crud.create_ven(test_session, ven_id="ven-o", name="VEN", status="online", registration_id="reg-o")
+    await _ingest(test_session, [_sample("ven-o", 50, 3.0, "evt-new")])
+    # Out of order: an older sample of the same minute with another event.
+    await _ingest(test_session, [_sample("ven-o", 20, 1.0, "evt-old")])
+
+    rows = (await test_session.execute(select(VenTelemetryRollup))).scalars().all()
+    assert {row.event_id for row in rows} == {"evt-new"}
+    for granularity in ("1m", "1h"):
+        buckets = await crud.telemetry_history(
+            test_session, "ven-o", history_bucket_seconds(granularity), start=BASE, end=BASE + timedelta(hours=1)
+        )
+        raw = await crud.telemetry_for_ven(test_session, "ven-o", start=BASE, end=BASE + timedelta(hours=1))
+        assert [point.eventId for point in build_history_response([], granularity, rollups=buckets).points] == [
+            point.eventId for point in build_history_response(raw, granularity).points
+        ] == ["evt-new"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ven_id, folded", [("ven-h", False), (None, False), (None, True)])
+async def test_history_from_rollups_matches_raw_telemetry(test_session, ven_id, folded):
+    await crud.create_ven(test_session, ven_id="ven-h", name="VEN", status="online", registration_id="reg-h")
+    await crud.create_ven(test_session, ven_id="ven-i", name="VEN", status="online", registration_id="reg-i")
+    samples = [_sample("ven-h", seconds, float(seconds % 17)) for seconds in range(0, 7200, 45)]
+    samples += [_sample("ven-i", seconds, 2.0, "evt-2") for seconds in range(20, 7200, 300)]
+    await _ingest(test_session, samples)
+    if folded:
+        # Fleet buckets before 12:50 come from the fleet rollups, later ones from the VENs'.
+        await fold_fleet_rollups(test_session, timedelta(0), now=BASE + timedelta(minutes=50))
+        await test_session.commit()
+
+    # Unaligned bounds: the edge buckets have to come from raw telemetry.
+    start, end = BASE + timedelta(seconds=130), BASE + timedelta(seconds=5000)
+    raw = [
+        row
+        for ven in (["ven-h"] if ven_id else ["ven-h", "ven-i"])
+        for row in await crud.telemetry_for_ven(test_session, ven, start=start, end=end)
+    ]
+
+    # 7.5 minutes: no rollup divides it, so everything is bucketed from raw telemetry.
+    for granularity in ("15m", "450000ms"):
+        bucket_seconds = history_bucket_seconds(granularity)
+        buckets = await crud.telemetry_history(test_session, ven_id, bucket_seconds, start=start, end=end)
+        # One row per bucket and source, not per sample.
+        assert len(buckets) < len(raw) / 5
+        aggregated = build_history_response([], granularity, rollups=buckets).points
+        direct = build_history_response(raw, granularity).points
+        assert [point.timestamp for point in aggregated] == [point.timestamp for point in direct]
+        for rolled, point in zip(aggregated, direct):
+            assert rolled.usedPowerKw == pytest.approx(point.usedPowerKw)
+            assert rolled.shedPowerKw == pytest.approx(point.shedPowerKw)
+            assert rolled.eventId == point.eventId
+
+
+@pytest.mark.asyncio
+async def test_history_endpoints_read_rollups(client, test_session):
+    await crud.create_ven(test_session, ven_id="ven-e", name="VEN", status="online", registration_id="reg-e")
+    await _ingest(test_session, [_sample("ven-e", 30, 4.0), _sample("ven-e", 90, 6.0)])
+
+    for path in ("/api/vens/ven-e/history", "/api/stats/network/history"):
+        response = await client.get(f"{path}?start=2025-10-22T12:00:00Z&granularity=1h")
+
+        assert response.status_code == 200
+        assert [(point["timestamp"][:19], point["usedPowerKw"]) for point in response.json()["points"]] == [
+            ("2025-10-22T12:00:00", 5.0)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_load_history_is_bucketed_from_the_load_samples(client, test_session):
+    await crud.create_ven(test_session, ven_id="ven-l", name="VEN", status="online", registration_id="reg-l")
+    batch = IngestBatch()
+    for seconds, power, event_id in ((10, 2.0, None), (40, 4.0, "evt-9"), (70, 6.0, None)):
+        loads = [
+            {"load_id": "hvac", "current_power_kw": power, "shed_capability_kw": 1.0},
+            {"load_id": "ev", "current_power_kw": 100.0, "shed_capability_kw": 50.0},
+        ]
+        batch.add_telemetry(_sample("ven-l", seconds, power + 100.0, event_id), loads)
+    await write_batch(test_session, batch)
+    await test_session.commit()
+
+    response = await client.get("/api/vens/ven-l/loads/hvac/history?start=2025-10-22T12:00:00Z&granularity=1m")
+
+    assert response.status_code == 200
+    assert [
+        (point["timestamp"][:19], point["usedPowerKw"], point["shedPowerKw"], point["eventId"])
+        for point in response.json()["points"]
+    ] == [("2025-10-22T12:00:00", 3.0, 1.0, "evt-9"), ("2025-10-22T12:01:00", 6.0, 1.0, None)]
@@ -0,0 +1,100 @@
+"""Tests for pre-serialized VEN list fragments."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app import crud
+from app.dependencies import get_ven_fragments
+from app.models.telemetry import VenStatus
+from app.services.ingest_writer import IngestBatch, write_batch
+from app.services.ven_fragments import VenFragments
+
+NOW = datetime(2025, 10, 10, 12, tzinfo=UTC)
+
+
+async def _telemetry(session, ven_id: str, at: datetime, used_kw: float) -> None:
+    batch = IngestBatch()
+    row = {
+        "ven_id": ven_id,
+        "timestamp": at,
+        "used_power_kw": used_kw,
+        "shed_power_kw": 1.5,
+        "requested_reduction_kw": None,
+        "event_id": None,
+    }
+    load = {
+        "load_id": "hvac",
+        "name": "HVAC – östra",
+        "type": "hvac",
+        "capacity_kw": 5.0,
+        "current_power_kw": used_kw,
+        "shed_capability_kw": 1.0,
+        "enabled": True,
+    }
+    batch.add_telemetry(row, [load])
+    await write_batch(session, batch)
+    await session.commit()
+
+
+async def _views(client) -> dict[str, bytes]:
+    views = {}
+    for path in ("/api/vens/", "/api/vens/summary"):
+        response = await client.get(path)
+        assert response.status_code == 200
+        views[path] = response.content
+    return views
+
+
+@pytest.mark.asyncio
+async def test_fragments_match_the_model_responses(client, test_session):
+    from app.main import app
+
+    for index in range(3):
+        await crud.create_ven(
+            test_session, ven_id=f"ven-{index}", name=f"VEN {index}", status="online", registration_id=f"ven-{index}"
+        )
+    await _telemetry(test_session, "ven-0", NOW, 4.25)
+    await _telemetry(test_session, "ven-1", NOW, 2.0)
+    test_session.add(
+        VenStatus(ven_id="ven-1", timestamp=NOW, status="curtailing", current_power_kw=1.0, shed_availability_kw=0.5)
+    )
+    await test_session.commit()
+
+    expected = await _views(client)
+    fragments = VenFragments()
+    app.dependency_overrides[get_ven_fragments] = lambda: fragments
+    assert await _views(client) == expected
+    assert await _views(client) == expected
+    stats = fragments.stats()["views"]
+    assert stats["vens"]["rendered"] == stats["vens_summary"]["rendered"] == 3
+    assert stats["vens"]["served"] == 6
+
+
+@pytest.mark.asyncio
+async def test_only_changed_vens_are_rendered(client, test_session):
+    from app.main import app
+
+    fragments = VenFragments()
+    app.dependency_overrides[get_ven_fragments] = lambda: fragments
+    for index in range(3):
+        await crud.create_ven(
+            test_session, ven_id=f"ven-{index}", name=f"VEN {index}", status="online", registration_id=f"ven-{index}"
+        )
+        await _telemetry(test_session, f"ven-{index}", NOW, 1.0)
+    await client.get("/api/vens/")
+    assert fragments.stats()["views"]["vens"]["rendered"] == 3
+
+    await _telemetry(test_session, "ven-1", NOW + timedelta(minutes=1), 3.5)
+    vens = (await client.get("/api/vens/")).json()
+    assert fragments.stats()["views"]["vens"]["rendered"] == 4
+    assert [ven["metrics"]["currentPowerKw"] for ven in vens] == [1.0, 3.5, 1.0]
+
+    renamed = await client.patch("/api/vens/ven-2", json={"name": "Renamed"})
+    assert renamed.status_code == 200
+    assert (await client.get("/api/vens/")).json()[2]["name"] == "Renamed"
+    assert fragments.stats()["views"]["vens"]["rendered"] == 5
+
+    await client.delete("/api/vens/ven-0")
+    assert [ven["id"] for ven in (await client.get("/api/vens/")).json()] == ["ven-1", "ven-2"]
+    assert fragments.stats()["views"]["vens"]["fragments"] == 2
+    assert (await client.get("/health/ven-fragments")).json()["views"]["vens"]["rendered"] == 5
@@ -0,0 +1,119 @@
+"""Tests for the in-process VEN registry."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select
+
+from app import crud
+from app.models.ven import VEN
+from app.services.ven_registry import VenRegistry
+
+
+@pytest.mark.asyncio
+async def test_ensure_registered_creates_unknown_vens(test_session):
+    """Unknown VENs are auto-registered, existing ones are left alone."""
+    await crud.create_ven(test_session, ven_id="ven-existing", name="Existing", status="offline")
+    registry = VenRegistry()
+
+    new_ids = await registry.ensure_registered(test_session, {"ven-existing", "ven-new"})
+    await test_session.commit()
+    registry.mark_known(new_ids)
+
+    assert new_ids == {"ven-existing", "ven-new"}
+    assert registry.is_known("ven-new")
+    vens = {ven.ven_id: ven for ven in (await test_session.execute(select(VEN))).scalars()}
+    assert vens["ven-new"].name == "Auto-registered VEN ven-new"
+    assert vens["ven-new"].status == "online"
+    assert vens["ven-existing"].status == "offline"
+
+
+@pytest.mark.asyncio
+async def test_known_vens_skip_database(test_engine, test_session):
+    """Once a VEN is known, registering it again issues no queries."""
+    registry = VenRegistry()
+    registry.mark_known(await registry.ensure_registered(test_session, {"ven-1"}))
+    await test_session.commit()
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        assert await registry.ensure_registered(test_session, {"ven-1"}) == set()
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _record)
+
+    assert statements == []
+
+
+@pytest.mark.asyncio
+async def test_flush_coalesces_heartbeats(test_session):
+    """Many heartbeats per VEN collapse into a single row update each."""
+    for ven_id in ("ven-a", "ven-b"):
+        await crud.create_ven(test_session, ven_id=ven_id, name=ven_id, status="offline")
+
+    registry = VenRegistry()
+    base = datetime(2025, 10, 20, 12, 0, tzinfo=UTC)
+    for offset in range(10):
+        registry.record_heartbeat("ven-a", base + timedelta(seconds=offset))
+    registry.record_heartbeat("ven-b", base)
+    registry.record_heartbeat("ven-b", base - timedelta(seconds=30))
+
+    assert registry.stats()["pending_heartbeats"] == 2
+    assert await registry.flush(test_session) == 2
+    assert registry.stats()["pending_heartbeats"] == 0
+    assert await registry.flush(test_session) == 0
+
+    test_session.expire_all()
+    vens = {ven.ven_id: ven for ven in (await test_session.execute(select(VEN))).scalars()}
+    assert vens["ven-a"].status == "online"
+    assert vens["ven-a"].last_heartbeat.replace(tzinfo=UTC) == base + timedelta(seconds=9)
+    assert vens["ven-b"].last_heartbeat.replace(tzinfo=UTC) == base
+
+
+@pytest.mark.asyncio
+async def test_forget_drops_pending_heartbeat():
+    registry = VenRegistry()
+    registry.mark_known(["ven-1"])
+    registry.record_heartbeat("ven-1")
+
+    registry.forget("ven-1")
+
+    assert not registry.is_known("ven-1")
+    assert registry.stats()["pending_heartbeats"] == 0
+
+
+@pytest.mark.asyncio
+async def test_router_existence_check_404s_after_eviction(client, test_session):
+    """Deleting a VEN evicts it from the registry, so later lookups hit the DB and 404."""
+    from app.dependencies import get_ven_registry
+    from app.main import app
+
+    await crud.create_ven(test_session, ven_id="ven-ingested", name="Ingested", status="online")
+    registry = VenRegistry()
+    registry.mark_known(["ven-ingested"])
+    app.dependency_overrides[get_ven_registry] = lambda: registry
+
+    response = await client.get("/api/vens/ven-ingested/history")
+    assert response.status_code == 200
+
+    response = await client.delete("/api/vens/ven-ingested")
+    assert response.status_code == 204
+    assert not registry.is_known("ven-ingested")
+
+    response = await client.get("/api/vens/ven-ingested/history")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_router_existence_check_falls_back_to_db(client):
+    """VENs the registry has never seen are looked up in the database."""
+    from app.dependencies import get_ven_registry
+    from app.main import app
+
+    app.dependency_overrides[get_ven_registry] = lambda: VenRegistry()
+
+    response = await client.get("/api/vens/ven-unknown/history")
+    assert response.status_code == 404
@@ -0,0 +1,95 @@
+"""Tests for the standalone background worker entry point."""
+import asyncio
+import os
+import signal
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_services_until_sigterm(monkeypatch):
+    from app import worker
+
+    calls: list[str] = []
+
+    class FakeServices:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def start(self):
+            calls.append("start")
+
+        async def stop(self):
+            calls.append("stop")
+
+    monkeypatch.setattr(worker, "BackgroundServices", FakeServices)
+    task = asyncio.create_task(worker.run())
+    while calls != ["start"]:
+        await asyncio.sleep(0.01)
+
+    os.kill(os.getpid(), signal.SIGTERM)
+    await asyncio.wait_for(task, timeout=5)
+
+    assert calls == ["start", "stop"]
+
+
+@pytest.mark.asyncio
+async def test_failed_start_stops_the_services_already_started(monkeypatch):
+    from app import worker
+    from app.core.config import settings
+    from app.services.background import BackgroundServices
+
+    calls: list[str] = []
+
+    class FakeService:
+        def __init__(self, name: str, fails: bool = False):
+            self.name, self.fails = name, fails
+
+        async def start(self):
+            calls.append(f"start {self.name}")
+            if self.fails:
+                raise ConnectionError("broker unreachable")
+
+        async def stop(self):
+            calls.append(f"stop {self.name}")
+
+    def build(*args, **kwargs):
+        services = BackgroundServices(settings, session_factory=None)
+        services.telemetry_archiver = FakeService("archiver")
+        services.partition_maintenance = FakeService("partitions")
+        services.fleet_rollups = FakeService("fleet rollups")
+        services.mqtt_consumer = FakeService("mqtt", fails=True)
+        services.event_command_service = FakeService("commands")
+        services.ven_heartbeat_monitor = FakeService("heartbeat")
+        return services
+
+    monkeypatch.setattr(worker, "BackgroundServices", build)
+    with pytest.raises(ConnectionError):
+        await worker.run()
+
+    assert calls == [
+        "start archiver",
+        "start partitions",
+        "start fleet rollups",
+        "start mqtt",
+        "stop fleet rollups",
+        "stop partitions",
+        "stop archiver",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_lifespan_skips_disabled_background_services(monkeypatch):
+    from app import main
+
+    started: list[str] = []
+
+    async def fake_start():
+        started.append("start")
+
+    monkeypatch.setattr(main.settings, "background_services_enabled", False)
+    monkeypatch.setattr(main.background_services, "start", fake_start)
+    async with main.lifespan(main.app):
+        pass
+
+    assert started == []